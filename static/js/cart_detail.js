@@ -2,13 +2,14 @@
  * This file contains JavaScript code for updating the shopping cart on the 
  * events page. It includes functionality for incrementing and decrementing 
  * the quantity of tickets in the cart, as well as removing memberships from 
- * the cart. It also includes a function for retrieving the maximum 
- * availability of a given ticket type for an event cart item.
+ * the cart. It also includes a function for retrieving the tickets left of 
+ * a given ticket type for an event in the cart.
  */
 
-// Get the update cart form and update cart URL from the page
+// Get the update cart form, update cart URL and availability URL from the page
 const updateCartForm = document.querySelector('#update-cart-form');
 const updateCartUrl = window.updateCartUrl;
+const availabilityUrl = window.availabilityUrl;
 
 // Get the availability spans for each ticket type
 const earlyBirdSpan = document.getElementById('early_bird_availability');
@@ -23,14 +24,16 @@ incrementButtons.forEach(button => {
   button.addEventListener('click', async (event) => {
     event.preventDefault();
 
-    // Get the event cart item ID and the input element containing the quantity value
+    // Get the event cart item ID, the event ID and the input element 
+    // containing the quantity value
     const eventCartItemId = event.target.getAttribute('data-event-cart-item-id');
+    const eventId = event.target.getAttribute('data-event-id');
     const inputEl = event.target.parentElement.querySelector('input');
     let currentValue = parseInt(inputEl.value) || 0;
 
-    // Get the ticket type and maximum availability for the event cart item
+    // Get the ticket type and the tickets left for the event
     const ticketType = inputEl.getAttribute('data-ticket-type');
-    const maxAvailability = await getMaxAvailability(eventCartItemId, ticketType);
+    const maxAvailability = await getMaxAvailability(eventId, ticketType);
 
     // Increment the input value if maximum availability has not been reached
     if (maxAvailability <= 0) {
@@ -140,33 +143,36 @@ removeMembershipButtons.forEach(button => {
   });
 });
 
+// Get the events of the cart, whose tickets left are asked for in one request
+const cartEventIds = [...new Set(
+  [...incrementButtons].map(button => button.getAttribute('data-event-id'))
+)];
+
 /**
-  * A function that retrieves the maximum availability of a given ticket  
-  * type for an event cart item.
-  * @param {string} eventCartItemId - The ID of the event cart item.
+  * A function that retrieves the tickets left of a given ticket type for an 
+  * event in the cart. The tickets left of all the events of the cart are 
+  * asked for in one request, which the browser caches for a few seconds.
+  * @param {string} eventId - The ID of the event.
   * @param {string} ticketType - The type of ticket to retrieve availability 
   * for (e.g. 'early_bird' or 'standard').
   */
-async function getMaxAvailability(eventCartItemId, ticketType) {
+async function getMaxAvailability(eventId, ticketType) {
   try {
-    // Send a GET request to the server to retrieve the maximum availability 
-    // of the ticket type for the event cart item.
-    const response = await fetch(
-      `${updateCartUrl}?action=get_max_availability&event_cart_item_id=${eventCartItemId}`,
-      {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'X-Requested-With': 'XMLHttpRequest'
-        }
+    // Send a GET request to the server to retrieve the tickets left of the 
+    // events of the cart.
+    const query = cartEventIds.map(id => `event=${encodeURIComponent(id)}`).join('&');
+    const response = await fetch(`${availabilityUrl}?${query}`, {
+      method: 'GET',
+      headers: {
+        'Accept': 'application/json'
       }
-    );    
-    
-    // Parse the response JSON and return the maximum availability of the 
-    // specified ticket type.
+    });
+
+    // Parse the response JSON and return the tickets left of the specified 
+    // ticket type for the event.
     const jsonResponse = await response.json();
-    return jsonResponse[`${ticketType}_availability`];
+    return jsonResponse.events[eventId][ticketType];
   } catch (err) {
     console.error(err);
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,39 @@
+/**
+ * This file contains JavaScript code for the "load more" links of the 
+ * paginated lists. Clicking a link fetches the next page of the list, 
+ * appends its items to the list and replaces the link with the one of the 
+ * page after it. Without JavaScript, the link opens the next page instead.
+ */
+
+document.addEventListener('click', async (event) => {
+  const link = event.target.closest('[data-load-more-target]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  link.classList.add('disabled');
+
+  // Fetch only the items of the next page and the link to the page after it
+  const response = await fetch(link.href, {
+    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+  });
+  if (!response.ok) {
+    link.classList.remove('disabled');
+    return;
+  }
+  const page = new DOMParser().parseFromString(await response.text(), 'text/html');
+
+  // Append the items of the next page to the list
+  const items = page.querySelector('template[data-items]');
+  const container = document.querySelector(link.dataset.loadMoreTarget);
+  container.appendChild(document.importNode(items.content, true));
+
+  // Replace the link with the one of the page after it, if any
+  const loadMore = link.closest('[data-load-more]');
+  const nextLoadMore = page.querySelector('[data-load-more]');
+  if (nextLoadMore) {
+    loadMore.replaceWith(document.importNode(nextLoadMore, true));
+  } else {
+    loadMore.remove();
+  }
+});
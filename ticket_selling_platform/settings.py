@@ -26,6 +26,21 @@ STRIPE_PUBLIC_KEY = "pk_test_51MfrHlKvlxSITsBd0rQWZ9J4XNuTGoBv3pcnXwF4re4RcojWIi
 # Set Stripe API key
 stripe.api_key = STRIPE_SECRET_KEY
 
+# Stripe API calls made by tsp.payments: base URL of the API, timeout of each 
+# call, size of the connection pool, number of retries of the calls that hit 
+# a rate limit or a connection error and delay before the first retry 
+# (doubled for each further retry, with jitter), number of consecutive failed 
+# calls after which calls fail fast for the reset time, and number of seconds 
+# the card details of payment methods are cached for
+STRIPE_API_BASE = os.environ.get('STRIPE_API_BASE', 'https://api.stripe.com')
+STRIPE_TIMEOUT_SECONDS = 10
+STRIPE_POOL_SIZE = 10
+STRIPE_MAX_RETRIES = 2
+STRIPE_RETRY_BACKOFF_SECONDS = 0.25
+STRIPE_CIRCUIT_FAILURE_THRESHOLD = 5
+STRIPE_CIRCUIT_RESET_SECONDS = 30
+STRIPE_CACHE_SECONDS = 24 * 60 * 60
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -58,11 +73,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tsp.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tsp.middleware.StudentRelationshipsMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -95,9 +112,17 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {
+            # A file rather than an in-memory database, so that the
+            # concurrency tests lock the database like the server does
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# Run the tests against a local fake Stripe server instead of the Stripe API
+TEST_RUNNER = 'tsp.tests.runner.FakeStripeTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -169,4 +194,100 @@ REDIRECT_URL_WHEN_LOGGED_IN = 'landing'
 MESSAGE_TAGS = {
     message_constants.DEBUG: 'dark',
     message_constants.ERROR: 'danger',
-}
\ No newline at end of file
+}
+
+# Number of minutes that tickets added to a cart are held for
+TICKET_HOLD_MINUTES = 15
+
+# Number of hours of a payout settlement window: the settle_payouts command 
+# pays each society once per window for the orders of the window
+PAYOUT_SETTLEMENT_WINDOW_HOURS = 24
+
+# Idempotency keys of checkouts: number of hours for which a retry with the 
+# same key gets the response of the first request, and number of seconds a 
+# retry waits for the first request to finish before being refused
+IDEMPOTENCY_KEY_HOURS = 24
+IDEMPOTENCY_WAIT_SECONDS = 5
+
+# Background jobs: number of attempts before a job is marked as failed, the 
+# delay before the first retry (doubled for each further retry) and the time 
+# after which a running job is considered abandoned by its worker
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF_SECONDS = 30
+JOB_TIMEOUT_SECONDS = 300
+
+# Number of emails sent over one connection to the mail server by bulk sends
+EMAIL_BATCH_SIZE = 100
+
+# Email outbox: maximum number of emails sent per minute to respect the limits 
+# of the mail server, number of attempts before an email is marked as failed 
+# and the delay before the first retry (doubled for each further retry)
+EMAIL_SEND_RATE_PER_MINUTE = 300
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_BACKOFF_SECONDS = 60
+
+# Number of objects per page of the lists, further pages being loaded by 
+# keyset from the last object of the previous page
+LIST_PAGE_SIZE = 20
+
+# Cache shared by the processes of the server: a memcached server at
+# CACHE_LOCATION when CACHE_BACKEND is memcached (run one locally with the
+# fake_memcached command), files in the CACHE_LOCATION directory when it is
+# filebased, or the memory of each process otherwise
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'memcached':
+    CACHES = {
+        'default': {
+            'BACKEND': 'tsp.memcached.MemcachedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', '127.0.0.1:11211'),
+            'OPTIONS': {'pool_size': 10, 'timeout': 1.0},
+        }
+    }
+elif CACHE_BACKEND == 'filebased':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get(
+                'CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')
+            ),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Number of seconds the lists of events and societies are cached for, 0 to
+# turn the caching of views off. Writes make the cached lists stale sooner
+VIEW_CACHE_SECONDS = 300
+
+# Tickets left for events shown by the quantity widgets of the carts: number 
+# of seconds they are cached for, by the server and by browsers, and maximum 
+# number of events asked for in one request
+AVAILABILITY_CACHE_SECONDS = 5
+AVAILABILITY_MAX_EVENTS = 100
+
+# Load the logged-in user as its Student, Society or StudentUnion object
+AUTHENTICATION_BACKENDS = ['tsp.backends.RoleModelBackend']
+
+# Maximum number of queries of each view, keyed by URL name, enforced by the 
+# query budget tests and logged by QueryBudgetMiddleware when DEBUG is on
+QUERY_BUDGETS_FILE = os.path.join(BASE_DIR, 'tsp', 'query_budgets.json')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'tsp.query_budget': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
@@ -19,14 +19,15 @@ from django.conf.urls.static import static
 from django.urls import path
 from tsp.views import (
     landing_page_view, log_out_view, login_view, sign_up_view,
-    change_password_view, forgot_password_view,
+    change_password_view, forgot_password_view, invalidations_view,
+    availability_view,
 )
 from tsp.views.student import (
     for_you_page_view, all_societies_view, all_events_view, society_page_view,
     follow_society_view, subscribe_society_view, buy_membership_view, 
     event_page_view, save_event_view, add_to_cart_view, cart_detail_view,
     update_cart_view, checkout_view, order_detail_view, ticket_view, 
-    order_history_list_view,
+    order_history_list_view, order_status_view,
 )
 from tsp.views.society import (
     create_event_view, modify_event_view, cancel_event_view, events_list_view,
@@ -50,6 +51,7 @@ urlpatterns = [
     path('forgot_password_next/<uidb64>', forgot_password_view.ChangePassword.as_view(), name='forgot_password_next'),
     path('change_password/', change_password_view.ChangePasswordView.as_view(), name='change_password'),
     path('activate/<uidb64>/<token>', sign_up_view.activate, name='activate'),
+    path('debug/invalidations/', invalidations_view.InvalidationsView.as_view(), name='debug_invalidations'),
 
     #Student Union
     path('create_society/', create_society_view.CreateSocietyView.as_view(), name='create_society'),
@@ -90,9 +92,11 @@ urlpatterns = [
     path('buy_membership/', buy_membership_view.BuyMembershipView.as_view(), name='buy_membership'),
     path('cart_detail/', cart_detail_view.CartDetailView.as_view(), name='cart_detail'),
     path('update_cart/', update_cart_view.UpdateCartView.as_view(), name='update_cart'), 
+    path('availability/', availability_view.AvailabilityView.as_view(), name='availability'),
     path('checkout/', checkout_view.CheckoutView.as_view(), name='checkout'), 
     path('order_detail/<int:pk>', order_detail_view.OrderDetailView.as_view(), name='order_detail'),
     path('order_detail/<int:pk>/tickets/', ticket_view.TicketView.as_view(), name='tickets'),
+    path('order_detail/<int:pk>/status/', order_status_view.OrderStatusView.as_view(), name='order_status'),
     path('list_order_history/', order_history_list_view.ListOrderHistoryView.as_view(), name='list_order_history'),
 ]
 
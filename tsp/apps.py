@@ -6,4 +6,5 @@ class LessonsConfig(AppConfig):
     
     def ready(self) -> None:
         import tsp.signals
+        import tsp.invalidation
         return super().ready()
\ No newline at end of file
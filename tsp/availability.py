@@ -0,0 +1,99 @@
+"""
+Tickets left for events, cached for the quantity widgets of the carts.
+
+The tickets left of an event are its capacity less the tickets sold and held
+in carts, the same for every student. They are cached per event for the
+AVAILABILITY_CACHE_SECONDS setting at most, under the availability namespace
+of the event, which tsp.invalidation bumps when tickets are issued and when
+cart items holding tickets change. Polling the tickets left of many events
+then costs two cache lookups, and one query for the events missing from the
+cache. Versions are only given to the namespaces of events that exist, so
+that requests for unknown events write nothing to the cache.
+
+The tickets left are a hint for the widgets: adding tickets to a cart still
+holds them, and fails if they are gone.
+
+Functions
+---------
+get_tickets_left : function
+    Get the tickets left for events.
+"""
+
+import time
+from django.conf import settings
+from django.core.cache import cache
+from tsp import caching
+from tsp.models import Event
+
+TICKET_TYPES = ('early_bird', 'standard')
+
+def get_tickets_left(event_ids):
+    """
+    Get the tickets left for events, from the cache where possible, and
+    cache those of the events missing from it.
+
+    Parameters
+    ----------
+    event_ids : list of int
+        The ids of the events.
+
+    Returns
+    -------
+    dict
+        The number of early bird and standard tickets left, by ticket type,
+        by id of event. Events that do not exist are left out.
+    """
+
+    start = time.perf_counter()
+    versions = dict(zip(event_ids, caching.get_versions(
+        [caching.availability_namespace(event_id) for event_id in event_ids],
+        create=False
+    )))
+    keys = {
+        _get_key(event_id, version): event_id
+        for event_id, version in versions.items()
+        if version is not None
+    }
+    tickets_left = {
+        keys[key]: value for key, value in cache.get_many(keys).items()
+    }
+    missing_ids = [event_id for event_id in event_ids if event_id not in tickets_left]
+    if missing_ids:
+        computed = {
+            event.id: {
+                ticket_type: max(Event.get_event_ticket_inventory(event, ticket_type), 0)
+                for ticket_type in TICKET_TYPES
+            }
+            for event in Event.objects.filter(pk__in=missing_ids).only(
+                'early_booking_capacity', 'standard_booking_capacity',
+                'early_bird_sold', 'standard_sold',
+                'early_bird_held', 'standard_held',
+            )
+        }
+        # The events without a version get one now that they are known to
+        # exist. Events given a version in the meantime may have changed
+        # since they were read, and are cached from the next lookup on
+        added_versions = caching.add_versions([
+            caching.availability_namespace(event_id)
+            for event_id in computed if versions[event_id] is None
+        ])
+        for event_id in computed:
+            version = added_versions.get(caching.availability_namespace(event_id))
+            if version is not None:
+                keys[_get_key(event_id, version)] = event_id
+        cache.set_many(
+            {
+                key: computed[event_id]
+                for key, event_id in keys.items()
+                if event_id in computed
+            },
+            settings.AVAILABILITY_CACHE_SECONDS
+        )
+        tickets_left.update(computed)
+    caching.stats.record('availability', not missing_ids, time.perf_counter() - start)
+    return tickets_left
+
+def _get_key(event_id, version):
+    """Get the cache key of the tickets left for an event."""
+
+    return f'availability:{event_id}:{version}'
@@ -0,0 +1,61 @@
+"""
+Authentication backend that loads users as their role.
+
+Students, societies and student unions are stored as subclasses of User
+with multi-table inheritance. The default backend loads the User row for
+every request, and each view then joins the table of the role again with
+request.user.student, request.user.society or request.user.studentunion.
+This backend loads the user, the row of its role and its university in one
+query, so request.user is the Student, Society or StudentUnion object.
+
+Classes
+-------
+RoleModelBackend
+    Authentication backend that loads users as their role.
+"""
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ObjectDoesNotExist
+from tsp.models import User
+
+ROLE_ACCESSORS = {
+    User.Role.STUDENT: 'student',
+    User.Role.SOCIETY: 'society',
+    User.Role.STUDENT_UNION: 'studentunion',
+}
+
+class RoleModelBackend(ModelBackend):
+    """Authentication backend that loads users as their role."""
+
+    def get_user(self, user_id):
+        """
+        Get the user with the given id as the object of its role, with its 
+        university.
+
+        Parameters
+        ----------
+        user_id : int
+            The id of the user.
+
+        Returns
+        -------
+        User or None
+            The Student, Society or StudentUnion object of the user, or the 
+            User object if it has no role object, such as a superuser. None 
+            if the user does not exist or cannot log in.
+        """
+
+        try:
+            user = User.objects.select_related(
+                'university', 
+                *ROLE_ACCESSORS.values()
+            ).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        try:
+            role_user = getattr(user, ROLE_ACCESSORS[user.role])
+        except (KeyError, ObjectDoesNotExist):
+            role_user = user
+        else:
+            role_user.university = user.university
+        return role_user if self.user_can_authenticate(role_user) else None
@@ -0,0 +1,127 @@
+"""
+Benchmark of the rendering of event broadcasts.
+
+The benchmark renders the event notification templates for a growing number 
+of recipients, once per recipient with tsp.views.helpers.send_event_message, 
+and once with a BroadcastMessage that renders the template once and fills in 
+every recipient. The event and the recipients are built in memory, so the 
+benchmark only measures the rendering.
+"""
+
+import time
+from datetime import timedelta
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+from tsp.broadcast import BroadcastMessage
+from tsp.models import Event, Student
+from tsp.views.helpers import send_event_message
+
+TEMPLATES = [
+    'society/email/create_event_email.html',
+    'society/email/modify_event_email_buyer.html',
+    'society/email/modify_event_email_saver.html',
+    'society/email/cancel_event_email_buyer.html',
+    'society/email/cancel_event_email_saver.html',
+]
+
+def run_broadcast_render_benchmark(recipient_counts, templates):
+    """
+    Time the per-recipient and the render-once rendering of the given 
+    templates for each of the given numbers of recipients.
+
+    Parameters
+    ----------
+    recipient_counts : list of int
+        The numbers of recipients to render the template for.
+    templates : list of str
+        The paths to the email templates to render.
+
+    Returns
+    -------
+    list of dict
+        One result per template and recipient count with the time in 
+        milliseconds of both renderings, and whether they rendered the same 
+        messages.
+    """
+
+    # The request of the per-recipient rendering is made for localhost
+    with override_settings(ALLOWED_HOSTS=['localhost']):
+        request = RequestFactory().get('/', HTTP_HOST='localhost')
+        event = _build_event()
+        results = []
+        for template in templates:
+            for recipient_count in recipient_counts:
+                recipients = _build_recipients(recipient_count)
+
+                start = time.perf_counter()
+                per_recipient_messages = [
+                    send_event_message(request, recipient, event, template)
+                    for recipient in recipients
+                ]
+                per_recipient_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                message = BroadcastMessage.render(template, {
+                    'domain': 'localhost',
+                    'event': event,
+                    'protocol': 'http'
+                })
+                broadcast_messages = [
+                    message.personalise(recipient) for recipient in recipients
+                ]
+                broadcast_ms = (time.perf_counter() - start) * 1000
+
+                results.append({
+                    'template': template,
+                    'recipients': recipient_count,
+                    'per_recipient_ms': per_recipient_ms,
+                    'broadcast_ms': broadcast_ms,
+                    'speedup': per_recipient_ms / max(broadcast_ms, 1e-9),
+                    'identical': per_recipient_messages == broadcast_messages,
+                })
+    return results
+
+def _build_event():
+    """
+    Build the unsaved event of the broadcast.
+
+    Returns
+    -------
+    Event
+        The unsaved event.
+    """
+
+    start_time = timezone.now() + timedelta(days=30)
+    return Event(
+        id=1,
+        name='Benchmark Event',
+        description='An event to benchmark the rendering of broadcasts.',
+        location='Bush House',
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+    )
+
+def _build_recipients(recipient_count):
+    """
+    Build the unsaved recipients of the broadcast.
+
+    Parameters
+    ----------
+    recipient_count : int
+        The number of recipients.
+
+    Returns
+    -------
+    list of Student
+        The unsaved recipients.
+    """
+
+    return [
+        Student(
+            email=f'student{i}@benchmark.ac.uk',
+            first_name=f'Student{i}',
+            last_name='Benchmark'
+        )
+        for i in range(recipient_count)
+    ]
@@ -0,0 +1,124 @@
+"""
+Benchmark of the bulk mail dispatcher.
+
+The benchmark sends the same emails to a growing number of recipients, once 
+one by one with a new connection per email as tsp.views.helpers.send_email 
+does, and once with send_bulk_mail. Each run uses one of Django's email 
+backends that do not need a mail server, so the benchmark measures the cost 
+of the connection handling around each email.
+"""
+
+import tempfile
+import time
+from django.core import mail
+from django.test.utils import override_settings
+from tsp.mail import build_email, send_bulk_mail
+
+BACKENDS = {
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+    'file': 'django.core.mail.backends.filebased.EmailBackend',
+}
+
+def run_bulk_mail_benchmark(recipient_counts, backends):
+    """
+    Time the per-recipient and the bulk delivery of emails for each of the 
+    given numbers of recipients and email backends.
+
+    Parameters
+    ----------
+    recipient_counts : list of int
+        The numbers of recipients to send the emails to.
+    backends : list of str
+        The names of the email backends to send the emails with, either 
+        'locmem' or 'file'.
+
+    Returns
+    -------
+    list of dict
+        One result per backend and recipient count with the time in 
+        milliseconds and the throughput in emails per second of both 
+        deliveries.
+    """
+
+    results = []
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as email_file_path:
+            with override_settings(
+                EMAIL_BACKEND=BACKENDS[backend],
+                EMAIL_FILE_PATH=email_file_path
+            ):
+                for recipient_count in recipient_counts:
+                    single_ms = _time_delivery(_send_one_by_one, recipient_count)
+                    bulk_ms = _time_delivery(send_bulk_mail, recipient_count)
+                    results.append({
+                        'backend': backend,
+                        'recipients': recipient_count,
+                        'single_ms': single_ms,
+                        'bulk_ms': bulk_ms,
+                        'single_per_second': _get_throughput(recipient_count, single_ms),
+                        'bulk_per_second': _get_throughput(recipient_count, bulk_ms),
+                    })
+    mail.outbox = []
+    return results
+
+def _time_delivery(deliver, recipient_count):
+    """
+    Time the delivery of emails to the given number of recipients.
+
+    Parameters
+    ----------
+    deliver : function
+        The function that sends a list of emails.
+    recipient_count : int
+        The number of recipients.
+
+    Returns
+    -------
+    float
+        The time taken in milliseconds.
+    """
+
+    emails = [
+        build_email(
+            f'student{i}@benchmark.ac.uk', 
+            'Benchmark Society has created a new event!', 
+            'A new event has been created.'
+        )
+        for i in range(recipient_count)
+    ]
+    mail.outbox = []
+    start = time.perf_counter()
+    deliver(emails)
+    return (time.perf_counter() - start) * 1000
+
+def _send_one_by_one(emails):
+    """
+    Send each email over a new connection.
+
+    Parameters
+    ----------
+    emails : list of EmailMessage
+        The emails to send.
+    """
+
+    for email in emails:
+        email.send()
+
+def _get_throughput(recipient_count, milliseconds):
+    """
+    Get the number of emails sent per second.
+
+    Parameters
+    ----------
+    recipient_count : int
+        The number of emails sent.
+    milliseconds : float
+        The time taken in milliseconds.
+
+    Returns
+    -------
+    float
+        The number of emails sent per second.
+    """
+
+    return recipient_count / max(milliseconds / 1000, 1e-9)
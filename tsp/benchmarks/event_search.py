@@ -0,0 +1,179 @@
+"""
+Benchmark of the event search.
+
+The benchmark grows the event table to each of the given sizes and times the 
+same search with the name__icontains filter joined through the societies of 
+the events, which the event views used to run, and with the full-text search 
+index. Every event name holds one of a fixed number of topics, so the number 
+of matches grows with the table. All the data is created in a transaction 
+that is rolled back at the end, so the database is left unchanged.
+"""
+
+import time
+from datetime import timedelta
+from statistics import median
+from django.db import transaction
+from django.utils import timezone
+from tsp.models import University, StudentUnion, Society, Event
+from tsp.search import rebuild_search_index, search_events, uses_fts5
+
+TOPIC_COUNT = 1000
+
+def run_event_search_benchmark(event_counts, repeat):
+    """
+    Time the substring and the full-text search of events for each of the 
+    given numbers of events.
+
+    Parameters
+    ----------
+    event_counts : list of int
+        The numbers of events in the table, in increasing order.
+    repeat : int
+        The number of times each search is timed.
+
+    Returns
+    -------
+    list of dict
+        One result per event count with the median time in milliseconds of 
+        both searches and the number of events found.
+    """
+
+    results = []
+    with transaction.atomic():
+        university, societies = _create_benchmark_data()
+        query = _get_topic(TOPIC_COUNT // 2)
+        created = 0
+        for event_count in event_counts:
+            _create_events(societies, created, event_count)
+            created = max(created, event_count)
+            rebuild_search_index()
+
+            def search_by_substring():
+                return list(Event.objects.filter(
+                    name__icontains=query, 
+                    society__university=university
+                ).distinct().values_list('id', flat=True))
+
+            def search_by_index():
+                return list(search_events(
+                    query, 
+                    university=university
+                ).values_list('id', flat=True))
+
+            substring_ms, matches = _time_search(search_by_substring, repeat)
+            index_ms, _ = _time_search(search_by_index, repeat)
+            results.append({
+                'events': event_count,
+                'matches': matches,
+                'substring_ms': substring_ms,
+                'index_ms': index_ms,
+                'fts5': uses_fts5(),
+            })
+        transaction.set_rollback(True)
+    return results
+
+def _get_topic(number):
+    """
+    Get the topic word of an event.
+
+    Parameters
+    ----------
+    number : int
+        The number of the topic.
+
+    Returns
+    -------
+    str
+        A word that does not start another topic.
+    """
+
+    return f'topic{number:04d}x'
+
+def _create_benchmark_data():
+    """
+    Create a university with a student union and societies hosting the 
+    events.
+
+    Returns
+    -------
+    tuple
+        The university and the list of societies.
+    """
+
+    university = University.objects.create(
+        name='Benchmark University', 
+        abbreviation='BU'
+    )
+    student_union = StudentUnion.objects.create(
+        email='union@benchmark.ac.uk',
+        name='Benchmark Student Union',
+        university=university
+    )
+    societies = [
+        Society.objects.create(
+            email=f'society{i}@benchmark.ac.uk',
+            name=f'Benchmark Society {i}',
+            student_union=student_union,
+            university=university
+        )
+        for i in range(5)
+    ]
+    return university, societies
+
+def _create_events(societies, start, end):
+    """
+    Create the events numbered from start to end with batched inserts, each 
+    organised by one of the societies.
+
+    Parameters
+    ----------
+    societies : list of Society
+        The societies hosting the events.
+    start : int
+        The number of the first event to create.
+    end : int
+        The number after the last event to create.
+    """
+
+    start_time = timezone.now() + timedelta(days=30)
+    events = Event.objects.bulk_create([
+        Event(
+            host=societies[i % len(societies)],
+            name=f'{_get_topic(i % TOPIC_COUNT)} night {i}',
+            description='An event created by the search benchmark.',
+            location='Benchmark location',
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=2),
+            early_booking_capacity=10,
+            standard_booking_capacity=10
+        )
+        for i in range(start, end)
+    ], batch_size=1000)
+    Event.society.through.objects.bulk_create([
+        Event.society.through(event_id=event.id, society_id=event.host_id)
+        for event in events
+    ], batch_size=1000)
+
+def _time_search(search, repeat):
+    """
+    Time a search.
+
+    Parameters
+    ----------
+    search : function
+        The function that runs the search and returns the ids found.
+    repeat : int
+        The number of times the search is timed.
+
+    Returns
+    -------
+    tuple
+        The median time in milliseconds and the number of events found.
+    """
+
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        ids = search()
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings), len(ids)
@@ -0,0 +1,332 @@
+"""
+Load simulation of a flash sale of a popular event.
+
+The simulation creates a free event with a limited number of tickets and
+students who all start buying them at the same time. Each student runs in
+its own thread with its own test client, and so its own session and database
+connection, against the WSGI application of the project. In every round a
+student adds early bird tickets to their cart, adds a standard ticket with
+the cart update, and checks out on the free-order path.
+
+The simulation reports the throughput and latency percentiles of the views,
+the requests that failed because the SQLite database was locked, and whether
+more tickets were issued than the capacity of the event. Unlike the other
+benchmarks, the threads need the data to be committed, so the data of the
+simulation is deleted at the end instead of being rolled back.
+
+Functions
+---------
+run_flash_sale : function
+    Simulate a flash sale and report how the platform behaves.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from statistics import mean
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from tsp.benchmarks.views import PERCENTILES, percentile
+from tsp.jobs import run_job
+from tsp.models import (
+    Cart, Event, Job, Society, Student, StudentUnion, Ticket, University
+)
+
+VIEWS = ['add_to_cart', 'update_cart', 'checkout']
+
+# Number of distinct error messages kept in the results
+ERROR_SAMPLE_SIZE = 5
+
+def run_flash_sale(students=50, rounds=2, early_booking_capacity=20,
+                   standard_booking_capacity=20, quantity=1, keep_data=False):
+    """
+    Simulate students buying the tickets of one event at the same time.
+
+    Parameters
+    ----------
+    students : int, optional
+        The number of simulated students, each running in its own thread.
+    rounds : int, optional
+        The number of times each student adds tickets and checks out.
+    early_booking_capacity : int, optional
+        The number of early bird tickets of the event.
+    standard_booking_capacity : int, optional
+        The number of standard tickets of the event.
+    quantity : int, optional
+        The number of early bird tickets added to the cart in each round.
+    keep_data : bool, optional
+        Keep the event, the students and their orders after the simulation.
+
+    Returns
+    -------
+    dict
+        The throughput, the latency percentiles and error counts of each
+        view, the number of orders placed and refused, and the capacity of
+        the event against the tickets issued.
+    """
+
+    with override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+    ):
+        university, event, sale_students = _create_sale_data(
+            students, early_booking_capacity, standard_booking_capacity
+        )
+        clients = []
+        try:
+            for student in sale_students:
+                client = Client()
+                client.force_login(student)
+                clients.append((client, student.cart))
+            records = []
+            barrier = threading.Barrier(len(clients))
+            threads = [
+                threading.Thread(
+                    target=_simulate_student,
+                    args=(client, cart, event, rounds, quantity, barrier, records)
+                )
+                for client, cart in clients
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duration = time.perf_counter() - start
+
+            for job in Job.objects.filter(
+                order__student__in=sale_students,
+                task='issue_tickets',
+                status=Job.Status.PENDING
+            ):
+                run_job(job)
+            event.refresh_from_db()
+            results = _summarise(records, duration, event)
+            results.update({'students': students, 'rounds': rounds})
+        finally:
+            if not keep_data:
+                for client, _ in clients:
+                    client.logout()
+                _delete_sale_data(university, event)
+    return results
+
+def _create_sale_data(students, early_booking_capacity, standard_booking_capacity):
+    """
+    Create a free event on sale now and the students buying its tickets.
+
+    Parameters
+    ----------
+    students : int
+        The number of students.
+    early_booking_capacity : int
+        The number of early bird tickets of the event.
+    standard_booking_capacity : int
+        The number of standard tickets of the event.
+
+    Returns
+    -------
+    tuple
+        The university of the sale, the event and the students.
+    """
+
+    university = University.objects.create(
+        name='Flash Sale University',
+        abbreviation='FSU'
+    )
+    student_union = StudentUnion.objects.create(
+        email='union@flashsale.ac.uk',
+        name='Flash Sale Student Union',
+        university=university
+    )
+    society = Society.objects.create(
+        email='society@flashsale.ac.uk',
+        name='Flash Sale Society',
+        student_union=student_union,
+        university=university
+    )
+    start_time = timezone.now() + timedelta(days=30)
+    event = Event.objects.create(
+        host=society,
+        name='Flash sale',
+        location='Flash sale location',
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        early_booking_capacity=early_booking_capacity,
+        standard_booking_capacity=standard_booking_capacity,
+        early_bird_price=0,
+        standard_price=0
+    )
+    event.society.add(society)
+    sale_students = []
+    for i in range(students):
+        student = Student.objects.create(
+            email=f'student{i}@flashsale.ac.uk',
+            first_name='Flash',
+            last_name=f'Student {i}',
+            university=university
+        )
+        Cart.objects.create(student=student)
+        sale_students.append(student)
+    return university, event, sale_students
+
+def _simulate_student(client, cart, event, rounds, quantity, barrier, records):
+    """
+    Add tickets of the event to the cart of a student and check out, once
+    per round. Run in a thread per student.
+
+    Parameters
+    ----------
+    client : Client
+        The test client logged in as the student.
+    cart : Cart
+        The cart of the student.
+    event : Event
+        The event on sale.
+    rounds : int
+        The number of times the student adds tickets and checks out.
+    quantity : int
+        The number of early bird tickets added in each round.
+    barrier : threading.Barrier
+        The barrier all students wait on to start at the same time.
+    records : list
+        The list the outcome of every request is appended to.
+    """
+
+    try:
+        barrier.wait()
+        for _ in range(rounds):
+            _request(records, 'add_to_cart', client.post, reverse('add_to_cart'), {
+                'event_pk': event.pk,
+                'early_bird_to_add': quantity,
+                'standard_to_add': '',
+            })
+            try:
+                event_cart_item_id = cart.event_cart_item.filter(
+                    event=event
+                ).values_list('id', flat=True).first()
+            except OperationalError:
+                event_cart_item_id = None
+            if event_cart_item_id is None:
+                continue
+            _request(records, 'update_cart', client.post, reverse('update_cart'), {
+                'event_cart_item_id': event_cart_item_id,
+                'standard_to_add': 1,
+            })
+            _request(records, 'checkout', client.get, reverse('checkout'), {})
+    finally:
+        connection.close()
+
+def _request(records, view, method, path, data):
+    """
+    Make a request and record its latency and outcome.
+
+    Parameters
+    ----------
+    records : list
+        The list the outcome is appended to.
+    view : str
+        The URL name of the view.
+    method : function
+        The method of the test client making the request.
+    path : str
+        The path of the request.
+    data : dict
+        The data of the request.
+    """
+
+    status, error = None, None
+    start = time.perf_counter()
+    try:
+        response = method(path, data)
+        status = response.status_code
+        if view == 'checkout' and status == 302:
+            status = 'ordered' if '/order_detail/' in response.url else 'refused'
+    except OperationalError as e:
+        error = str(e)
+        status = 'locked' if 'locked' in error else 'error'
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+        status = 'error'
+    records.append({
+        'view': view,
+        'ms': (time.perf_counter() - start) * 1000,
+        'status': status,
+        'error': error,
+    })
+
+def _summarise(records, duration, event):
+    """
+    Summarise the outcome of the requests and the inventory of the event.
+
+    Parameters
+    ----------
+    records : list of dict
+        The outcome of every request.
+    duration : float
+        The duration of the simulation in seconds.
+    event : Event
+        The event on sale, refreshed after the simulation.
+
+    Returns
+    -------
+    dict
+        The results of the simulation.
+    """
+
+    views = {}
+    for view in VIEWS:
+        view_records = [record for record in records if record['view'] == view]
+        timings = [record['ms'] for record in view_records] or [0]
+        views[view] = {
+            'requests': len(view_records),
+            'locked': sum(record['status'] == 'locked' for record in view_records),
+            'errors': sum(record['status'] == 'error' for record in view_records),
+            'mean_ms': mean(timings),
+            'max_ms': max(timings),
+            **{
+                f'p{percent}_ms': percentile(timings, percent)
+                for percent in PERCENTILES
+            },
+        }
+    errors = []
+    for record in records:
+        if record['error'] and record['error'] not in errors:
+            errors.append(record['error'])
+    capacity = event.early_booking_capacity + event.standard_booking_capacity
+    tickets_issued = Ticket.objects.filter(event=event).count()
+    return {
+        'duration_s': duration,
+        'requests': len(records),
+        'throughput_rps': len(records) / duration if duration else 0,
+        'views': views,
+        'orders': sum(record['status'] == 'ordered' for record in records),
+        'refused_orders': sum(record['status'] == 'refused' for record in records),
+        'locked': sum(view['locked'] for view in views.values()),
+        'errors': sum(view['errors'] for view in views.values()),
+        'error_sample': errors[:ERROR_SAMPLE_SIZE],
+        'capacity': capacity,
+        'tickets_issued': tickets_issued,
+        'tickets_sold': event.early_bird_sold + event.standard_sold,
+        'tickets_held': event.early_bird_held + event.standard_held,
+        'oversold': tickets_issued > capacity,
+    }
+
+def _delete_sale_data(university, event):
+    """
+    Delete the event, the accounts and the orders of the simulation.
+
+    Parameters
+    ----------
+    university : University
+        The university of the simulation.
+    event : Event
+        The event on sale.
+    """
+
+    Ticket.objects.filter(event=event).delete()
+    event.delete()
+    university.delete()
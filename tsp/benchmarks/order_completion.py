@@ -0,0 +1,138 @@
+"""
+Benchmark of the order completion pipeline.
+
+The benchmark places free orders of a growing number of tickets and times 
+the creation of the order, which runs the complete_order signal handler that 
+claims the tickets, together with the background jobs that issue them. All 
+the data is created in a transaction that is rolled back at the end, so the 
+database is left unchanged.
+"""
+
+import time
+from datetime import timedelta
+from statistics import mean
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from tsp.jobs import run_pending_jobs
+from tsp.models import (
+    University,
+    StudentUnion,
+    Society,
+    Student,
+    Event,
+    EventCartItem,
+    Cart,
+    Order,
+)
+
+def run_order_completion_benchmark(ticket_counts, repeat):
+    """
+    Time the completion of orders for each of the given ticket counts.
+
+    Parameters
+    ----------
+    ticket_counts : list of int
+        The numbers of tickets in the orders to time.
+    repeat : int
+        The number of orders timed for each ticket count.
+
+    Returns
+    -------
+    list of dict
+        One result per ticket count with the ticket count, the mean, minimum 
+        and maximum latency in milliseconds and the number of queries run to 
+        complete one order.
+    """
+
+    results = []
+    with transaction.atomic():
+        student, event = _create_benchmark_data(sum(ticket_counts) * repeat)
+        for ticket_count in ticket_counts:
+            timings = []
+            for i in range(repeat):
+                _fill_cart(student.cart, event, ticket_count)
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    Order.objects.create(student=student)
+                    run_pending_jobs()
+                    timings.append((time.perf_counter() - start) * 1000)
+            results.append({
+                'tickets': ticket_count,
+                'mean_ms': mean(timings),
+                'min_ms': min(timings),
+                'max_ms': max(timings),
+                'queries': len(queries),
+            })
+        transaction.set_rollback(True)
+    return results
+
+def _create_benchmark_data(capacity):
+    """
+    Create a student with a cart and a free event hosted by a society.
+
+    Parameters
+    ----------
+    capacity : int
+        The number of early bird tickets of the event.
+
+    Returns
+    -------
+    tuple
+        The student and the event.
+    """
+
+    university = University.objects.create(
+        name='Benchmark University', 
+        abbreviation='BU'
+    )
+    student_union = StudentUnion.objects.create(
+        email='union@benchmark.ac.uk',
+        name='Benchmark Student Union',
+        university=university
+    )
+    society = Society.objects.create(
+        email='society@benchmark.ac.uk',
+        name='Benchmark Society',
+        student_union=student_union,
+        university=university
+    )
+    student = Student.objects.create(
+        email='student@benchmark.ac.uk',
+        first_name='Bench',
+        last_name='Mark',
+        university=university
+    )
+    Cart.objects.create(student=student)
+    start_time = timezone.now() + timedelta(days=30)
+    event = Event.objects.create(
+        host=society,
+        name='Benchmark event',
+        location='Benchmark location',
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        early_booking_capacity=capacity,
+        standard_booking_capacity=0
+    )
+    event.society.add(society)
+    return student, event
+
+def _fill_cart(cart, event, ticket_count):
+    """
+    Add the given number of early bird tickets of the event to the cart.
+
+    Parameters
+    ----------
+    cart : Cart
+        The cart to fill.
+    event : Event
+        The event of the tickets.
+    ticket_count : int
+        The number of tickets to add.
+    """
+
+    event_cart_item = EventCartItem.objects.create(
+        event=event,
+        early_bird_quantity=ticket_count
+    )
+    cart.event_cart_item.add(event_cart_item)
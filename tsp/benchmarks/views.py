@@ -0,0 +1,363 @@
+"""
+Benchmark of the hot student and society views.
+
+The benchmark requests each view with the Django test client against the
+current database, which should be seeded with the seed command at the
+scale being measured. Every request runs in a savepoint that is rolled back,
+so that the requests that add to the cart or place an order time the same
+work on every repetition, and the whole benchmark runs in a transaction that
+is rolled back at the end, so the database is left unchanged. Work deferred
+to the commit of a transaction, such as background jobs, is not timed. The
+requests run with DEBUG off, as in production.
+
+Each view is requested a number of times to warm up the caches, then timed
+over the repetitions. The results can be written as JSON and compared with
+the results of an earlier run to flag regressions.
+
+Functions
+---------
+run_view_benchmark : function
+    Time the hot views against the current database.
+compare_results : function
+    Compare results with the results of an earlier run.
+percentile : function
+    Get a percentile of timings.
+"""
+
+import time
+from datetime import datetime
+from statistics import mean, median
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from tsp.models import (
+    Event, EventCartItem, Order, Society, Student, Ticket
+)
+from tsp.query_budget import QueryRecorder
+
+PERCENTILES = [50, 90, 95, 99]
+
+SCENARIOS = [
+    'all_events',
+    'for_you_page',
+    'event_page',
+    'add_to_cart',
+    'cart_detail',
+    'update_cart',
+    'checkout',
+    'order_detail',
+    'events_list',
+    'event_tickets',
+    'list_regular_member',
+]
+
+class BenchmarkDataError(Exception):
+    """Raised when the database has no data to benchmark the views with."""
+
+def run_view_benchmark(scenarios=SCENARIOS, warmup=3, repeat=20,
+                       student_email=None, society_email=None):
+    """
+    Time the given views against the current database.
+
+    Parameters
+    ----------
+    scenarios : list of str, optional
+        The URL names of the views to time, in SCENARIOS.
+    warmup : int, optional
+        The number of untimed requests made to each view first.
+    repeat : int, optional
+        The number of timed requests made to each view.
+    student_email : str, optional
+        The email of the student making the student requests. Defaults to
+        the student with the most orders.
+    society_email : str, optional
+        The email of the society making the society requests. Defaults to
+        the society hosting the most events.
+
+    Returns
+    -------
+    dict
+        The size of the dataset, the settings of the run and one result per
+        view with its status code, the mean, minimum, maximum and percentile
+        latencies in milliseconds and the median number of queries.
+
+    Raises
+    ------
+    BenchmarkDataError
+        If the database has no student, society or event to request.
+    """
+
+    results = []
+    with override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+    ):
+        with transaction.atomic():
+            data = _get_benchmark_data(student_email, society_email)
+            clients = {
+                'student': _logged_in_client(data['student']),
+                'society': _logged_in_client(data['society']),
+            }
+            for name in scenarios:
+                actor, method, path, prepare = _get_scenario(name, data)
+                timings, query_counts, status_code = [], [], None
+                for i in range(warmup + repeat):
+                    with transaction.atomic():
+                        params = prepare()
+                        with QueryRecorder() as recorder:
+                            start = time.perf_counter()
+                            response = getattr(clients[actor], method)(path, params)
+                            elapsed = (time.perf_counter() - start) * 1000
+                        transaction.set_rollback(True)
+                    status_code = response.status_code
+                    if i >= warmup:
+                        timings.append(elapsed)
+                        query_counts.append(recorder.count)
+                results.append({
+                    'name': name,
+                    'method': method.upper(),
+                    'path': path,
+                    'status': status_code,
+                    'mean_ms': mean(timings),
+                    'min_ms': min(timings),
+                    'max_ms': max(timings),
+                    **{
+                        f'p{percent}_ms': percentile(timings, percent)
+                        for percent in PERCENTILES
+                    },
+                    'queries': int(median(query_counts)),
+                })
+            dataset = {
+                model.__name__: model.objects.count()
+                for model in (Student, Society, Event, Order, Ticket)
+            }
+            transaction.set_rollback(True)
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'warmup': warmup,
+        'repeat': repeat,
+        'dataset': dataset,
+        'results': results,
+    }
+
+def compare_results(results, baseline, threshold=0.2):
+    """
+    Compare the results of a run with the results of an earlier run.
+
+    Parameters
+    ----------
+    results : dict
+        The results of the run, as returned by run_view_benchmark.
+    baseline : dict
+        The results of the earlier run.
+    threshold : float, optional
+        The fraction by which the median latency of a view may grow before
+        it is flagged.
+
+    Returns
+    -------
+    list of str
+        The description of every regression: a view whose median latency
+        grew by more than the threshold or that runs more queries.
+    """
+
+    baseline_results = {result['name']: result for result in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        before = baseline_results.get(result['name'])
+        if before is None:
+            continue
+        if result['p50_ms'] > before['p50_ms'] * (1 + threshold):
+            regressions.append(
+                f"{result['name']}: p50 {before['p50_ms']:.2f} ms -> "
+                f"{result['p50_ms']:.2f} ms"
+            )
+        if result['queries'] > before['queries']:
+            regressions.append(
+                f"{result['name']}: {before['queries']} -> "
+                f"{result['queries']} queries"
+            )
+    return regressions
+
+def percentile(timings, percent):
+    """
+    Get a percentile of the timings, interpolated between the closest ranks.
+
+    Parameters
+    ----------
+    timings : list of float
+        The timings.
+    percent : int
+        The percentile to get, between 0 and 100.
+
+    Returns
+    -------
+    float
+        The percentile of the timings.
+    """
+
+    ordered = sorted(timings)
+    rank = (len(ordered) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def _logged_in_client(user):
+    """
+    Get a test client logged in as the given user.
+
+    Parameters
+    ----------
+    user : User
+        The user to log in.
+
+    Returns
+    -------
+    Client
+        The logged in client.
+    """
+
+    client = Client()
+    client.force_login(user)
+    return client
+
+def _get_benchmark_data(student_email, society_email):
+    """
+    Pick the student, society, events and order requested by the benchmark.
+
+    Parameters
+    ----------
+    student_email : str or None
+        The email of the student, or None for the student with the most
+        orders.
+    society_email : str or None
+        The email of the society, or None for the society hosting the most
+        events.
+
+    Returns
+    -------
+    dict
+        The student, the society, an upcoming event of the university of
+        the student with early bird tickets left, the event of the society
+        with the most tickets sold and the latest order of the student.
+
+    Raises
+    ------
+    BenchmarkDataError
+        If the database has no student, society or event to request.
+    """
+
+    students = Student.objects.select_related('cart')
+    if student_email:
+        student = students.filter(email=student_email).first()
+    else:
+        student = students.annotate(
+            order_count=Count('order')
+        ).order_by('-order_count', 'id').first()
+    societies = Society.objects.all()
+    if society_email:
+        society = societies.filter(email=society_email).first()
+    else:
+        society = societies.annotate(
+            event_count=Count('society')
+        ).order_by('-event_count', 'id').first()
+    if student is None or society is None:
+        raise BenchmarkDataError(
+            'No student or society to benchmark, seed the database first.'
+        )
+
+    event = Event.objects.filter(
+        host__university=student.university,
+        status=Event.Status.ACTIVE,
+        start_time__gt=timezone.now(),
+        early_booking_capacity__gt=F('early_bird_sold') + F('early_bird_held'),
+    ).order_by('-early_bird_sold', 'id').first()
+    society_event = Event.objects.filter(society=society).order_by(
+        (F('early_bird_sold') + F('standard_sold')).desc(), 'id'
+    ).first()
+    if event is None or society_event is None:
+        raise BenchmarkDataError('No event to benchmark, seed the database first.')
+    return {
+        'student': student,
+        'society': society,
+        'event': event,
+        'society_event': society_event,
+        'order': Order.objects.filter(student=student).order_by('-id').first(),
+    }
+
+def _get_scenario(name, data):
+    """
+    Get the request made to a view.
+
+    Parameters
+    ----------
+    name : str
+        The URL name of the view.
+    data : dict
+        The data picked by _get_benchmark_data.
+
+    Returns
+    -------
+    tuple
+        The actor making the request, 'student' or 'society', the method, the
+        path and a function run before each request in its savepoint, which
+        prepares the database and returns the data of the request.
+    """
+
+    cart = data['student'].cart
+    event = data['event']
+    order = data['order']
+
+    def no_data():
+        return {}
+
+    def add_cart_item():
+        cart_item = EventCartItem.objects.create(event=event, early_bird_quantity=1)
+        cart.event_cart_item.add(cart_item)
+        return cart_item
+
+    def add_to_cart_data():
+        return {'event_pk': event.id, 'early_bird_to_add': 1, 'standard_to_add': ''}
+
+    def update_cart_data():
+        return {'event_cart_item_id': add_cart_item().id, 'early_bird_to_add': 1}
+
+    def fill_cart_with_free_item():
+        cart.event_cart_item.clear()
+        cart.membership.clear()
+        Event.objects.filter(pk=event.pk).update(
+            early_bird_price=0, standard_price=0
+        )
+        add_cart_item()
+        return {}
+
+    scenarios = {
+        'all_events': ('student', 'get', reverse('all_events'), no_data),
+        'for_you_page': ('student', 'get', reverse('for_you_page'), no_data),
+        'event_page': (
+            'student', 'get', reverse('event_page', args=[event.id]), no_data
+        ),
+        'add_to_cart': ('student', 'post', reverse('add_to_cart'), add_to_cart_data),
+        'cart_detail': ('student', 'get', reverse('cart_detail'), no_data),
+        'update_cart': ('student', 'post', reverse('update_cart'), update_cart_data),
+        'checkout': (
+            'student', 'get', reverse('checkout'), fill_cart_with_free_item
+        ),
+        'order_detail': (
+            'student', 'get',
+            reverse('order_detail', args=[order.id if order else 0]), no_data
+        ),
+        'events_list': ('society', 'get', reverse('events_list'), no_data),
+        'event_tickets': (
+            'society', 'get',
+            reverse('event_tickets', args=[data['society_event'].id]), no_data
+        ),
+        'list_regular_member': (
+            'society', 'get', reverse('list_regular_member'), no_data
+        ),
+    }
+    return scenarios[name]
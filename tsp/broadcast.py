@@ -0,0 +1,113 @@
+"""
+Rendering of event broadcasts, where the same email is sent to every
+subscriber, buyer or saver of an event and only the recipient changes.
+
+Rendering a template for every recipient runs the whole template pipeline,
+including the event details and the url lookups, once per recipient. A
+broadcast message renders the template once with a placeholder in place of
+the recipient, and then fills in the recipient's attributes with string
+joins.
+
+Classes
+-------
+BroadcastMessage
+    An email template rendered once for all recipients of a broadcast.
+"""
+
+import re
+from django.template.loader import render_to_string
+from django.utils.html import conditional_escape
+
+MARKER = '\x00'
+ESCAPE_SUFFIX = '|escape'
+PLACEHOLDER_PATTERN = re.compile(f'{MARKER}([A-Za-z0-9_]+(?:\\{ESCAPE_SUFFIX})?){MARKER}')
+
+class _RecipientAttribute(str):
+    """
+    The marker rendered in place of an attribute of the recipient. When the
+    template escapes the value, the escaped marker is rendered instead, so
+    that the value of the recipient is escaped when it is filled in.
+    """
+
+    def __new__(cls, name):
+        return super().__new__(cls, f'{MARKER}{name}{MARKER}')
+
+    def __html__(self):
+        return f'{self[:-1]}{ESCAPE_SUFFIX}{MARKER}'
+
+class _RecipientPlaceholder:
+    """The object rendered in place of the recipient of a broadcast."""
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _RecipientAttribute(name)
+
+class BroadcastMessage:
+    """
+    An email template rendered once for all recipients of a broadcast.
+
+    The template may only output attributes of the recipient, such as
+    {{ user.full_name }}. Filters, tags and lookups on the attributes of the
+    recipient are not supported, as they are applied to the placeholder.
+
+    Attributes
+    ----------
+    parts : list of str
+        The rendered template split around the attributes of the recipient.
+        Even indices hold rendered text and odd indices hold the name of an
+        attribute of the recipient, followed by |escape if the value has to
+        be escaped. The parts can be stored as JSON.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    @classmethod
+    def render(cls, template_name, context, recipient_name='user'):
+        """
+        Render a template once for all recipients of a broadcast.
+
+        Parameters
+        ----------
+        template_name : str
+            The path to the email template.
+        context : dict
+            The context of the template, without the recipient.
+        recipient_name : str, optional
+            The name of the recipient in the template.
+
+        Returns
+        -------
+        BroadcastMessage
+            The rendered template, ready to be personalised.
+        """
+
+        context = {**context, recipient_name: _RecipientPlaceholder()}
+        message = render_to_string(template_name, context)
+        return cls(PLACEHOLDER_PATTERN.split(message))
+
+    def personalise(self, recipient):
+        """
+        Fill in the attributes of a recipient.
+
+        Parameters
+        ----------
+        recipient : User
+            The recipient of the email.
+
+        Returns
+        -------
+        str
+            The message of the recipient.
+        """
+
+        message = self.parts[:]
+        for i in range(1, len(message), 2):
+            name = message[i]
+            if name.endswith(ESCAPE_SUFFIX):
+                name = name[:-len(ESCAPE_SUFFIX)]
+                message[i] = conditional_escape(getattr(recipient, name))
+            else:
+                message[i] = str(getattr(recipient, name))
+        return ''.join(message)
@@ -0,0 +1,311 @@
+"""
+Versioned namespaces of cached data and statistics of the cache.
+
+Cached values are grouped in namespaces, such as the events of a university.
+Each namespace has a version number kept in the cache, and the version is
+part of the keys of its values. A write that makes the values of a namespace
+stale bumps its version instead of finding and deleting all its keys, and
+the stale values expire on their own.
+
+The hits, misses and time spent getting values are counted per name of
+cached data, such as a view, in the process.
+
+Classes
+-------
+CacheStats : class
+    Hit, miss and latency statistics of cached data.
+
+Functions
+---------
+get_versions : function
+    Get the current versions of namespaces.
+add_versions : function
+    Give namespaces without a version their first version.
+bump_namespaces : function
+    Make the values cached in namespaces stale.
+make_key : function
+    Build the cache key of a value in namespaces.
+get_or_set : function
+    Get a cached value, or compute and cache it.
+events_namespace : function
+    Get the namespace of the events listed at a university.
+societies_namespace : function
+    Get the namespace of the societies listed at a university.
+availability_namespace : function
+    Get the namespace of the tickets left for an event.
+"""
+
+import hashlib
+import threading
+import time
+from django.core.cache import cache
+
+class CacheStats:
+    """
+    Hit, miss and latency statistics of cached data, per name. Counted in
+    the process, across threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, hit, seconds):
+        """
+        Count a lookup of cached data.
+
+        Parameters
+        ----------
+        name : str
+            The name of the cached data.
+        hit : bool
+            Whether the value was found in the cache.
+        seconds : float
+            The time spent getting the value, computing it on a miss.
+        """
+
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                'hits': 0, 'misses': 0, 'hit_seconds': 0.0, 'miss_seconds': 0.0
+            })
+            if hit:
+                stats['hits'] += 1
+                stats['hit_seconds'] += seconds
+            else:
+                stats['misses'] += 1
+                stats['miss_seconds'] += seconds
+
+    def snapshot(self):
+        """
+        Get the statistics of every name.
+
+        Returns
+        -------
+        dict
+            The hits, misses, hit ratio and mean latency in milliseconds of
+            hits and misses, by name.
+        """
+
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        for values in stats.values():
+            lookups = values['hits'] + values['misses']
+            values['hit_ratio'] = values['hits'] / lookups if lookups else 0
+            values['hit_ms'] = _mean_ms(values.pop('hit_seconds'), values['hits'])
+            values['miss_ms'] = _mean_ms(values.pop('miss_seconds'), values['misses'])
+        return stats
+
+    def reset(self):
+        """Forget the statistics."""
+
+        with self._lock:
+            self._stats.clear()
+
+stats = CacheStats()
+
+def get_versions(namespaces, create=True):
+    """
+    Get the current versions of namespaces in one cache lookup. A namespace
+    without a version, never cached or evicted, starts at a version taken
+    from the clock, so that it never goes back to the version of values
+    still cached.
+
+    Parameters
+    ----------
+    namespaces : list of str
+        The namespaces.
+    create : bool, optional
+        Whether to give the namespaces without a version their first
+        version. Otherwise nothing is written to the cache.
+
+    Returns
+    -------
+    list of int
+        The version of each namespace, None for the namespaces without a
+        version when create is False.
+    """
+
+    keys = [_get_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    if not create:
+        return [versions.get(key) for key in keys]
+    for key in keys:
+        if key not in versions:
+            version = _new_version()
+            cache.add(key, version, timeout=None)
+            versions[key] = cache.get(key, version)
+    return [versions[key] for key in keys]
+
+def add_versions(namespaces):
+    """
+    Give namespaces without a version their first version, taken from the
+    clock.
+
+    Parameters
+    ----------
+    namespaces : list of str
+        The namespaces.
+
+    Returns
+    -------
+    dict
+        The version of the namespaces given one by this call, by namespace.
+        The namespaces given a version in the meantime, by a concurrent
+        lookup or bump, are left out.
+    """
+
+    added = {}
+    for namespace in namespaces:
+        version = _new_version()
+        if cache.add(_get_version_key(namespace), version, timeout=None):
+            added[namespace] = version
+    return added
+
+def bump_namespaces(*namespaces):
+    """
+    Make the values cached in namespaces stale, by bumping their versions
+    in one cache lookup and one batched write. A namespace gets the next
+    version or a version taken from the clock, whichever is later, so that
+    concurrent bumps reading the same version still move it past the
+    versions of values cached in between.
+
+    Parameters
+    ----------
+    *namespaces : str
+        The namespaces.
+    """
+
+    keys = [_get_version_key(namespace) for namespace in namespaces]
+    if not keys:
+        return
+    versions = cache.get_many(keys)
+    clock_version = _new_version()
+    cache.set_many(
+        {key: max(versions.get(key, 0) + 1, clock_version) for key in keys},
+        timeout=None
+    )
+
+def make_key(name, namespaces, parts):
+    """
+    Build the cache key of a value in namespaces, from the current versions
+    of the namespaces.
+
+    Parameters
+    ----------
+    name : str
+        The name of the cached data.
+    namespaces : list of str
+        The namespaces of the value.
+    parts : iterable
+        The values the cached value depends on.
+
+    Returns
+    -------
+    str
+        The cache key.
+    """
+
+    versions = get_versions(namespaces)
+    digest = hashlib.sha256(
+        repr([list(zip(namespaces, versions)), list(parts)]).encode()
+    ).hexdigest()
+    return f'{name}:{digest}'
+
+def get_or_set(name, namespaces, parts, compute, timeout):
+    """
+    Get a cached value, or compute and cache it, and count the lookup.
+
+    Parameters
+    ----------
+    name : str
+        The name of the cached data.
+    namespaces : list of str
+        The namespaces of the value.
+    parts : iterable
+        The values the cached value depends on.
+    compute : function
+        The function computing the value on a miss.
+    timeout : int
+        The number of seconds the value is cached for.
+
+    Returns
+    -------
+    object
+        The value.
+    """
+
+    start = time.perf_counter()
+    key = make_key(name, namespaces, parts)
+    value = cache.get(key)
+    hit = value is not None
+    if not hit:
+        value = compute()
+        cache.set(key, value, timeout)
+    stats.record(name, hit, time.perf_counter() - start)
+    return value
+
+def events_namespace(university_id):
+    """
+    Get the namespace of the events listed at a university.
+
+    Parameters
+    ----------
+    university_id : int
+        The id of the university.
+
+    Returns
+    -------
+    str
+        The namespace.
+    """
+
+    return f'events:university:{university_id}'
+
+def societies_namespace(university_id):
+    """
+    Get the namespace of the societies listed at a university.
+
+    Parameters
+    ----------
+    university_id : int
+        The id of the university.
+
+    Returns
+    -------
+    str
+        The namespace.
+    """
+
+    return f'societies:university:{university_id}'
+
+def availability_namespace(event_id):
+    """
+    Get the namespace of the tickets left for an event.
+
+    Parameters
+    ----------
+    event_id : int
+        The id of the event.
+
+    Returns
+    -------
+    str
+        The namespace.
+    """
+
+    return f'availability:{event_id}'
+
+def _get_version_key(namespace):
+    """Get the cache key of the version of a namespace."""
+
+    return f'version:{namespace}'
+
+def _new_version():
+    """Get the first version of a namespace, from the clock."""
+
+    return time.time_ns() // 1000
+
+def _mean_ms(seconds, count):
+    """Get the mean of a total time in milliseconds."""
+
+    return seconds * 1000 / count if count else 0
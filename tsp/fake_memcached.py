@@ -0,0 +1,242 @@
+"""
+Local stand-in for a memcached server, used by the tests and the benchmarks
+to run the memcached cache backend without installing memcached.
+
+The server answers the commands of the memcached text protocol used by the
+cache backend: get, set, add, delete, incr, decr, touch and flush_all. It
+keeps the values in memory with their expiration time, and counts the
+commands it receives.
+
+Classes
+-------
+FakeMemcachedServer : class
+    TCP server standing in for memcached.
+"""
+
+import threading
+import time
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+# Expiration times longer than 30 days are Unix timestamps
+MAX_RELATIVE_EXPIRATION = 30 * 24 * 60 * 60
+
+class FakeMemcachedServer:
+    """
+    TCP server standing in for memcached, run in a background thread.
+
+    Attributes
+    ----------
+    values : dict
+        The flags, data and expiration time of the values stored, by key.
+    commands : list of str
+        The name of every command received.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.values = {}
+        self.commands = []
+        self._lock = threading.Lock()
+        self._server = _FakeMemcachedTCPServer((host, port), _FakeMemcachedHandler)
+        self._server.fake_memcached = self
+        self._thread = None
+
+    @property
+    def location(self):
+        """The host and port of the server, to be set as the LOCATION."""
+
+        host, port = self._server.server_address[:2]
+        return f'{host}:{port}'
+
+    def start(self):
+        """Serve connections in a background thread."""
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve connections in the current thread until interrupted."""
+
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving connections and close the socket."""
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        """Forget the values and the commands."""
+
+        with self._lock:
+            self.values.clear()
+            self.commands.clear()
+
+    def count_commands(self, name=None):
+        """
+        Count the commands received.
+
+        Parameters
+        ----------
+        name : str, optional
+            Only count the commands with this name, such as get.
+
+        Returns
+        -------
+        int
+            The number of commands.
+        """
+
+        return sum(name is None or command == name for command in self.commands)
+
+    def handle(self, name, args, data):
+        """
+        Answer a command of the memcached text protocol.
+
+        Parameters
+        ----------
+        name : str
+            The name of the command.
+        args : list of str
+            The arguments of the command.
+        data : bytes or None
+            The data block of a storage command.
+
+        Returns
+        -------
+        bytes
+            The reply to the command.
+        """
+
+        with self._lock:
+            self.commands.append(name)
+            handler = COMMANDS.get(name)
+            if handler is None:
+                return b'ERROR\r\n'
+            try:
+                return handler(self, args, data)
+            except (IndexError, ValueError):
+                return b'CLIENT_ERROR bad command line format\r\n'
+
+    def _get_value(self, key):
+        value = self.values.get(key)
+        if value is not None and value[2] is not None and value[2] <= time.time():
+            del self.values[key]
+            value = None
+        return value
+
+    def _get(self, args, data):
+        reply = b''
+        for key in args:
+            value = self._get_value(key)
+            if value is not None:
+                flags, stored = value[:2]
+                reply += f'VALUE {key} {flags} {len(stored)}\r\n'.encode()
+                reply += stored + b'\r\n'
+        return reply + b'END\r\n'
+
+    def _set(self, args, data):
+        key, flags, expiration = args[0], int(args[1]), int(args[2])
+        expires_at = _get_expiry(expiration)
+        if expires_at is not None and expires_at <= time.time():
+            self.values.pop(key, None)
+        else:
+            self.values[key] = (flags, data, expires_at)
+        return b'STORED\r\n'
+
+    def _add(self, args, data):
+        if self._get_value(args[0]) is not None:
+            return b'NOT_STORED\r\n'
+        return self._set(args, data)
+
+    def _delete(self, args, data):
+        if self._get_value(args[0]) is None:
+            return b'NOT_FOUND\r\n'
+        del self.values[args[0]]
+        return b'DELETED\r\n'
+
+    def _incr(self, args, data, sign=1):
+        key, delta = args[0], int(args[1])
+        value = self._get_value(key)
+        if value is None:
+            return b'NOT_FOUND\r\n'
+        flags, stored, expires_at = value
+        number = max(int(stored) + sign * delta, 0)
+        self.values[key] = (flags, str(number).encode(), expires_at)
+        return f'{number}\r\n'.encode()
+
+    def _decr(self, args, data):
+        return self._incr(args, data, sign=-1)
+
+    def _touch(self, args, data):
+        value = self._get_value(args[0])
+        if value is None:
+            return b'NOT_FOUND\r\n'
+        self.values[args[0]] = (value[0], value[1], _get_expiry(int(args[1])))
+        return b'TOUCHED\r\n'
+
+    def _flush_all(self, args, data):
+        self.values.clear()
+        return b'OK\r\n'
+
+    def _version(self, args, data):
+        return b'VERSION fake\r\n'
+
+COMMANDS = {
+    'get': FakeMemcachedServer._get,
+    'gets': FakeMemcachedServer._get,
+    'set': FakeMemcachedServer._set,
+    'add': FakeMemcachedServer._add,
+    'delete': FakeMemcachedServer._delete,
+    'incr': FakeMemcachedServer._incr,
+    'decr': FakeMemcachedServer._decr,
+    'touch': FakeMemcachedServer._touch,
+    'flush_all': FakeMemcachedServer._flush_all,
+    'version': FakeMemcachedServer._version,
+}
+
+# Commands followed by a data block
+STORAGE_COMMANDS = {'set', 'add'}
+
+class _FakeMemcachedTCPServer(ThreadingTCPServer):
+    """TCP server of the fake memcached server, with a thread per connection."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+class _FakeMemcachedHandler(StreamRequestHandler):
+    """Connection handler of the fake memcached server."""
+
+    def handle(self):
+        fake_memcached = self.server.fake_memcached
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.decode().split()
+            if not parts:
+                continue
+            name, *args = parts
+            if name == 'quit':
+                return
+            data = None
+            if name in STORAGE_COMMANDS:
+                data = self.rfile.read(int(args[3]) + 2)[:-2]
+            try:
+                self.wfile.write(fake_memcached.handle(name, args, data))
+            except ConnectionError:
+                return
+
+def _get_expiry(expiration):
+    """Get the expiration time of a value as a Unix timestamp, or None."""
+
+    if expiration == 0:
+        return None
+    if expiration < 0:
+        return time.time()
+    if expiration > MAX_RELATIVE_EXPIRATION:
+        return expiration
+    return time.time() + expiration
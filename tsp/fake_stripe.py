@@ -0,0 +1,401 @@
+"""
+Local stand-in for the Stripe API, used by the tests and the benchmarks so
+that they make no network calls.
+
+The server answers the endpoints of the Stripe API used by the platform:
+customers, payment methods, payment intents, transfers and accounts. It
+keeps the objects it creates in memory and replays the response of a
+request sent again with the same idempotency key. Any payment method id
+starting with pm_ is a Visa card ending in 4242. The server can delay its
+responses to simulate the round trip to Stripe and can fail the next
+requests with a given status code, to test retries and the circuit breaker.
+
+Classes
+-------
+FakeStripeServer : class
+    HTTP server standing in for the Stripe API.
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+class FakeStripeServer:
+    """
+    HTTP server standing in for the Stripe API, run in a background thread.
+
+    Attributes
+    ----------
+    latency : float
+        The number of seconds every response is delayed by.
+    requests : list of tuple
+        The method and path of every request received.
+    objects : dict
+        The objects created, by id.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0):
+        self.latency = latency
+        self.requests = []
+        self.objects = {}
+        self.idempotent_responses = {}
+        self.failures = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _FakeStripeHandler)
+        self._server.daemon_threads = True
+        self._server.fake_stripe = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """The base URL of the server, to be set as stripe.api_base."""
+
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve requests in a background thread."""
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests in the current thread until interrupted."""
+
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving requests and close the socket."""
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        """Forget the requests, objects and failures."""
+
+        with self._lock:
+            self.requests.clear()
+            self.objects.clear()
+            self.idempotent_responses.clear()
+            self.failures.clear()
+
+    def fail_next(self, status, count=1):
+        """
+        Fail the next requests with the given status code.
+
+        Parameters
+        ----------
+        status : int
+            The status code, such as 429 for a rate limit or 500.
+        count : int, optional
+            The number of requests to fail.
+        """
+
+        with self._lock:
+            self.failures.extend([status] * count)
+
+    def count_requests(self, method=None, path=None):
+        """
+        Count the requests received.
+
+        Parameters
+        ----------
+        method : str, optional
+            Only count the requests with this method.
+        path : str, optional
+            Only count the requests to paths starting with this path.
+
+        Returns
+        -------
+        int
+            The number of requests.
+        """
+
+        return sum(
+            (method is None or request_method == method)
+            and (path is None or request_path.startswith(path))
+            for request_method, request_path in self.requests
+        )
+
+    def handle(self, method, path, params, idempotency_key):
+        """
+        Answer a request to the Stripe API.
+
+        Parameters
+        ----------
+        method : str
+            The method of the request.
+        path : str
+            The path of the request.
+        params : dict
+            The parameters of the request, with nested keys as dicts.
+        idempotency_key : str or None
+            The idempotency key of the request.
+
+        Returns
+        -------
+        tuple
+            The status code and the JSON body of the response.
+        """
+
+        with self._lock:
+            self.requests.append((method, path))
+            if self.failures:
+                status = self.failures.pop(0)
+                return status, _error('api_error', 'Fake Stripe failure.')
+            if idempotency_key in self.idempotent_responses:
+                return self.idempotent_responses[idempotency_key]
+            response = self._route(method, path, params)
+            if idempotency_key and response[0] == 200:
+                self.idempotent_responses[idempotency_key] = response
+            return response
+
+    def _route(self, method, path, params):
+        """Dispatch a request to the endpoint of its path."""
+
+        for pattern, methods in ROUTES:
+            match = re.fullmatch(pattern, path)
+            if match and method in methods:
+                return methods[method](self, params, *match.groups())
+        return 404, _error('invalid_request_error', f'Unrecognized request URL ({path}).')
+
+    def _create(self, prefix, obj):
+        obj['id'] = f'{prefix}_{uuid.uuid4().hex[:24]}'
+        self.objects[obj['id']] = obj
+        return obj
+
+    def _get(self, object_id, object_type):
+        obj = self.objects.get(object_id)
+        if obj is None and object_type == 'payment_method' and object_id.startswith('pm_'):
+            obj = self.objects[object_id] = {
+                'id': object_id,
+                'object': 'payment_method',
+                'type': 'card',
+                'customer': None,
+                'card': {'brand': 'visa', 'last4': '4242'},
+            }
+        if obj is None or obj['object'] != object_type:
+            return None
+        return obj
+
+    def _respond(self, obj, params, object_type):
+        if obj is None:
+            return 404, _error(
+                'invalid_request_error', f'No such {object_type}.', 'resource_missing'
+            )
+        obj = json.loads(json.dumps(obj))
+        for path in _as_list(params.get('expand')):
+            self._expand(obj, path.split('.'))
+        return 200, obj
+
+    def _expand(self, obj, keys):
+        key = keys[0]
+        if len(keys) > 1:
+            if isinstance(obj.get(key), dict):
+                self._expand(obj[key], keys[1:])
+        elif isinstance(obj.get(key), str) and obj[key] in self.objects:
+            obj[key] = json.loads(json.dumps(self.objects[obj[key]]))
+
+    def _create_customer(self, params):
+        customer = self._create('cus', {
+            'object': 'customer',
+            'name': params.get('name'),
+            'email': params.get('email'),
+            'invoice_settings': {'default_payment_method': None},
+        })
+        payment_method_id = params.get('payment_method')
+        if payment_method_id:
+            payment_method = self._get(payment_method_id, 'payment_method')
+            if payment_method is None:
+                return self._respond(None, params, 'payment_method')
+            payment_method['customer'] = customer['id']
+        self._update(customer, params)
+        return self._respond(customer, params, 'customer')
+
+    def _retrieve_customer(self, params, customer_id):
+        return self._respond(self._get(customer_id, 'customer'), params, 'customer')
+
+    def _update_customer(self, params, customer_id):
+        customer = self._get(customer_id, 'customer')
+        if customer is not None:
+            self._update(customer, params)
+        return self._respond(customer, params, 'customer')
+
+    def _retrieve_payment_method(self, params, payment_method_id):
+        return self._respond(
+            self._get(payment_method_id, 'payment_method'), params, 'payment_method'
+        )
+
+    def _attach_payment_method(self, params, payment_method_id):
+        payment_method = self._get(payment_method_id, 'payment_method')
+        if payment_method is not None:
+            payment_method['customer'] = params.get('customer')
+        return self._respond(payment_method, params, 'payment_method')
+
+    def _create_payment_intent(self, params):
+        intent = self._create('pi', {
+            'object': 'payment_intent',
+            'amount': int(params.get('amount', 0)),
+            'currency': params.get('currency'),
+            'customer': params.get('customer'),
+            'payment_method': params.get('payment_method'),
+            'transfer_data': params.get('transfer_data'),
+            'status': (
+                'succeeded' if params.get('confirm') == 'true'
+                else 'requires_confirmation'
+            ),
+        })
+        return self._respond(intent, params, 'payment_intent')
+
+    def _confirm_payment_intent(self, params, intent_id):
+        intent = self._get(intent_id, 'payment_intent')
+        if intent is not None:
+            intent['status'] = 'succeeded'
+        return self._respond(intent, params, 'payment_intent')
+
+    def _create_transfer(self, params):
+        destination = params.get('destination') or ''
+        if not destination.startswith('acct_'):
+            return self._respond(None, params, 'account')
+        transfer = self._create('tr', {
+            'object': 'transfer',
+            'amount': int(params.get('amount', 0)),
+            'currency': params.get('currency'),
+            'destination': destination,
+            'transfer_group': params.get('transfer_group'),
+        })
+        return self._respond(transfer, params, 'transfer')
+
+    def _create_account(self, params):
+        account = self._create('acct', {'object': 'account', 'tos_acceptance': {}})
+        self._update(account, params)
+        return self._respond(account, params, 'account')
+
+    def _retrieve_account(self, params, account_id):
+        return self._respond(self._get(account_id, 'account'), params, 'account')
+
+    def _update_account(self, params, account_id):
+        account = self._get(account_id, 'account')
+        if account is not None:
+            self._update(account, params)
+        return self._respond(account, params, 'account')
+
+    def _update(self, obj, params):
+        for key, value in params.items():
+            if key in ('expand', 'payment_method'):
+                continue
+            if isinstance(value, dict) and isinstance(obj.get(key), dict):
+                obj[key].update(value)
+            else:
+                obj[key] = value
+
+ROUTES = [
+    (r'/v1/customers', {'POST': FakeStripeServer._create_customer}),
+    (r'/v1/customers/([^/]+)', {
+        'GET': FakeStripeServer._retrieve_customer,
+        'POST': FakeStripeServer._update_customer,
+    }),
+    (r'/v1/payment_methods/([^/]+)', {
+        'GET': FakeStripeServer._retrieve_payment_method,
+    }),
+    (r'/v1/payment_methods/([^/]+)/attach', {
+        'POST': FakeStripeServer._attach_payment_method,
+    }),
+    (r'/v1/payment_intents', {'POST': FakeStripeServer._create_payment_intent}),
+    (r'/v1/payment_intents/([^/]+)/confirm', {
+        'POST': FakeStripeServer._confirm_payment_intent,
+    }),
+    (r'/v1/transfers', {'POST': FakeStripeServer._create_transfer}),
+    (r'/v1/accounts', {'POST': FakeStripeServer._create_account}),
+    (r'/v1/accounts/([^/]+)', {
+        'GET': FakeStripeServer._retrieve_account,
+        'POST': FakeStripeServer._update_account,
+    }),
+]
+
+class _FakeStripeHandler(BaseHTTPRequestHandler):
+    """Request handler of the fake Stripe server."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self._answer('GET', url.path, url.query)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode()
+        self._answer('POST', url.path, '&'.join(filter(None, [url.query, body])))
+
+    def _answer(self, method, path, query):
+        fake_stripe = self.server.fake_stripe
+        if fake_stripe.latency:
+            time.sleep(fake_stripe.latency)
+        status, body = fake_stripe.handle(
+            method,
+            path,
+            _parse_params(query),
+            self.headers.get('Idempotency-Key')
+        )
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Request-Id', f'req_{uuid.uuid4().hex[:14]}')
+        try:
+            self.end_headers()
+            self.wfile.write(content)
+        except ConnectionError:
+            # The client gave up waiting for the response
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def _parse_params(query):
+    """
+    Parse form-encoded parameters as sent by the stripe library, with nested
+    keys such as invoice_settings[default_payment_method] as dicts.
+
+    Parameters
+    ----------
+    query : str
+        The form-encoded parameters.
+
+    Returns
+    -------
+    dict
+        The parameters.
+    """
+
+    params = {}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        keys = re.findall(r'[^\[\]]+', name)
+        target = params
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return params
+
+def _as_list(value):
+    """Get a list sent as an indexed dict of values, such as expand[0]."""
+
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return [value[index] for index in sorted(value, key=int)]
+    return [value]
+
+def _error(error_type, message, code=None):
+    """Get the body of an error response of the Stripe API."""
+
+    return {'error': {'type': error_type, 'message': message, 'code': code}}
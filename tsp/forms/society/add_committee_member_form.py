@@ -32,7 +32,7 @@ class AddCommitteeMemberForm(forms.Form):
         try:
             student = Student.objects.get(email=email)
             if self.society:
-                if student in self.society.committee_members:
+                if student.relationships.is_committee_member(self.society):
                     self.add_error(
                         'email', 
                         'The student is already a committee member of this '
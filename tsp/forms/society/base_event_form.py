@@ -11,7 +11,7 @@ class BaseEventForm(forms.ModelForm):
         self.user = kwargs.pop('user', None)
         super(BaseEventForm, self).__init__(*args, **kwargs)
         if self.user:
-            self.instance.host = self.user.society
+            self.instance.host_id = self.user.pk
             self.instance.society.add(self.user)
 
     photo = forms.ImageField(
@@ -1,10 +1,11 @@
 from django import forms
 from django.forms import ModelForm
-from tsp.models import EventCartItem, Event, Society, Cart
+from tsp.models import EventCartItem, Event, Society, Student, Cart, TicketHold
 
 class BaseCartForm(ModelForm):
     """Base form for adding or updating an item in the cart."""
     
+    sold_out_message = 'Sorry, there are not enough tickets left.'
     early_bird_to_add = forms.IntegerField(
         label='Early Bird Tickets', 
         widget=forms.NumberInput(attrs={'class': 'form-control'}),
@@ -29,12 +30,16 @@ class BaseCartForm(ModelForm):
         self.cart = None
         self.event_cart_item = None
         if self.user:
-            self.cart, _ = Cart.objects.get_or_create(student=self.user.student)
+            student = self.user if isinstance(self.user, Student) else self.user.student
+            self.cart, _ = Cart.objects.get_or_create(student=student)
             if self.event and self.cart:
                 self.event_cart_item, created = EventCartItem.objects.get_or_create(
                     basecart=self.cart,
                     event=self.event
                 )
+                # Share the event so that its counters refreshed by ticket 
+                # holds are seen by the form
+                self.event_cart_item.event = self.event
         super().__init__(*args, **kwargs)
         
     class Meta:
@@ -52,6 +57,8 @@ class BaseCartForm(ModelForm):
     def _get_available_ticket_quantities(self, ticket_type):
         """
         Get the available ticket quantities for the specified ticket type.
+        Tickets held for the cart are part of the inventory of the cart, 
+        while tickets in the cart whose hold has been released are not.
         
         Parameters
         ----------
@@ -69,7 +76,15 @@ class BaseCartForm(ModelForm):
             ticket_type
         )
         total_quantity_in_cart = self.cart.get_ticket_quantity_in_cart_per_event(self.event, ticket_type)
-        available_quantity = max(ticket_inventory - total_quantity_in_cart, 0)
+        quantity_held = TicketHold.get_quantity_held(
+            self.cart, 
+            self.event, 
+            ticket_type
+        )
+        available_quantity = max(
+            ticket_inventory + quantity_held - total_quantity_in_cart, 
+            0
+        )
         return available_quantity
 
     def save(self, commit=True):
@@ -98,6 +113,10 @@ class BaseCartForm(ModelForm):
 
     def update_event_cart_item(self, early_bird_to_add, standard_to_add):
         """Set the attributes of the EventCartItem object.
+        
+        Tickets added to the cart are held for the cart and tickets removed 
+        from the cart are released. If the tickets to add can no longer be 
+        held, they are not added and a form error is added instead.
 
         Parameters
         ----------
@@ -108,9 +127,52 @@ class BaseCartForm(ModelForm):
         """
         
         if self.event_cart_item:
+            early_bird_to_add = self._update_ticket_hold(
+                'early_bird', 
+                early_bird_to_add
+            )
+            standard_to_add = self._update_ticket_hold(
+                'standard', 
+                standard_to_add
+            )
             self.event_cart_item.early_bird_quantity += early_bird_to_add
             self.event_cart_item.standard_quantity += standard_to_add
             self.event_cart_item.save()
+            
+    def _update_ticket_hold(self, ticket_type, quantity_to_add):
+        """
+        Hold or release tickets of the event cart item for the quantity of 
+        tickets added to or removed from the cart.
+        
+        Parameters
+        ----------
+        ticket_type : str
+            The type of ticket added or removed.
+        quantity_to_add : int
+            The number of tickets to add, negative when tickets are removed.
+            
+        Returns
+        -------
+        int
+            The number of tickets to add to the cart.
+        """
+        
+        if quantity_to_add > 0:
+            held = TicketHold.hold_tickets(
+                self.event_cart_item, 
+                ticket_type, 
+                quantity_to_add
+            )
+            if not held:
+                self.add_error(None, self.sold_out_message)
+                return 0
+        elif quantity_to_add < 0:
+            TicketHold.release_tickets(
+                self.event_cart_item, 
+                ticket_type, 
+                -quantity_to_add
+            )
+        return quantity_to_add
         
     def update_cart(self, membership):
         """
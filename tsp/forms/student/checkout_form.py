@@ -9,6 +9,11 @@ class CheckoutForm(forms.ModelForm):
     full_name = forms.CharField(max_length=255)
     email = forms.EmailField()
     amount = forms.DecimalField(widget=forms.HiddenInput(), required=False)
+    idempotency_key = forms.CharField(
+        widget=forms.HiddenInput(), 
+        max_length=64, 
+        required=False
+    )
     
     def __init__(self, *args, **kwargs):
         """Initialize the class instance."""
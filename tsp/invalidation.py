@@ -0,0 +1,381 @@
+"""
+Invalidation of cached data when the models it is built from change.
+
+The receivers of this module listen to the post_save, post_delete and
+m2m_changed signals of events, societies, the societies of events, tickets
+and cart items, and map every change to the namespaces of tsp.caching it
+makes stale: the events and societies listed at a university and the
+tickets left for an event. Only the namespaces that cached data is read
+from are made stale, so that a write costs no lookup for data that is
+cached nowhere.
+
+The namespaces made stale within a transaction are collected and bumped
+once, when the transaction commits, so that a request writing many rows
+bumps every namespace once, in one batch, a rolled back transaction bumps
+none, and no request caches data read before the commit under the bumped
+version. Outside of a transaction they are bumped at once. The latest
+batches of invalidations of the process are kept for the debug view.
+
+Classes
+-------
+InvalidationLog : class
+    The latest invalidations of the process.
+
+Functions
+---------
+invalidate : function
+    Make namespaces stale once the current transaction commits.
+invalidate_events : function
+    Invalidate the lists showing events and their tickets left after the
+    events are updated in bulk.
+invalidate_event_when_saved : function
+    Invalidate the lists showing an event and its tickets left when it is
+    saved.
+remember_event_before_deleted : function
+    Remember the universities listing an event before it is deleted.
+invalidate_event_when_deleted : function
+    Invalidate the lists that showed an event once it is deleted.
+invalidate_events_when_societies_changed : function
+    Invalidate the lists of events when their societies change.
+invalidate_society_when_saved : function
+    Invalidate the lists showing a society when it is saved.
+invalidate_society_when_deleted : function
+    Invalidate the lists of a society when it is deleted.
+invalidate_availability_when_ticket_changed : function
+    Invalidate the tickets left for an event when a ticket is saved or
+    deleted.
+invalidate_availability_when_event_cart_item_changed : function
+    Invalidate the tickets left for an event when a cart item holding them
+    is saved or deleted.
+"""
+
+import threading
+from collections import deque
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from tsp.caching import (
+    availability_namespace,
+    bump_namespaces,
+    events_namespace,
+    societies_namespace,
+)
+from tsp.models import Event, EventCartItem, Society, Ticket
+
+# Number of batches of invalidations kept for the debug view
+LOG_SIZE = 100
+
+class InvalidationLog:
+    """
+    The latest batches of invalidations of the process, with the time they
+    were made and the changes that caused them.
+    """
+
+    def __init__(self, size=LOG_SIZE):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=size)
+
+    def record(self, namespaces, reasons):
+        """
+        Record a batch of invalidations.
+
+        Parameters
+        ----------
+        namespaces : iterable of str
+            The namespaces made stale.
+        reasons : iterable of str
+            The changes that made them stale.
+        """
+
+        entry = {
+            'time': timezone.now(),
+            'namespaces': sorted(namespaces),
+            'reasons': sorted(reasons),
+        }
+        with self._lock:
+            self._entries.appendleft(entry)
+
+    def recent(self):
+        """
+        Get the recorded batches of invalidations.
+
+        Returns
+        -------
+        list of dict
+            The time, namespaces and reasons of every batch, latest first.
+        """
+
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        """Forget the recorded invalidations."""
+
+        with self._lock:
+            self._entries.clear()
+
+log = InvalidationLog()
+
+class _InvalidationBatch:
+    """
+    The namespaces made stale within an atomic block, bumped when the
+    transaction commits. The batch is registered with on_commit, and is no
+    longer pending once it ran or once its atomic block was rolled back.
+    Nested atomic blocks have their own batch, so that rolling one back
+    drops its invalidations only.
+    """
+
+    def __init__(self, connection):
+        self.namespaces = set()
+        self.reasons = set()
+        self.savepoint_ids = _get_savepoint_ids(connection)
+        self.done = False
+
+    def add(self, namespaces, reason):
+        self.namespaces.update(namespaces)
+        self.reasons.add(reason)
+
+    def is_pending(self, connection):
+        return (
+            not self.done
+            and self.savepoint_ids == _get_savepoint_ids(connection)
+            and any(callback[1] is self for callback in connection.run_on_commit)
+        )
+
+    def __call__(self):
+        self.done = True
+        _bump(self.namespaces, self.reasons)
+
+def _get_savepoint_ids(connection):
+    """
+    Get the savepoints of the atomic blocks the connection is in, without
+    the blocks that have none and commit or roll back with their parent.
+    """
+
+    return {sid for sid in connection.savepoint_ids if sid is not None}
+
+def invalidate(namespaces, reason, using=None):
+    """
+    Make namespaces stale once the current transaction commits, or at once
+    outside of a transaction.
+
+    Parameters
+    ----------
+    namespaces : iterable of str
+        The namespaces made stale.
+    reason : str
+        The change that made them stale, shown by the debug view.
+    using : str, optional
+        The alias of the database of the transaction.
+    """
+
+    namespaces = set(namespaces)
+    if not namespaces:
+        return
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        _bump(namespaces, [reason])
+        return
+    batch = getattr(connection, 'invalidation_batch', None)
+    if batch is None or not batch.is_pending(connection):
+        batch = _InvalidationBatch(connection)
+        connection.invalidation_batch = batch
+        transaction.on_commit(batch, using)
+    batch.add(namespaces, reason)
+
+def _bump(namespaces, reasons):
+    """Bump namespaces and record the invalidation."""
+
+    bump_namespaces(*sorted(namespaces))
+    log.record(namespaces, reasons)
+
+def _get_changed_ids(sender, instance, action, reverse, pk_set, source_field, target_field):
+    """
+    Get the ids of both sides of the rows of a many-to-many relation that an
+    m2m_changed signal added, removed or cleared. The rows cleared are
+    remembered on the pre_clear signal, as they are gone on post_clear.
+
+    Parameters
+    ----------
+    sender : Model
+        The through model of the relation.
+    instance : Model
+        The object whose relation changed.
+    action : str
+        The action of the signal.
+    reverse : bool
+        Whether the instance is on the related side of the relation.
+    pk_set : set of int or None
+        The ids of the objects added or removed.
+    source_field : str
+        The field of the through model pointing to the model of the relation.
+    target_field : str
+        The field of the through model pointing to the related model.
+
+    Returns
+    -------
+    tuple or None
+        The ids of the changed objects of the model of the relation and of
+        the related model, or None if the action changed nothing yet.
+    """
+
+    if action == 'pre_clear':
+        own_field, other_field = (target_field, source_field) if reverse else (source_field, target_field)
+        instance._invalidation_cleared_ids = set(
+            sender.objects.filter(**{own_field: instance.pk}).values_list(other_field, flat=True)
+        )
+        return None
+    if action == 'post_clear':
+        changed_ids = getattr(instance, '_invalidation_cleared_ids', set())
+    elif action in ('post_add', 'post_remove'):
+        changed_ids = set(pk_set)
+    else:
+        return None
+    if not changed_ids:
+        return None
+    if reverse:
+        return changed_ids, {instance.pk}
+    return {instance.pk}, changed_ids
+
+def _get_event_university_ids(event):
+    """Get the ids of the universities of the host and societies of an event."""
+
+    return set(
+        Society.objects.filter(
+            Q(pk=event.host_id) | Q(society=event),
+            university__isnull=False
+        ).values_list('university_id', flat=True)
+    )
+
+def invalidate_events(event_ids, reason):
+    """
+    Invalidate the events listed at the universities of the given events and 
+    the tickets left for them, after the events are updated in bulk, which 
+    sends no save signal. The universities are read in one query.
+
+    Parameters
+    ----------
+    event_ids : list of int
+        The ids of the events updated.
+    reason : str
+        The change that made them stale, shown by the debug view.
+    """
+
+    university_ids = Society.objects.filter(
+        Q(host__in=event_ids) | Q(society__in=event_ids),
+        university__isnull=False
+    ).values_list('university_id', flat=True).distinct()
+    namespaces = [availability_namespace(event_id) for event_id in event_ids]
+    namespaces += [events_namespace(university_id) for university_id in university_ids]
+    invalidate(namespaces, reason)
+
+@receiver(post_save, sender=Event)
+def invalidate_event_when_saved(sender, instance, **kwargs):
+    """
+    Invalidate the events listed at the universities of an event and the
+    tickets left for it, which depend on its capacities, when it is saved.
+    """
+
+    namespaces = [availability_namespace(instance.pk)]
+    namespaces += [
+        events_namespace(university_id)
+        for university_id in _get_event_university_ids(instance)
+    ]
+    invalidate(namespaces, f'Event {instance.pk} saved')
+
+@receiver(pre_delete, sender=Event)
+def remember_event_before_deleted(sender, instance, **kwargs):
+    """
+    Remember the universities listing an event while they are known, as the
+    societies of the event are unlinked from it with the event.
+    """
+
+    instance._invalidation_university_ids = _get_event_university_ids(instance)
+
+@receiver(post_delete, sender=Event)
+def invalidate_event_when_deleted(sender, instance, **kwargs):
+    """Invalidate the lists that showed an event once it is deleted."""
+
+    namespaces = [availability_namespace(instance.pk)]
+    namespaces += [
+        events_namespace(university_id)
+        for university_id in getattr(instance, '_invalidation_university_ids', ())
+    ]
+    invalidate(namespaces, f'Event {instance.pk} deleted')
+
+@receiver(m2m_changed, sender=Event.society.through)
+def invalidate_events_when_societies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate the events listed at the universities of the societies added
+    to or removed from events, from either side of the relation.
+    """
+
+    changed_ids = _get_changed_ids(
+        sender, instance, action, reverse, pk_set, 'event_id', 'society_id'
+    )
+    if changed_ids is None:
+        return
+    society_ids = changed_ids[1]
+    university_ids = Society.objects.filter(
+        pk__in=society_ids,
+        university__isnull=False
+    ).values_list('university_id', flat=True).distinct()
+    invalidate(
+        [events_namespace(university_id) for university_id in university_ids],
+        'Societies of events changed'
+    )
+
+@receiver(post_save, sender=Society)
+def invalidate_society_when_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidate the lists showing a society when it is saved. The name of a
+    society is searched in the event lists of its university. Logging in
+    only updates the last login of the society, which is shown nowhere.
+    """
+
+    if instance.university_id is None:
+        return
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    namespaces = [societies_namespace(instance.university_id)]
+    if not created:
+        namespaces.append(events_namespace(instance.university_id))
+    invalidate(namespaces, f'Society {instance.pk} saved')
+
+@receiver(post_delete, sender=Society)
+def invalidate_society_when_deleted(sender, instance, **kwargs):
+    """
+    Invalidate the lists of a society when it is deleted. Its events are
+    cancelled before, which invalidates them.
+    """
+
+    if instance.university_id is not None:
+        invalidate(
+            [societies_namespace(instance.university_id)],
+            f'Society {instance.pk} deleted'
+        )
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_availability_when_ticket_changed(sender, instance, **kwargs):
+    """
+    Invalidate the tickets left for an event when a ticket is saved or
+    deleted. Tickets issued in bulk are invalidated by the job issuing them.
+    """
+
+    invalidate([availability_namespace(instance.event_id)], f'Ticket {instance.pk} changed')
+
+@receiver(post_save, sender=EventCartItem)
+@receiver(post_delete, sender=EventCartItem)
+def invalidate_availability_when_event_cart_item_changed(sender, instance, **kwargs):
+    """
+    Invalidate the tickets left for the event of a cart item when it is
+    saved or deleted, as it holds tickets of the event until it is deleted.
+    """
+
+    invalidate(
+        [availability_namespace(instance.event_id)],
+        f'Event cart item {instance.pk} changed'
+    )
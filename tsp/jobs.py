@@ -0,0 +1,343 @@
+"""
+Background jobs that keep slow work, such as calls to Stripe and sending
+emails, off the request path. Jobs are stored in the database and run by the
+run_jobs worker command.
+
+Every task is idempotent, so a job that is retried after a failure, or run
+again after its worker died, does not repeat work that is already done.
+
+Functions
+---------
+task : function
+    Register a function as a task that jobs can run.
+run_job : function
+    Run the task of a claimed job and record the outcome.
+run_pending_jobs : function
+    Run the jobs that are due until none is left.
+enqueue_order_jobs : function
+    Enqueue the post-processing of a completed order.
+record_payment : task
+    Create the payment object of an order paid by card.
+issue_tickets : task
+    Create the tickets of an order.
+distribute_payment : task
+    Charge an order and record the payouts of the sellers in the ledger.
+send_order_confirmation : task
+    Send the order confirmation email.
+broadcast_event_email : task
+    Write an event notification for every recipient to the email outbox.
+"""
+
+import random
+import traceback
+from faker import Faker
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.template.loader import render_to_string
+from ticket_selling_platform import settings
+from tsp import payments
+from tsp.caching import availability_namespace
+from tsp.invalidation import invalidate
+from tsp.models import (
+    Event,
+    HistoricalCart,
+    OrderLine,
+    Job,
+    Order,
+    OutboundEmail,
+    Payment,
+    PayoutEntry,
+    Ticket
+)
+from tsp.broadcast import BroadcastMessage
+
+TASKS = {}
+
+def task(function):
+    """
+    Register a function as a task that jobs can run. The task is called with
+    the order of the job and the payload of the job as keyword arguments.
+
+    Parameters
+    ----------
+    function : function
+        The function to register under its name.
+
+    Returns
+    -------
+    function
+        The registered function.
+    """
+
+    TASKS[function.__name__] = function
+    return function
+
+def run_job(job):
+    """
+    Run the task of a claimed job in a transaction and record the outcome.
+    A failed job is scheduled for a retry until it uses up its attempts.
+
+    Parameters
+    ----------
+    job : Job
+        The claimed job.
+
+    Returns
+    -------
+    bool
+        True if the job has succeeded, False otherwise.
+    """
+
+    try:
+        with transaction.atomic():
+            TASKS[job.task](job.order, **job.payload)
+    except Exception:
+        Job.mark_failed(job, traceback.format_exc())
+        return False
+    Job.mark_succeeded(job)
+    return True
+
+def run_pending_jobs(limit=None):
+    """
+    Run the jobs that are due until none is left.
+
+    Parameters
+    ----------
+    limit : int, optional
+        The maximum number of jobs to run.
+
+    Returns
+    -------
+    int
+        The number of jobs run.
+    """
+
+    count = 0
+    while limit is None or count < limit:
+        job = Job.claim_next()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+def enqueue_order_jobs(order):
+    """
+    Enqueue the post-processing of a completed order. Payments are only
+    recorded for orders paid by card, and only distributed to the sellers for
+    real Stripe customers.
+
+    Parameters
+    ----------
+    order : Order
+        The completed order.
+    """
+
+    if order.customer_id:
+        Job.enqueue('record_payment', order)
+    Job.enqueue('issue_tickets', order)
+    if order.customer_id and not order.customer_id.startswith('fake'):
+        Job.enqueue('distribute_payment', order)
+
+@task
+def record_payment(order):
+    """
+    Create the payment object of an order paid by card, with the card
+    details of the Stripe customer, which are usually cached by the checkout.
+    A failed call to Stripe fails the job, so that it is retried.
+
+    Parameters
+    ----------
+    order : Order
+        The completed order.
+    """
+
+    if not order.customer_id or Payment.objects.filter(order=order).exists():
+        return
+    if order.customer_id.startswith('fake'):
+        # Seeded orders have no Stripe customer
+        transaction_id = "pm_" + Faker("en_GB").sha1()
+        last4 = random.randint(1000,9999)
+        brands = ["visa", "mastercard", "amex", "unionpay"]
+        brand = random.sample(brands, k=1)[0]
+    else:
+        payment_method = payments.get_default_payment_method(order.customer_id)
+        last4 = payment_method['last4']
+        brand = payment_method['brand']
+        transaction_id = payment_method['id']
+    Payment.objects.create(
+        student=order.student,
+        order=order,
+        amount=HistoricalCart.objects.get(order=order).total_price,
+        last4=last4,
+        brand=brand,
+        transaction_id=transaction_id
+    )
+
+@task
+def issue_tickets(order):
+    """
+    Create the tickets of an order in one batched insert, from the lines of
+    the order. The tickets were taken from the inventory when the order was
+    placed, so only the ticket objects are created here.
+
+    Parameters
+    ----------
+    order : Order
+        The completed order.
+
+    Returns
+    -------
+    list of Ticket
+        The tickets of the order.
+    """
+
+    with transaction.atomic():
+        # Lock the order so that concurrent workers issue the tickets once
+        Order.objects.select_for_update().get(pk=order.pk)
+        tickets = list(
+            Ticket.objects.filter(order=order).select_related('order_line')
+        )
+        if tickets:
+            return tickets
+        for line in OrderLine.objects.filter(
+            order=order,
+            event__isnull=False
+        ).exclude(type=OrderLine.Type.MEMBERSHIP):
+            tickets += _build_tickets_for_line(line, order)
+        # The batched insert sends no signals to invalidate the tickets left
+        invalidate(
+            {availability_namespace(ticket.event_id) for ticket in tickets},
+            f'Tickets of order {order.pk} issued'
+        )
+        return Ticket.objects.bulk_create(tickets, batch_size=500)
+
+def _build_tickets_for_line(line, order):
+    """
+    Build the unsaved tickets of a line of an order.
+
+    Parameters
+    ----------
+    line : OrderLine
+        The line of tickets.
+    order : Order
+        The order object to which the tickets belong.
+
+    Returns
+    -------
+    list of Ticket
+        The unsaved tickets.
+    """
+
+    return [
+        Ticket(event_id=line.event_id, order=order, type=line.type, order_line=line)
+        for i in range(line.quantity)
+    ]
+
+@task
+def distribute_payment(order):
+    """
+    Charge the customer of a completed order and record the payouts owed to 
+    the sellers in the payout ledger, which is settled by the settle_payouts 
+    command. Both are computed from the lines of the order, at the prices the 
+    items were bought at.
+
+    Parameters
+    ----------
+    order : Order
+        The completed order.
+    """
+
+    record_payment(order)
+    # The entries are rolled back with the job if the charge fails
+    payouts = PayoutEntry.record(order)
+    payments.charge_order(order, sum(payouts.values()))
+
+@task
+def send_order_confirmation(order, email):
+    """
+    Send an email confirmation for the given order. The payment and tickets
+    are created first if their jobs have not run yet.
+
+    Parameters
+    ----------
+    order : Order
+        The completed order.
+    email : str
+        The email address to send the confirmation to.
+    """
+
+    record_payment(order)
+    tickets = issue_tickets(order)
+    payment = Payment.objects.filter(order=order).first()
+
+    lines = list(order.lines.all())
+    total_price, total_saved = OrderLine.get_totals(lines)
+
+    subject = f"We have received your order #{order.id}"
+    context = {
+        'order': order,
+        'tickets': tickets,
+        'payment': payment,
+        'memberships': [line for line in lines if not line.is_ticket],
+        'total_price': total_price,
+    }
+    html_message = render_to_string(
+        'student/email/order_confirmation.html',
+        context
+    )
+
+    # Create the email and attach the HTML message.
+    msg = EmailMultiAlternatives(
+        subject,
+        '',
+        settings.EMAIL_HOST_USER,
+        [email],
+    )
+    msg.attach_alternative(html_message, "text/html")
+    msg.send()
+
+EVENT_AUDIENCES = {
+    'subscribers': lambda event: event.event_subscribers,
+    'buyers': lambda event: event.event_buyers.distinct(),
+    'savers': lambda event: event.event_filtered_savers,
+}
+
+@task
+def broadcast_event_email(order, event_id, audience, template, subject, parts):
+    """
+    Personalise an event notification for every recipient of the audience 
+    and write it to the email outbox, from where the send_outbound_emails 
+    worker sends them. Recipients who are still waiting for the same 
+    notification are skipped.
+
+    Parameters
+    ----------
+    order : None
+        Broadcasts are not tied to an order.
+    event_id : int
+        The id of the event the notification is about.
+    audience : str
+        The recipients of the notification, either subscribers, buyers or 
+        savers.
+    template : str
+        The path to the email template the notification was rendered from.
+    subject : str
+        The subject of the email.
+    parts : list of str
+        The parts of the notification rendered once for all recipients, see 
+        BroadcastMessage.
+    """
+
+    event = Event.objects.get(pk=event_id)
+    message = BroadcastMessage(parts)
+    OutboundEmail.enqueue([
+        OutboundEmail(
+            recipient=recipient.email,
+            subject=subject,
+            body=message.personalise(recipient),
+            template=template,
+            event=event
+        )
+        for recipient in EVENT_AUDIENCES[audience](event)
+    ])
@@ -0,0 +1,251 @@
+"""
+Bulk delivery of emails over a reused mail server connection, and the worker 
+that sends the emails waiting in the outbox.
+
+Sending emails one by one with EmailMessage.send opens a new connection,
+including the TLS handshake and login to the SMTP server, for every email.
+The bulk dispatcher opens one connection per chunk of emails and sends the
+whole chunk over it.
+
+Classes
+-------
+BulkMailResult
+    The outcome of a bulk delivery.
+
+Functions
+---------
+build_email : function
+    Build the email of one recipient.
+send_bulk_mail : function
+    Send emails in chunks, reusing one connection per chunk.
+send_outbound_email_batch : function
+    Send one batch of the emails waiting in the outbox.
+send_pending_outbound_emails : function
+    Send the emails waiting in the outbox until none is due.
+"""
+
+from django.core.mail import EmailMessage, get_connection
+from ticket_selling_platform import settings
+from tsp.models import OutboundEmail
+
+class BulkMailResult:
+    """
+    The outcome of a bulk delivery.
+
+    Attributes
+    ----------
+    sent : list of str
+        The recipients the emails have been sent to.
+    failed : dict
+        A dictionary mapping the recipients the emails could not be sent to
+        to the error raised.
+    sent_emails : list of EmailMessage
+        The emails that have been sent.
+    failed_emails : list of tuple
+        The emails that could not be sent with the error raised.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.failed = {}
+        self.sent_emails = []
+        self.failed_emails = []
+
+    def add_sent(self, email):
+        """
+        Record an email that has been sent.
+
+        Parameters
+        ----------
+        email : EmailMessage
+            The email sent.
+        """
+
+        self.sent.append(', '.join(email.recipients()))
+        self.sent_emails.append(email)
+
+    def add_failed(self, email, error):
+        """
+        Record an email that could not be sent.
+
+        Parameters
+        ----------
+        email : EmailMessage
+            The email that could not be sent.
+        error : str
+            The error raised.
+        """
+
+        self.failed[', '.join(email.recipients())] = error
+        self.failed_emails.append((email, error))
+
+    @property
+    def sent_count(self):
+        """
+        Get the number of emails sent.
+
+        Returns
+        -------
+        int
+            The number of recipients the emails have been sent to.
+        """
+
+        return len(self.sent)
+
+    @property
+    def all_sent(self):
+        """
+        Check if all emails have been sent.
+
+        Returns
+        -------
+        bool
+            True if no email has failed, False otherwise.
+        """
+
+        return not self.failed
+
+def build_email(to_email, mail_subject, message):
+    """
+    Build the email of one recipient, in the same way as
+    tsp.views.helpers.send_email.
+
+    Parameters
+    ----------
+    to_email : str
+        The email address of the recipient.
+    mail_subject : str
+        The subject of the email.
+    message : str
+        The body of the email.
+
+    Returns
+    -------
+    EmailMessage
+        The unsent email.
+    """
+
+    return EmailMessage(mail_subject, message, to=[to_email])
+
+def send_bulk_mail(emails, chunk_size=None, connection=None):
+    """
+    Send emails in chunks, reusing one connection for all emails of a chunk.
+    Opening a new connection for each chunk keeps the number of emails sent
+    per connection below the limits of the mail server. The emails of a
+    chunk are passed to send_messages one at a time, so that an email that
+    is refused does not stop the rest of the chunk and its recipients are
+    reported.
+
+    Parameters
+    ----------
+    emails : iterable of EmailMessage
+        The emails to send.
+    chunk_size : int, optional
+        The number of emails sent per connection. Defaults to the
+        EMAIL_BATCH_SIZE setting.
+    connection : BaseEmailBackend, optional
+        The email backend to send the emails with. Defaults to the
+        EMAIL_BACKEND setting.
+
+    Returns
+    -------
+    BulkMailResult
+        The recipients the emails have been sent to and those that failed.
+    """
+
+    chunk_size = chunk_size or settings.EMAIL_BATCH_SIZE
+    connection = connection or get_connection()
+    result = BulkMailResult()
+    emails = list(emails)
+    for start in range(0, len(emails), chunk_size):
+        chunk = emails[start:start + chunk_size]
+        try:
+            connection.open()
+        except Exception as e:
+            for email in chunk:
+                result.add_failed(email, str(e))
+            continue
+        try:
+            for email in chunk:
+                try:
+                    connection.send_messages([email])
+                    result.add_sent(email)
+                except Exception as e:
+                    result.add_failed(email, str(e))
+                    # The server may have dropped the connection
+                    try:
+                        connection.close()
+                        connection.open()
+                    except Exception:
+                        pass
+        finally:
+            connection.close()
+    return result
+
+def send_outbound_email_batch(batch_size=None):
+    """
+    Send one batch of the emails waiting in the outbox over one connection, 
+    without going over the send rate of the mail server. Emails that could 
+    not be sent are retried later with exponential backoff.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        The maximum number of emails to send. Defaults to the 
+        EMAIL_BATCH_SIZE setting.
+
+    Returns
+    -------
+    int
+        The number of emails claimed from the outbox, whether they have been 
+        sent or not.
+    """
+
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    limit = min(batch_size, OutboundEmail.get_send_allowance())
+    if limit <= 0:
+        return 0
+    outbound_emails = OutboundEmail.claim_batch(limit)
+    if not outbound_emails:
+        return 0
+    emails = {}
+    for outbound_email in outbound_emails:
+        email = build_email(
+            outbound_email.recipient,
+            outbound_email.subject,
+            outbound_email.body
+        )
+        emails[id(email)] = (email, outbound_email)
+    result = send_bulk_mail(
+        [email for email, _ in emails.values()],
+        chunk_size=len(emails)
+    )
+    OutboundEmail.mark_sent(
+        [emails[id(email)][1] for email in result.sent_emails]
+    )
+    for email, error in result.failed_emails:
+        OutboundEmail.mark_failed(emails[id(email)][1], error)
+    return len(outbound_emails)
+
+def send_pending_outbound_emails(batch_size=None):
+    """
+    Send the emails waiting in the outbox in batches until none is due or 
+    the send rate of the mail server is reached.
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        The maximum number of emails sent per batch.
+
+    Returns
+    -------
+    int
+        The number of emails claimed from the outbox.
+    """
+
+    count = 0
+    while True:
+        claimed = send_outbound_email_batch(batch_size)
+        if not claimed:
+            return count
+        count += claimed
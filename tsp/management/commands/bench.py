@@ -0,0 +1,105 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from tsp.benchmarks.views import (
+    PERCENTILES, SCENARIOS, BenchmarkDataError, compare_results, run_view_benchmark
+)
+
+class Command(BaseCommand):
+    """Command to time the hot student and society views."""
+
+    help = (
+        'Time the hot student and society views against the current, seeded '
+        'database, and flag regressions against an earlier run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--views',
+            nargs='+',
+            choices=SCENARIOS,
+            default=SCENARIOS,
+            help='The URL names of the views to time.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='The number of untimed requests made to each view first.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='The number of timed requests made to each view.',
+        )
+        parser.add_argument(
+            '--student',
+            help='The email of the student, the student with the most orders by default.',
+        )
+        parser.add_argument(
+            '--society',
+            help='The email of the society, the society hosting the most events by default.',
+        )
+        parser.add_argument(
+            '--output',
+            help='The path of the JSON file the results are written to.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='The path of the JSON results of an earlier run to compare with.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='The fraction by which the median latency of a view may grow '
+                 'before it is flagged as a regression.',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+        try:
+            results = run_view_benchmark(
+                options['views'],
+                options['warmup'],
+                options['repeat'],
+                options['student'],
+                options['society']
+            )
+        except BenchmarkDataError as e:
+            raise CommandError(str(e))
+
+        dataset = ', '.join(
+            f'{model_name} {count}'
+            for model_name, count in results['dataset'].items()
+        )
+        self.stdout.write(f'Dataset: {dataset}\n')
+        percentile_headers = ''.join(f"{f'p{percent} ms':>10}" for percent in PERCENTILES)
+        self.stdout.write(
+            f"{'view':<20} {'status':>6} {'mean ms':>10}{percentile_headers} "
+            f"{'queries':>8}\n"
+        )
+        for result in results['results']:
+            percentiles = ''.join(
+                f"{result[f'p{percent}_ms']:>10.2f}" for percent in PERCENTILES
+            )
+            self.stdout.write(
+                f"{result['name']:<20} {result['status']:>6} "
+                f"{result['mean_ms']:>10.2f}{percentiles} {result['queries']:>8}\n"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}\n")
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = compare_results(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Regressions against the baseline:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write('No regression against the baseline\n')
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from tsp.benchmarks.broadcast_render import TEMPLATES, run_broadcast_render_benchmark
+
+class Command(BaseCommand):
+    """Command to compare the per-recipient and the render-once rendering of event broadcasts."""
+
+    help = 'Time the per-recipient and the render-once rendering of event broadcasts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipient-counts',
+            nargs='+',
+            type=int,
+            default=[100, 1000, 10000],
+            help='The numbers of recipients to render the templates for.',
+        )
+        parser.add_argument(
+            '--templates',
+            nargs='+',
+            choices=TEMPLATES,
+            default=TEMPLATES[:1],
+            help='The email templates to render.',
+        )
+
+    def handle(self, *args, **options):
+        results = run_broadcast_render_benchmark(
+            options['recipient_counts'],
+            options['templates']
+        )
+        self.stdout.write(
+            f"{'template':>30} {'recipients':>10} {'per recipient ms':>16} "
+            f"{'broadcast ms':>12} {'speedup':>8} {'identical':>9}\n"
+        )
+        for result in results:
+            template = result['template'].rsplit('/', 1)[-1]
+            self.stdout.write(
+                f"{template:>30} {result['recipients']:>10} "
+                f"{result['per_recipient_ms']:>16.2f} "
+                f"{result['broadcast_ms']:>12.2f} "
+                f"{result['speedup']:>7.1f}x {str(result['identical']):>9}\n"
+            )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from tsp.benchmarks.bulk_mail import BACKENDS, run_bulk_mail_benchmark
+
+class Command(BaseCommand):
+    """Command to compare the per-recipient and the bulk delivery of emails."""
+
+    help = 'Time the per-recipient and the bulk delivery of emails.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipient-counts',
+            nargs='+',
+            type=int,
+            default=[100, 1000, 3000],
+            help='The numbers of recipients to send the emails to.',
+        )
+        parser.add_argument(
+            '--backends',
+            nargs='+',
+            choices=list(BACKENDS),
+            default=list(BACKENDS),
+            help='The email backends to send the emails with.',
+        )
+
+    def handle(self, *args, **options):
+        results = run_bulk_mail_benchmark(
+            options['recipient_counts'],
+            options['backends']
+        )
+        self.stdout.write(
+            f"{'backend':>8} {'recipients':>10} {'single ms':>10} "
+            f"{'bulk ms':>10} {'single/s':>10} {'bulk/s':>10}\n"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['backend']:>8} {result['recipients']:>10} "
+                f"{result['single_ms']:>10.2f} {result['bulk_ms']:>10.2f} "
+                f"{result['single_per_second']:>10.0f} "
+                f"{result['bulk_per_second']:>10.0f}\n"
+            )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from tsp.benchmarks.event_search import run_event_search_benchmark
+
+class Command(BaseCommand):
+    """Command to time the event search against the number of events."""
+
+    help = 'Time the substring and the full-text search of a growing event table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event-counts',
+            nargs='+',
+            type=int,
+            default=[1000, 10000, 100000],
+            help='The numbers of events in the table, in increasing order.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='The number of times each search is timed.',
+        )
+
+    def handle(self, *args, **options):
+        results = run_event_search_benchmark(
+            sorted(options['event_counts']),
+            options['repeat']
+        )
+        self.stdout.write(
+            f"{'events':>8} {'matches':>8} {'substring ms':>13} "
+            f"{'index ms':>10} {'fts5':>6}\n"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['events']:>8} {result['matches']:>8} "
+                f"{result['substring_ms']:>13.2f} {result['index_ms']:>10.2f} "
+                f"{str(result['fts5']):>6}\n"
+            )
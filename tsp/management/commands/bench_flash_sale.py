@@ -0,0 +1,103 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from tsp.benchmarks.flash_sale import VIEWS, run_flash_sale
+from tsp.benchmarks.views import PERCENTILES
+
+class Command(BaseCommand):
+    """Command to simulate a flash sale of a popular event."""
+
+    help = (
+        'Simulate students buying the tickets of one event at the same time, '
+        'and report the throughput, the latencies, the database lock errors '
+        'and whether the event was oversold.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students',
+            type=int,
+            default=50,
+            help='The number of simulated students, each in its own thread.',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=2,
+            help='The number of times each student adds tickets and checks out.',
+        )
+        parser.add_argument(
+            '--early-booking-capacity',
+            type=int,
+            default=20,
+            help='The number of early bird tickets of the event.',
+        )
+        parser.add_argument(
+            '--standard-booking-capacity',
+            type=int,
+            default=20,
+            help='The number of standard tickets of the event.',
+        )
+        parser.add_argument(
+            '--quantity',
+            type=int,
+            default=1,
+            help='The number of early bird tickets added in each round.',
+        )
+        parser.add_argument(
+            '--keep-data',
+            action='store_true',
+            help='Keep the event, the students and their orders afterwards.',
+        )
+        parser.add_argument(
+            '--output',
+            help='The path of the JSON file the results are written to.',
+        )
+
+    def handle(self, *args, **options):
+        if options['students'] < 1:
+            raise CommandError('--students must be at least 1.')
+        results = run_flash_sale(
+            options['students'],
+            options['rounds'],
+            options['early_booking_capacity'],
+            options['standard_booking_capacity'],
+            options['quantity'],
+            options['keep_data']
+        )
+        self.stdout.write(
+            f"{results['students']} students, {results['requests']} requests in "
+            f"{results['duration_s']:.2f}s ({results['throughput_rps']:.1f} requests/s)\n"
+        )
+        percentile_headers = ''.join(f"{f'p{percent} ms':>10}" for percent in PERCENTILES)
+        self.stdout.write(
+            f"{'view':<12} {'requests':>8} {'locked':>7} {'errors':>7} "
+            f"{'mean ms':>10}{percentile_headers}\n"
+        )
+        for view in VIEWS:
+            result = results['views'][view]
+            percentiles = ''.join(
+                f"{result[f'p{percent}_ms']:>10.2f}" for percent in PERCENTILES
+            )
+            self.stdout.write(
+                f"{view:<12} {result['requests']:>8} {result['locked']:>7} "
+                f"{result['errors']:>7} {result['mean_ms']:>10.2f}{percentiles}\n"
+            )
+        self.stdout.write(
+            f"Orders placed: {results['orders']}, refused: {results['refused_orders']}\n"
+            f"Tickets issued: {results['tickets_issued']} of {results['capacity']} "
+            f"(sold counters {results['tickets_sold']}, "
+            f"held {results['tickets_held']})\n"
+        )
+        for error in results['error_sample']:
+            self.stdout.write(f'Error: {error}\n')
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}\n")
+
+        if results['oversold']:
+            raise CommandError(
+                f"The event was oversold: {results['tickets_issued']} tickets "
+                f"issued for a capacity of {results['capacity']}."
+            )
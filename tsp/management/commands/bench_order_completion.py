@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from tsp.benchmarks.order_completion import run_order_completion_benchmark
+
+class Command(BaseCommand):
+    """Command to time order completion against the number of tickets."""
+
+    help = 'Time the completion of orders with a growing number of tickets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ticket-counts',
+            nargs='+',
+            type=int,
+            default=[1, 10, 20, 50, 100, 200],
+            help='The numbers of tickets in the timed orders.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='The number of orders timed for each ticket count.',
+        )
+
+    def handle(self, *args, **options):
+        results = run_order_completion_benchmark(
+            options['ticket_counts'], 
+            options['repeat']
+        )
+        self.stdout.write(
+            f"{'tickets':>8} {'mean ms':>10} {'min ms':>10} "
+            f"{'max ms':>10} {'queries':>8}\n"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['tickets']:>8} {result['mean_ms']:>10.2f} "
+                f"{result['min_ms']:>10.2f} {result['max_ms']:>10.2f} "
+                f"{result['queries']:>8}\n"
+            )
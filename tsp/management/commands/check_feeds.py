@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from tsp.models import FeedEntry
+
+class Command(BaseCommand):
+    """Command to check the "For You" feeds against the follows and saved events."""
+
+    help = 'Report the "For You" feed entries that are missing or stale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Add the missing entries and remove the stale ones.',
+        )
+
+    def handle(self, *args, **options):
+        missing, stale = FeedEntry.get_drift()
+        for student_id, event_id in sorted(missing):
+            self.stdout.write(f'Missing: event {event_id} in feed of student {student_id}\n')
+        for student_id, event_id in sorted(stale):
+            self.stdout.write(f'Stale: event {event_id} in feed of student {student_id}\n')
+        if not missing and not stale:
+            self.stdout.write('The feeds are consistent\n')
+            return
+        if options['fix']:
+            added, removed = FeedEntry.refresh()
+            self.stdout.write(f'Added {added} and removed {removed} feed entries\n')
+            return
+        raise CommandError(
+            f'{len(missing)} missing and {len(stale)} stale feed entries'
+        )
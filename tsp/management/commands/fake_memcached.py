@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from tsp.fake_memcached import FakeMemcachedServer
+
+class Command(BaseCommand):
+    """Command to run a local fake memcached server."""
+
+    help = (
+        'Run a local stand-in for memcached. Set the CACHE_BACKEND environment '
+        'variable to memcached and CACHE_LOCATION to its address to run the '
+        'server or the benchmarks against it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=11211,
+            help='The port to listen on.',
+        )
+
+    def handle(self, *args, **options):
+        server = FakeMemcachedServer(port=options['port'])
+        self.stdout.write(f'Fake memcached server listening on {server.location}\n')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from tsp.fake_stripe import FakeStripeServer
+
+class Command(BaseCommand):
+    """Command to run a local fake Stripe server."""
+
+    help = (
+        'Run a local stand-in for the Stripe API. Set the STRIPE_API_BASE '
+        'environment variable to its URL to run the server or the benchmarks '
+        'against it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=12111,
+            help='The port to listen on.',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0,
+            help='The number of seconds every response is delayed by, to '
+                 'simulate the round trip to Stripe.',
+        )
+
+    def handle(self, *args, **options):
+        server = FakeStripeServer(port=options['port'], latency=options['latency'])
+        self.stdout.write(f'Fake Stripe server listening on {server.url}\n')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
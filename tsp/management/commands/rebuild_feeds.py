@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from tsp.models import FeedEntry
+
+class Command(BaseCommand):
+    """Command to rebuild the "For You" feeds of all students."""
+
+    help = 'Rebuild the "For You" feeds from the follows and saved events.'
+
+    def handle(self, *args, **options):
+        added, removed = FeedEntry.refresh()
+        self.stdout.write(f'Added {added} and removed {removed} feed entries\n')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from tsp.search import rebuild_search_index, uses_fts5
+
+class Command(BaseCommand):
+    """Command to index all events in the search index again."""
+
+    help = 'Index all events in the full-text search index again.'
+
+    def handle(self, *args, **options):
+        if not uses_fts5():
+            self.stdout.write('The database does not support FTS5, events are searched without an index\n')
+            return
+        count = rebuild_search_index()
+        self.stdout.write(f'Indexed {count} events\n')
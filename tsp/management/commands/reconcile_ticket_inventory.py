@@ -0,0 +1,71 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from tsp.models import Event, Ticket
+
+class Command(BaseCommand):
+    """Command to rebuild the ticket sold counters of events from the tickets."""
+
+    help = 'Rebuild the early bird and standard sold counters of every event.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the events with wrong counters without fixing them.',
+        )
+
+    def handle(self, *args, **options):
+        tickets_sold = self._count_tickets_sold()
+        with transaction.atomic():
+            events = Event.objects.select_for_update().only(
+                'id', 'early_bird_sold', 'standard_sold'
+            )
+            drifted_events = []
+            for event in events.iterator():
+                sold = tickets_sold.get(event.id, {})
+                early_bird_sold = sold.get('early_bird', 0)
+                standard_sold = sold.get('standard', 0)
+                if (event.early_bird_sold != early_bird_sold or
+                    event.standard_sold != standard_sold):
+                    self.stdout.write(
+                        f'Event {event.id}: early bird '
+                        f'{event.early_bird_sold} -> {early_bird_sold}, '
+                        f'standard {event.standard_sold} -> {standard_sold}\n'
+                    )
+                    event.early_bird_sold = early_bird_sold
+                    event.standard_sold = standard_sold
+                    drifted_events.append(event)
+            if not options['dry_run']:
+                Event.objects.bulk_update(
+                    drifted_events,
+                    ['early_bird_sold', 'standard_sold'],
+                    batch_size=500
+                )
+        self.stdout.write(
+            f'Reconciled ticket inventory of {len(drifted_events)} events\n'
+        )
+
+    def _count_tickets_sold(self):
+        """
+        Count the issued tickets of each event by ticket type.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping event ids to a dictionary of ticket type 
+            to the number of tickets issued.
+        """
+
+        tickets_sold = defaultdict(dict)
+        rows = (
+            Ticket.objects
+            .filter(type__in=['early_bird', 'standard'])
+            .values('event', 'type')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for row in rows:
+            tickets_sold[row['event']][row['type']] = row['count']
+        return tickets_sold
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from tsp.models import TicketHold
+
+class Command(BaseCommand):
+    """Command to release the expired ticket holds of all events."""
+
+    help = 'Release the tickets held in carts whose hold has expired.'
+
+    def handle(self, *args, **options):
+        released = TicketHold.release_expired()
+        self.stdout.write(f'Released {released} expired ticket holds\n')
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from tsp.jobs import run_pending_jobs
+
+class Command(BaseCommand):
+    """Command to run the background jobs stored in the database."""
+
+    help = 'Run the background jobs that are due, polling for new jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are due and exit.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait before polling again when no job is due.'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = run_pending_jobs()
+            self.stdout.write(f'Ran {count} jobs\n')
+            return
+        self.stdout.write('Waiting for jobs, press CTRL-C to stop\n')
+        try:
+            while True:
+                if not run_pending_jobs():
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Worker stopped\n')
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from tsp.mail import send_pending_outbound_emails
+
+class Command(BaseCommand):
+    """Command to send the emails waiting in the email outbox."""
+
+    help = 'Send the emails waiting in the outbox, polling for new emails.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send the emails that are due and exit.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait before polling again when no email is due.'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = send_pending_outbound_emails()
+            self.stdout.write(f'Processed {count} emails\n')
+            return
+        self.stdout.write('Waiting for emails, press CTRL-C to stop\n')
+        try:
+            while True:
+                if not send_pending_outbound_emails():
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Worker stopped\n')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from tsp.payouts import get_window_end, settle_payouts
+
+class Command(BaseCommand):
+    """Command to pay the societies the payouts recorded in the ledger."""
+
+    help = (
+        'Transfer to every society the payouts it is owed for the orders of '
+        'the settlement windows that have ended, in one transfer per society.'
+    )
+
+    def handle(self, *args, **options):
+        settled, failed = settle_payouts()
+        self.stdout.write(
+            f'Settled {len(settled)} societies up to '
+            f'{get_window_end().isoformat()}\n'
+        )
+        for settlement, error in failed:
+            self.stderr.write(
+                f'Failed to settle {settlement.society.name} '
+                f'(settlement {settlement.id}): {error}\n'
+            )
@@ -0,0 +1,224 @@
+"""
+Cache backend speaking the memcached text protocol, with no client library.
+
+The backend keeps a pool of connections to one server shared by all threads
+and sends the commands of the memcached text protocol over them. It works
+with memcached itself and with the local stand-in of tsp.fake_memcached,
+which the tests and the benchmarks use. Integers are stored as decimal
+digits so that they can be incremented on the server, and other values are
+pickled.
+
+Classes
+-------
+MemcachedCache : class
+    Django cache backend for a server speaking the memcached text protocol.
+"""
+
+import pickle
+import queue
+import socket
+import time
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Flags stored with a value, telling how it was serialised
+FLAG_PICKLE = 1
+FLAG_INTEGER = 2
+
+# Timeouts longer than 30 days are taken by memcached as a Unix timestamp
+MAX_RELATIVE_TIMEOUT = 30 * 24 * 60 * 60
+
+class MemcachedCache(BaseCache):
+    """
+    Django cache backend for a server speaking the memcached text protocol.
+    The LOCATION is the host and port of the server, such as
+    127.0.0.1:11211, and the OPTIONS can set the pool_size and the timeout
+    in seconds of the connections.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        if isinstance(server, (list, tuple)):
+            server = server[0]
+        host, port = server.rsplit(':', 1)
+        options = params.get('OPTIONS', {})
+        self._address = (host, int(port))
+        self._timeout = options.get('timeout', 1.0)
+        self._pool = queue.LifoQueue(maxsize=options.get('pool_size', 10))
+
+    def get_backend_timeout(self, timeout=DEFAULT_TIMEOUT):
+        """
+        Get the expiration time of a value as sent to memcached: 0 for no
+        expiration, and a Unix timestamp for timeouts longer than 30 days.
+        """
+
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return 0
+        if int(timeout) <= 0:
+            # A negative expiration time expires the value at once
+            return -1
+        if timeout > MAX_RELATIVE_TIMEOUT:
+            timeout += int(time.time())
+        return int(timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._store('add', key, value, timeout) == b'STORED'
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._store('set', key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        messages = [
+            self._encode_store(
+                'set', self.make_and_validate_key(key, version=version), value, timeout
+            )
+            for key, value in data.items()
+        ]
+        if not messages:
+            return []
+        # The commands are sent together and their replies read after
+        with self._connection() as (sock, reader):
+            sock.sendall(b''.join(messages))
+            for _ in messages:
+                self._read_line(reader)
+        return []
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._get_values([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {
+            self.make_and_validate_key(key, version=version): key
+            for key in keys
+        }
+        if not keys:
+            return {}
+        values = self._get_values(list(keys))
+        return {keys[key]: value for key, value in values.items()}
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        command = f'touch {key} {self.get_backend_timeout(timeout)}'
+        return self._call(command) == b'TOUCHED'
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._call(f'delete {key}') == b'DELETED'
+
+    def incr(self, key, delta=1, version=None):
+        command = 'incr' if delta >= 0 else 'decr'
+        key = self.make_and_validate_key(key, version=version)
+        line = self._call(f'{command} {key} {abs(delta)}')
+        if line == b'NOT_FOUND':
+            raise ValueError(f"Key '{key}' not found.")
+        return int(line)
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        self._call('flush_all')
+
+    def close(self, **kwargs):
+        # The connections are kept open across requests
+        pass
+
+    def _store(self, command, key, value, timeout):
+        """Send a storage command and get the reply of the server."""
+
+        with self._connection() as (sock, reader):
+            sock.sendall(self._encode_store(command, key, value, timeout))
+            return self._read_line(reader)
+
+    def _encode_store(self, command, key, value, timeout):
+        """Encode a storage command with its data."""
+
+        if isinstance(value, int) and not isinstance(value, bool):
+            flags, data = FLAG_INTEGER, str(value).encode()
+        else:
+            flags, data = FLAG_PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        header = (
+            f'{command} {key} {flags} {self.get_backend_timeout(timeout)} '
+            f'{len(data)}'
+        )
+        return f'{header}\r\n'.encode() + data + b'\r\n'
+
+    def _get_values(self, keys):
+        """Get the values of keys in one command, by key."""
+
+        values = {}
+        with self._connection() as (sock, reader):
+            sock.sendall(f"get {' '.join(keys)}\r\n".encode())
+            while True:
+                line = self._read_line(reader)
+                if line == b'END':
+                    break
+                _, key, flags, length = line.split()
+                data = reader.read(int(length) + 2)[:-2]
+                if int(flags) == FLAG_INTEGER:
+                    values[key.decode()] = int(data)
+                else:
+                    values[key.decode()] = pickle.loads(data)
+        return values
+
+    def _call(self, command, data=None):
+        """Send a command with its data and get the line of the reply."""
+
+        message = f'{command}\r\n'.encode()
+        if data is not None:
+            message += data + b'\r\n'
+        with self._connection() as (sock, reader):
+            sock.sendall(message)
+            return self._read_line(reader)
+
+    def _read_line(self, reader):
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('The memcached server closed the connection.')
+        line = line[:-2]
+        if line in (b'ERROR', b'CLIENT_ERROR', b'SERVER_ERROR') or line.startswith(
+            (b'CLIENT_ERROR ', b'SERVER_ERROR ')
+        ):
+            raise ConnectionError(f'The memcached server replied {line.decode()}.')
+        return line
+
+    def _connection(self):
+        return _PooledConnection(self)
+
+    def _connect(self):
+        sock = socket.create_connection(self._address, timeout=self._timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, sock.makefile('rb')
+
+class _PooledConnection:
+    """
+    Connection taken from the pool of a MemcachedCache for one command. The
+    connection is put back once the reply has been read, and closed if the
+    command failed, as the rest of its reply could still be read.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._connection = None
+
+    def __enter__(self):
+        try:
+            self._connection = self._cache._pool.get_nowait()
+        except queue.Empty:
+            self._connection = self._cache._connect()
+        return self._connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        sock, reader = self._connection
+        if exc_type is None:
+            try:
+                self._cache._pool.put_nowait(self._connection)
+                return
+            except queue.Full:
+                pass
+        reader.close()
+        sock.close()
@@ -0,0 +1,67 @@
+"""
+Middleware of the ticket selling platform.
+
+Classes
+-------
+StudentRelationshipsMiddleware
+    Keep the relationship snapshots of students for the duration of a 
+    request.
+QueryBudgetMiddleware
+    Log the views that run more queries than their budget in development.
+"""
+
+import logging
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from tsp.query_budget import QueryRecorder, load_query_budgets
+from tsp.relationships import relationship_scope
+
+logger = logging.getLogger('tsp.query_budget')
+
+class StudentRelationshipsMiddleware:
+    """
+    Open a relationship scope for every request, so that the societies and 
+    events a student is related to are loaded at most once per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with relationship_scope():
+            return self.get_response(request)
+
+class QueryBudgetMiddleware:
+    """
+    Record the queries of every request and log the number of queries, the 
+    time spent in the database and the repeated queries of the view. A 
+    warning is logged when the view runs more queries than its budget in 
+    the QUERY_BUDGETS_FILE setting. Only used when DEBUG is on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = load_query_budgets()
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is None:
+            return response
+        budget = self.budgets.get(match.url_name)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                '%s %s (%s) is over its budget of %d queries: %s',
+                request.method, request.path, match.url_name, budget, 
+                recorder.summary()
+            )
+        else:
+            logger.debug(
+                '%s %s (%s): %s', 
+                request.method, request.path, match.url_name, 
+                recorder.summary()
+            )
+        return response
@@ -0,0 +1,47 @@
+# Generated by Django 4.1.3 on 2026-10-17 16:21
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_ticket_sold_counters(apps, schema_editor):
+    """Set the sold counters of existing events from their issued tickets."""
+
+    Event = apps.get_model('tsp', 'Event')
+    Ticket = apps.get_model('tsp', 'Ticket')
+    rows = (
+        Ticket.objects
+        .filter(type__in=['early_bird', 'standard'])
+        .values('event', 'type')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        Event.objects.filter(pk=row['event']).update(
+            **{f"{row['type']}_sold": row['count']}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0002_alter_historicalcart_discount_data_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='early_bird_sold',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='standard_sold',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.RunPython(
+            populate_ticket_sold_counters,
+            migrations.RunPython.noop
+        ),
+    ]
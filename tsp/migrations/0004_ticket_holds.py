@@ -0,0 +1,44 @@
+# Generated by Django 4.1.3 on 2026-10-17 17:25
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0003_event_ticket_sold_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='early_bird_held',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='standard_held',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.CreateModel(
+            name='TicketHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=20)),
+                ('quantity', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('expires_at', models.DateTimeField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tsp.event')),
+                ('event_cart_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='tsp.eventcartitem')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tickethold',
+            index=models.Index(fields=['event', 'expires_at'], name='tsp_ticketh_event_i_c35219_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tickethold',
+            unique_together={('event_cart_item', 'type')},
+        ),
+    ]
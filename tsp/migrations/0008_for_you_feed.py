@@ -0,0 +1,44 @@
+# Generated by Django 4.1.3 on 2026-10-17 18:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_feeds(apps, schema_editor):
+    FeedEntry = apps.get_model('tsp', 'FeedEntry')
+    Event = apps.get_model('tsp', 'Event')
+    Society = apps.get_model('tsp', 'Society')
+    Student = apps.get_model('tsp', 'Student')
+    events_by_society = {}
+    for society_id, event_id in Event.society.through.objects.values_list('society_id', 'event_id'):
+        events_by_society.setdefault(society_id, []).append(event_id)
+    pairs = set(Student.saved_event.through.objects.values_list('student_id', 'event_id'))
+    for society_id, student_id in Society.follower.through.objects.values_list('society_id', 'student_id'):
+        pairs.update((student_id, event_id) for event_id in events_by_society.get(society_id, []))
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(student_id=student_id, event_id=event_id) for student_id, event_id in pairs],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0007_event_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='tsp.event')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='tsp.student')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('student', 'event'), name='unique_feed_entry'),
+        ),
+        migrations.RunPython(fill_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.3 on 2026-10-17 19:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0009_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Settlement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_end', models.DateTimeField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SETTLED', 'Settled')], default='PENDING', max_length=50)),
+                ('transfer_id', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('settled_at', models.DateTimeField(blank=True, null=True)),
+                ('society', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='settlements', to='tsp.society')),
+            ],
+            options={
+                'unique_together': {('society', 'window_end')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PayoutEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payout_entries', to='tsp.order')),
+                ('settlement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='entries', to='tsp.settlement')),
+                ('society', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payout_entries', to='tsp.society')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='payoutentry',
+            index=models.Index(fields=['settlement', 'society', 'created_at'], name='tsp_payoute_settlem_5d29ac_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='payoutentry',
+            unique_together={('order', 'society')},
+        ),
+    ]
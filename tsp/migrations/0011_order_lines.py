@@ -0,0 +1,103 @@
+# Generated by Django 4.1.3 on 2026-10-17 19:52
+
+import json
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_order_lines(apps, schema_editor):
+    """
+    Write the lines of existing orders from their historical carts, and link 
+    their tickets to them. The events and societies are copied as they are 
+    now, as the carts do not keep them as they were bought.
+    """
+
+    HistoricalCart = apps.get_model('tsp', 'HistoricalCart')
+    OrderLine = apps.get_model('tsp', 'OrderLine')
+    Ticket = apps.get_model('tsp', 'Ticket')
+    carts = HistoricalCart.objects.prefetch_related(
+        'event_cart_item__event', 'membership__university'
+    )
+    for cart in carts.iterator(chunk_size=500):
+        discount_data = cart.discount_data or {}
+        if isinstance(discount_data, str):
+            discount_data = json.loads(discount_data)
+        lines = []
+        for item in cart.event_cart_item.all():
+            event = item.event
+            discount = Decimal(discount_data.get(str(item.id), '0'))
+            discounted_type = 'standard' if item.standard_quantity > 0 else 'early_bird'
+            for ticket_type, quantity, unit_price in (
+                ('early_bird', item.early_bird_quantity, event.early_bird_price),
+                ('standard', item.standard_quantity, event.standard_price),
+            ):
+                if quantity > 0:
+                    lines.append(OrderLine(
+                        order_id=cart.order_id,
+                        type=ticket_type,
+                        event=event,
+                        name=event.name,
+                        location=event.location,
+                        start_time=event.start_time,
+                        end_time=event.end_time,
+                        unit_price=unit_price,
+                        quantity=quantity,
+                        discount=discount if ticket_type == discounted_type else 0,
+                    ))
+        for society in cart.membership.all():
+            lines.append(OrderLine(
+                order_id=cart.order_id,
+                type='membership',
+                society=society,
+                name=society.name,
+                university_name=society.university.name if society.university else '',
+                unit_price=society.member_fee,
+                quantity=1,
+            ))
+        for line in OrderLine.objects.bulk_create(lines):
+            if line.type != 'membership':
+                Ticket.objects.filter(
+                    order_id=line.order_id, event_id=line.event_id, type=line.type
+                ).update(order_line=line)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0010_payout_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('early_bird', 'Early Bird'), ('standard', 'Standard'), ('membership', 'Membership')], max_length=20)),
+                ('name', models.CharField(max_length=255)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('university_name', models.CharField(blank=True, max_length=255)),
+                ('start_time', models.DateTimeField(blank=True, null=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('unit_price', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('quantity', models.IntegerField(default=1, validators=[django.core.validators.MinValueValidator(0)])),
+                ('discount', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_lines', to='tsp.event')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='tsp.order')),
+                ('society', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_lines', to='tsp.society')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='order_line',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tickets', to='tsp.orderline'),
+        ),
+        migrations.RunPython(
+            populate_order_lines,
+            migrations.RunPython.noop
+        ),
+    ]
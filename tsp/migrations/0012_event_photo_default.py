@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-17 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0011_order_lines'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='photo',
+            field=models.ImageField(default='default_event_photo.jpg', upload_to='events/'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.1.3 on 2026-10-17 21:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_event_fields(apps, schema_editor):
+    FeedEntry = apps.get_model('tsp', 'FeedEntry')
+    Event = apps.get_model('tsp', 'Event')
+    events = Event.objects.filter(pk=OuterRef('event_id'))
+    FeedEntry.objects.update(
+        start_time=Subquery(events.values('start_time')[:1]),
+        end_time=Subquery(events.values('end_time')[:1]),
+        status=Subquery(events.values('status')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0012_event_photo_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedentry',
+            name='start_time',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='feedentry',
+            name='end_time',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='feedentry',
+            name='status',
+            field=models.CharField(choices=[('ACTIVE', 'Active'), ('CANCELLED', 'Cancelled')], default='ACTIVE', max_length=50),
+        ),
+        migrations.RunPython(copy_event_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='feedentry',
+            name='start_time',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='feedentry',
+            name='end_time',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['student', 'start_time', 'event'], name='tsp_feedent_student_168c7f_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.3 on 2026-10-17 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tsp', '0013_feed_entry_event_copy'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='outboundemail',
+            name='unique_unsent_outbound_email',
+        ),
+        migrations.AddConstraint(
+            model_name='outboundemail',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('recipient', 'template', 'event'), name='unique_pending_outbound_email'),
+        ),
+    ]
@@ -1,16 +1,20 @@
-import os
 from ticket_selling_platform import settings
 from django.core.validators import RegexValidator
 from django.core.validators import MinLengthValidator
 from django.core.validators import MinValueValidator, MaxValueValidator, MinLengthValidator
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.transaction import TransactionManagementError
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils import timezone
+from datetime import timedelta
 from collections import defaultdict
-from django.db.models import Sum
+from django.db.models import Sum, F, Q
 from decimal import Decimal
+import hashlib
 import json
 from django.utils.functional import cached_property
+from tsp.pricing import CartPricing
+from tsp.relationships import get_relationships, forget_relationships
 from tsp.managers import (
     CustomUserManager,
     StudentManager,
@@ -196,7 +200,7 @@ class Student(User):
             True if the event has been saved, False otherwise.
         """
 
-        return event in self.saved_event.all()
+        return self.relationships.has_saved(event)
 
     def purchase_event(self, event):
         """
@@ -209,6 +213,7 @@ class Student(User):
         """
         
         self.purchased_event.add(event)
+        forget_relationships([self.pk])
     
     def purchase_discounted_event(self, event):
         """
@@ -221,6 +226,7 @@ class Student(User):
         """
         
         self.discounted_event.add(event)
+        forget_relationships([self.pk])
     
     def event_discounted(self, event):
         """
@@ -238,7 +244,21 @@ class Student(User):
             False otherwise.
         """
         
-        return event in self.discounted_event.all()
+        return self.relationships.has_discount(event)
+
+    @property
+    def relationships(self):
+        """
+        Get the snapshot of the societies and events the student is related 
+        to, loaded once per request.
+
+        Returns
+        -------
+        StudentRelationships
+            The relationships of the student.
+        """
+
+        return get_relationships(self)
     
     @property
     def full_name(self) -> str:
@@ -538,10 +558,7 @@ class Society(User):
             True if the student is a member of the society, False otherwise.
         """
     
-        return (
-            student in self.committee_members or 
-            student in self.regular_members
-        )
+        return student.relationships.is_member(self)
     
     def add_follower(self, student):
         """
@@ -677,6 +694,14 @@ class Event(models.Model):
         The price of the standard event ticket.
     status : Status
         Enum indicating the status of the given event.
+    early_bird_sold : models.IntegerField
+        The number of early bird tickets issued for the given event. 
+    standard_sold : models.IntegerField
+        The number of standard tickets issued for the given event.
+    early_bird_held : models.IntegerField
+        The number of early bird tickets held in carts for the given event.
+    standard_held : models.IntegerField
+        The number of standard tickets held in carts for the given event.
     """
 
     class Status(models.TextChoices):
@@ -698,7 +723,7 @@ class Event(models.Model):
     description = models.CharField(max_length=5000, null=True, blank=True)
     photo = models.ImageField(
         upload_to='events/',
-        default=os.path.join(settings.MEDIA_ROOT, 'default_event_photo.jpg'),
+        default='default_event_photo.jpg',
         blank=False,
     )
     location = models.CharField(max_length=255)
@@ -727,6 +752,22 @@ class Event(models.Model):
         choices=Status.choices,
         default=Status.ACTIVE
     )
+    early_bird_sold = models.IntegerField(
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
+    standard_sold = models.IntegerField(
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
+    early_bird_held = models.IntegerField(
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
+    standard_held = models.IntegerField(
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
 
     class Meta:
         ordering = ['start_time']
@@ -755,6 +796,8 @@ class Event(models.Model):
     def get_event_ticket_inventory(event, ticket_type):
         """
         Get the current inventory of the specified ticket type for the event.
+        The inventory is read from the sold and held counters of the event, 
+        so no tickets or holds are counted.
 
         Parameters
         ----------
@@ -773,22 +816,185 @@ class Event(models.Model):
         inventory = 0
         if event:
             # Get the booking capacity of the specified ticket type
-            if ticket_type not in ('early_bird', 'standard'):
-                raise ValueError("Invalid ticket type specified.")
-            if ticket_type == 'early_bird':
-                booking_capacity = event.early_booking_capacity
-            else:
-                booking_capacity = event.standard_booking_capacity
+            capacity_field, sold_field, held_field = (
+                Event.get_inventory_field_names(ticket_type)
+            )
+            booking_capacity = getattr(event, capacity_field)
                 
-            # Get the number of tickets sold for the event of the specified 
-            # ticket type
-            tickets_sold = Ticket.objects.filter(
-                event=event,
-                type=ticket_type,
-            ).count()
-            inventory = booking_capacity - tickets_sold 
+            # Get the number of tickets sold or held in carts for the event of 
+            # the specified ticket type
+            tickets_sold = getattr(event, sold_field)
+            tickets_held = getattr(event, held_field)
+            inventory = booking_capacity - tickets_sold - tickets_held
         return inventory
     
+    @staticmethod
+    def get_inventory_field_names(ticket_type):
+        """
+        Get the names of the capacity, sold and held fields of the specified 
+        ticket type.
+
+        Parameters
+        ----------
+        ticket_type : str
+            The type of ticket. Must be either "early_bird" or "standard".
+
+        Returns
+        -------
+        tuple
+            The capacity, sold and held field names of the ticket type.
+        """
+        
+        if ticket_type not in ('early_bird', 'standard'):
+            raise ValueError("Invalid ticket type specified.")
+        if ticket_type == 'early_bird':
+            capacity_field = 'early_booking_capacity'
+        else:
+            capacity_field = 'standard_booking_capacity'
+        return capacity_field, f'{ticket_type}_sold', f'{ticket_type}_held'
+    
+    @staticmethod
+    def record_tickets_sold(event, early_bird_quantity, standard_quantity,
+                            early_bird_held=0, standard_held=0):
+        """
+        Add the given ticket quantities to the sold counters of the event and 
+        remove the tickets converted from holds from the held counters.
+        The counters are updated in the database with F() expressions so that 
+        concurrent orders of the same event do not overwrite each other.
+
+        Parameters
+        ----------
+        event : Event
+            The event that issues the tickets.
+        early_bird_quantity : int
+            The number of early bird tickets issued.
+        standard_quantity : int
+            The number of standard tickets issued.
+        early_bird_held : int
+            The number of held early bird tickets released by the issue.
+        standard_held : int
+            The number of held standard tickets released by the issue.
+        """
+        
+        if (early_bird_quantity or standard_quantity or 
+            early_bird_held or standard_held):
+            Event.objects.filter(pk=event.pk).update(
+                early_bird_sold=F('early_bird_sold') + early_bird_quantity,
+                standard_sold=F('standard_sold') + standard_quantity,
+                early_bird_held=F('early_bird_held') - early_bird_held,
+                standard_held=F('standard_held') - standard_held,
+            )
+    
+    @staticmethod
+    def hold_tickets(event, ticket_type, quantity):
+        """
+        Add the given quantity to the held counter of the event if enough 
+        tickets of the specified type are left.
+        The check and the update are a single conditional UPDATE on the event 
+        row, so concurrent holds can never exceed the booking capacity.
+
+        Parameters
+        ----------
+        event : Event
+            The event that issues the tickets.
+        ticket_type : str
+            The type of ticket to hold.
+        quantity : int
+            The number of tickets to hold.
+
+        Returns
+        -------
+        bool
+            True if the tickets have been held, False if they are sold out.
+        """
+        
+        capacity_field, sold_field, held_field = (
+            Event.get_inventory_field_names(ticket_type)
+        )
+        held = Event.objects.filter(
+            pk=event.pk,
+            **{f'{capacity_field}__gte': F(sold_field) + F(held_field) + quantity}
+        ).update(**{held_field: F(held_field) + quantity})
+        event.refresh_from_db(fields=[sold_field, held_field])
+        return bool(held)
+    
+    @staticmethod
+    def release_tickets(event, ticket_type, quantity):
+        """
+        Remove the given quantity from the held counter of the event.
+
+        Parameters
+        ----------
+        event : Event
+            The event that issues the tickets.
+        ticket_type : str
+            The type of ticket to release.
+        quantity : int
+            The number of tickets to release.
+        """
+        
+        _, _, held_field = Event.get_inventory_field_names(ticket_type)
+        if quantity:
+            Event.objects.filter(pk=event.pk).update(
+                **{held_field: F(held_field) - quantity}
+            )
+    
+    @staticmethod
+    def lock_events(events):
+        """
+        Lock the given events until the end of the current transaction, so 
+        that their ticket counters cannot change before the tickets are issued.
+        The rows are locked in id order, so that transactions locking the 
+        same events cannot deadlock.
+        SQLite has no row locks: a no-op update of the events takes the write 
+        lock of the database instead. It must be the first statement of the 
+        outermost transaction, so that concurrent transactions wait for the 
+        lock rather than fail to upgrade their read lock.
+
+        Parameters
+        ----------
+        events : QuerySet
+            The events to lock.
+
+        Returns
+        -------
+        list of Event
+            The locked events in id order, with their current ticket counters.
+
+        Raises
+        ------
+        TransactionManagementError
+            If called outside a transaction, where the lock would be released 
+            at once.
+        """
+        
+        if not connection.in_atomic_block:
+            raise TransactionManagementError(
+                'The events can only be locked in a transaction.'
+            )
+        events = Event.objects.filter(pk__in=events.values('pk')).order_by('pk')
+        if connection.features.has_select_for_update:
+            return list(events.select_for_update())
+        events.update(status=F('status'))
+        return list(events)
+    
+    @property
+    def event_subscribers(self):
+        """
+        Get a list of students who subscribed to the host or to any of the 
+        organiser societies of the current event.
+
+        Returns
+        -------
+        QuerySet
+            A QuerySet of distinct Student objects who subscribed to the 
+            societies of the event.
+        """
+        
+        return Student.objects.filter(
+            Q(subscriber=self.host_id) | Q(subscriber__in=self.society.all())
+        ).distinct()
+    
     @property
     def event_savers(self):
         """
@@ -904,6 +1110,331 @@ class EventCartItem(models.Model):
             return round(early_bird_price * discount_rate, 2)
 
 
+class TicketsSoldOut(Exception):
+    """
+    Exception raised when the tickets of an event cart item can no longer be 
+    issued because the event has sold out.
+
+    Attributes
+    ----------
+    event : Event
+        The event that has sold out.
+    ticket_type : str
+        The type of ticket that has sold out.
+    """
+    
+    def __init__(self, event, ticket_type):
+        self.event = event
+        self.ticket_type = ticket_type
+        ticket_name = ticket_type.replace('_', ' ')
+        super().__init__(
+            f'Sorry, the {ticket_name} tickets of {event.name} are sold out.'
+        )
+
+
+class CartTrimmed(TicketsSoldOut):
+    """
+    Exception raised at checkout when the cart holds more tickets than the 
+    events have left. The cart has been trimmed to the tickets left.
+
+    Attributes
+    ----------
+    trimmed : list of tuple
+        The event, the ticket type and the number of tickets left of each 
+        trimmed cart item.
+    """
+    
+    def __init__(self, trimmed):
+        self.trimmed = trimmed
+        self.event, self.ticket_type, _ = trimmed[0]
+        reasons = []
+        for event, ticket_type, quantity_left in trimmed:
+            ticket_name = ticket_type.replace('_', ' ')
+            if quantity_left:
+                reasons.append(
+                    f'only {quantity_left} {ticket_name} tickets of {event.name} '
+                    f'were left.'
+                )
+            else:
+                reasons.append(
+                    f'the {ticket_name} tickets of {event.name} are sold out.'
+                )
+        reasons = [reasons[0]] + [reason[0].upper() + reason[1:] for reason in reasons[1:]]
+        Exception.__init__(
+            self, 
+            f"Sorry, {' '.join(reasons)} Your cart has been updated, please "
+            f"check it before checking out again."
+        )
+
+
+class TicketHold(models.Model):
+    """
+    TicketHold model represents tickets of an event reserved for an event cart 
+    item for a limited time. Held tickets count against the inventory of the 
+    event until the hold is converted into tickets at checkout, released from 
+    the cart or expired.
+    
+    Attributes
+    ----------
+    event_cart_item : models.ForeignKey
+        The event cart item that holds the tickets.
+    event : models.ForeignKey
+        The event that issues the held tickets.
+    type : models.CharField
+        The type of the held tickets, either early_bird or standard.
+    quantity : models.IntegerField
+        The number of tickets held.
+    expires_at : models.DateTimeField
+        The date and time when the hold expires.
+    """
+    
+    event_cart_item = models.ForeignKey(
+        EventCartItem, 
+        on_delete=models.CASCADE,
+        related_name='holds'
+    )
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    type = models.CharField(max_length=20)
+    quantity = models.IntegerField(
+        default=0, 
+        validators=[MinValueValidator(0)]
+    )
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['event_cart_item', 'type']
+        indexes = [models.Index(fields=['event', 'expires_at'])]
+    
+    @staticmethod
+    def get_expiry_time():
+        """
+        Get the expiry time of a hold placed now.
+        
+        Returns
+        -------
+        datetime
+            The date and time when a hold placed now expires.
+        """
+        
+        return timezone.now() + timedelta(minutes=settings.TICKET_HOLD_MINUTES)
+    
+    @staticmethod
+    def hold_tickets(event_cart_item, ticket_type, quantity):
+        """
+        Hold the given quantity of tickets for the event cart item. Holding 
+        more tickets of the same type extends the expiry time of the hold.
+        Expired holds of the event are released when the event looks sold out.
+        
+        Parameters
+        ----------
+        event_cart_item : EventCartItem
+            The event cart item to hold the tickets for.
+        ticket_type : str
+            The type of ticket to hold.
+        quantity : int
+            The number of tickets to hold.
+            
+        Returns
+        -------
+        bool
+            True if the tickets have been held, False if they are sold out.
+        """
+        
+        event = event_cart_item.event
+        with transaction.atomic():
+            if not Event.hold_tickets(event, ticket_type, quantity):
+                if not TicketHold.release_expired(event):
+                    return False
+                if not Event.hold_tickets(event, ticket_type, quantity):
+                    return False
+            expires_at = TicketHold.get_expiry_time()
+            updated = TicketHold.objects.filter(
+                event_cart_item=event_cart_item, 
+                type=ticket_type
+            ).update(quantity=F('quantity') + quantity, expires_at=expires_at)
+            if not updated:
+                TicketHold.objects.create(
+                    event_cart_item=event_cart_item,
+                    event=event,
+                    type=ticket_type,
+                    quantity=quantity,
+                    expires_at=expires_at
+                )
+        return True
+    
+    @staticmethod
+    def release_tickets(event_cart_item, ticket_type, quantity):
+        """
+        Release up to the given quantity of held tickets of the event cart item.
+        
+        Parameters
+        ----------
+        event_cart_item : EventCartItem
+            The event cart item to release the tickets of.
+        ticket_type : str
+            The type of ticket to release.
+        quantity : int
+            The number of tickets to release.
+        """
+        
+        with transaction.atomic():
+            hold = TicketHold.objects.select_for_update().filter(
+                event_cart_item=event_cart_item, 
+                type=ticket_type
+            ).first()
+            if hold is None:
+                return
+            quantity = min(quantity, hold.quantity)
+            if quantity == hold.quantity:
+                hold.delete()
+            else:
+                hold.quantity -= quantity
+                hold.save(update_fields=['quantity'])
+            Event.release_tickets(hold.event, ticket_type, quantity)
+    
+    @staticmethod
+    def release_all(event_cart_item):
+        """
+        Release all held tickets of the event cart item.
+        
+        Parameters
+        ----------
+        event_cart_item : EventCartItem
+            The event cart item to release the tickets of.
+        """
+        
+        for hold in TicketHold.objects.filter(event_cart_item=event_cart_item):
+            TicketHold._release_hold(hold)
+    
+    @staticmethod
+    def release_expired(event=None):
+        """
+        Release the expired holds of the given event, or of all events when 
+        no event is given.
+        
+        Parameters
+        ----------
+        event : Event, optional
+            The event to release the expired holds of.
+            
+        Returns
+        -------
+        int
+            The number of holds released.
+        """
+        
+        now = timezone.now()
+        expired_holds = TicketHold.objects.filter(expires_at__lte=now)
+        if event is not None:
+            expired_holds = expired_holds.filter(event=event)
+        released = 0
+        for hold in expired_holds.iterator():
+            released += TicketHold._release_hold(hold, expired_at=now)
+        return released
+    
+    @staticmethod
+    def _release_hold(hold, expired_at=None):
+        """
+        Delete the given hold and remove its tickets from the held counter of 
+        the event. Only the caller that deletes the row releases the tickets, 
+        so a hold is never released twice.
+        
+        Parameters
+        ----------
+        hold : TicketHold
+            The hold to release.
+        expired_at : datetime, optional
+            Only release the hold if it still expires by this time.
+            
+        Returns
+        -------
+        int
+            1 if the hold has been released, 0 otherwise.
+        """
+        
+        with transaction.atomic():
+            holds = TicketHold.objects.filter(pk=hold.pk)
+            if expired_at is not None:
+                holds = holds.filter(expires_at__lte=expired_at)
+            hold = holds.select_for_update().first()
+            if hold is None:
+                return 0
+            holds.delete()
+            Event.release_tickets(hold.event, hold.type, hold.quantity)
+        return 1
+    
+    @staticmethod
+    def claim_tickets(event_cart_item):
+        """
+        Convert the holds of the event cart item into sold tickets. Tickets in 
+        the cart that are no longer held are taken from the remaining 
+        inventory of the event.
+        
+        Parameters
+        ----------
+        event_cart_item : EventCartItem
+            The event cart item whose tickets are issued.
+            
+        Raises
+        ------
+        TicketsSoldOut
+            If tickets in the cart are neither held nor available.
+        """
+        
+        event = event_cart_item.event
+        quantities = {
+            'early_bird': event_cart_item.early_bird_quantity,
+            'standard': event_cart_item.standard_quantity,
+        }
+        with transaction.atomic():
+            holds = TicketHold.objects.select_for_update().filter(
+                event_cart_item=event_cart_item
+            )
+            quantities_held = {hold.type: hold.quantity for hold in holds}
+            released = {}
+            for ticket_type, quantity in quantities.items():
+                quantity_held = quantities_held.get(ticket_type, 0)
+                shortfall = quantity - quantity_held
+                if shortfall > 0 and not Event.hold_tickets(event, ticket_type, shortfall):
+                    raise TicketsSoldOut(event, ticket_type)
+                released[ticket_type] = max(quantity, quantity_held)
+            TicketHold.objects.filter(event_cart_item=event_cart_item).delete()
+            Event.record_tickets_sold(
+                event,
+                quantities['early_bird'],
+                quantities['standard'],
+                released['early_bird'],
+                released['standard']
+            )
+    
+    @staticmethod
+    def get_quantity_held(cart, event, ticket_type):
+        """
+        Get the number of tickets of the event held for the given cart.
+        
+        Parameters
+        ----------
+        cart : Cart
+            The cart holding the tickets.
+        event : Event
+            The event that issues the tickets.
+        ticket_type : str
+            The type of ticket.
+            
+        Returns
+        -------
+        int
+            The number of tickets held for the cart.
+        """
+        
+        quantity_held = TicketHold.objects.filter(
+            event=event,
+            type=ticket_type,
+            event_cart_item__basecart=cart
+        ).aggregate(quantity=Sum('quantity'))['quantity']
+        return quantity_held or 0
+
+
 class BaseCart(models.Model):
     """
     Base cart model represents a shopping cart of a student. This model 
@@ -935,6 +1466,19 @@ class Cart(BaseCart):
     
     student = models.OneToOneField(Student, on_delete=models.CASCADE)
     
+    def get_pricing(self):
+        """
+        Price the cart in a single pass over its items.
+        
+        Returns:
+        --------
+        CartPricing
+            A priced snapshot of the cart. Callers that need several cart 
+            values should read them all from one snapshot.
+        """
+        
+        return CartPricing(self)
+    
     @property
     def all_items_free(self):
         """
@@ -946,7 +1490,7 @@ class Cart(BaseCart):
             True if all items in the cart are free, False otherwise.
         """
         
-        return not self.total_price and self.count
+        return self.get_pricing().all_items_free
     
     @property
     def total_price(self):
@@ -959,12 +1503,8 @@ class Cart(BaseCart):
         decimal
             The total price of items in the cart.
         """
-        total_price = (
-            self.total_ticket_price_before_discount + 
-            self.total_membership_price - 
-            self.total_saved
-        )
-        return total_price
+        
+        return self.get_pricing().total_price
     
     @property
     def total_saved(self):
@@ -977,11 +1517,7 @@ class Cart(BaseCart):
             The total amount of discount for all items in the cart.
         """
         
-        total_saved = Decimal('0.00')
-        if self.discount_data:
-            for item, discount in self.discount_data.items():
-                total_saved += discount
-        return total_saved
+        return self.get_pricing().total_saved
     
     @property
     def count(self):
@@ -993,6 +1529,7 @@ class Cart(BaseCart):
         int
             The total amount of tickets and memberships in the cart.
         """
+        
         return self.ticket_count + self.membership_count
     
     @property
@@ -1006,10 +1543,10 @@ class Cart(BaseCart):
             The total amount of tickets in the cart.
         """
         
-        ticket_count = 0
-        for item in self.event_cart_item.all():
-            ticket_count += item.early_bird_quantity + item.standard_quantity
-        return ticket_count
+        ticket_count = self.event_cart_item.aggregate(
+            count=Sum(F('early_bird_quantity') + F('standard_quantity'))
+        )['count']
+        return ticket_count or 0
     
     @property
     def membership_count(self):
@@ -1036,13 +1573,7 @@ class Cart(BaseCart):
             The total cost of tickets added to the cart before discount applied.
         """
         
-        total_price = Decimal('0.00')
-        for item in self.event_cart_item.all():
-            early_bird_price = item.event.early_bird_price 
-            standard_price = item.event.standard_price
-            total_price += early_bird_price * item.early_bird_quantity
-            total_price += standard_price * item.standard_quantity
-        return total_price 
+        return self.get_pricing().total_ticket_price_before_discount
     
     @property
     def total_membership_price(self):
@@ -1055,10 +1586,10 @@ class Cart(BaseCart):
             The total cost of memberships added to the cart.
         """
         
-        total_price = Decimal('0.00')
-        for membership in self.membership.all():
-            total_price += membership.member_fee
-        return total_price
+        total_price = self.membership.aggregate(
+            total=Sum('member_fee')
+        )['total']
+        return total_price or Decimal('0.00')
     
     @property
     def discount_data(self):
@@ -1073,15 +1604,7 @@ class Cart(BaseCart):
             and the values are the amount of discount applied to them.
         """
         
-        discount_data = defaultdict(Decimal)
-        for item in self.event_cart_item.all():
-            discount_rate = self.get_discount_rate(item)
-            discount = item.get_discount_amount(discount_rate)
-            discounted = self.student.event_discounted(item.event)
-            if discount != 0.0 and not discounted:
-                item_id = item.id
-                discount_data[item_id] += discount
-        return discount_data
+        return self.get_pricing().discount_data
     
     def get_discount_rate(self, event_cart_item):
         """
@@ -1102,6 +1625,67 @@ class Cart(BaseCart):
                 discount_rate = max(discount_rate, society.member_discount)
         return discount_rate / 100
     
+    def trim_to_availability(self, events):
+        """
+        Reduce the tickets in the cart to the tickets the events have left. 
+        The tickets held for the cart count as left. The events should be 
+        locked with Event.lock_events, so that the tickets left cannot change 
+        before they are issued.
+
+        Parameters
+        ----------
+        events : list of Event
+            The events of the cart, with their current ticket counters.
+
+        Returns
+        -------
+        list of tuple
+            The event, the ticket type and the number of tickets left of each 
+            trimmed cart item. Empty if every ticket in the cart is left.
+        """
+        
+        events = {event.id: event for event in events}
+        quantities_held = defaultdict(int)
+        for event_cart_item_id, ticket_type, quantity in TicketHold.objects.filter(
+            event_cart_item__basecart=self
+        ).values_list('event_cart_item_id', 'type', 'quantity'):
+            quantities_held[event_cart_item_id, ticket_type] += quantity
+        
+        # Tickets of each event and type that are neither sold nor held
+        quantities_left = {}
+        for event in events.values():
+            for ticket_type in ('early_bird', 'standard'):
+                capacity_field, sold_field, held_field = (
+                    Event.get_inventory_field_names(ticket_type)
+                )
+                quantities_left[event.id, ticket_type] = (
+                    getattr(event, capacity_field) 
+                    - getattr(event, sold_field) 
+                    - getattr(event, held_field)
+                )
+        
+        trimmed = []
+        for item in self.event_cart_item.order_by('id'):
+            event = events[item.event_id]
+            item_trimmed = False
+            for ticket_type in ('early_bird', 'standard'):
+                quantity_field = f'{ticket_type}_quantity'
+                quantity = getattr(item, quantity_field)
+                quantity_held = quantities_held[item.id, ticket_type]
+                quantity_left = max(
+                    quantities_left[event.id, ticket_type] + quantity_held, 0
+                )
+                if quantity > quantity_left:
+                    setattr(item, quantity_field, quantity_left)
+                    trimmed.append((event, ticket_type, quantity_left))
+                    item_trimmed = True
+                quantities_left[event.id, ticket_type] -= max(
+                    getattr(item, quantity_field) - quantity_held, 0
+                )
+            if item_trimmed:
+                item.save()
+        return trimmed
+    
     def membership_is_in_cart(self, membership):
         """
         Get the boolean value indicating whether the given membership has 
@@ -1133,7 +1717,7 @@ class Cart(BaseCart):
             True if the student is a member of the given society, False otherwise.
         """
         
-        return membership and self.student in membership.regular_member.all()
+        return membership and self.student.relationships.is_regular_member(membership)
     
     def get_ticket_quantity_in_cart_per_event(self, event, ticket_type):
         """
@@ -1289,30 +1873,284 @@ class Order(models.Model):
         ordering = ['-create_at']
 
 
-class Payment(models.Model):
+class OrderLine(models.Model):
     """
-    Payment model represents a payment made by a student. 
-    Payment method supports Visa, Mastercard, American Express 
-    and China UnionPay payments from customers worldwide.
+    OrderLine model represents an item of an order as it was bought. The 
+    lines of an order are written once when the order is placed and keep a 
+    copy of the names, times and prices of the items, so that the order is 
+    shown as it was bought even after its events are edited or deleted.
+    An event cart item has a line per type of ticket bought, and a 
+    membership has a line of its own.
 
     Attributes
     ----------
-    student : models.ForeignKey
-        The student that makes the given payment.
-    order : models.OneToOneField
-        The order fulfilled by the given payment.
-    amount : models.DecimalField
-        The amount of the given payment.
-    status : Status
-        Enum indicating the status of the given order.
-    last4 : str
-        The last 4 digits of the bank card used for the payment.
-    brand : str
-        The brand of the bank card used for the payment.
-    transaction_id : str 
-        The ID of the transaction associated with the payment that is 
-        provided by Stripe.  
-    """
+    order : models.ForeignKey
+        The order the item was bought in.
+    type : models.CharField
+        The type of the item, either early_bird, standard or membership.
+    event : models.ForeignKey, optional
+        The event of the tickets, empty for memberships or once the event 
+        is deleted.
+    society : models.ForeignKey, optional
+        The society of the membership, empty for tickets or once the 
+        society is deleted.
+    name : models.CharField
+        The name of the event or society.
+    location : models.CharField
+        The location of the event, empty for memberships.
+    university_name : models.CharField
+        The name of the university of the society, empty for tickets.
+    start_time : models.DateTimeField, optional
+        The start time of the event, empty for memberships.
+    end_time : models.DateTimeField, optional
+        The end time of the event, empty for memberships.
+    unit_price : models.DecimalField
+        The price of one ticket or of the membership.
+    quantity : models.IntegerField
+        The number of tickets or memberships bought.
+    discount : models.DecimalField
+        The member discount applied to the line.
+    """
+
+    class Type(models.TextChoices):
+        EARLY_BIRD = 'early_bird', 'Early Bird'
+        STANDARD = 'standard', 'Standard'
+        MEMBERSHIP = 'membership', 'Membership'
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='lines'
+    )
+    type = models.CharField(max_length=20, choices=Type.choices)
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.SET_NULL,
+        related_name='order_lines',
+        blank=True,
+        null=True
+    )
+    society = models.ForeignKey(
+        Society,
+        on_delete=models.SET_NULL,
+        related_name='order_lines',
+        blank=True,
+        null=True
+    )
+    name = models.CharField(max_length=255)
+    location = models.CharField(max_length=255, blank=True)
+    university_name = models.CharField(max_length=255, blank=True)
+    start_time = models.DateTimeField(blank=True, null=True)
+    end_time = models.DateTimeField(blank=True, null=True)
+    unit_price = models.DecimalField(
+        default=0.0, 
+        max_digits=10, 
+        decimal_places=2
+    )
+    quantity = models.IntegerField(default=1, validators=[MinValueValidator(0)])
+    discount = models.DecimalField(
+        default=0.0, 
+        max_digits=10, 
+        decimal_places=2
+    )
+
+    class Meta:
+        ordering = ['id']
+
+    @property
+    def subtotal(self):
+        """The price of the line before discount."""
+
+        return self.unit_price * self.quantity
+
+    @property
+    def total(self):
+        """The price of the line with its discount applied."""
+
+        return self.subtotal - self.discount
+
+    @property
+    def is_ticket(self):
+        """Return True if the line is a line of tickets."""
+
+        return self.type != OrderLine.Type.MEMBERSHIP
+
+    @property
+    def seller(self):
+        """
+        The society paid for the line: the host of the event for tickets, 
+        or one of its societies if it has no host, and the society itself 
+        for memberships. None once the event or society is deleted.
+        """
+
+        if not self.is_ticket:
+            return self.society
+        if self.event is None:
+            return None
+        if self.event.host is not None:
+            return self.event.host
+        return next(iter(self.event.society.all()), None)
+
+    @staticmethod
+    def build_lines(order, pricing):
+        """
+        Build the lines of an order from the priced cart it was placed 
+        with. The discount of an event cart item is applied to the line of 
+        the tickets it was computed on, the standard tickets if there are 
+        any and the early bird tickets otherwise.
+
+        Parameters
+        ----------
+        order : Order
+            The order placed.
+        pricing : CartPricing
+            The priced snapshot of the cart of the order.
+
+        Returns
+        -------
+        list of OrderLine
+            The unsaved lines of the order.
+        """
+
+        lines = []
+        for priced_item in pricing.lines:
+            item, event = priced_item.item, priced_item.event
+            discounted_type = (
+                OrderLine.Type.STANDARD if item.standard_quantity > 0 
+                else OrderLine.Type.EARLY_BIRD
+            )
+            for ticket_type, quantity, unit_price in (
+                (OrderLine.Type.EARLY_BIRD, item.early_bird_quantity, event.early_bird_price),
+                (OrderLine.Type.STANDARD, item.standard_quantity, event.standard_price),
+            ):
+                if quantity <= 0:
+                    continue
+                lines.append(OrderLine(
+                    order=order,
+                    type=ticket_type,
+                    event=event,
+                    name=event.name,
+                    location=event.location,
+                    start_time=event.start_time,
+                    end_time=event.end_time,
+                    unit_price=unit_price,
+                    quantity=quantity,
+                    discount=(
+                        priced_item.discount if ticket_type == discounted_type 
+                        else 0
+                    )
+                ))
+        for society in pricing.memberships:
+            lines.append(OrderLine(
+                order=order,
+                type=OrderLine.Type.MEMBERSHIP,
+                society=society,
+                name=society.name,
+                university_name=(
+                    society.university.name if society.university else ''
+                ),
+                unit_price=society.member_fee,
+                quantity=1
+            ))
+        return lines
+
+    @staticmethod
+    def record(order, pricing):
+        """
+        Write the lines of an order in one insert.
+
+        Parameters
+        ----------
+        order : Order
+            The order placed.
+        pricing : CartPricing
+            The priced snapshot of the cart of the order.
+
+        Returns
+        -------
+        list of OrderLine
+            The lines of the order.
+        """
+
+        return OrderLine.objects.bulk_create(OrderLine.build_lines(order, pricing))
+
+    @staticmethod
+    def get_totals(lines):
+        """
+        Get the total price and the total saved of the lines of an order.
+
+        Parameters
+        ----------
+        lines : iterable of OrderLine
+            The lines of the order.
+
+        Returns
+        -------
+        tuple
+            The total price due with discounts applied, and the total 
+            discount.
+        """
+
+        total_saved = sum((line.discount for line in lines), Decimal('0.00'))
+        total = sum((line.subtotal for line in lines), Decimal('0.00'))
+        return total - total_saved, total_saved
+
+    @staticmethod
+    def get_payouts(order):
+        """
+        Get the amount owed to each seller of an order, from the prices the 
+        items were bought at, so that edits to the events or societies after 
+        the checkout do not change what is charged and paid out. Lines 
+        without a seller, whose event or society was deleted, are left out.
+
+        Parameters
+        ----------
+        order : Order
+            The order placed.
+
+        Returns
+        -------
+        dict
+            A dictionary where the keys are the sellers and the values are 
+            the payout amounts.
+        """
+
+        lines = order.lines.select_related(
+            'event__host', 
+            'society'
+        ).prefetch_related('event__society')
+        payouts = defaultdict(Decimal)
+        for line in lines:
+            seller = line.seller
+            if seller is not None and line.total > 0:
+                payouts[seller] += line.total
+        return dict(payouts)
+
+
+class Payment(models.Model):
+    """
+    Payment model represents a payment made by a student. 
+    Payment method supports Visa, Mastercard, American Express 
+    and China UnionPay payments from customers worldwide.
+
+    Attributes
+    ----------
+    student : models.ForeignKey
+        The student that makes the given payment.
+    order : models.OneToOneField
+        The order fulfilled by the given payment.
+    amount : models.DecimalField
+        The amount of the given payment.
+    status : Status
+        Enum indicating the status of the given order.
+    last4 : str
+        The last 4 digits of the bank card used for the payment.
+    brand : str
+        The brand of the bank card used for the payment.
+    transaction_id : str 
+        The ID of the transaction associated with the payment that is 
+        provided by Stripe.  
+    """
 
     class Status(models.TextChoices):
         COMPLETED = 'COMPLETED', 'Completed'
@@ -1353,6 +2191,9 @@ class Ticket(models.Model):
         The order that purchases the given ticket. 
     type : models.CharField
         The type of the ticket, either EarlyBird or Standard.
+    order_line : models.ForeignKey, optional
+        The line of the order the ticket was bought in, with the event as 
+        it was bought.
     """
     
     class Type(models.TextChoices):
@@ -1366,6 +2207,13 @@ class Ticket(models.Model):
         choices=Type.choices,
         default=Type.EARLY_BIRD,
     )
+    order_line = models.ForeignKey(
+        OrderLine,
+        on_delete=models.SET_NULL,
+        related_name='tickets',
+        blank=True,
+        null=True
+    )
 
     @staticmethod   
     def get_tickets_by_event(event):
@@ -1404,4 +2252,1024 @@ class Ticket(models.Model):
         """
     
         tickets = Ticket.objects.filter(order=order)
-        return tickets
\ No newline at end of file
+        return tickets
+
+class Settlement(models.Model):
+    """
+    Settlement model represents the transfer to a society of the payouts it 
+    is owed for the orders of one settlement window. A society is settled at 
+    most once per window, and the transfer is sent with the settlement as its 
+    idempotency key, so that a settlement run again after a failure does not 
+    pay the society twice.
+
+    Attributes
+    ----------
+    society : models.ForeignKey
+        The society paid by the settlement.
+    window_end : models.DateTimeField
+        The end of the settlement window. The settlement covers the payout 
+        entries created before it.
+    amount : models.DecimalField
+        The total amount of the payout entries of the settlement.
+    status : Status
+        Enum indicating whether the transfer has been sent.
+    transfer_id : models.CharField
+        The id of the Stripe transfer.
+    created_at : models.DateTimeField
+        The date and time when the settlement is created.
+    settled_at : models.DateTimeField, optional
+        The date and time when the transfer has been sent.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SETTLED = 'SETTLED', 'Settled'
+
+    society = models.ForeignKey(
+        Society,
+        on_delete=models.CASCADE,
+        related_name='settlements'
+    )
+    window_end = models.DateTimeField()
+    amount = models.DecimalField(
+        default=0.0, 
+        max_digits=10, 
+        decimal_places=2
+    )
+    status = models.CharField(
+        max_length=50,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    transfer_id = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    settled_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        unique_together = ['society', 'window_end']
+
+class PayoutEntry(models.Model):
+    """
+    PayoutEntry model represents the amount owed to a society for an order, 
+    in the payout ledger. The entries of an order are recorded once its 
+    customer has been charged, and are paid to the societies in batches by 
+    the settle_payouts command.
+
+    Attributes
+    ----------
+    order : models.ForeignKey
+        The order the amount was paid in.
+    society : models.ForeignKey
+        The society the amount is owed to.
+    amount : models.DecimalField
+        The amount owed to the society.
+    created_at : models.DateTimeField
+        The date and time when the entry is recorded.
+    settlement : models.ForeignKey, optional
+        The settlement that pays the entry, empty until it is settled.
+    """
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='payout_entries'
+    )
+    society = models.ForeignKey(
+        Society,
+        on_delete=models.CASCADE,
+        related_name='payout_entries'
+    )
+    amount = models.DecimalField(
+        default=0.0, 
+        max_digits=10, 
+        decimal_places=2
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    settlement = models.ForeignKey(
+        Settlement,
+        on_delete=models.RESTRICT,
+        related_name='entries',
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        unique_together = ['order', 'society']
+        indexes = [models.Index(fields=['settlement', 'society', 'created_at'])]
+
+    @staticmethod
+    def record(order):
+        """
+        Append the payouts of an order to the ledger, from the prices of the 
+        lines of the order. The entries of an order are recorded once, so 
+        recording them again does nothing.
+
+        Parameters
+        ----------
+        order : Order
+            The order the payouts were paid in.
+
+        Returns
+        -------
+        dict
+            A dictionary where the keys are the sellers and the values are 
+            the payout amounts.
+        """
+
+        payouts = OrderLine.get_payouts(order)
+        PayoutEntry.objects.bulk_create(
+            [
+                PayoutEntry(order=order, society=society, amount=amount)
+                for society, amount in payouts.items()
+                if amount > 0
+            ],
+            ignore_conflicts=True
+        )
+        return payouts
+
+    @staticmethod
+    def get_unsettled_totals(window_end):
+        """
+        Get the total amount of the unsettled entries created before the end 
+        of a settlement window, per society.
+
+        Parameters
+        ----------
+        window_end : datetime
+            The end of the settlement window.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping society id to the amount owed.
+        """
+
+        totals = PayoutEntry.objects.filter(
+            settlement__isnull=True,
+            created_at__lt=window_end
+        ).values('society').annotate(total=Sum('amount'))
+        return {row['society']: row['total'] for row in totals}
+
+class IdempotencyKey(models.Model):
+    """
+    IdempotencyKey model records a request sent with a key chosen by the 
+    client, so that a retry of the request with the same key, such as a 
+    double-click or a network retry of a checkout, gets the response of the 
+    first request instead of running it again. A key is recorded before the 
+    request runs and its response is stored once the request has succeeded.
+
+    Attributes
+    ----------
+    user : models.ForeignKey
+        The user that sent the request.
+    key : models.CharField
+        The key chosen by the client.
+    fingerprint : models.CharField
+        The hash of the path and the data of the request.
+    response_status : models.PositiveSmallIntegerField, optional
+        The status code of the response, empty while the request is running.
+    response_location : models.CharField
+        The URL the response redirects to.
+    created_at : models.DateTimeField
+        The date and time when the request is received.
+    """
+
+    # Form fields that differ between retries of the same request
+    IGNORED_FIELDS = {'csrfmiddlewaretoken', 'idempotency_key'}
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=64)
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    response_location = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'key'],
+                name='unique_user_idempotency_key'
+            )
+        ]
+
+    @property
+    def is_complete(self):
+        """Return True if the response of the request is stored."""
+
+        return self.response_status is not None
+
+    @property
+    def is_expired(self):
+        """
+        Return True if the key is older than IDEMPOTENCY_KEY_HOURS, after 
+        which it no longer replays its response and can be used again.
+        """
+
+        lifetime = timedelta(hours=settings.IDEMPOTENCY_KEY_HOURS)
+        return self.created_at <= timezone.now() - lifetime
+
+    @staticmethod
+    def get_fingerprint(path, data):
+        """
+        Get the fingerprint of a request, so that a key sent again with 
+        different data can be told apart from a retry.
+
+        Parameters
+        ----------
+        path : str
+            The path of the request.
+        data : QueryDict
+            The data of the request.
+
+        Returns
+        -------
+        str
+            The SHA-256 hash of the path and the data, in hexadecimal.
+        """
+
+        items = sorted(
+            (name, values) for name, values in data.lists()
+            if name not in IdempotencyKey.IGNORED_FIELDS
+        )
+        content = json.dumps([path, items], separators=(',', ':'))
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @staticmethod
+    def begin(user, key, fingerprint):
+        """
+        Record a request sent with the given key, unless the key is already 
+        recorded for the user. The key is looked up by the unique index on 
+        the user and the key. An expired key is recorded again.
+
+        Parameters
+        ----------
+        user : User
+            The user that sent the request.
+        key : str
+            The key chosen by the client.
+        fingerprint : str
+            The fingerprint of the request.
+
+        Returns
+        -------
+        tuple
+            The IdempotencyKey and True if the request is recorded now, or 
+            False if the key was already recorded by an earlier request.
+        """
+
+        record = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if record is not None and record.is_expired:
+            record.delete()
+            record = None
+        if record is not None:
+            return record, False
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint
+                )
+        except IntegrityError:
+            # A concurrent request with the same key has just been recorded
+            return IdempotencyKey.objects.get(user=user, key=key), False
+        return record, True
+
+    def complete(self, response):
+        """
+        Store the response of the request so that it is replayed to retries.
+
+        Parameters
+        ----------
+        response : HttpResponse
+            The redirect returned by the request.
+        """
+
+        self.response_status = response.status_code
+        self.response_location = response.get('Location', '')
+        self.save(update_fields=['response_status', 'response_location'])
+
+class Job(models.Model):
+    """
+    Job model represents a unit of background work stored in the database, 
+    such as the post-processing of a completed order. Jobs are picked up by 
+    the run_jobs worker command and retried with exponential backoff when 
+    they fail.
+
+    Attributes
+    ----------
+    task : models.CharField
+        The name of the registered task to run.
+    order : models.ForeignKey, optional
+        The order that the job processes.
+    payload : models.JSONField
+        The keyword arguments of the task.
+    status : Status
+        Enum indicating the status of the given job.
+    attempts : models.IntegerField
+        The number of times the job has been started.
+    max_attempts : models.IntegerField
+        The number of attempts before the job is marked as failed.
+    run_at : models.DateTimeField
+        The date and time from which the job can be run. While the job is 
+        running, the date and time after which the job is considered to be 
+        abandoned by its worker.
+    last_error : models.TextField
+        The error raised by the last failed attempt.
+    created_at : models.DateTimeField
+        The date and time when the job is enqueued.
+    finished_at : models.DateTimeField, optional
+        The date and time when the job has succeeded or failed.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+
+    task = models.CharField(max_length=50)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='jobs',
+        null=True,
+        blank=True
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=50,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=settings.JOB_MAX_ATTEMPTS)
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        unique_together = ['order', 'task']
+        indexes = [models.Index(fields=['status', 'run_at'])]
+
+    @staticmethod
+    def enqueue(task, order=None, **payload):
+        """
+        Add a job to the queue. A task is enqueued at most once per order, so 
+        enqueueing the same task for an order again returns the existing job.
+
+        Parameters
+        ----------
+        task : str
+            The name of the registered task to run.
+        order : Order, optional
+            The order that the job processes.
+        **payload
+            The keyword arguments of the task.
+
+        Returns
+        -------
+        Job
+            The enqueued job.
+        """
+
+        if order is None:
+            return Job.objects.create(task=task, payload=payload)
+        job, _ = Job.objects.get_or_create(
+            task=task,
+            order=order,
+            defaults={'payload': payload}
+        )
+        return job
+
+    @staticmethod
+    def claim_next():
+        """
+        Claim the next job that is due, including running jobs abandoned by 
+        their worker. Abandoned jobs that have used up their attempts are 
+        marked as failed instead, so that a job killing its worker is not 
+        retried forever. The job is claimed with a conditional update, so 
+        concurrent workers never claim the same job.
+
+        Returns
+        -------
+        Job or None
+            The claimed job, or None if no job is due.
+        """
+
+        while True:
+            now = timezone.now()
+            job = Job.objects.filter(
+                status__in=[Job.Status.PENDING, Job.Status.RUNNING],
+                run_at__lte=now
+            ).order_by('run_at', 'id').first()
+            if job is None:
+                return None
+            if (
+                job.status == Job.Status.RUNNING
+                and job.attempts >= job.max_attempts
+            ):
+                Job.objects.filter(
+                    pk=job.pk,
+                    status=job.status,
+                    attempts=job.attempts
+                ).update(
+                    status=Job.Status.FAILED,
+                    finished_at=now,
+                    last_error='Abandoned by its worker after its last attempt'
+                )
+                continue
+            lock_expires_at = now + timedelta(
+                seconds=settings.JOB_TIMEOUT_SECONDS
+            )
+            claimed = Job.objects.filter(
+                pk=job.pk,
+                status=job.status,
+                attempts=job.attempts
+            ).update(
+                status=Job.Status.RUNNING,
+                attempts=F('attempts') + 1,
+                run_at=lock_expires_at
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+
+    @staticmethod
+    def get_backoff(attempts):
+        """
+        Get the delay before a failed job is retried.
+
+        Parameters
+        ----------
+        attempts : int
+            The number of times the job has been started.
+
+        Returns
+        -------
+        timedelta
+            The delay, which doubles with each failed attempt.
+        """
+
+        seconds = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+        return timedelta(seconds=seconds)
+
+    @staticmethod
+    def mark_succeeded(job):
+        """
+        Mark the given job as succeeded.
+
+        Parameters
+        ----------
+        job : Job
+            The job that has succeeded.
+        """
+
+        job.status = Job.Status.SUCCEEDED
+        job.finished_at = timezone.now()
+        job.last_error = ''
+        job.save(update_fields=['status', 'finished_at', 'last_error'])
+
+    @staticmethod
+    def mark_failed(job, error):
+        """
+        Schedule a retry of the given job, or mark it as failed when it has 
+        used up its attempts.
+
+        Parameters
+        ----------
+        job : Job
+            The job that has failed.
+        error : str
+            The error raised by the job.
+        """
+
+        job.last_error = error
+        if job.attempts >= job.max_attempts:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = Job.Status.PENDING
+            job.run_at = timezone.now() + Job.get_backoff(job.attempts)
+        job.save(
+            update_fields=['status', 'finished_at', 'run_at', 'last_error']
+        )
+
+    @staticmethod
+    def get_order_status(order):
+        """
+        Get the processing status of the given order from its jobs.
+
+        Parameters
+        ----------
+        order : Order
+            The given order.
+
+        Returns
+        -------
+        str
+            'FAILED' if any job of the order has failed, 'PENDING' if any job 
+            is still waiting or running, 'SUCCEEDED' otherwise.
+        """
+
+        statuses = set(
+            Job.objects.filter(order=order).values_list('status', flat=True)
+        )
+        if Job.Status.FAILED in statuses:
+            return Job.Status.FAILED
+        if statuses & {Job.Status.PENDING, Job.Status.RUNNING}:
+            return Job.Status.PENDING
+        return Job.Status.SUCCEEDED
+
+
+class OutboundEmail(models.Model):
+    """
+    OutboundEmail model represents an email waiting in the outbox to be sent 
+    by the send_outbound_emails worker command. Views write emails to the 
+    outbox instead of sending them during the request. An email that is 
+    still waiting is not queued again for the same recipient, template and 
+    event: the waiting email gets the subject and body of the new one. An 
+    email queued while the previous one is being sent waits for it.
+
+    Attributes
+    ----------
+    recipient : models.EmailField
+        The email address of the recipient.
+    subject : models.CharField
+        The subject of the email.
+    body : models.TextField
+        The body of the email.
+    template : models.CharField
+        The template the body was rendered from.
+    event : models.ForeignKey, optional
+        The event the email is about.
+    status : Status
+        Enum indicating the status of the given email.
+    attempts : models.IntegerField
+        The number of times sending the email has been attempted.
+    send_after : models.DateTimeField
+        The date and time from which the email can be sent. While the email 
+        is being sent, the date and time after which it is considered to be 
+        abandoned by its worker.
+    last_error : models.TextField
+        The error raised by the last failed attempt.
+    created_at : models.DateTimeField
+        The date and time when the email is queued.
+    sent_at : models.DateTimeField, optional
+        The date and time when the email has been sent.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    template = models.CharField(max_length=100, blank=True)
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    status = models.CharField(
+        max_length=50,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.IntegerField(default=0)
+    send_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient', 'template', 'event'],
+                condition=Q(status='PENDING'),
+                name='unique_pending_outbound_email'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['status', 'send_after']),
+            models.Index(fields=['sent_at']),
+        ]
+
+    @staticmethod
+    def enqueue(emails):
+        """
+        Add emails to the outbox in batched inserts. Emails that are already 
+        pending for the same recipient, template and event are updated with 
+        the subject and body of the new emails instead, so that recipients 
+        get the latest version of an event changed twice before the outbox 
+        is sent. Emails that are being sent are left as they are, and the new 
+        emails are queued to be sent after them.
+
+        Parameters
+        ----------
+        emails : list of OutboundEmail
+            The unsaved emails to queue.
+        """
+
+        new_emails = [email for email in emails if email.event_id is None]
+        emails_by_key = {
+            (email.recipient, email.template, email.event_id): email
+            for email in emails
+            if email.event_id is not None
+        }
+        recipients_by_event = defaultdict(list)
+        for recipient, template, event_id in emails_by_key:
+            recipients_by_event[(template, event_id)].append(recipient)
+        unsent_emails = []
+        for (template, event_id), recipients in recipients_by_event.items():
+            for start in range(0, len(recipients), 500):
+                unsent_emails.extend(OutboundEmail.objects.filter(
+                    status__in=[OutboundEmail.Status.PENDING, OutboundEmail.Status.SENDING],
+                    template=template,
+                    event_id=event_id,
+                    recipient__in=recipients[start:start + 500]
+                ).only('id', 'recipient', 'template', 'event_id', 'status', 'send_after'))
+        pending_emails = []
+        sending_emails = []
+        for unsent_email in unsent_emails:
+            if unsent_email.status == OutboundEmail.Status.PENDING:
+                pending_emails.append(unsent_email)
+            else:
+                sending_emails.append(unsent_email)
+        for pending_email in pending_emails:
+            email = emails_by_key.pop(
+                (pending_email.recipient, pending_email.template, pending_email.event_id)
+            )
+            pending_email.subject = email.subject
+            pending_email.body = email.body
+        for sending_email in sending_emails:
+            email = emails_by_key.get(
+                (sending_email.recipient, sending_email.template, sending_email.event_id)
+            )
+            # Wait until the email being sent is sent or abandoned
+            if email is not None:
+                email.send_after = max(email.send_after, sending_email.send_after)
+        OutboundEmail.objects.bulk_update(
+            pending_emails,
+            ['subject', 'body'],
+            batch_size=500
+        )
+        OutboundEmail.objects.bulk_create(
+            new_emails + list(emails_by_key.values()),
+            batch_size=500,
+            ignore_conflicts=True
+        )
+
+    @staticmethod
+    def get_send_allowance():
+        """
+        Get the number of emails that can be sent now without going over the 
+        send rate of the mail server.
+
+        Returns
+        -------
+        int
+            The number of emails that can be sent now.
+        """
+
+        sent_in_last_minute = OutboundEmail.objects.filter(
+            sent_at__gte=timezone.now() - timedelta(minutes=1)
+        ).count()
+        return max(settings.EMAIL_SEND_RATE_PER_MINUTE - sent_in_last_minute, 0)
+
+    @staticmethod
+    def claim_batch(limit):
+        """
+        Claim the emails that are due, including emails abandoned by their 
+        worker. The emails are claimed with a conditional update, so 
+        concurrent workers never claim the same email.
+
+        Parameters
+        ----------
+        limit : int
+            The maximum number of emails to claim.
+
+        Returns
+        -------
+        list of OutboundEmail
+            The claimed emails.
+        """
+
+        now = timezone.now()
+        due_emails = OutboundEmail.objects.filter(
+            status__in=[OutboundEmail.Status.PENDING, OutboundEmail.Status.SENDING],
+            send_after__lte=now
+        )
+        ids = list(
+            due_emails.order_by('send_after', 'id').values_list('id', flat=True)[:limit]
+        )
+        lock_expires_at = now + timedelta(seconds=settings.JOB_TIMEOUT_SECONDS)
+        due_emails.filter(pk__in=ids).update(
+            status=OutboundEmail.Status.SENDING,
+            attempts=F('attempts') + 1,
+            send_after=lock_expires_at
+        )
+        return list(OutboundEmail.objects.filter(
+            pk__in=ids,
+            status=OutboundEmail.Status.SENDING,
+            send_after=lock_expires_at
+        ).order_by('id'))
+
+    @staticmethod
+    def mark_sent(emails):
+        """
+        Mark the given emails as sent.
+
+        Parameters
+        ----------
+        emails : list of OutboundEmail
+            The emails that have been sent.
+        """
+
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status=OutboundEmail.Status.SENT,
+            sent_at=timezone.now(),
+            last_error=''
+        )
+
+    @staticmethod
+    def mark_failed(email, error):
+        """
+        Schedule a retry of the given email with exponential backoff, or mark 
+        it as failed when it has used up its attempts. An email that has 
+        been queued again while it was being sent is not retried either, as 
+        the newer email will be sent instead.
+
+        Parameters
+        ----------
+        email : OutboundEmail
+            The email that could not be sent.
+        error : str
+            The error raised.
+        """
+
+        email.last_error = error
+        queued_again = email.event_id is not None and OutboundEmail.objects.filter(
+            status=OutboundEmail.Status.PENDING,
+            recipient=email.recipient,
+            template=email.template,
+            event_id=email.event_id
+        ).exists()
+        if email.attempts >= settings.EMAIL_MAX_ATTEMPTS or queued_again:
+            email.status = OutboundEmail.Status.FAILED
+        else:
+            email.status = OutboundEmail.Status.PENDING
+            seconds = settings.EMAIL_RETRY_BACKOFF_SECONDS * 2 ** (email.attempts - 1)
+            email.send_after = timezone.now() + timedelta(seconds=seconds)
+        email.save(update_fields=['status', 'send_after', 'last_error'])
+
+class FeedEntry(models.Model):
+    """
+    FeedEntry model represents an event in the "For You" feed of a student. 
+    The feed holds the events organised by the societies the student follows 
+    and the events the student has saved. It is written when a society 
+    organises an event, when a student follows a society and when a student 
+    saves an event. The times and status of the event are copied into the 
+    entry, and kept up to date when the event is saved, so that a page of 
+    the feed is read with a range scan of the (student, start_time, event) 
+    index instead of joining the follows, saved events and events on every 
+    page view.
+
+    Attributes
+    ----------
+    student : models.ForeignKey
+        The student whose feed holds the event.
+    event : models.ForeignKey
+        The event in the feed.
+    start_time : models.DateTimeField
+        The start time of the event.
+    end_time : models.DateTimeField
+        The end time of the event.
+    status : models.CharField
+        The status of the event.
+    """
+
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    status = models.CharField(
+        max_length=50,
+        choices=Event.Status.choices,
+        default=Event.Status.ACTIVE
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'event'],
+                name='unique_feed_entry'
+            )
+        ]
+        indexes = [models.Index(fields=['student', 'start_time', 'event'])]
+
+    @staticmethod
+    def add_entries(pairs):
+        """
+        Add events to the feeds of students in batched inserts, with the 
+        times and status of the events. Events that are already in a feed 
+        are skipped.
+
+        Parameters
+        ----------
+        pairs : iterable of tuple
+            The (student id, event id) pairs to add.
+        """
+
+        pairs = list(pairs)
+        if not pairs:
+            return
+        event_ids = list({event_id for _, event_id in pairs})
+        events = {}
+        for start in range(0, len(event_ids), 500):
+            events.update(
+                (event_id, (start_time, end_time, status))
+                for event_id, start_time, end_time, status in Event.objects.filter(
+                    pk__in=event_ids[start:start + 500]
+                ).values_list('id', 'start_time', 'end_time', 'status')
+            )
+        entries = []
+        for student_id, event_id in pairs:
+            if event_id in events:
+                start_time, end_time, status = events[event_id]
+                entries.append(FeedEntry(
+                    student_id=student_id,
+                    event_id=event_id,
+                    start_time=start_time,
+                    end_time=end_time,
+                    status=status
+                ))
+        FeedEntry.objects.bulk_create(
+            entries,
+            batch_size=500,
+            ignore_conflicts=True
+        )
+
+    @staticmethod
+    def update_event(event):
+        """
+        Copy the times and status of an event into the feed entries of the 
+        event.
+
+        Parameters
+        ----------
+        event : Event
+            The event that has changed.
+        """
+
+        FeedEntry.objects.filter(event=event).update(
+            start_time=event.start_time,
+            end_time=event.end_time,
+            status=event.status
+        )
+
+    @staticmethod
+    def fan_out(society_ids, event_ids):
+        """
+        Add events to the feeds of the followers of the given societies.
+
+        Parameters
+        ----------
+        society_ids : iterable of int
+            The ids of the societies that organise the events.
+        event_ids : iterable of int
+            The ids of the events.
+        """
+
+        event_ids = list(event_ids)
+        follower_ids = Society.follower.through.objects.filter(
+            society_id__in=list(society_ids)
+        ).values_list('student_id', flat=True).distinct()
+        FeedEntry.add_entries(
+            (student_id, event_id)
+            for student_id in follower_ids
+            for event_id in event_ids
+        )
+
+    @staticmethod
+    def get_expected_pairs(student_ids=None, event_ids=None):
+        """
+        Get the events that should be in the feeds of students, from the 
+        societies they follow and the events they have saved.
+
+        Parameters
+        ----------
+        student_ids : iterable of int, optional
+            The ids of the students to limit the feeds to.
+        event_ids : iterable of int, optional
+            The ids of the events to limit the feeds to.
+
+        Returns
+        -------
+        set of tuple
+            The (student id, event id) pairs that should be in the feeds.
+        """
+
+        follows = Society.follower.through.objects.all()
+        organised = Event.society.through.objects.all()
+        saved = Student.saved_event.through.objects.all()
+        if student_ids is not None:
+            student_ids = list(student_ids)
+            follows = follows.filter(student_id__in=student_ids)
+            saved = saved.filter(student_id__in=student_ids)
+        if event_ids is not None:
+            event_ids = list(event_ids)
+            organised = organised.filter(event_id__in=event_ids)
+            saved = saved.filter(event_id__in=event_ids)
+        events_by_society = defaultdict(list)
+        for society_id, event_id in organised.values_list('society_id', 'event_id'):
+            events_by_society[society_id].append(event_id)
+        follows = follows.filter(society_id__in=list(events_by_society))
+        pairs = set(saved.values_list('student_id', 'event_id'))
+        for society_id, student_id in follows.values_list('society_id', 'student_id'):
+            pairs.update(
+                (student_id, event_id) for event_id in events_by_society[society_id]
+            )
+        return pairs
+
+    @staticmethod
+    def get_drift(student_ids=None, event_ids=None):
+        """
+        Compare the feeds of students with the events they should hold.
+
+        Parameters
+        ----------
+        student_ids : iterable of int, optional
+            The ids of the students to limit the feeds to.
+        event_ids : iterable of int, optional
+            The ids of the events to limit the feeds to.
+
+        Returns
+        -------
+        tuple of set
+            The (student id, event id) pairs missing from the feeds and the 
+            pairs in the feeds that should not be.
+        """
+
+        if student_ids is not None:
+            student_ids = list(student_ids)
+        if event_ids is not None:
+            event_ids = list(event_ids)
+        entries = FeedEntry.objects.all()
+        if student_ids is not None:
+            entries = entries.filter(student_id__in=student_ids)
+        if event_ids is not None:
+            entries = entries.filter(event_id__in=event_ids)
+        current = set(entries.values_list('student_id', 'event_id'))
+        expected = FeedEntry.get_expected_pairs(student_ids, event_ids)
+        return expected - current, current - expected
+
+    @staticmethod
+    def refresh(student_ids=None, event_ids=None):
+        """
+        Bring the feeds of students in line with the societies they follow 
+        and the events they have saved. Without arguments, every feed is 
+        rebuilt.
+
+        Parameters
+        ----------
+        student_ids : iterable of int, optional
+            The ids of the students to limit the feeds to.
+        event_ids : iterable of int, optional
+            The ids of the events to limit the feeds to.
+
+        Returns
+        -------
+        tuple of int
+            The number of entries added and removed.
+        """
+
+        with transaction.atomic():
+            missing, stale = FeedEntry.get_drift(student_ids, event_ids)
+            FeedEntry.add_entries(missing)
+            stale_by_student = defaultdict(list)
+            for student_id, event_id in stale:
+                stale_by_student[student_id].append(event_id)
+            for student_id, stale_event_ids in stale_by_student.items():
+                FeedEntry.objects.filter(
+                    student_id=student_id,
+                    event_id__in=stale_event_ids
+                ).delete()
+        return len(missing), len(stale)
@@ -0,0 +1,393 @@
+"""
+Gateway to the Stripe API used by the checkout, the payment jobs, the
+payouts and the bank details of societies.
+
+Every call to Stripe goes through the gateway, which sends it over one
+connection-pooled HTTP session shared by all threads, with a timeout per
+call. Calls that fail with a rate limit or connection error are retried
+with exponential backoff and jitter, and calls that create or update an
+object carry an idempotency key, so that a retry does not repeat it. After
+STRIPE_CIRCUIT_FAILURE_THRESHOLD consecutive calls have failed because
+Stripe could not be reached, the circuit opens and calls fail fast for
+STRIPE_CIRCUIT_RESET_SECONDS instead of holding requests for the timeout.
+
+The card details of payment methods never change, and the customers
+created by the checkout keep the payment method they were created with, so
+they are cached instead of being retrieved from Stripe again.
+
+Classes
+-------
+PaymentGatewayUnavailable : class
+    Raised when the circuit is open and Stripe is not called.
+PooledHTTPClient : class
+    Stripe HTTP client sharing one pooled session with per-call timeouts.
+CircuitBreaker : class
+    Circuit breaker opened by consecutive failed calls.
+
+Functions
+---------
+call : function
+    Call the Stripe API with retries and the circuit breaker.
+create_customer : function
+    Create a customer with a default payment method in one call.
+get_default_payment_method : function
+    Get the card details of the default payment method of a customer.
+create_account : function
+    Create the Stripe account of a society.
+update_account : function
+    Update the Stripe account of a society.
+charge_order : function
+    Charge the customer of an order once for the whole order.
+"""
+
+import random
+import threading
+import time
+import uuid
+import requests
+import stripe
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from stripe.http_client import RequestsClient
+from stripe.stripe_object import StripeObject
+from ticket_selling_platform import settings
+
+class PaymentGatewayUnavailable(stripe.error.APIConnectionError):
+    """Raised when the circuit is open and Stripe is not called."""
+
+class PooledHTTPClient(RequestsClient):
+    """
+    Stripe HTTP client sending every request over one session shared by all
+    threads, so that connections to Stripe are kept alive and reused from a
+    pool. The timeout can be set for the calls of the current thread.
+    """
+
+    def __init__(self, timeout, pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        super().__init__(timeout=timeout, session=session)
+
+    @property
+    def _timeout(self):
+        return getattr(self._thread_local, 'timeout', None) or self.default_timeout
+
+    @_timeout.setter
+    def _timeout(self, timeout):
+        self.default_timeout = timeout
+
+    def set_timeout(self, timeout):
+        """
+        Set the timeout of the calls of the current thread.
+
+        Parameters
+        ----------
+        timeout : float or None
+            The timeout in seconds, or None for the default timeout.
+        """
+
+        self._thread_local.timeout = timeout
+
+class CircuitBreaker:
+    """
+    Circuit breaker opened by a number of consecutive failed calls. While it
+    is open, calls fail fast. Once the reset time has passed, one call is let
+    through: the circuit closes if it succeeds and opens again if it fails.
+    """
+
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Return True if calls should fail fast."""
+
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                # Let one call through to test whether Stripe is back
+                self.opened_at = time.monotonic()
+                return False
+            return True
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """Count a failed call and open the circuit at the threshold."""
+
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def reset(self):
+        """Close the circuit and forget the failed calls."""
+
+        self.record_success()
+
+# Errors after which a call is retried
+RETRIED_ERRORS = (stripe.error.RateLimitError, stripe.error.APIConnectionError)
+
+# Errors counted by the circuit breaker, as Stripe could not be reached
+OUTAGE_ERRORS = (stripe.error.APIConnectionError, stripe.error.APIError)
+
+http_client = PooledHTTPClient(
+    settings.STRIPE_TIMEOUT_SECONDS,
+    settings.STRIPE_POOL_SIZE
+)
+circuit_breaker = CircuitBreaker(
+    settings.STRIPE_CIRCUIT_FAILURE_THRESHOLD,
+    settings.STRIPE_CIRCUIT_RESET_SECONDS
+)
+
+stripe.api_base = settings.STRIPE_API_BASE
+stripe.default_http_client = http_client
+# The gateway retries calls itself
+stripe.max_network_retries = 0
+
+def call(method, *args, timeout=None, **kwargs):
+    """
+    Call the Stripe API with retries and the circuit breaker. A call that
+    creates or updates an object should be given an idempotency key, so that
+    it is not repeated by a retry.
+
+    Parameters
+    ----------
+    method : function
+        The method of the stripe library to call.
+    *args
+        The positional arguments of the method.
+    timeout : float, optional
+        The timeout in seconds of each attempt. Defaults to
+        STRIPE_TIMEOUT_SECONDS.
+    **kwargs
+        The keyword arguments of the method.
+
+    Returns
+    -------
+    object
+        The value returned by the method.
+
+    Raises
+    ------
+    PaymentGatewayUnavailable
+        If the circuit is open.
+    stripe.error.StripeError
+        If the call failed after its retries.
+    """
+
+    if circuit_breaker.is_open:
+        raise PaymentGatewayUnavailable(
+            'Stripe is unavailable, please try again later.'
+        )
+    http_client.set_timeout(timeout)
+    try:
+        for attempt in range(settings.STRIPE_MAX_RETRIES + 1):
+            try:
+                result = method(*args, **kwargs)
+                break
+            except RETRIED_ERRORS:
+                if attempt == settings.STRIPE_MAX_RETRIES:
+                    raise
+                delay = settings.STRIPE_RETRY_BACKOFF_SECONDS * 2 ** attempt
+                time.sleep(random.uniform(0, delay))
+    except OUTAGE_ERRORS:
+        circuit_breaker.record_failure()
+        raise
+    finally:
+        http_client.set_timeout(None)
+    circuit_breaker.record_success()
+    return result
+
+def create_customer(name, email, payment_method_id):
+    """
+    Create a customer with the given payment method attached as its default
+    payment method, in one call. The card details of the payment method are
+    cached for the payment jobs of the order.
+
+    Parameters
+    ----------
+    name : str
+        The name of the customer.
+    email : str
+        The email of the customer.
+    payment_method_id : str
+        The id of the payment method created by Stripe.js.
+
+    Returns
+    -------
+    stripe.Customer
+        The customer created.
+    """
+
+    customer = call(
+        stripe.Customer.create,
+        name=name,
+        email=email,
+        payment_method=payment_method_id,
+        invoice_settings={'default_payment_method': payment_method_id},
+        expand=['invoice_settings.default_payment_method'],
+        idempotency_key=_new_idempotency_key(),
+    )
+    if isinstance(customer, StripeObject):
+        payment_method = _get_card_details(
+            customer.invoice_settings.default_payment_method
+        )
+        cache.set(
+            _get_customer_cache_key(customer.id),
+            payment_method,
+            settings.STRIPE_CACHE_SECONDS
+        )
+    return customer
+
+def get_default_payment_method(customer_id):
+    """
+    Get the card details of the default payment method of a customer, from
+    the cache or with one call to Stripe.
+
+    Parameters
+    ----------
+    customer_id : str
+        The id of the customer.
+
+    Returns
+    -------
+    dict
+        The id, the brand and the last 4 digits of the card of the payment
+        method.
+    """
+
+    cache_key = _get_customer_cache_key(customer_id)
+    payment_method = cache.get(cache_key)
+    if payment_method is not None:
+        return payment_method
+    customer = call(
+        stripe.Customer.retrieve,
+        customer_id,
+        expand=['invoice_settings.default_payment_method']
+    )
+    payment_method = customer.invoice_settings.default_payment_method
+    if isinstance(payment_method, str):
+        payment_method = call(stripe.PaymentMethod.retrieve, payment_method)
+    card_details = _get_card_details(payment_method)
+    if isinstance(customer, StripeObject):
+        cache.set(cache_key, card_details, settings.STRIPE_CACHE_SECONDS)
+    return card_details
+
+def create_account(**params):
+    """
+    Create the Stripe account of a society.
+
+    Parameters
+    ----------
+    **params
+        The parameters of the account.
+
+    Returns
+    -------
+    stripe.Account
+        The account created.
+    """
+
+    return call(
+        stripe.Account.create,
+        idempotency_key=_new_idempotency_key(),
+        **params
+    )
+
+def update_account(account_id, **params):
+    """
+    Update the Stripe account of a society.
+
+    Parameters
+    ----------
+    account_id : str
+        The id of the account.
+    **params
+        The parameters to update.
+
+    Returns
+    -------
+    stripe.Account
+        The account updated.
+    """
+
+    return call(
+        stripe.Account.modify,
+        account_id,
+        idempotency_key=_new_idempotency_key(),
+        **params
+    )
+
+def charge_order(order, amount):
+    """
+    Charge the customer of an order once for the whole order, with the 
+    default payment method of the customer. The payment intent is created 
+    with an idempotency key per order, so a retried charge does not charge 
+    the customer twice.
+
+    Parameters
+    ----------
+    order : Order
+        The completed order.
+    amount : Decimal
+        The amount to charge, in pounds.
+    """
+
+    if amount <= 0:
+        return
+    payment_method_id = get_default_payment_method(order.customer_id)['id']
+    intent = call(
+        stripe.PaymentIntent.create,
+        amount=int(amount * 100),
+        currency='gbp',
+        payment_method=payment_method_id,
+        customer=order.customer_id,
+        payment_method_types=['card'],
+        transfer_group=f'order-{order.id}',
+        idempotency_key=f'order-{order.id}-charge',
+    )
+    if intent.status != 'succeeded':
+        call(intent.confirm)
+
+def _new_idempotency_key():
+    """Get a new idempotency key, shared by the retries of one call."""
+
+    return uuid.uuid4().hex
+
+def _get_customer_cache_key(customer_id):
+    """Get the cache key of the default payment method of a customer."""
+
+    return f'stripe:customer:{customer_id}:payment_method'
+
+def _get_card_details(payment_method):
+    """
+    Get the cached details of a payment method.
+
+    Parameters
+    ----------
+    payment_method : stripe.PaymentMethod
+        The payment method.
+
+    Returns
+    -------
+    dict
+        The id, the brand and the last 4 digits of the card.
+    """
+
+    return {
+        'id': payment_method.id,
+        'brand': payment_method.card.brand,
+        'last4': payment_method.card.last4,
+    }
@@ -0,0 +1,144 @@
+"""
+Settlement of the payout ledger: the payouts owed to each society are paid
+in one Stripe transfer per society and settlement window, instead of one
+payment per society and order.
+
+The customer of an order is charged once for the whole order, and the
+amount owed to each society is appended to the ledger as a PayoutEntry.
+The settle_payouts command then groups the unsettled entries created before
+the end of the last complete settlement window by society and transfers
+their total. The entries are attached to their Settlement before the
+transfer is sent, and the transfer is sent with the settlement as its
+idempotency key, so a settlement that fails is retried by the next run
+without paying the society twice.
+
+Functions
+---------
+get_window_end : function
+    Get the end of the last complete settlement window.
+settle_payouts : function
+    Settle the payouts owed to every society up to the last window.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+import stripe
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from ticket_selling_platform import settings
+from tsp import payments
+from tsp.models import PayoutEntry, Settlement, Society
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+def get_window_end(now=None):
+    """
+    Get the end of the last complete settlement window. Windows last
+    PAYOUT_SETTLEMENT_WINDOW_HOURS and are aligned on the epoch, so every
+    run in the same window settles up to the same time.
+
+    Parameters
+    ----------
+    now : datetime, optional
+        The current time. Defaults to now.
+
+    Returns
+    -------
+    datetime
+        The end of the last complete settlement window.
+    """
+
+    now = now or timezone.now()
+    window = timedelta(hours=settings.PAYOUT_SETTLEMENT_WINDOW_HOURS)
+    return EPOCH + (now - EPOCH) // window * window
+
+def settle_payouts(now=None):
+    """
+    Settle the payouts owed to every society for the entries created before
+    the end of the last complete settlement window, and retry the transfers
+    of the settlements that failed before. Societies without a Stripe
+    account are settled once they have one.
+
+    Parameters
+    ----------
+    now : datetime, optional
+        The current time. Defaults to now.
+
+    Returns
+    -------
+    tuple
+        The settlements transferred, and the settlements whose transfer
+        failed with their error.
+    """
+
+    _create_settlements(get_window_end(now))
+    settled, failed = [], []
+    pending = Settlement.objects.filter(
+        status=Settlement.Status.PENDING
+    ).select_related('society').order_by('id')
+    for settlement in pending:
+        try:
+            _transfer(settlement)
+        except stripe.error.StripeError as e:
+            failed.append((settlement, e))
+        else:
+            settled.append(settlement)
+    return settled, failed
+
+def _create_settlements(window_end):
+    """
+    Create the settlement of every society owed payouts for the entries
+    created before the end of a window, and attach the entries to it. A
+    society already settled for the window keeps its later entries for the
+    next window, so the amount of a settlement never changes.
+
+    Parameters
+    ----------
+    window_end : datetime
+        The end of the settlement window.
+    """
+
+    totals = PayoutEntry.get_unsettled_totals(window_end)
+    societies = Society.objects.filter(id__in=totals).exclude(
+        stripe_account_id__isnull=True
+    ).exclude(stripe_account_id='')
+    for society in societies:
+        with transaction.atomic():
+            settlement, created = Settlement.objects.get_or_create(
+                society=society,
+                window_end=window_end
+            )
+            if not created:
+                continue
+            PayoutEntry.objects.filter(
+                society=society,
+                settlement__isnull=True,
+                created_at__lt=window_end
+            ).update(settlement=settlement)
+            settlement.amount = settlement.entries.aggregate(
+                total=Sum('amount')
+            )['total']
+            settlement.save(update_fields=['amount'])
+
+def _transfer(settlement):
+    """
+    Transfer the amount of a settlement to its society.
+
+    Parameters
+    ----------
+    settlement : Settlement
+        The pending settlement.
+    """
+
+    transfer = payments.call(
+        stripe.Transfer.create,
+        amount=int(settlement.amount * 100),
+        currency='gbp',
+        destination=settlement.society.stripe_account_id,
+        transfer_group=f'settlement-{settlement.id}',
+        idempotency_key=f'settlement-{settlement.id}',
+    )
+    settlement.transfer_id = transfer.id
+    settlement.status = Settlement.Status.SETTLED
+    settlement.settled_at = timezone.now()
+    settlement.save(update_fields=['transfer_id', 'status', 'settled_at'])
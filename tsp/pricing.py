@@ -0,0 +1,167 @@
+"""
+Pricing of shopping carts in a single pass over prefetched data.
+
+Classes
+-------
+PricedEventCartItem
+    The prices and discount of one event cart item in a cart.
+CartPricing
+    A priced snapshot of a cart computed in a fixed number of queries.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+
+class PricedEventCartItem:
+    """
+    The prices and discount of one event cart item in a cart.
+
+    Attributes
+    ----------
+    item : EventCartItem
+        The priced event cart item.
+    event : Event
+        The event of the event cart item.
+    early_bird_total : Decimal
+        The price of the early bird tickets of the item.
+    standard_total : Decimal
+        The price of the standard tickets of the item.
+    total : Decimal
+        The price of all tickets of the item before discount.
+    discount : Decimal
+        The member discount applied to the item.
+    """
+
+    def __init__(self, item, discount):
+        self.item = item
+        self.event = item.event
+        self.early_bird_total = (
+            self.event.early_bird_price * item.early_bird_quantity
+        )
+        self.standard_total = self.event.standard_price * item.standard_quantity
+        self.total = self.early_bird_total + self.standard_total
+        self.discount = discount
+
+
+class CartPricing:
+    """
+    A priced snapshot of a cart. The event cart items with their events and
+    organiser societies, the memberships in the cart, the societies the
+    student is a member of and the events the student bought with discount
+    are each loaded with one query, so the number of queries does not grow
+    with the number of items.
+
+    Attributes
+    ----------
+    cart : Cart
+        The priced cart.
+    event_cart_items : list of EventCartItem
+        The event cart items in the cart.
+    memberships : list of Society
+        The society memberships in the cart.
+    lines : list of PricedEventCartItem
+        The prices and discounts of the event cart items.
+    discount_data : defaultdict(Decimal)
+        A dictionary mapping event cart item id to the amount of discount
+        applied, for the items that are discounted.
+    total_ticket_price_before_discount : Decimal
+        The total price of tickets in the cart before discount.
+    total_membership_price : Decimal
+        The total price of memberships in the cart.
+    total_saved : Decimal
+        The total discount applied to items in the cart.
+    total_price : Decimal
+        The total price of items in the cart that is due to pay.
+    ticket_count : int
+        The total number of tickets in the cart.
+    membership_count : int
+        The total number of memberships in the cart.
+    count : int
+        The total number of tickets and memberships in the cart.
+    """
+
+    def __init__(self, cart):
+        self.cart = cart
+        student = cart.student
+        self.event_cart_items = list(
+            cart.event_cart_item
+            .select_related('event__host')
+            .prefetch_related('event__society')
+            .order_by('id')
+        )
+        self.memberships = list(cart.membership.select_related('university'))
+        member_society_ids = student.relationships.member_society_ids
+        discounted_event_ids = student.relationships.discounted_event_ids
+        discount_society_ids = member_society_ids | {
+            membership.id for membership in self.memberships
+        }
+
+        self.lines = []
+        self.discount_data = defaultdict(Decimal)
+        for item in self.event_cart_items:
+            discount_rate = self._get_discount_rate(item, discount_society_ids)
+            discount = item.get_discount_amount(discount_rate)
+            if discount != 0.0 and item.event_id not in discounted_event_ids:
+                self.discount_data[item.id] += discount
+            self.lines.append(
+                PricedEventCartItem(item, self.discount_data.get(item.id, 0))
+            )
+
+        self.total_ticket_price_before_discount = sum(
+            (line.total for line in self.lines),
+            Decimal('0.00')
+        )
+        self.total_membership_price = sum(
+            (membership.member_fee for membership in self.memberships),
+            Decimal('0.00')
+        )
+        self.total_saved = sum(self.discount_data.values(), Decimal('0.00'))
+        self.total_price = (
+            self.total_ticket_price_before_discount +
+            self.total_membership_price -
+            self.total_saved
+        )
+        self.ticket_count = sum(
+            item.early_bird_quantity + item.standard_quantity
+            for item in self.event_cart_items
+        )
+        self.membership_count = len(self.memberships)
+        self.count = self.ticket_count + self.membership_count
+
+    @property
+    def all_items_free(self):
+        """
+        Check if all items in the cart are free.
+
+        Returns
+        -------
+        bool
+            True if all items in the cart are free, False otherwise.
+        """
+
+        return not self.total_price and self.count
+
+    def _get_discount_rate(self, event_cart_item, discount_society_ids):
+        """
+        Get the highest discount rate of the organiser societies of the event
+        that the student is or will be a member of.
+
+        Parameters
+        ----------
+        event_cart_item : EventCartItem
+            The event cart item to get the discount rate for.
+        discount_society_ids : set of int
+            The ids of the societies whose member discount applies.
+
+        Returns
+        -------
+        Decimal
+            The highest applicable discount rate for the event cart item.
+        """
+
+        discount_rate = Decimal('0.00')
+        for society in event_cart_item.event.society.all():
+            if society.id in discount_society_ids:
+                discount_rate = max(discount_rate, society.member_discount)
+        return discount_rate / 100
@@ -0,0 +1,175 @@
+"""
+Query budgets of the views.
+
+A view that runs one query per object it shows, such as one query for the
+societies of every event of a cart, gets slower as the data grows while
+looking fine on a small database. The recorder counts the queries run on a
+database connection, times them and groups them by fingerprint, the SQL with
+its parameters and literals replaced by placeholders, so that a query run
+once per object shows up as one fingerprint repeated many times.
+
+The budgets are the maximum numbers of queries of each view, keyed by URL
+name, in the JSON file of the QUERY_BUDGETS_FILE setting. They are enforced
+by the tests in tsp.tests.views.test_query_budgets and, in development,
+logged by QueryBudgetMiddleware.
+
+Classes
+-------
+QueryRecorder
+    Record the queries run on a database connection.
+
+Functions
+---------
+fingerprint : function
+    Get the fingerprint of an SQL query.
+load_query_budgets : function
+    Load the query budgets of the views.
+"""
+
+import json
+import re
+import time
+from collections import Counter
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def fingerprint(sql):
+    """
+    Get the fingerprint of an SQL query, which is the same for every run of
+    the query whatever its parameters.
+
+    Parameters
+    ----------
+    sql : str
+        The SQL of the query.
+
+    Returns
+    -------
+    str
+        The SQL with its parameters and literals replaced by '?' and its
+        lists of parameters collapsed into '(...)'.
+    """
+
+    sql = sql.replace('%s', '?')
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+def load_query_budgets(path=None):
+    """
+    Load the query budgets of the views.
+
+    Parameters
+    ----------
+    path : str, optional
+        The path to the JSON file of the budgets. Defaults to the
+        QUERY_BUDGETS_FILE setting.
+
+    Returns
+    -------
+    dict
+        The maximum number of queries of each view, keyed by URL name.
+    """
+
+    with open(path or settings.QUERY_BUDGETS_FILE) as budgets_file:
+        return json.load(budgets_file)
+
+class QueryRecorder:
+    """
+    Record the queries run on a database connection while it is used as a
+    context manager.
+
+    Attributes
+    ----------
+    using : str
+        The alias of the database connection.
+    queries : list of tuple
+        The SQL and the duration in seconds of each query run.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.queries = []
+        self._wrapper = None
+
+    def __enter__(self):
+        self._wrapper = connections[self.using].execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def count(self):
+        """
+        Get the number of queries run.
+
+        Returns
+        -------
+        int
+            The number of queries.
+        """
+
+        return len(self.queries)
+
+    @property
+    def duration_ms(self):
+        """
+        Get the total time spent in the database.
+
+        Returns
+        -------
+        float
+            The total duration of the queries in milliseconds.
+        """
+
+        return sum(duration for _, duration in self.queries) * 1000
+
+    @property
+    def duplicates(self):
+        """
+        Get the fingerprints of the queries run more than once, which are
+        usually queries run once per object of a list.
+
+        Returns
+        -------
+        dict
+            The number of runs of each repeated fingerprint, most repeated
+            first.
+        """
+
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return {
+            sql: count for sql, count in counts.most_common() if count > 1
+        }
+
+    def summary(self):
+        """
+        Describe the recorded queries for logs and test failures.
+
+        Returns
+        -------
+        str
+            The number of queries, their total duration and the repeated
+            fingerprints.
+        """
+
+        lines = [f'{self.count} queries in {self.duration_ms:.1f} ms']
+        for sql, count in self.duplicates.items():
+            lines.append(f'  {count}x {sql}')
+        return '\n'.join(lines)
@@ -0,0 +1,338 @@
+"""
+Request-scoped snapshot of the relationships of a student with societies
+and events.
+
+Checking whether a student follows a society or has saved an event with
+`student in society.followers` or `event in student.saved_event.all()`
+costs a query, and loads the whole list, every time it is asked. The
+snapshot loads the ids of the related societies and events of a student
+once, with one values_list query per relationship when it is first needed,
+and answers every later check with a set lookup.
+
+The snapshots are kept for the duration of a relationship scope, which
+StudentRelationshipsMiddleware opens for every request. The signal
+handlers in tsp.signals discard the snapshot of a student when one of its
+relationships changes. Outside of a scope, such as in jobs and management
+commands, a new snapshot is loaded every time one is asked for.
+
+Classes
+-------
+StudentRelationships
+    The ids of the societies and events a student is related to.
+
+Functions
+---------
+relationship_scope : function
+    Keep the snapshots loaded in a block of code.
+get_relationships : function
+    Get the snapshot of a student.
+forget_relationships : function
+    Discard the snapshots of students.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.utils.functional import cached_property
+
+_snapshots = ContextVar('student_relationships', default=None)
+
+@contextmanager
+def relationship_scope():
+    """
+    Keep the snapshots of the relationships of students loaded until the end
+    of the block.
+    """
+
+    token = _snapshots.set({})
+    try:
+        yield
+    finally:
+        _snapshots.reset(token)
+
+def get_relationships(student):
+    """
+    Get the snapshot of the relationships of a student, loading it once per
+    relationship scope.
+
+    Parameters
+    ----------
+    student : Student
+        The student to get the relationships of.
+
+    Returns
+    -------
+    StudentRelationships
+        The relationships of the student.
+    """
+
+    snapshots = _snapshots.get()
+    if snapshots is None:
+        return StudentRelationships(student)
+    if student.pk not in snapshots:
+        snapshots[student.pk] = StudentRelationships(student)
+    return snapshots[student.pk]
+
+def forget_relationships(student_ids=None):
+    """
+    Discard the snapshots of the given students in the current relationship
+    scope, so that they are loaded again the next time they are used.
+
+    Parameters
+    ----------
+    student_ids : iterable of int, optional
+        The ids of the students. Defaults to all students.
+    """
+
+    snapshots = _snapshots.get()
+    if snapshots is None:
+        return
+    if student_ids is None:
+        snapshots.clear()
+        return
+    for student_id in student_ids:
+        snapshots.pop(student_id, None)
+
+class StudentRelationships:
+    """
+    The ids of the societies and events a student is related to. Each set is
+    loaded with one query the first time it is used.
+
+    Attributes
+    ----------
+    student : Student
+        The student the relationships belong to.
+    """
+
+    def __init__(self, student):
+        self.student = student
+
+    @cached_property
+    def followed_society_ids(self):
+        """
+        Get the ids of the societies the student follows.
+
+        Returns
+        -------
+        frozenset of int
+            The ids of the followed societies.
+        """
+
+        return frozenset(self.student.follower.values_list('id', flat=True))
+
+    @cached_property
+    def subscribed_society_ids(self):
+        """
+        Get the ids of the societies whose emailing list the student is on.
+
+        Returns
+        -------
+        frozenset of int
+            The ids of the subscribed societies.
+        """
+
+        return frozenset(self.student.subscriber.values_list('id', flat=True))
+
+    @cached_property
+    def member_society_ids(self):
+        """
+        Get the ids of the societies the student is a regular member of.
+
+        Returns
+        -------
+        frozenset of int
+            The ids of the societies of the regular memberships.
+        """
+
+        return frozenset(self.student.regular_member.values_list('id', flat=True))
+
+    @cached_property
+    def committee_society_ids(self):
+        """
+        Get the ids of the societies the student is a committee member of.
+
+        Returns
+        -------
+        frozenset of int
+            The ids of the societies of the committee memberships.
+        """
+
+        return frozenset(
+            self.student.committee_members.values_list('id', flat=True)
+        )
+
+    @cached_property
+    def saved_event_ids(self):
+        """
+        Get the ids of the events the student has saved.
+
+        Returns
+        -------
+        frozenset of int
+            The ids of the saved events.
+        """
+
+        return frozenset(self.student.saved_event.values_list('id', flat=True))
+
+    @cached_property
+    def purchased_event_ids(self):
+        """
+        Get the ids of the events the student has purchased.
+
+        Returns
+        -------
+        frozenset of int
+            The ids of the purchased events.
+        """
+
+        return frozenset(self.student.purchased_event.values_list('id', flat=True))
+
+    @cached_property
+    def discounted_event_ids(self):
+        """
+        Get the ids of the events the student has purchased with discount.
+
+        Returns
+        -------
+        frozenset of int
+            The ids of the discounted events.
+        """
+
+        return frozenset(self.student.discounted_event.values_list('id', flat=True))
+
+    def follows(self, society):
+        """
+        Check if the student follows the given society.
+
+        Parameters
+        ----------
+        society : Society
+            The society to check.
+
+        Returns
+        -------
+        bool
+            True if the student follows the society, False otherwise.
+        """
+
+        return society.id in self.followed_society_ids
+
+    def is_subscribed(self, society):
+        """
+        Check if the student is on the emailing list of the given society.
+
+        Parameters
+        ----------
+        society : Society
+            The society to check.
+
+        Returns
+        -------
+        bool
+            True if the student is subscribed, False otherwise.
+        """
+
+        return society.id in self.subscribed_society_ids
+
+    def is_regular_member(self, society):
+        """
+        Check if the student is a regular member of the given society.
+
+        Parameters
+        ----------
+        society : Society
+            The society to check.
+
+        Returns
+        -------
+        bool
+            True if the student is a regular member, False otherwise.
+        """
+
+        return society.id in self.member_society_ids
+
+    def is_committee_member(self, society):
+        """
+        Check if the student is a committee member of the given society.
+
+        Parameters
+        ----------
+        society : Society
+            The society to check.
+
+        Returns
+        -------
+        bool
+            True if the student is a committee member, False otherwise.
+        """
+
+        return society.id in self.committee_society_ids
+
+    def is_member(self, society):
+        """
+        Check if the student is a regular or committee member of the given
+        society.
+
+        Parameters
+        ----------
+        society : Society
+            The society to check.
+
+        Returns
+        -------
+        bool
+            True if the student is a member, False otherwise.
+        """
+
+        return self.is_committee_member(society) or self.is_regular_member(society)
+
+    def has_saved(self, event):
+        """
+        Check if the student has saved the given event.
+
+        Parameters
+        ----------
+        event : Event
+            The event to check.
+
+        Returns
+        -------
+        bool
+            True if the event has been saved, False otherwise.
+        """
+
+        return event.id in self.saved_event_ids
+
+    def has_purchased(self, event):
+        """
+        Check if the student has purchased the given event.
+
+        Parameters
+        ----------
+        event : Event
+            The event to check.
+
+        Returns
+        -------
+        bool
+            True if the event has been purchased, False otherwise.
+        """
+
+        return event.id in self.purchased_event_ids
+
+    def has_discount(self, event):
+        """
+        Check if the student has purchased the given event with discount.
+
+        Parameters
+        ----------
+        event : Event
+            The event to check.
+
+        Returns
+        -------
+        bool
+            True if the event has been purchased with discount, False
+            otherwise.
+        """
+
+        return event.id in self.discounted_event_ids
@@ -0,0 +1,339 @@
+"""
+Full-text search over events.
+
+On SQLite the events are indexed in an FTS5 table holding the name,
+description and location of each event, the names of its organising
+societies and tokens for the universities of those societies. A search is
+answered from the index alone, so its cost depends on the number of matches
+rather than the number of events, and the university scope needs no join
+through the societies of the events. Other database backends fall back to
+case-insensitive substring filters on the event table.
+
+The index is kept in sync by the signal handlers in tsp.signals. Events
+created without signals, such as with bulk_create, are indexed with the
+rebuild_search_index command.
+
+Functions
+---------
+fts5_available : function
+    Check if the SQLite library supports FTS5.
+uses_fts5 : function
+    Check if events are searched with the FTS5 index.
+create_search_index : function
+    Create and fill the FTS5 index of events.
+drop_search_index : function
+    Drop the FTS5 index of events.
+index_events : function
+    Add or refresh events in the index.
+remove_events : function
+    Remove events from the index.
+rebuild_search_index : function
+    Index all events again.
+search_events : function
+    Filter events by a search query and a university.
+"""
+
+import re
+import sqlite3
+from functools import lru_cache
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'tsp_event_search'
+
+# Matches in the name count the most, the university tokens never count
+RANK_WEIGHTS = 'bm25(10.0, 1.0, 2.0, 5.0, 0.0)'
+
+BATCH_SIZE = 500
+
+INDEX_EVENTS_SQL = f"""
+    INSERT INTO {SEARCH_TABLE} (
+        rowid, name, description, location, societies, universities
+    )
+    SELECT
+        e.id,
+        e.name,
+        COALESCE(e.description, ''),
+        e.location,
+        COALESCE((
+            SELECT group_concat(s.name, ' ')
+            FROM tsp_event_society es
+            JOIN tsp_society s ON s.user_ptr_id = es.society_id
+            WHERE es.event_id = e.id
+        ), ''),
+        COALESCE((
+            SELECT group_concat(DISTINCT 'u' || u.university_id)
+            FROM tsp_event_society es
+            JOIN tsp_user u ON u.id = es.society_id
+            WHERE es.event_id = e.id AND u.university_id IS NOT NULL
+        ), '')
+    FROM tsp_event e
+"""
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    """
+    Check if the SQLite library supports FTS5.
+
+    Returns
+    -------
+    bool
+        True if an FTS5 table can be created, False otherwise.
+    """
+
+    try:
+        sqlite3.connect(':memory:').execute(
+            'CREATE VIRTUAL TABLE fts5_check USING fts5(content)'
+        )
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+def uses_fts5(db_connection=connection):
+    """
+    Check if events are searched with the FTS5 index.
+
+    Parameters
+    ----------
+    db_connection : BaseDatabaseWrapper, optional
+        The database connection. Defaults to the default connection.
+
+    Returns
+    -------
+    bool
+        True on SQLite with FTS5 support, False otherwise.
+    """
+
+    return db_connection.vendor == 'sqlite' and fts5_available()
+
+def create_search_index(db_connection=connection):
+    """
+    Create the FTS5 index of events and index all events. Nothing is done
+    when the database does not support FTS5.
+
+    Parameters
+    ----------
+    db_connection : BaseDatabaseWrapper, optional
+        The database connection. Defaults to the default connection.
+    """
+
+    if not uses_fts5(db_connection):
+        return
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "name, description, location, societies, universities, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) VALUES ('rank', %s)",
+            [RANK_WEIGHTS]
+        )
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(INDEX_EVENTS_SQL)
+
+def drop_search_index(db_connection=connection):
+    """
+    Drop the FTS5 index of events.
+
+    Parameters
+    ----------
+    db_connection : BaseDatabaseWrapper, optional
+        The database connection. Defaults to the default connection.
+    """
+
+    if not uses_fts5(db_connection):
+        return
+    with db_connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+def index_events(event_ids):
+    """
+    Add or refresh the given events in the index, with the current names and
+    universities of their societies.
+
+    Parameters
+    ----------
+    event_ids : iterable of int
+        The ids of the events to index.
+    """
+
+    if not uses_fts5():
+        return
+    event_ids = list(event_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(event_ids), BATCH_SIZE):
+            batch = event_ids[start:start + BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+                batch
+            )
+            cursor.execute(
+                f'{INDEX_EVENTS_SQL} WHERE e.id IN ({placeholders})',
+                batch
+            )
+
+def remove_events(event_ids):
+    """
+    Remove the given events from the index.
+
+    Parameters
+    ----------
+    event_ids : iterable of int
+        The ids of the events to remove.
+    """
+
+    if not uses_fts5():
+        return
+    event_ids = list(event_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(event_ids), BATCH_SIZE):
+            batch = event_ids[start:start + BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+                batch
+            )
+
+def rebuild_search_index():
+    """
+    Index all events again.
+
+    Returns
+    -------
+    int
+        The number of events indexed, or 0 if the database does not
+        support FTS5.
+    """
+
+    if not uses_fts5():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(INDEX_EVENTS_SQL)
+        return cursor.rowcount
+
+def search_events(query, university=None, queryset=None, ranked=True):
+    """
+    Filter events by a search query over their name, description, location
+    and organising societies, and by the university of their societies.
+    Every word of the query has to match the start of a word of the event.
+
+    Parameters
+    ----------
+    query : str
+        The search query. An empty query matches all events.
+    university : University, optional
+        The university the societies of the events belong to.
+    queryset : QuerySet, optional
+        The events to filter. Defaults to all events.
+    ranked : bool, optional
+        Whether to order the events by relevance, most relevant first.
+
+    Returns
+    -------
+    QuerySet
+        The matching events.
+    """
+
+    from tsp.models import Event
+
+    events = Event.objects.all() if queryset is None else queryset
+    terms = re.findall(r'\w+', query or '')
+    if query and not terms:
+        return events.none()
+    if not terms and university is None:
+        return events
+    if uses_fts5():
+        return _search_index(events, terms, university, ranked)
+    return _search_fallback(events, query, terms, university, ranked)
+
+def _search_index(events, terms, university, ranked):
+    """
+    Filter events with the FTS5 index.
+
+    Parameters
+    ----------
+    events : QuerySet
+        The events to filter.
+    terms : list of str
+        The words of the search query.
+    university : University or None
+        The university the societies of the events belong to.
+    ranked : bool
+        Whether to order the events by relevance.
+
+    Returns
+    -------
+    QuerySet
+        The matching events.
+    """
+
+    expressions = []
+    if university is not None:
+        expressions.append(f'universities : u{university.pk}')
+    if terms:
+        phrases = ' '.join('"' + term + '"*' for term in terms)
+        expressions.append(f'{{name description location societies}} : ({phrases})')
+    match = ' AND '.join(expressions)
+    if ranked and terms:
+        # Join the index once, a rank subquery per event would repeat the 
+        # full-text query for every match
+        return events.extra(
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.rowid = tsp_event.id', 
+                f'{SEARCH_TABLE} MATCH %s'
+            ],
+            params=[match],
+            select={'search_rank': f'{SEARCH_TABLE}.rank'},
+            order_by=['search_rank', 'id']
+        )
+    return events.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        (match,)
+    ))
+
+def _search_fallback(events, query, terms, university, ranked):
+    """
+    Filter events with substring filters on backends without FTS5.
+
+    Parameters
+    ----------
+    events : QuerySet
+        The events to filter.
+    query : str
+        The search query.
+    terms : list of str
+        The words of the search query.
+    university : University or None
+        The university the societies of the events belong to.
+    ranked : bool
+        Whether to order the events by relevance.
+
+    Returns
+    -------
+    QuerySet
+        The matching events.
+    """
+
+    for term in terms:
+        events = events.filter(
+            Q(name__icontains=term) |
+            Q(description__icontains=term) |
+            Q(location__icontains=term) |
+            Q(society__name__icontains=term)
+        )
+    if university is not None:
+        events = events.filter(society__university=university)
+    events = events.distinct()
+    if ranked and terms:
+        # Events with the whole query in their name come first
+        events = events.annotate(search_rank=Case(
+            When(name__icontains=query.strip(), then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField()
+        )).order_by('search_rank', 'id')
+    return events
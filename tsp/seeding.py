@@ -0,0 +1,759 @@
+"""
+Seeding of the database with generated data.
+
+The data is generated from a random number generator seeded with a fixed
+value, so the same volumes and seed always produce the same accounts,
+relationships and orders, and is written with bulk inserts in one
+transaction. Every account shares one password hash, and societies get
+fake Stripe account ids, so seeding makes no network calls and scales to
+production volumes, such as 50k students, 2k societies, 100k events and 1M
+tickets.
+
+The signal handlers that keep the derived data up to date are not run by
+bulk inserts. The ticket sold counters of the events, the "For You" feeds and
+the search index are filled once at the end instead.
+
+Classes
+-------
+Seeder
+    Fill the database with generated universities, accounts, events and
+    orders.
+
+Functions
+---------
+load_universities : function
+    Load the universities and their email domains.
+insert_rows : function
+    Insert rows of values into the table of a model.
+bulk_create_inherited : function
+    Insert objects of a model with multi-table inheritance.
+"""
+
+import json
+import os
+import random
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from faker import Faker
+from tsp.models import (
+    BaseCart, Cart, Domain, Event, EventCartItem, FeedEntry, HistoricalCart,
+    Order, OrderLine, Payment, Society, Student, StudentUnion, Ticket,
+    University, User
+)
+from tsp.search import rebuild_search_index
+
+DOMAINS_FILE = os.path.join(os.path.dirname(__file__), 'data', 'domains.xlsx')
+
+# Seeded first, in this order, whatever the number of universities
+DEFAULT_UNIVERSITIES = ['KCL', 'LSE', 'QMU', 'UCL']
+
+PASSWORD = 'Password123'
+
+BATCH_SIZE = 1000
+
+# Number of students, events or orders generated before they are inserted
+CHUNK_SIZE = 10000
+
+# Number of generated names, sentences and addresses picked from at random
+POOL_SIZE = 1000
+
+def load_universities(path=DOMAINS_FILE):
+    """
+    Load the universities and their email domains, the default universities
+    first.
+
+    Parameters
+    ----------
+    path : str, optional
+        The path to the spreadsheet of the domains.
+
+    Returns
+    -------
+    list of tuple
+        The name, the abbreviated name and the email domains of each
+        university.
+    """
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    rows = workbook.active.iter_rows(min_row=2, values_only=True)
+    universities = {}
+    for name, domain, abbreviation in rows:
+        if name is None:
+            continue
+        universities.setdefault(name, (name, abbreviation, []))[2].append(domain)
+    workbook.close()
+    return sorted(
+        universities.values(),
+        key=lambda university: (
+            DEFAULT_UNIVERSITIES.index(university[1])
+            if university[1] in DEFAULT_UNIVERSITIES
+            else len(DEFAULT_UNIVERSITIES)
+        )
+    )
+
+def insert_rows(model, field_names, rows, batch_size=BATCH_SIZE):
+    """
+    Insert rows of values into the table of a model without building model 
+    objects, for the tables with the most rows. The values must be ready to
+    be stored, such as ids and strings.
+
+    Parameters
+    ----------
+    model : Model
+        The model of the table.
+    field_names : list of str
+        The attribute names of the fields of the values.
+    rows : iterable of sequence
+        The values of each row.
+    batch_size : int, optional
+        The number of rows inserted per query.
+    """
+
+    quote_name = connection.ops.quote_name
+    columns = [model._meta.get_field(name).column for name in field_names]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote_name(model._meta.db_table),
+        ', '.join(quote_name(column) for column in columns),
+        ', '.join(['%s'] * len(columns))
+    )
+    rows = list(rows)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+
+def bulk_create_inherited(model, objects, batch_size=BATCH_SIZE):
+    """
+    Insert objects of a model with multi-table inheritance, which bulk_create
+    does not support. The rows of the parent model are inserted with
+    bulk_create, then the rows of the model with the primary keys of their
+    parents.
+
+    Parameters
+    ----------
+    model : Model
+        The model, a child of a single concrete parent model.
+    objects : list of Model
+        The unsaved objects to insert.
+    batch_size : int, optional
+        The number of rows inserted per query.
+
+    Returns
+    -------
+    list of Model
+        The objects, with their primary keys set.
+    """
+
+    parent_link = model._meta.pk
+    parent_model = parent_link.remote_field.model
+    parent_fields = [
+        field for field in parent_model._meta.concrete_fields
+        if not field.primary_key
+    ]
+    parents = parent_model.objects.bulk_create(
+        [
+            parent_model(**{
+                field.attname: getattr(obj, field.attname)
+                for field in parent_fields
+            })
+            for obj in objects
+        ],
+        batch_size=batch_size
+    )
+    for obj, parent in zip(objects, parents):
+        setattr(obj, parent_model._meta.pk.attname, parent.pk)
+        setattr(obj, parent_link.attname, parent.pk)
+
+    fields = model._meta.local_concrete_fields
+    insert_rows(
+        model,
+        [field.attname for field in fields],
+        (
+            [
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+                for field in fields
+            ]
+            for obj in objects
+        ),
+        batch_size
+    )
+    return objects
+
+class Seeder:
+    """
+    Fill the database with generated universities, student unions, students,
+    societies with their followers, subscribers and members, events, and
+    orders with their tickets and payments.
+
+    Attributes
+    ----------
+    universities : int
+        The number of universities.
+    students : int
+        The number of students, spread over the universities.
+    societies : int
+        The number of societies, spread over the universities.
+    events : int
+        The number of events, spread over the societies.
+    tickets : int
+        The number of tickets sold. Fewer are sold if the events run out of
+        capacity.
+    follows : int
+        The average number of societies a student follows.
+    stripe_account_id : str or None
+        The Stripe account of every society, fake accounts if None.
+    """
+
+    def __init__(self, universities=4, students=80, societies=16, events=170,
+                 tickets=800, follows=3, seed=0, stripe_account_id=None,
+                 log=None):
+        self.universities = universities
+        self.students = students
+        self.societies = societies
+        self.events = events
+        self.tickets = tickets
+        self.follows = follows
+        self.stripe_account_id = stripe_account_id
+        self.random = random.Random(seed)
+        self.faker = Faker('en_GB')
+        self.faker.seed_instance(seed)
+        self.password = make_password(PASSWORD, salt=f'seed{seed}')
+        self.now = timezone.now()
+        self.log = log or (lambda message: None)
+
+    def run(self):
+        """
+        Generate and insert all the data.
+
+        Returns
+        -------
+        dict
+            The number of rows inserted by model name.
+        """
+
+        with transaction.atomic():
+            self._create_pools()
+            self._create_universities()
+            self._create_students()
+            self._create_societies()
+            self._create_relationships()
+            self._create_events()
+            self._create_orders()
+            self._fill_derived_data()
+        return {
+            model.__name__: model.objects.count()
+            for model in (
+                University, Student, Society, Event, Order, Ticket, FeedEntry
+            )
+        }
+
+    def _create_pools(self):
+        """Generate the names, sentences and addresses picked from."""
+
+        self.first_names = [self.faker.first_name() for _ in range(POOL_SIZE)]
+        self.last_names = [self.faker.last_name() for _ in range(POOL_SIZE)]
+        self.sentences = [self.faker.sentence() for _ in range(POOL_SIZE)]
+        self.event_names = [
+            self.faker.catch_phrase() for _ in range(POOL_SIZE)
+        ]
+        self.addresses = [
+            self.faker.address().split('\n') for _ in range(POOL_SIZE)
+        ]
+
+    def _create_universities(self):
+        """Create the universities, their domains and student unions."""
+
+        chosen = load_universities()[:self.universities]
+        universities = University.objects.bulk_create([
+            University(name=name, abbreviation=abbreviation)
+            for name, abbreviation, _ in chosen
+        ])
+        Domain.objects.bulk_create([
+            Domain(university=university, name=domain)
+            for university, (_, _, domains) in zip(universities, chosen)
+            for domain in domains
+        ])
+        # The email domain and abbreviated name of each university
+        self.university_domains = [
+            (university, domains[0], abbreviation)
+            for university, (_, abbreviation, domains) in zip(universities, chosen)
+        ]
+        self.student_unions = bulk_create_inherited(StudentUnion, [
+            StudentUnion(
+                email=f'{abbreviation.lower()}su@{domain}',
+                password=self.password,
+                name=f'{abbreviation}SU',
+                university=university,
+                role=User.Role.STUDENT_UNION,
+                is_superuser=True
+            )
+            for university, domain, abbreviation in self.university_domains
+        ])
+        self.log(f'Created {len(universities)} universities')
+
+    def _create_students(self):
+        """
+        Create the students, spread over the universities, and their carts.
+        The first student of the first university is the default student.
+        """
+
+        self.student_ids_by_university = defaultdict(list)
+        self.student_university = {}
+        for start in range(0, self.students, CHUNK_SIZE):
+            students = []
+            indexes = []
+            for i in range(start, min(start + CHUNK_SIZE, self.students)):
+                index = i % len(self.university_domains)
+                university, domain, _ = self.university_domains[index]
+                students.append(Student(
+                    email=f'student.{i}@{domain}',
+                    password=self.password,
+                    first_name=self.random.choice(self.first_names),
+                    last_name=self.random.choice(self.last_names),
+                    university=university,
+                    role=User.Role.STUDENT
+                ))
+                indexes.append(index)
+            if start == 0:
+                students[0].email = 'joe.doe@kcl.ac.uk'
+                students[0].first_name = 'Joe'
+                students[0].last_name = 'Doe'
+            bulk_create_inherited(Student, students)
+            bulk_create_inherited(Cart, [Cart(student=student) for student in students])
+            for student, index in zip(students, indexes):
+                self.student_ids_by_university[index].append(student.id)
+                self.student_university[student.id] = index
+        self.student_ids = list(self.student_university)
+        self.log(f'Created {self.students} students')
+
+    def _create_societies(self):
+        """
+        Create the societies, spread over the universities. The first society
+        of the first university is the default society.
+        """
+
+        societies = []
+        indexes = []
+        for i in range(self.societies):
+            index = i % len(self.university_domains)
+            university, domain, abbreviation = self.university_domains[index]
+            societies.append(Society(
+                email=f'society.{i}@{domain}',
+                password=self.password,
+                student_union=self.student_unions[index],
+                name=f'{abbreviation} society.{i}',
+                member_discount=Decimal(self.random.randint(500, 1000)) / 100,
+                member_fee=Decimal(self.random.randint(500, 1000)) / 100,
+                university=university,
+                role=User.Role.SOCIETY,
+                account_number='00012345',
+                sort_code='040004',
+                account_name=f'{abbreviation} society.{i}',
+                stripe_account_id=(
+                    self.stripe_account_id or f'acct_fake{i:011d}'
+                )
+            ))
+            indexes.append(index)
+        if societies:
+            societies[0].email = 'robotics@kcl.ac.uk'
+            societies[0].name = 'Robotics'
+            societies[0].account_name = 'Robotics'
+        bulk_create_inherited(Society, societies)
+        self.society_ids_by_university = defaultdict(list)
+        self.member_discount = {}
+        for society, index in zip(societies, indexes):
+            self.society_ids_by_university[index].append(society.id)
+            self.member_discount[society.id] = society.member_discount
+        self.log(f'Created {len(societies)} societies')
+
+    def _create_relationships(self):
+        """
+        Make each student follow random societies of their university,
+        subscribe to and become a regular member of some of them, and give
+        each society committee members.
+        """
+
+        self.member_society_ids = defaultdict(set)
+        follower = Society.follower.through
+        subscriber = Society.subscriber.through
+        regular_member = Society.regular_member.through
+        committee_member = Society.committee_member.through
+        for index, student_ids in self.student_ids_by_university.items():
+            society_ids = self.society_ids_by_university[index]
+            for start in range(0, len(student_ids), CHUNK_SIZE):
+                follows, subscriptions, memberships = [], [], []
+                for student_id in student_ids[start:start + CHUNK_SIZE]:
+                    count = min(
+                        len(society_ids),
+                        self.random.randint(0, 2 * self.follows)
+                    )
+                    for society_id in self.random.sample(society_ids, count):
+                        follows.append((society_id, student_id))
+                        if self.random.random() < 0.5:
+                            subscriptions.append((society_id, student_id))
+                        if self.random.random() < 0.3:
+                            memberships.append((society_id, student_id))
+                            self.member_society_ids[student_id].add(society_id)
+                insert_rows(follower, ['society_id', 'student_id'], follows)
+                insert_rows(subscriber, ['society_id', 'student_id'], subscriptions)
+                insert_rows(regular_member, ['society_id', 'student_id'], memberships)
+
+            committee = []
+            for society_id in society_ids:
+                candidates = [
+                    student_id for student_id in self.random.sample(
+                        student_ids, min(len(student_ids), 7)
+                    )
+                    if society_id not in self.member_society_ids[student_id]
+                ]
+                for student_id in candidates[:self.random.randint(3, 7)]:
+                    committee.append((society_id, student_id))
+                    self.member_society_ids[student_id].add(society_id)
+            insert_rows(committee_member, ['society_id', 'student_id'], committee)
+        self.log('Created followers, subscribers and members')
+
+    def _create_events(self):
+        """
+        Create the events, hosted by random societies and sometimes organised
+        together with other societies of the same university, and save some
+        upcoming events for the students.
+        """
+
+        society_ids = [
+            (index, society_id)
+            for index, ids in self.society_ids_by_university.items()
+            for society_id in ids
+        ]
+        # The details of each event needed to sell its tickets
+        self.event_ids_by_university = defaultdict(list)
+        self.event_details = {}
+        organisers = Event.society.through
+        for start in range(0, self.events if society_ids else 0, CHUNK_SIZE):
+            events = []
+            event_societies = []
+            for i in range(start, min(start + CHUNK_SIZE, self.events)):
+                index, host_id = self.random.choice(society_ids)
+                start_time = self.now + timedelta(
+                    minutes=self.random.randint(-365 * 24 * 60, 120 * 24 * 60)
+                )
+                early_booking_capacity = self.random.randint(0, 30)
+                cancelled = self.random.random() < 0.1
+                events.append(Event(
+                    host_id=host_id,
+                    name=self.random.choice(self.event_names),
+                    description=self.random.choice(self.sentences),
+                    location=', '.join(self.random.choice(self.addresses)),
+                    start_time=start_time,
+                    end_time=start_time + timedelta(hours=self.random.randint(2, 8)),
+                    early_booking_capacity=early_booking_capacity,
+                    standard_booking_capacity=self.random.randint(
+                        early_booking_capacity, early_booking_capacity + 20
+                    ),
+                    early_bird_price=Decimal(self.random.randint(100, 400)) / 100,
+                    standard_price=Decimal(self.random.randint(500, 1000)) / 100,
+                    status=Event.Status.CANCELLED if cancelled else Event.Status.ACTIVE
+                ))
+                organiser_ids = {host_id}
+                if self.random.random() < 0.1:
+                    others = self.society_ids_by_university[index]
+                    organiser_ids.update(self.random.sample(
+                        others, min(len(others), self.random.randint(1, 4))
+                    ))
+                event_societies.append((index, tuple(organiser_ids)))
+            Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+            insert_rows(organisers, ['event_id', 'society_id'], (
+                (event.id, society_id)
+                for event, (_, organiser_ids) in zip(events, event_societies)
+                for society_id in organiser_ids
+            ))
+            for event, (index, organiser_ids) in zip(events, event_societies):
+                self.event_details[event.id] = [
+                    event.start_time,
+                    event.early_booking_capacity,
+                    event.standard_booking_capacity,
+                    event.early_bird_price,
+                    event.standard_price,
+                    organiser_ids,
+                    event.name,
+                    event.location,
+                    event.end_time
+                ]
+                if event.status == Event.Status.ACTIVE:
+                    self.event_ids_by_university[index].append(event.id)
+        self._save_events()
+        self.log(f'Created {self.events} events')
+
+    def _save_events(self):
+        """Save up to three upcoming events of their university per student."""
+
+        upcoming_ids_by_university = {
+            index: [
+                event_id for event_id in event_ids
+                if self.event_details[event_id][0] > self.now
+            ]
+            for index, event_ids in self.event_ids_by_university.items()
+        }
+        saved = []
+        for student_id, index in self.student_university.items():
+            event_ids = upcoming_ids_by_university.get(index, [])
+            count = min(len(event_ids), self.random.randint(0, 3))
+            for event_id in self.random.sample(event_ids, count):
+                saved.append((student_id, event_id))
+        insert_rows(Student.saved_event.through, ['student_id', 'event_id'], saved)
+
+    def _create_orders(self):
+        """
+        Sell the tickets in orders of one to three events of the university
+        of the student, until the number of tickets is reached or the events
+        run out of capacity.
+        """
+
+        self.sold = defaultdict(lambda: [0, 0])
+        self.purchased, self.discounted = set(), set()
+        tickets_left = self.tickets
+        failures = 0
+        orders = []
+        while self.student_ids and tickets_left > 0 and failures < 100:
+            order = self._generate_order(tickets_left)
+            if order is None:
+                failures += 1
+                continue
+            failures = 0
+            orders.append(order)
+            tickets_left -= sum(early + standard for _, early, standard in order[2])
+            if len(orders) >= CHUNK_SIZE:
+                self._insert_orders(orders)
+                orders = []
+        self._insert_orders(orders)
+        self.log(f'Sold {self.tickets - tickets_left} tickets')
+
+    def _generate_order(self, tickets_left):
+        """
+        Generate an order of a random student.
+
+        Parameters
+        ----------
+        tickets_left : int
+            The number of tickets left to sell.
+
+        Returns
+        -------
+        tuple or None
+            The student id, the creation time and the (event id, early bird
+            quantity, standard quantity) items of the order, or None if no
+            ticket could be sold to the student.
+        """
+
+        student_id = self.random.choice(self.student_ids)
+        event_ids = self.event_ids_by_university.get(
+            self.student_university[student_id], []
+        )
+        items = []
+        count = min(len(event_ids), self.random.randint(1, 3))
+        for event_id in self.random.sample(event_ids, count):
+            details = self.event_details[event_id]
+            sold = self.sold[event_id]
+            early = min(self.random.randint(1, 3), details[1] - sold[0], tickets_left)
+            standard = 0
+            if early <= 0:
+                early = 0
+                standard = min(
+                    self.random.randint(1, 3), details[2] - sold[1], tickets_left
+                )
+            if early > 0 or standard > 0:
+                sold[0] += early
+                sold[1] += standard
+                tickets_left -= early + standard
+                items.append((event_id, early, max(standard, 0)))
+        if not items:
+            return None
+        first_start = min(self.event_details[event_id][0] for event_id, _, _ in items)
+        create_at = min(first_start, self.now) - timedelta(
+            minutes=self.random.randint(60, 60 * 24 * 60)
+        )
+        return student_id, create_at, items
+
+    def _insert_orders(self, generated_orders):
+        """
+        Insert generated orders with their historical carts, event cart
+        items, tickets and payments, and record the purchased events of the
+        students.
+
+        Parameters
+        ----------
+        generated_orders : list of tuple
+            The orders generated by _generate_order.
+        """
+
+        if not generated_orders:
+            return
+        orders = []
+        for student_id, create_at, _ in generated_orders:
+            line_1, *lines = self.random.choice(self.addresses)
+            orders.append(Order(
+                student_id=student_id,
+                customer_id=f'fakecus_{self.random.getrandbits(64):016x}',
+                create_at=create_at,
+                line_1=line_1,
+                line_2=lines[0] if len(lines) > 2 else None,
+                city_town=lines[-2] if len(lines) > 1 else line_1,
+                postcode=lines[-1][:10] if lines else '',
+            ))
+        Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+
+        event_cart_items = EventCartItem.objects.bulk_create(
+            [
+                EventCartItem(
+                    event_id=event_id,
+                    early_bird_quantity=early,
+                    standard_quantity=standard
+                )
+                for _, _, items in generated_orders
+                for event_id, early, standard in items
+            ],
+            batch_size=BATCH_SIZE
+        )
+        items_by_order = []
+        position = 0
+        for _, _, items in generated_orders:
+            items_by_order.append(event_cart_items[position:position + len(items)])
+            position += len(items)
+
+        historical_carts, payments, order_lines = [], [], []
+        purchased, discounted = set(), set()
+        for order, order_items in zip(orders, items_by_order):
+            members_of = self.member_society_ids.get(order.student_id, set())
+            total_price = Decimal('0.00')
+            total_saved = Decimal('0.00')
+            discount_data = {}
+            for item in order_items:
+                details = self.event_details[item.event_id]
+                price = (details[3] * item.early_bird_quantity
+                         + details[4] * item.standard_quantity)
+                rate = max(
+                    [self.member_discount[society_id]
+                     for society_id in details[5] if society_id in members_of],
+                    default=Decimal('0')
+                ) / 100
+                discount = (price * rate).quantize(Decimal('0.01'))
+                total_price += price - discount
+                total_saved += discount
+                purchased.add((order.student_id, item.event_id))
+                if discount:
+                    discount_data[str(item.id)] = str(discount)
+                    discounted.add((order.student_id, item.event_id))
+                discounted_type = (
+                    'standard' if item.standard_quantity else 'early_bird'
+                )
+                for ticket_type, quantity, unit_price in (
+                    ('early_bird', item.early_bird_quantity, details[3]),
+                    ('standard', item.standard_quantity, details[4])
+                ):
+                    if quantity:
+                        order_lines.append(OrderLine(
+                            order=order,
+                            type=ticket_type,
+                            event_id=item.event_id,
+                            name=details[6],
+                            location=details[7],
+                            start_time=details[0],
+                            end_time=details[8],
+                            unit_price=unit_price,
+                            quantity=quantity,
+                            discount=(
+                                discount if ticket_type == discounted_type else 0
+                            )
+                        ))
+            historical_carts.append(HistoricalCart(
+                student_id=order.student_id,
+                order=order,
+                total_price=total_price,
+                total_saved=total_saved,
+                count=sum(
+                    item.early_bird_quantity + item.standard_quantity
+                    for item in order_items
+                ),
+                discount_data=json.dumps(discount_data)
+            ))
+            if total_price > 0:
+                payments.append(Payment(
+                    student_id=order.student_id,
+                    order=order,
+                    amount=total_price,
+                    last4=f'{self.random.randint(0, 9999):04d}',
+                    brand=self.random.choice(['visa', 'mastercard', 'amex'])
+                ))
+        bulk_create_inherited(HistoricalCart, historical_carts)
+        insert_rows(
+            BaseCart.event_cart_item.through,
+            ['basecart_id', 'eventcartitem_id'],
+            (
+                (cart.id, item.id)
+                for cart, order_items in zip(historical_carts, items_by_order)
+                for item in order_items
+            )
+        )
+        OrderLine.objects.bulk_create(order_lines, batch_size=BATCH_SIZE)
+        insert_rows(
+            Ticket,
+            ['event_id', 'order_id', 'type', 'order_line_id'],
+            (
+                (line.event_id, line.order_id, line.type, line.id)
+                for line in order_lines
+                for _ in range(line.quantity)
+            )
+        )
+        Payment.objects.bulk_create(payments, batch_size=BATCH_SIZE)
+        # A student can order an event more than once, across chunks too
+        for through, pairs, inserted in (
+            (Student.purchased_event.through, purchased, self.purchased),
+            (Student.discounted_event.through, discounted, self.discounted)
+        ):
+            insert_rows(through, ['student_id', 'event_id'], pairs - inserted)
+            inserted |= pairs
+
+    def _fill_derived_data(self):
+        """
+        Fill the ticket sold counters of the events, the "For You" feeds and
+        the search index from the inserted data.
+        """
+
+        for field, ticket_type in (
+            ('early_bird_sold', 'early_bird'),
+            ('standard_sold', 'standard')
+        ):
+            sold = Ticket.objects.filter(
+                event=OuterRef('pk'), type=ticket_type
+            ).values('event').annotate(count=Count('id')).values('count')
+            Event.objects.update(**{
+                field: Coalesce(Subquery(sold), 0, output_field=IntegerField())
+            })
+
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {feed} '
+                '(student_id, event_id, start_time, end_time, status) '
+                'SELECT p.student_id, p.event_id, e.start_time, e.end_time, '
+                'e.status FROM ('
+                'SELECT f.student_id, o.event_id FROM {follower} f '
+                'JOIN {organisers} o ON o.society_id = f.society_id '
+                'UNION '
+                'SELECT student_id, event_id FROM {saved}'
+                ') p JOIN {event} e ON e.id = p.event_id'.format(
+                    feed=quote_name(FeedEntry._meta.db_table),
+                    follower=quote_name(Society.follower.through._meta.db_table),
+                    organisers=quote_name(Event.society.through._meta.db_table),
+                    saved=quote_name(Student.saved_event.through._meta.db_table),
+                    event=quote_name(Event._meta.db_table),
+                )
+            )
+        rebuild_search_index()
+        self.log('Filled the ticket counters, feeds and search index')
@@ -9,40 +9,89 @@ delete_event_cart_item_when_event_cancelled : function
     Delete EventCartItem objects when an event is cancelled.
 delete_event_cart_item_when_removed_from_cart : function
     Delete EventCartItem objects when removed from the cart.
+release_ticket_holds_when_event_cart_item_deleted : function
+    Release the tickets held by EventCartItem objects when they are deleted.
 complete_order : function
     Handle order completion tasks such as creating historical carts,
-    managing payment and ticket objects, and clearing the cart.
+    claiming tickets, clearing the cart and enqueueing the jobs that create 
+    payment and ticket objects.
+index_event_when_saved : function
+    Add or refresh an event in the search index when it is saved.
+remove_event_from_index_when_deleted : function
+    Remove an event from the search index when it is deleted.
+index_events_when_societies_changed : function
+    Refresh events in the search index when their societies change.
+index_society_events_when_society_saved : function
+    Refresh the events of a society in the search index when it is saved.
+update_feeds_when_event_saved : function
+    Copy the times and status of an event into the feeds holding it when it 
+    is saved.
+update_feeds_when_event_societies_changed : function
+    Add events to or remove them from the feeds of the followers of their 
+    societies.
+update_feeds_when_followers_changed : function
+    Add the events of a society to or remove them from the feeds of its 
+    followers.
+update_feeds_when_saved_events_changed : function
+    Add saved events to or remove them from the feeds of students.
+forget_relationships_when_society_relations_changed : function
+    Discard the relationship snapshots of students whose follows, 
+    subscriptions or memberships change.
+forget_relationships_when_saved_events_changed : function
+    Discard the relationship snapshots of students whose saved events 
+    change.
 """
 
-from django.db.models.signals import pre_save, post_save, pre_delete
+from django.db.models.signals import (
+    pre_save, 
+    post_save, 
+    pre_delete, 
+    post_delete, 
+    m2m_changed
+)
 from django.dispatch import receiver
 from django.db import transaction
 import json
 from tsp.json_utils.json_encoder import DecimalEncoder
-import stripe
-from faker import Faker
-import random
-from tsp.views.student.payout_view import PayoutView
-from django.test import RequestFactory
+from tsp.jobs import enqueue_order_jobs
+from tsp.search import index_events, remove_events
+from tsp.invalidation import invalidate_events
+from tsp.relationships import forget_relationships
 from tsp.models import (
     Society, 
     Event,
     HistoricalCart,
+    OrderLine,
     EventCartItem, 
-    Ticket, 
+    TicketHold,
     Order,
-    Payment
+    Student,
+    FeedEntry,
 )
 
 @receiver(pre_delete, sender=Society)
 def cancel_event_when_host_deleted(sender, instance, **kwargs):
-    """Cancel all events when the host society is deleted."""
+    """
+    Cancel all events when the host society is deleted. The events are 
+    cancelled in one update, which sends no save signal, so their search 
+    index rows, feed entries and cached lists are refreshed here, in a 
+    number of queries that does not grow with the number of events.
+    """
     
-    instance_events = Event.objects.filter(host=instance)
-    for event in instance_events:
-        event.cancel_event()
-        event.host = None 
-        event.save()
+    event_ids = list(
+        Event.objects.filter(host=instance).values_list('id', flat=True)
+    )
+    if not event_ids:
+        return
+    invalidate_events(event_ids, f'Events of society {instance.pk} cancelled')
+    Event.objects.filter(pk__in=event_ids).update(
+        status=Event.Status.CANCELLED,
+        host=None
+    )
+    FeedEntry.objects.filter(event_id__in=event_ids).update(
+        status=Event.Status.CANCELLED
+    )
+    index_events(event_ids)
     
 @receiver(post_save, sender=EventCartItem)
 def delete_event_cart_item_when_event_cancelled(sender, instance, **kwargs):
@@ -65,33 +114,45 @@ def delete_event_cart_item_when_removed_from_cart(sender, instance, **kwargs):
     if instance.id and instance.standard_quantity == 0 and instance.early_bird_quantity == 0:
         instance.delete()
 
+@receiver(pre_delete, sender=EventCartItem)
+def release_ticket_holds_when_event_cart_item_deleted(sender, instance, **kwargs):
+    """
+    Release the tickets held by an EventCartItem object before it is deleted, 
+    so that they become available to other students again.
+    """
+    
+    TicketHold.release_all(instance)
+
 @receiver(post_save, sender=Order)
 def complete_order(sender, instance, created, **kwargs):
     """ 
     After a new order is placed, create a historical cart with data from 
-    user's cart, create the payment and ticket objects, issue tickets, 
-    then empty the cart.
+    user's cart, write the lines of the order in one insert, take the 
+    tickets from the inventory, then empty the cart. The cart is priced 
+    once and the snapshot is shared by all steps. 
+    Creating the payment and ticket objects and paying out the sellers are 
+    enqueued as background jobs in the same transaction.
     """ 
 
     if created:
         with transaction.atomic():
             cart = instance.student.cart
-            _create_historical_cart(cart, instance)
-            _create_payment(cart, instance)
-            _create_ticket(cart, instance)
-            if instance.customer_id and not instance.customer_id.startswith('fake'): 
-                _distribute_payment(instance)
-            _update_order_items(cart, instance)
+            pricing = cart.get_pricing()
+            _create_historical_cart(pricing, instance)
+            OrderLine.record(instance, pricing)
+            _claim_tickets(pricing)
+            _update_order_items(pricing, instance)
             _clear_cart(cart)
+            enqueue_order_jobs(instance)
             
-def _create_historical_cart(cart, order):
+def _create_historical_cart(pricing, order):
     """
     Create a new historical cart with data from user's cart.
     
     Parameters:
     -----------
-    cart : Cart
-        The user's cart object.
+    pricing : CartPricing
+        The priced snapshot of the user's cart.
     order : Order
         The order object that was just created.
     """
@@ -99,37 +160,36 @@ def _create_historical_cart(cart, order):
     historical_cart = HistoricalCart.objects.create(
         student=order.student,
         order=order,
-        total_price=cart.total_price,
-        total_saved=cart.total_saved,
-        count=cart.count,
-        discount_data=json.dumps(cart.discount_data, cls=DecimalEncoder)
+        total_price=pricing.total_price,
+        total_saved=pricing.total_saved,
+        count=pricing.count,
+        discount_data=json.dumps(pricing.discount_data, cls=DecimalEncoder)
     )
     
     # Set event and membership cart items with data from cart
-    for item in cart.event_cart_item.all():
-        historical_cart.event_cart_item.add(item)
-    for item in cart.membership.all():
-        historical_cart.membership.add(item)
+    historical_cart.event_cart_item.add(*pricing.event_cart_items)
+    historical_cart.membership.add(*pricing.memberships)
     historical_cart.save()
 
-def _update_order_items(cart, order):
+def _update_order_items(pricing, order):
     """
     Update the status of items after order has been placed.
     
     Parameters:
     -----------
-    cart : Cart
-        The user's cart object.
+    pricing : CartPricing
+        The priced snapshot of the user's cart.
     order : Order
         The order object that was just created.
     """
     
-    for item in cart.event_cart_item.all():
-        _update_cart_item_after_order_completed(item, cart, order.student)
-    for item in cart.membership.all():
-        _update_cart_item_after_order_completed(item, cart, order.student)
+    discount_data = pricing.discount_data
+    for item in pricing.event_cart_items:
+        _update_cart_item_after_order_completed(item, discount_data, order.student)
+    for item in pricing.memberships:
+        _update_cart_item_after_order_completed(item, discount_data, order.student)
 
-def _update_cart_item_after_order_completed(item, cart, student):
+def _update_cart_item_after_order_completed(item, discount_data, student):
     """
     Update items in the cart after an order has been completed.
     If the item is an event cart item, set it as purchased.
@@ -137,13 +197,14 @@ def _update_cart_item_after_order_completed(item, cart, student):
     
     Parameters:
     -----------
-    cart : Cart
-        The user's cart object.
+    item : EventCartItem or Society
+        The item in the cart.
+    discount_data : defaultdict(Decimal)
+        A dictionary mapping event cart item id to the discount applied.
     student : Student 
         The student who placed the order.
     """
     
-    discount_data = cart.discount_data
     if isinstance(item, EventCartItem):
         student.purchase_event(item.event)
         if item.id in discount_data:
@@ -164,108 +225,226 @@ def _clear_cart(cart):
     
     cart.clear()
     cart.save()
-    
-def _create_payment(cart, order):
+
+def _claim_tickets(pricing):
     """
-    Create a new payment object with data from the completed order 
-    when the order is not free.
-    
+    Convert the tickets held for the event cart items in the cart into sold 
+    tickets.
+
     Parameters:
     -----------
-    cart : Cart
-        The user's cart object.
-    order : Order
-        The order object that was just created.
+    pricing : CartPricing
+        The priced snapshot of the user's cart.
     """
     
-    if order.customer_id:
-        try:
-            customer = stripe.Customer.retrieve(order.customer_id)
-            payment_method_id = customer.invoice_settings.default_payment_method
-            payment_method = stripe.PaymentMethod.retrieve(payment_method_id)
-            last4 = payment_method.card.last4
-            brand = payment_method.card.brand
-            transaction_id = payment_method_id
-        except:
-            # For seeding purposes
-            transaction_id = "pm_" + Faker("en_GB").sha1()
-            last4 = random.randint(1000,9999)
-            brands = ["visa", "mastercard", "amex", "unionpay"]
-            brand = random.sample(brands, k=1)[0]
-        Payment.objects.create(
-            student=order.student,
-            order=order,
-            amount=cart.total_price,
-            last4=last4,
-            brand=brand,
-            transaction_id=transaction_id
+    for item in pricing.event_cart_items:
+        TicketHold.claim_tickets(item)
+
+@receiver(post_save, sender=Event)
+def index_event_when_saved(sender, instance, **kwargs):
+    """Add or refresh an event in the search index when it is saved."""
+
+    index_events([instance.id])
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_index_when_deleted(sender, instance, **kwargs):
+    """Remove an event from the search index when it is deleted."""
+
+    remove_events([instance.id])
+
+@receiver(m2m_changed, sender=Event.society.through)
+def index_events_when_societies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Refresh events in the search index when societies are added to or 
+    removed from them, from either side of the relation.
+    """
+
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            index_events([instance.id])
+    elif action == 'pre_clear':
+        # The cleared events are no longer known after the clear
+        instance._cleared_event_ids = list(
+            Event.objects.filter(society=instance).values_list('id', flat=True)
         )
-    
-def _create_ticket(cart, order):
+    elif action == 'post_clear':
+        index_events(getattr(instance, '_cleared_event_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        index_events(pk_set)
+
+@receiver(post_save, sender=Society)
+def index_society_events_when_society_saved(sender, instance, created, **kwargs):
+    """
+    Refresh the events of a society in the search index when it is saved, 
+    as the name and university of the society are indexed with its events.
     """
-    Create tickets for the event cart items in the given cart.
 
-    Parameters:
-    -----------
-    cart : Cart
-        The cart object containing the event cart items.
-    order : Order
-        The order object to which the tickets belong.
+    if not created:
+        index_events(
+            Event.objects.filter(society=instance).values_list('id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Event)
+def update_feeds_when_event_saved(sender, instance, created, update_fields=None, **kwargs):
     """
-    
-    for item in cart.event_cart_item.all():
-        _create_ticket_for_quantity(
-            item, 
-            order, 
-            item.early_bird_quantity, 
-            'early_bird'
+    Copy the times and status of an event into the feeds holding it when it 
+    is saved, as the feeds are filtered and ordered by them.
+    """
+
+    if created:
+        return
+    if update_fields is not None and not (
+        set(update_fields) & {'start_time', 'end_time', 'status'}
+    ):
+        return
+    FeedEntry.update_event(instance)
+
+@receiver(m2m_changed, sender=Event.society.through)
+def update_feeds_when_event_societies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Fan an event out to the feeds of the followers of the societies that 
+    organise it, and update the feeds when a society stops organising it.
+    """
+
+    if not reverse:
+        if action == 'post_add':
+            FeedEntry.fan_out(pk_set, [instance.id])
+        elif action in ('post_remove', 'post_clear'):
+            FeedEntry.refresh(event_ids=[instance.id])
+    elif action == 'post_add':
+        FeedEntry.fan_out([instance.id], pk_set)
+    elif action == 'post_remove':
+        FeedEntry.refresh(event_ids=pk_set)
+    elif action == 'pre_clear':
+        # The cleared events are no longer known after the clear
+        instance._cleared_feed_event_ids = list(
+            Event.objects.filter(society=instance).values_list('id', flat=True)
         )
-        _create_ticket_for_quantity(
-            item, 
-            order, 
-            item.standard_quantity, 
-            'standard'
+    elif action == 'post_clear':
+        FeedEntry.refresh(
+            student_ids=instance.follower.values_list('id', flat=True),
+            event_ids=getattr(instance, '_cleared_feed_event_ids', [])
         )
 
-def _create_ticket_for_quantity(item, order, quantity, ticket_type):
+@receiver(m2m_changed, sender=Society.follower.through)
+def update_feeds_when_followers_changed(sender, instance, action, reverse, pk_set, **kwargs):
     """
-    Create tickets for the given item, order and ticket type, for a given 
-    quantity.
-
-    Parameters:
-    -----------
-    item : Item
-        The event cart item.
-    order : Order
-        The order object to which the tickets belong.
-    quantity : int
-        The quantity of tickets to be created.
-    ticket_type : str
-        The type of ticket to be created, either EarlyBird or Standard.
+    Backfill the feed of a student with the events of a society when they 
+    follow it, and remove the events from the feed when they unfollow it 
+    unless they are still in the feed for another reason.
     """
-    
-    for i in range(quantity):
-        ticket = Ticket.objects.create(
-            event=item.event,
-            order=order,
-            type=ticket_type,
+
+    if not reverse:
+        if action == 'pre_clear':
+            # The cleared followers are no longer known after the clear
+            instance._cleared_follower_ids = list(
+                instance.follower.values_list('id', flat=True)
+            )
+            return
+        if action not in ('post_add', 'post_remove', 'post_clear'):
+            return
+        event_ids = list(
+            Event.objects.filter(society=instance).values_list('id', flat=True)
+        )
+        if action == 'post_add':
+            FeedEntry.add_entries(
+                (student_id, event_id) for student_id in pk_set for event_id in event_ids
+            )
+        elif action == 'post_remove':
+            FeedEntry.refresh(student_ids=pk_set, event_ids=event_ids)
+        elif action == 'post_clear':
+            FeedEntry.refresh(
+                student_ids=getattr(instance, '_cleared_follower_ids', []),
+                event_ids=event_ids
+            )
+        return
+    if action == 'pre_clear':
+        # The cleared societies are no longer known after the clear
+        instance._cleared_followed_society_ids = list(
+            instance.follower.values_list('id', flat=True)
         )
-        ticket.save()
-        
-def _distribute_payment(order):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_followed_society_ids', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    event_ids = list(
+        Event.objects.filter(society__in=pk_set).values_list('id', flat=True).distinct()
+    )
+    if action == 'post_add':
+        FeedEntry.add_entries((instance.id, event_id) for event_id in event_ids)
+    else:
+        FeedEntry.refresh(student_ids=[instance.id], event_ids=event_ids)
+
+@receiver(m2m_changed, sender=Student.saved_event.through)
+def update_feeds_when_saved_events_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Add an event to the feed of a student when they save it, and remove it 
+    when they unsave it unless a society they follow organises it.
     """
-    Distribute the payment for a completed order to the sellers.
 
-    Parameters:
-    -----------
-    order : Order 
-        The completed order to distribute the payment for.
+    if not reverse:
+        if action == 'post_add':
+            FeedEntry.add_entries((instance.id, event_id) for event_id in pk_set)
+        elif action == 'post_remove':
+            FeedEntry.refresh(student_ids=[instance.id], event_ids=pk_set)
+        elif action == 'post_clear':
+            FeedEntry.refresh(student_ids=[instance.id])
+    elif action == 'post_add':
+        FeedEntry.add_entries((student_id, instance.id) for student_id in pk_set)
+    elif action == 'post_remove':
+        FeedEntry.refresh(student_ids=pk_set, event_ids=[instance.id])
+    elif action == 'post_clear':
+        FeedEntry.refresh(event_ids=[instance.id])
+
+
+def _forget_relationships_when_changed(instance, action, reverse, pk_set, student_side):
     """
+    Discard the relationship snapshots of the students on one side of a 
+    relation that has changed.
 
-    # Create a fake request object  
-    factory = RequestFactory()
-    request = factory.post('/')
-    
-    # Call the post method on the payout view with the fake request
-    payout_view = PayoutView()
-    payout_view.post(request, order.id)
\ No newline at end of file
+    Parameters
+    ----------
+    instance : Model
+        The object whose relation has changed.
+    action : str
+        The m2m_changed action.
+    reverse : bool
+        Whether the relation has been changed from its reverse side.
+    pk_set : set of int or None
+        The primary keys of the objects added to or removed from the relation.
+    student_side : bool
+        Whether the students are the instances of the forward side.
+    """
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse != student_side:
+        forget_relationships([instance.pk])
+    else:
+        # The students removed by a clear are not known
+        forget_relationships(pk_set if action != 'post_clear' else None)
+
+@receiver(m2m_changed, sender=Society.follower.through)
+@receiver(m2m_changed, sender=Society.subscriber.through)
+@receiver(m2m_changed, sender=Society.regular_member.through)
+@receiver(m2m_changed, sender=Society.committee_member.through)
+def forget_relationships_when_society_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Discard the relationship snapshots of the students whose follows, 
+    subscriptions or memberships change.
+    """
+
+    _forget_relationships_when_changed(instance, action, reverse, pk_set, False)
+
+@receiver(m2m_changed, sender=Student.saved_event.through)
+def forget_relationships_when_saved_events_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Discard the relationship snapshots of the students whose saved events 
+    change. Purchases discard the snapshot in Student.purchase_event and 
+    Student.purchase_discounted_event instead, as a receiver would make 
+    every purchase check for existing rows before inserting.
+    """
+
+    _forget_relationships_when_changed(instance, action, reverse, pk_set, True)
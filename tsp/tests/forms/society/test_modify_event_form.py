@@ -1,6 +1,6 @@
 """Unit tests of the modify event form"""
 import os
-from ticket_selling_platform import settings
+from django.conf import settings
 from django.test import TestCase
 from django.utils import timezone
 from tsp.models import Society, Event
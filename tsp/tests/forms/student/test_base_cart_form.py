@@ -1,6 +1,6 @@
 """Unit tests of the base cart form"""
 from django.test import TestCase
-from tsp.models import User, Society, Student, Event, Cart, EventCartItem
+from tsp.models import User, Society, Student, Event, Cart, EventCartItem, TicketHold
 from tsp.forms.student.base_cart_form import BaseCartForm
 
 class BaseEventFormTestCase(TestCase):
@@ -138,6 +138,39 @@ class BaseEventFormTestCase(TestCase):
         self.assertEqual(form._get_available_ticket_quantities('early_bird'), early_bird_availability)
         self.assertEqual(form._get_available_ticket_quantities('standard'), standard_availability)
         
+    def test_save_holds_tickets_added_to_cart(self):
+        form = BaseCartForm(data=self.form_input, user=self.user, event=self.event)
+        self.assertTrue(form.is_valid())
+        form.save()
+        hold = TicketHold.objects.get(event_cart_item=self.event_cart_item)
+        self.assertEqual(hold.type, 'early_bird')
+        self.assertEqual(hold.quantity, 2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 2)
+
+    def test_removing_tickets_from_cart_releases_hold(self):
+        form = BaseCartForm(user=self.user, event=self.event)
+        form.update_event_cart_item(2, 0)
+        form.update_event_cart_item(-1, 0)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 1)
+        self.event_cart_item.refresh_from_db()
+        self.assertEqual(self.event_cart_item.early_bird_quantity, 3)
+
+    def test_save_does_not_add_tickets_when_sold_out(self):
+        form = BaseCartForm(data=self.form_input, user=self.user, event=self.event)
+        self.assertTrue(form.is_valid())
+        # Another student holds the remaining tickets before the form is saved.
+        other_event_cart_item = EventCartItem.objects.create(event=self.event)
+        TicketHold.hold_tickets(other_event_cart_item, 'early_bird', 49)
+        form.save()
+        self.assertIn(BaseCartForm.sold_out_message, form.non_field_errors())
+        self.event_cart_item.refresh_from_db()
+        self.assertEqual(self.event_cart_item.early_bird_quantity, 2)
+        self.assertFalse(
+            TicketHold.objects.filter(event_cart_item=self.event_cart_item).exists()
+        )
+
     def test_initialization_sets_user_and_event(self):
         form = BaseCartForm(user=self.user, event=self.event)
         self.assertEqual(form.user, self.user)
@@ -0,0 +1,24 @@
+"""Unit tests of the broadcast render benchmark command"""
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from tsp.benchmarks.broadcast_render import TEMPLATES, run_broadcast_render_benchmark
+
+class BenchBroadcastRenderCommandTestCase(TestCase):
+    """Unit tests of the broadcast render benchmark command"""
+
+    def test_benchmark_reports_each_template_and_recipient_count(self):
+        results = run_broadcast_render_benchmark([1, 10], TEMPLATES)
+        self.assertEqual(
+            [(result['template'], result['recipients']) for result in results],
+            [(template, count) for template in TEMPLATES for count in [1, 10]]
+        )
+        for result in results:
+            self.assertTrue(result['identical'])
+            self.assertGreater(result['per_recipient_ms'], 0)
+
+    def test_command_output(self):
+        out = StringIO()
+        call_command('bench_broadcast_render', '--recipient-counts', '5', stdout=out)
+        self.assertIn('create_event_email.html', out.getvalue())
+        self.assertIn('True', out.getvalue())
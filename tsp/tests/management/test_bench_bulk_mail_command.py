@@ -0,0 +1,25 @@
+"""Unit tests of the bulk mail benchmark command"""
+from io import StringIO
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from tsp.benchmarks.bulk_mail import run_bulk_mail_benchmark
+
+class BenchBulkMailCommandTestCase(TestCase):
+    """Unit tests of the bulk mail benchmark command"""
+
+    def test_benchmark_reports_each_backend_and_recipient_count(self):
+        results = run_bulk_mail_benchmark([1, 10], ['locmem', 'file'])
+        self.assertEqual(
+            [(result['backend'], result['recipients']) for result in results],
+            [('locmem', 1), ('locmem', 10), ('file', 1), ('file', 10)]
+        )
+        for result in results:
+            self.assertGreater(result['single_per_second'], 0)
+            self.assertGreater(result['bulk_per_second'], 0)
+
+    def test_command_output(self):
+        out = StringIO()
+        call_command('bench_bulk_mail', '--recipient-counts', '5', '--backends', 'locmem', stdout=out)
+        self.assertIn('locmem', out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
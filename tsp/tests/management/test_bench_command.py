@@ -0,0 +1,103 @@
+"""Unit tests of the view benchmark command"""
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tsp.benchmarks.views import (
+    PERCENTILES, SCENARIOS, compare_results, run_view_benchmark
+)
+from tsp.models import BaseCart, EventCartItem, Order, Ticket, User
+from tsp.seeding import Seeder
+
+class BenchCommandTestCase(TestCase):
+    """Unit tests of the view benchmark command"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(universities=1, students=20, societies=3, events=30, tickets=100).run()
+
+    def setUp(self):
+        self.output_path = os.path.join(tempfile.mkdtemp(), 'bench.json')
+
+    def test_benchmark_reports_each_view(self):
+        results = run_view_benchmark(warmup=1, repeat=3)
+        self.assertEqual([result['name'] for result in results['results']], SCENARIOS)
+        self.assertEqual(results['dataset']['Ticket'], 100)
+        for result in results['results']:
+            with self.subTest(view=result['name']):
+                self.assertIn(result['status'], (200, 302))
+                self.assertGreater(result['queries'], 0)
+                self.assertLessEqual(result['min_ms'], result['p50_ms'])
+                for lower, upper in zip(PERCENTILES, PERCENTILES[1:]):
+                    self.assertLessEqual(result[f'p{lower}_ms'], result[f'p{upper}_ms'])
+                self.assertLessEqual(result['p99_ms'], result['max_ms'])
+
+    def test_free_checkout_places_an_order(self):
+        results = run_view_benchmark(['checkout'], warmup=0, repeat=1)
+        self.assertEqual(results['results'][0]['status'], 302)
+
+    def _counts(self):
+        return (
+            Order.objects.count(),
+            Ticket.objects.count(),
+            EventCartItem.objects.count(),
+            BaseCart.event_cart_item.through.objects.count(),
+        )
+
+    def test_benchmark_data_is_rolled_back(self):
+        counts = self._counts()
+        call_command('bench', '--warmup', '0', '--repeat', '1', stdout=StringIO())
+        self.assertEqual(self._counts(), counts)
+
+    def test_command_writes_json_results(self):
+        out = StringIO()
+        call_command(
+            'bench', '--views', 'all_events', 'cart_detail', '--warmup', '0',
+            '--repeat', '2', '--output', self.output_path, stdout=out
+        )
+        with open(self.output_path) as output_file:
+            results = json.load(output_file)
+        self.assertEqual(
+            [result['name'] for result in results['results']],
+            ['all_events', 'cart_detail']
+        )
+        self.assertEqual(results['repeat'], 2)
+        self.assertIn('cart_detail', out.getvalue())
+
+    def test_command_flags_regressions_against_a_baseline(self):
+        call_command(
+            'bench', '--views', 'all_events', '--warmup', '0', '--repeat', '1',
+            '--output', self.output_path, stdout=StringIO()
+        )
+        with open(self.output_path) as output_file:
+            baseline = json.load(output_file)
+        baseline['results'][0]['p50_ms'] = 0.0001
+        baseline['results'][0]['queries'] = 0
+        with open(self.output_path, 'w') as output_file:
+            json.dump(baseline, output_file)
+        with self.assertRaisesMessage(CommandError, 'all_events'):
+            call_command(
+                'bench', '--views', 'all_events', '--warmup', '0', '--repeat', '1',
+                '--baseline', self.output_path, stdout=StringIO()
+            )
+
+    def test_compare_results(self):
+        baseline = {'results': [{'name': 'all_events', 'p50_ms': 10.0, 'queries': 3}]}
+        within = {'results': [{'name': 'all_events', 'p50_ms': 11.0, 'queries': 3}]}
+        slower = {'results': [{'name': 'all_events', 'p50_ms': 13.0, 'queries': 4}]}
+        new_view = {'results': [{'name': 'cart_detail', 'p50_ms': 50.0, 'queries': 9}]}
+        self.assertEqual(compare_results(within, baseline), [])
+        self.assertEqual(len(compare_results(slower, baseline)), 2)
+        self.assertEqual(compare_results(slower, baseline, threshold=0.5), [
+            'all_events: 3 -> 4 queries'
+        ])
+        self.assertEqual(compare_results(new_view, baseline), [])
+
+    def test_command_fails_on_an_empty_database(self):
+        Ticket.objects.all().delete()
+        User.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('bench', stdout=StringIO())
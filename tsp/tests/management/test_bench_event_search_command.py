@@ -0,0 +1,20 @@
+"""Unit tests of the event search benchmark command"""
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from tsp.benchmarks.event_search import run_event_search_benchmark
+from tsp.models import Event
+
+class BenchEventSearchCommandTestCase(TestCase):
+    """Unit tests of the event search benchmark command"""
+
+    def test_benchmark_reports_each_event_count(self):
+        results = run_event_search_benchmark([10, 2000], 1)
+        self.assertEqual([result['events'] for result in results], [10, 2000])
+        self.assertEqual([result['matches'] for result in results], [0, 2])
+        self.assertEqual(Event.objects.count(), 0)
+
+    def test_command_output(self):
+        out = StringIO()
+        call_command('bench_event_search', '--event-counts', '10', '--repeat', '1', stdout=out)
+        self.assertIn('substring ms', out.getvalue())
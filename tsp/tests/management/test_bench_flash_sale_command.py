@@ -0,0 +1,69 @@
+"""Unit tests of the flash sale simulation command"""
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from tsp.benchmarks.flash_sale import VIEWS, run_flash_sale
+from tsp.models import Event, Order, Student, Ticket, University
+
+class BenchFlashSaleCommandTestCase(TransactionTestCase):
+    """Unit tests of the flash sale simulation command"""
+
+    def test_simulation_reports_each_view(self):
+        results = run_flash_sale(students=2, rounds=1)
+        self.assertEqual(list(results['views']), VIEWS)
+        self.assertEqual(results['students'], 2)
+        self.assertEqual(results['views']['add_to_cart']['requests'], 2)
+        self.assertGreater(results['throughput_rps'], 0)
+        self.assertEqual(
+            results['requests'],
+            sum(view['requests'] for view in results['views'].values())
+        )
+
+    def test_event_is_not_oversold(self):
+        results = run_flash_sale(
+            students=4, rounds=3, early_booking_capacity=3,
+            standard_booking_capacity=2, quantity=2
+        )
+        self.assertEqual(results['capacity'], 5)
+        self.assertLessEqual(results['tickets_issued'], 5)
+        self.assertEqual(results['tickets_sold'], results['tickets_issued'])
+        self.assertFalse(results['oversold'])
+
+    def test_single_student_buys_the_tickets(self):
+        results = run_flash_sale(students=1, rounds=2, quantity=2)
+        self.assertEqual(results['orders'], 2)
+        self.assertEqual(results['locked'], 0)
+        self.assertEqual(results['errors'], 0)
+        # Two early bird tickets and one standard ticket per round
+        self.assertEqual(results['tickets_issued'], 6)
+        self.assertEqual(results['tickets_held'], 0)
+
+    def test_simulation_data_is_deleted(self):
+        run_flash_sale(students=2, rounds=1)
+        self.assertFalse(University.objects.exists())
+        self.assertFalse(Student.objects.exists())
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Ticket.objects.exists())
+        self.assertFalse(Session.objects.exists())
+
+    def test_simulation_data_can_be_kept(self):
+        run_flash_sale(students=2, rounds=1, keep_data=True)
+        self.assertEqual(Student.objects.count(), 2)
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_command_output(self):
+        out = StringIO()
+        output_path = os.path.join(tempfile.mkdtemp(), 'flash_sale.json')
+        call_command(
+            'bench_flash_sale', '--students', '2', '--rounds', '1',
+            '--output', output_path, stdout=out
+        )
+        self.assertIn('checkout', out.getvalue())
+        self.assertIn('Tickets issued', out.getvalue())
+        with open(output_path) as output_file:
+            self.assertIn('oversold', json.load(output_file))
@@ -0,0 +1,26 @@
+"""Unit tests of the order completion benchmark command"""
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from tsp.benchmarks.order_completion import run_order_completion_benchmark
+from tsp.models import Order, Ticket, Event
+
+class BenchOrderCompletionCommandTestCase(TestCase):
+    """Unit tests of the order completion benchmark command"""
+
+    def test_benchmark_reports_each_ticket_count(self):
+        results = run_order_completion_benchmark([1, 5, 25], 2)
+        self.assertEqual([result['tickets'] for result in results], [1, 5, 25])
+        for result in results:
+            self.assertLessEqual(result['min_ms'], result['mean_ms'])
+            self.assertLessEqual(result['mean_ms'], result['max_ms'])
+
+    def test_ticket_issuance_queries_do_not_grow_with_ticket_count(self):
+        results = run_order_completion_benchmark([1, 50], 1)
+        self.assertEqual(results[0]['queries'], results[1]['queries'])
+
+    def test_benchmark_data_is_rolled_back(self):
+        call_command('bench_order_completion', '--ticket-counts', '3', '--repeat', '1', stdout=StringIO())
+        self.assertEqual(Order.objects.count(), 0)
+        self.assertEqual(Ticket.objects.count(), 0)
+        self.assertEqual(Event.objects.count(), 0)
@@ -0,0 +1,52 @@
+"""Unit tests of the rebuild feeds and check feeds commands"""
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tsp.models import Event, FeedEntry, Society, Student
+
+class FeedCommandsTestCase(TestCase):
+    """Unit tests of the rebuild feeds and check feeds commands"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json'
+    ]
+
+    def setUp(self):
+        self.student = Student.objects.get(email='johndoe@kcl.ac.uk')
+        self.event = Event.objects.get(pk=15)
+        self.student.save_event(self.event)
+
+    def test_check_feeds_when_consistent(self):
+        out = StringIO()
+        call_command('check_feeds', stdout=out)
+        self.assertIn('The feeds are consistent', out.getvalue())
+
+    def test_check_feeds_reports_missing_entries(self):
+        FeedEntry.objects.all().delete()
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('check_feeds', stdout=out)
+        self.assertIn(
+            f'Missing: event {self.event.id} in feed of student {self.student.id}', 
+            out.getvalue()
+        )
+        self.assertFalse(FeedEntry.objects.exists())
+
+    def test_check_feeds_fixes_entries(self):
+        FeedEntry.objects.all().delete()
+        out = StringIO()
+        call_command('check_feeds', fix=True, stdout=out)
+        self.assertIn('Added 1 and removed 0 feed entries', out.getvalue())
+        self.assertTrue(
+            FeedEntry.objects.filter(student=self.student, event=self.event).exists()
+        )
+
+    def test_rebuild_feeds(self):
+        FeedEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_feeds', stdout=out)
+        self.assertIn('Added 1 and removed 0 feed entries', out.getvalue())
+        self.assertEqual(FeedEntry.get_drift(), (set(), set()))
@@ -0,0 +1,22 @@
+"""Unit tests of the rebuild search index command"""
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from tsp.models import Event
+from tsp.search import search_events
+
+class RebuildSearchIndexCommandTestCase(TestCase):
+    """Unit tests of the rebuild search index command"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json'
+    ]
+
+    def test_rebuild_search_index(self):
+        Event.objects.filter(pk=15).update(name='Hackathon')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 1 events', out.getvalue())
+        self.assertEqual(list(search_events('hackathon')), [Event.objects.get(pk=15)])
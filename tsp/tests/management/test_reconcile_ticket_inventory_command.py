@@ -0,0 +1,52 @@
+"""Unit tests of the reconcile ticket inventory command"""
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from tsp.models import Event, Order, Ticket
+from tsp.jobs import run_pending_jobs
+
+class ReconcileTicketInventoryCommandTestCase(TestCase):
+    """Unit tests of the reconcile ticket inventory command"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        # Run the jobs that issue the tickets of the default order.
+        run_pending_jobs()
+        self.event = Event.objects.get(pk=15)
+        self.order = Order.objects.get(pk=29)
+        Ticket.objects.create(event=self.event, order=self.order, type='standard')
+        
+    def test_counters_are_rebuilt_from_tickets(self):
+        # The ticket created directly does not update the counters.
+        self.assertEqual(self.event.early_bird_sold, 2)
+        self.assertEqual(self.event.standard_sold, 0)
+        call_command('reconcile_ticket_inventory', stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, 2)
+        self.assertEqual(self.event.standard_sold, 1)
+        self.assertEqual(Event.get_event_ticket_inventory(self.event, 'early_bird'), 48)
+        self.assertEqual(Event.get_event_ticket_inventory(self.event, 'standard'), 99)
+
+    def test_counters_are_corrected_when_too_high(self):
+        Event.objects.filter(pk=self.event.pk).update(
+            early_bird_sold=10, 
+            standard_sold=10
+        )
+        call_command('reconcile_ticket_inventory', stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, 2)
+        self.assertEqual(self.event.standard_sold, 1)
+
+    def test_dry_run_does_not_change_counters(self):
+        out = StringIO()
+        call_command('reconcile_ticket_inventory', '--dry-run', stdout=out)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.standard_sold, 0)
+        self.assertIn('Reconciled ticket inventory of 1 events', out.getvalue())
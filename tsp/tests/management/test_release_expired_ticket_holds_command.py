@@ -0,0 +1,38 @@
+"""Unit tests of the release expired ticket holds command"""
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from tsp.models import Event, EventCartItem, TicketHold
+
+class ReleaseExpiredTicketHoldsCommandTestCase(TestCase):
+    """Unit tests of the release expired ticket holds command"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json'
+    ]
+
+    def setUp(self):
+        self.event = Event.objects.get(pk=15)
+        self.event_cart_item = EventCartItem.objects.get(pk=25)
+        TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 2)
+        TicketHold.hold_tickets(self.event_cart_item, 'standard', 3)
+
+    def test_expired_holds_are_released(self):
+        TicketHold.objects.filter(type='standard').update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        out = StringIO()
+        call_command('release_expired_ticket_holds', stdout=out)
+        self.assertIn('Released 1 expired ticket holds', out.getvalue())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 2)
+        self.assertEqual(self.event.standard_held, 0)
+
+    def test_active_holds_are_kept(self):
+        call_command('release_expired_ticket_holds', stdout=StringIO())
+        self.assertEqual(TicketHold.objects.count(), 2)
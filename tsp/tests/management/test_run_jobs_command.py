@@ -0,0 +1,66 @@
+"""Unit tests of the run jobs command"""
+from io import StringIO
+from unittest.mock import patch
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from tsp.jobs import run_pending_jobs
+from tsp.models import Job, Order, Payment, Ticket
+
+class RunJobsCommandTestCase(TestCase):
+    """Unit tests of the run jobs command"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        # The default order of 2 early bird tickets enqueues the 
+        # record_payment and issue_tickets jobs.
+        self.order = Order.objects.get(pk=29)
+
+    def test_run_jobs_once(self):
+        out = StringIO()
+        call_command('run_jobs', '--once', stdout=out)
+        self.assertIn('Ran 2 jobs', out.getvalue())
+        self.assertEqual(Job.get_order_status(self.order), Job.Status.SUCCEEDED)
+        self.assertTrue(Payment.objects.filter(order=self.order).exists())
+        self.assertEqual(Ticket.objects.filter(order=self.order).count(), 2)
+
+    def test_failed_job_is_retried(self):
+        with patch('tsp.jobs.Ticket.objects.bulk_create', side_effect=Exception('Error')):
+            run_pending_jobs()
+        job = Job.objects.get(order=self.order, task='issue_tickets')
+        self.assertEqual(job.status, Job.Status.PENDING)
+        self.assertIn('Error', job.last_error)
+        self.assertEqual(Ticket.objects.filter(order=self.order).count(), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=job.created_at)
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(Ticket.objects.filter(order=self.order).count(), 2)
+
+    def test_order_jobs_are_idempotent(self):
+        Job.enqueue('send_order_confirmation', self.order, email='johndoe@kcl.ac.uk')
+        run_pending_jobs()
+        Job.objects.update(status=Job.Status.PENDING, run_at=self.order.create_at)
+        run_pending_jobs()
+        self.assertEqual(Payment.objects.filter(order=self.order).count(), 1)
+        self.assertEqual(Ticket.objects.filter(order=self.order).count(), 2)
+
+    def test_order_confirmation_issues_tickets_first(self):
+        Job.objects.filter(order=self.order).delete()
+        Job.enqueue('send_order_confirmation', self.order, email='johndoe@kcl.ac.uk')
+        run_pending_jobs()
+        tickets = Ticket.objects.filter(order=self.order)
+        self.assertEqual(tickets.count(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['johndoe@kcl.ac.uk'])
+        html_message = mail.outbox[0].alternatives[0][0]
+        for ticket in tickets:
+            self.assertIn(f'Ticket number # {ticket.id}', html_message)
@@ -0,0 +1,89 @@
+"""Unit tests of the seed command"""
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.test import TestCase
+from tsp.models import (
+    Event, FeedEntry, HistoricalCart, Order, Society, Student, Ticket, University
+)
+from tsp.seeding import Seeder
+
+class SeedCommandTestCase(TestCase):
+    """Unit tests of the seed command"""
+
+    def _seed(self, *args):
+        out = StringIO()
+        call_command(
+            'seed', '--universities', '2', '--students', '20', '--societies', '4',
+            '--events', '20', '--tickets', '60', *args, stdout=out
+        )
+        return out.getvalue()
+
+    def _snapshot(self):
+        return (
+            list(Student.objects.order_by('id').values_list('email', 'first_name')),
+            list(Society.objects.order_by('id').values_list('email', 'name')),
+            list(Event.objects.order_by('id').values_list(
+                'name', 'early_bird_sold', 'standard_sold', 'status'
+            )),
+            list(Ticket.objects.order_by('id').values_list('event_id', 'order__student_id')),
+        )
+
+    def test_seed_creates_the_requested_volumes(self):
+        output = self._seed()
+        self.assertEqual(University.objects.count(), 2)
+        self.assertEqual(Student.objects.count(), 20)
+        self.assertEqual(Society.objects.count(), 4)
+        self.assertEqual(Event.objects.count(), 20)
+        self.assertEqual(Ticket.objects.count(), 60)
+        self.assertEqual(HistoricalCart.objects.count(), Order.objects.count())
+        self.assertTrue(Student.objects.filter(email='joe.doe@kcl.ac.uk').exists())
+        self.assertIn('Seed complete', output)
+
+    def test_seeded_accounts_can_log_in(self):
+        self._seed()
+        self.assertTrue(
+            self.client.login(email='joe.doe@kcl.ac.uk', password='Password123')
+        )
+
+    def test_same_seed_generates_the_same_data(self):
+        snapshots = []
+        for _ in range(2):
+            with transaction.atomic():
+                Seeder(universities=2, students=20, societies=4, events=20, tickets=60).run()
+                snapshots.append(self._snapshot())
+                transaction.set_rollback(True)
+        self.assertEqual(snapshots[0], snapshots[1])
+
+    def test_ticket_counters_match_the_tickets(self):
+        self._seed()
+        events = Event.objects.annotate(
+            early_bird_count=Count('ticket', filter=Q(ticket__type='early_bird')),
+            standard_count=Count('ticket', filter=Q(ticket__type='standard')),
+        )
+        for event in events:
+            self.assertEqual(event.early_bird_sold, event.early_bird_count)
+            self.assertEqual(event.standard_sold, event.standard_count)
+            self.assertLessEqual(event.early_bird_sold, event.early_booking_capacity)
+            self.assertLessEqual(event.standard_sold, event.standard_booking_capacity)
+
+    def test_feeds_are_consistent(self):
+        self._seed()
+        self.assertTrue(FeedEntry.objects.exists())
+        self.assertEqual(FeedEntry.get_drift(), (set(), set()))
+
+    def test_seed_makes_no_stripe_call_by_default(self):
+        with patch('stripe.Account.create') as create_account:
+            self._seed()
+        create_account.assert_not_called()
+        self.assertFalse(
+            Society.objects.exclude(stripe_account_id__startswith='acct_fake').exists()
+        )
+
+    def test_seed_fails_on_a_seeded_database(self):
+        self._seed()
+        with self.assertRaises(CommandError):
+            self._seed()
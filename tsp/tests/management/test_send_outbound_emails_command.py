@@ -0,0 +1,61 @@
+"""Unit tests of the send outbound emails command"""
+from io import StringIO
+from unittest.mock import patch
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from ticket_selling_platform import settings
+from tsp.mail import send_outbound_email_batch
+from tsp.models import OutboundEmail
+
+class SendOutboundEmailsCommandTestCase(TestCase):
+    """Unit tests of the send outbound emails command"""
+
+    def setUp(self):
+        OutboundEmail.enqueue([
+            OutboundEmail(
+                recipient=f'student{i}@kcl.ac.uk', 
+                subject='Subject', 
+                body=f'Message {i}'
+            )
+            for i in range(5)
+        ])
+
+    def test_send_outbound_emails_once(self):
+        out = StringIO()
+        call_command('send_outbound_emails', '--once', stdout=out)
+        self.assertIn('Processed 5 emails', out.getvalue())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[2].to, ['student2@kcl.ac.uk'])
+        self.assertEqual(mail.outbox[2].body, 'Message 2')
+        self.assertEqual(
+            OutboundEmail.objects.filter(status=OutboundEmail.Status.SENT).count(), 
+            5
+        )
+
+    def test_send_rate_is_respected(self):
+        with patch.object(settings, 'EMAIL_SEND_RATE_PER_MINUTE', 3):
+            call_command('send_outbound_emails', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            OutboundEmail.objects.filter(status=OutboundEmail.Status.PENDING).count(), 
+            2
+        )
+
+    def test_batch_size(self):
+        self.assertEqual(send_outbound_email_batch(batch_size=2), 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_emails_are_retried(self):
+        def send_messages(emails):
+            if emails[0].to == ['student1@kcl.ac.uk']:
+                raise Exception('Recipient refused')
+            mail.outbox.extend(emails)
+            return len(emails)
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            call_command('send_outbound_emails', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 4)
+        failed_email = OutboundEmail.objects.get(recipient='student1@kcl.ac.uk')
+        self.assertEqual(failed_email.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(failed_email.last_error, 'Recipient refused')
+        self.assertEqual(failed_email.attempts, 1)
@@ -0,0 +1,143 @@
+"""Unit tests of the settle payouts command"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.utils import timezone
+from ticket_selling_platform import settings
+from tsp.models import Order, OrderLine, PayoutEntry, Settlement, Society
+from tsp.payouts import get_window_end, settle_payouts
+from tsp.tests.test_payments import FakeStripeTestCase
+
+class SettlePayoutsCommandTestCase(FakeStripeTestCase):
+    """Unit tests of the settle payouts command"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.order = Order.objects.get(pk=29)
+        self.society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        self.other_society = Society.objects.get(email='robotics@qmw.ac.uk')
+        self.other_society.stripe_account_id = 'acct_robotics'
+        self.other_society.save()
+        # Record the payouts of three orders in the last window
+        created_at = get_window_end() - timedelta(hours=1)
+        for order in [self.order, *self._create_orders(2)]:
+            self._record(order, {
+                self.society: Decimal('10.00'),
+                self.other_society: Decimal('2.50'),
+            })
+        PayoutEntry.objects.update(created_at=created_at)
+
+    def _record(self, order, payouts):
+        order.lines.all().delete()
+        OrderLine.objects.bulk_create([
+            OrderLine(
+                order=order,
+                type=OrderLine.Type.MEMBERSHIP,
+                society=society,
+                name=society.name,
+                unit_price=amount
+            )
+            for society, amount in payouts.items()
+        ])
+        PayoutEntry.record(order)
+
+    def _create_orders(self, count):
+        return [
+            Order.objects.create(student=self.order.student) for _ in range(count)
+        ]
+
+    def _get_transfers(self):
+        return {
+            obj['destination']: obj['amount']
+            for obj in self.fake_stripe.objects.values()
+            if obj['object'] == 'transfer'
+        }
+
+    def test_window_end_is_aligned(self):
+        now = datetime(2023, 3, 14, 15, 9, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            get_window_end(now),
+            datetime(2023, 3, 14, tzinfo=dt_timezone.utc)
+        )
+        with patch.object(settings, 'PAYOUT_SETTLEMENT_WINDOW_HOURS', 6):
+            self.assertEqual(
+                get_window_end(now),
+                datetime(2023, 3, 14, 12, tzinfo=dt_timezone.utc)
+            )
+
+    def test_one_transfer_per_society(self):
+        out = StringIO()
+        call_command('settle_payouts', stdout=out)
+        self.assertIn('Settled 2 societies', out.getvalue())
+        self.assertEqual(self.fake_stripe.count_requests('POST', '/v1/transfers'), 2)
+        self.assertEqual(self._get_transfers(), {
+            self.society.stripe_account_id: 3000,
+            'acct_robotics': 750,
+        })
+        for settlement in Settlement.objects.all():
+            self.assertEqual(settlement.status, Settlement.Status.SETTLED)
+            self.assertTrue(settlement.transfer_id.startswith('tr_'))
+            self.assertEqual(settlement.entries.count(), 3)
+        self.assertFalse(PayoutEntry.objects.filter(settlement__isnull=True).exists())
+
+    def test_settle_again_does_nothing(self):
+        settle_payouts()
+        settled, failed = settle_payouts()
+        self.assertEqual((settled, failed), ([], []))
+        self.assertEqual(Settlement.objects.count(), 2)
+        self.assertEqual(self.fake_stripe.count_requests('POST', '/v1/transfers'), 2)
+
+    def test_entries_of_the_current_window_are_not_settled(self):
+        order = self._create_orders(1)[0]
+        self._record(order, {self.society: Decimal('4.00')})
+        settle_payouts()
+        entry = PayoutEntry.objects.get(order=order)
+        self.assertIsNone(entry.settlement)
+        self.assertEqual(self._get_transfers()[self.society.stripe_account_id], 3000)
+
+    def test_societies_without_account_are_not_settled(self):
+        self.other_society.stripe_account_id = ''
+        self.other_society.save()
+        settled, failed = settle_payouts()
+        self.assertEqual([s.society for s in settled], [self.society])
+        self.assertEqual(
+            PayoutEntry.objects.filter(
+                society=self.other_society, settlement__isnull=True
+            ).count(),
+            3
+        )
+
+    @patch.object(settings, 'STRIPE_MAX_RETRIES', 0)
+    def test_failed_transfer_is_retried(self):
+        self.fake_stripe.fail_next(500)
+        err = StringIO()
+        call_command('settle_payouts', stdout=StringIO(), stderr=err)
+        self.assertIn('Failed to settle', err.getvalue())
+        self.assertEqual(
+            Settlement.objects.filter(status=Settlement.Status.PENDING).count(), 1
+        )
+        settled, failed = settle_payouts()
+        self.assertEqual(len(settled), 1)
+        self.assertEqual(failed, [])
+        self.assertEqual(len(self._get_transfers()), 2)
+        self.assertFalse(
+            Settlement.objects.filter(status=Settlement.Status.PENDING).exists()
+        )
+
+    def test_settled_society_can_be_deleted(self):
+        settle_payouts()
+        self.other_society.delete()
+        self.assertFalse(Settlement.objects.filter(society=self.other_society).exists())
+        self.assertEqual(Settlement.objects.count(), 1)
@@ -1,6 +1,6 @@
 """Unit tests of the Cart model"""
 from django.test import TestCase
-from tsp.models import Event, EventCartItem, Cart, Society, Student
+from tsp.models import Event, EventCartItem, Cart, Society, Student, TicketHold
 from decimal import Decimal
 from collections import defaultdict
 
@@ -231,4 +231,34 @@ class CartModelTestCase(TestCase):
         # Test cart is empty after clearing the cart 
         self.cart.clear()
         self.assertEqual(len(self.cart.event_cart_item.all()), 0) 
-        self.assertEqual(len(self.cart.membership.all()), 0) 
\ No newline at end of file
+        self.assertEqual(len(self.cart.membership.all()), 0)
+
+    def _sell_early_bird_tickets(self, quantity):
+        self.event.early_bird_sold = quantity
+        self.event.save()
+        return Event.lock_events(Event.objects.filter(pk=self.event.pk))
+
+    def test_trim_to_availability_keeps_tickets_left(self):
+        events = self._sell_early_bird_tickets(self.event.early_booking_capacity - 2)
+        self.assertEqual(self.cart.trim_to_availability(events), [])
+        self.event_cart_item.refresh_from_db()
+        self.assertEqual(self.event_cart_item.early_bird_quantity, 2)
+
+    def test_trim_to_availability_trims_to_tickets_left(self):
+        events = self._sell_early_bird_tickets(self.event.early_booking_capacity - 1)
+        trimmed = self.cart.trim_to_availability(events)
+        self.assertEqual(trimmed, [(self.event, 'early_bird', 1)])
+        self.event_cart_item.refresh_from_db()
+        self.assertEqual(self.event_cart_item.early_bird_quantity, 1)
+
+    def test_trim_to_availability_counts_tickets_held_for_the_cart(self):
+        TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 2)
+        self.event.refresh_from_db()
+        events = self._sell_early_bird_tickets(self.event.early_booking_capacity - 2)
+        self.assertEqual(self.cart.trim_to_availability(events), [])
+
+    def test_trim_to_availability_removes_sold_out_items(self):
+        events = self._sell_early_bird_tickets(self.event.early_booking_capacity)
+        trimmed = self.cart.trim_to_availability(events)
+        self.assertEqual(trimmed, [(self.event, 'early_bird', 0)])
+        self.assertFalse(self.cart.event_cart_item.exists())
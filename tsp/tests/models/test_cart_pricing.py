@@ -0,0 +1,95 @@
+"""Unit tests of the CartPricing class"""
+from decimal import Decimal
+from django.test import TestCase
+from tsp.models import Event, EventCartItem, Society, Student
+from tsp.pricing import CartPricing
+
+class CartPricingTestCase(TestCase):
+    """Unit tests of the CartPricing class"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/other_events.json',
+        'tsp/tests/fixtures/default_cart.json'
+    ]
+
+    def setUp(self):
+        # There are 2 early bird tickets and 1 associated society membership
+        # in cart.
+        self.student = Student.objects.get(email='johndoe@kcl.ac.uk')
+        self.cart = self.student.cart
+        self.event_cart_item = EventCartItem.objects.get(pk=25)
+        self.event = self.event_cart_item.event
+        self.society = Society.objects.get(email='tech_society@kcl.ac.uk')
+
+    def _add_event_cart_items(self):
+        for event in Event.objects.exclude(pk=self.event.pk):
+            item = EventCartItem.objects.create(
+                event=event,
+                early_bird_quantity=1,
+                standard_quantity=2
+            )
+            self.cart.event_cart_item.add(item)
+
+    def test_pricing_matches_cart(self):
+        self._add_event_cart_items()
+        pricing = CartPricing(self.cart)
+        self.assertEqual(pricing.total_price, self.cart.total_price)
+        self.assertEqual(pricing.total_saved, self.cart.total_saved)
+        self.assertEqual(pricing.count, self.cart.count)
+        self.assertEqual(pricing.ticket_count, self.cart.ticket_count)
+        self.assertEqual(pricing.membership_count, self.cart.membership_count)
+        self.assertEqual(
+            pricing.total_ticket_price_before_discount,
+            self.cart.total_ticket_price_before_discount
+        )
+        self.assertEqual(
+            pricing.total_membership_price,
+            self.cart.total_membership_price
+        )
+        self.assertEqual(pricing.discount_data, self.cart.discount_data)
+
+    def test_lines(self):
+        pricing = CartPricing(self.cart)
+        self.assertEqual(len(pricing.lines), 1)
+        line = pricing.lines[0]
+        self.assertEqual(line.item, self.event_cart_item)
+        self.assertEqual(line.early_bird_total, 2 * self.event.early_bird_price)
+        self.assertEqual(line.standard_total, Decimal('0.00'))
+        self.assertEqual(line.total, 2 * self.event.early_bird_price)
+        discount = self.event.early_bird_price * self.society.member_discount/100
+        self.assertEqual(line.discount, discount)
+
+    def test_discount_applies_to_regular_member(self):
+        self.cart.membership.clear()
+        self.assertFalse(CartPricing(self.cart).discount_data)
+        self.society.regular_member.add(self.student)
+        pricing = CartPricing(self.cart)
+        discount = self.event.early_bird_price * self.society.member_discount/100
+        self.assertEqual(pricing.discount_data[self.event_cart_item.id], discount)
+
+    def test_no_discount_for_discounted_event(self):
+        self.student.purchase_discounted_event(self.event)
+        pricing = CartPricing(self.cart)
+        self.assertFalse(pricing.discount_data)
+        self.assertEqual(pricing.total_saved, Decimal('0.00'))
+
+    def test_all_items_free(self):
+        self.event.early_bird_price = 0
+        self.event.save()
+        self.society.member_fee = 0
+        self.society.save()
+        self.assertTrue(CartPricing(self.cart).all_items_free)
+        self.cart.clear()
+        self.assertFalse(CartPricing(self.cart).all_items_free)
+
+    def test_number_of_queries_does_not_grow_with_items(self):
+        with self.assertNumQueries(5):
+            CartPricing(self.cart)
+        self._add_event_cart_items()
+        with self.assertNumQueries(5):
+            CartPricing(self.cart)
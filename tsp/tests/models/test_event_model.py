@@ -1,6 +1,6 @@
 """Unit tests of the Event model"""
 import os
-from ticket_selling_platform import settings
+from django.conf import settings
 from django.test import TestCase
 from tsp.models import Event, Society, University, Student
 from datetime import datetime
@@ -99,6 +99,23 @@ class EventModelTestCase(TestCase):
         inventory = Event.get_event_ticket_inventory(self.event, 'standard')
         self.assertEqual(inventory, 100)
 
+    def test_get_event_ticket_inventory_uses_sold_counters(self):
+        self.event.early_bird_sold = 20
+        self.event.standard_sold = 30
+        early_bird_inventory = Event.get_event_ticket_inventory(self.event, 'early_bird')
+        standard_inventory = Event.get_event_ticket_inventory(self.event, 'standard')
+        self.assertEqual(early_bird_inventory, 30)
+        self.assertEqual(standard_inventory, 70)
+
+    def test_record_tickets_sold(self):
+        Event.record_tickets_sold(self.event, 2, 3)
+        Event.record_tickets_sold(self.event, 1, 0)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, 3)
+        self.assertEqual(self.event.standard_sold, 3)
+        self.assertEqual(Event.get_event_ticket_inventory(self.event, 'early_bird'), 47)
+        self.assertEqual(Event.get_event_ticket_inventory(self.event, 'standard'), 97)
+
     def test_get_event_ticket_inventory_for_invalid_ticket_type(self):
         # Test that the method raises a ValueError when an invalid ticket type 
         # is specified.
@@ -130,3 +147,12 @@ class EventModelTestCase(TestCase):
         count_after = students.count()
         self.assertIn(self.student, students)
         self.assertEqual(count_after, count_before+1)
+
+    def test_lock_events_returns_current_events_in_id_order(self):
+        other_event = Event.objects.get(pk=self.event.pk)
+        other_event.pk = None
+        other_event.save()
+        Event.objects.filter(pk=self.event.pk).update(early_bird_sold=3)
+        events = Event.lock_events(Event.objects.order_by('-pk'))
+        self.assertEqual([event.pk for event in events], [self.event.pk, other_event.pk])
+        self.assertEqual(events[0].early_bird_sold, 3)
@@ -0,0 +1,146 @@
+"""Unit tests of the FeedEntry model"""
+from django.test import TestCase
+from django.utils import timezone
+from tsp.models import Event, FeedEntry, Society, Student
+
+class FeedEntryModelTestCase(TestCase):
+    """Unit tests of the FeedEntry model"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json'
+    ]
+
+    def setUp(self):
+        self.student = Student.objects.get(email='johndoe@kcl.ac.uk')
+        self.society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        self.other_society = Society.objects.get(email='ai_society@kcl.ac.uk')
+        self.event = Event.objects.get(pk=15)
+        self.event.society.set([self.society])
+        self.student.saved_event.clear()
+        self.student.follower.clear()
+        FeedEntry.objects.all().delete()
+
+    def _feed(self):
+        return list(Event.objects.filter(feed_entries__student=self.student))
+
+    def test_following_a_society_backfills_its_events(self):
+        self.society.add_follower(self.student)
+        self.assertEqual(self._feed(), [self.event])
+
+    def test_unfollowing_a_society_removes_its_events(self):
+        self.society.add_follower(self.student)
+        self.society.remove_follower(self.student)
+        self.assertEqual(self._feed(), [])
+
+    def test_unfollowing_a_society_keeps_saved_events(self):
+        self.society.add_follower(self.student)
+        self.student.save_event(self.event)
+        self.society.remove_follower(self.student)
+        self.assertEqual(self._feed(), [self.event])
+
+    def test_unfollowing_a_society_keeps_events_of_other_followed_societies(self):
+        self.event.society.add(self.other_society)
+        self.society.add_follower(self.student)
+        self.other_society.add_follower(self.student)
+        self.society.remove_follower(self.student)
+        self.assertEqual(self._feed(), [self.event])
+
+    def test_unfollowing_a_society_only_refreshes_its_events(self):
+        other_event = Event.objects.get(pk=self.event.pk)
+        other_event.pk = None
+        other_event.save()
+        other_event.society.set([self.other_society])
+        self.society.add_follower(self.student)
+        self.other_society.add_follower(self.student)
+        FeedEntry.objects.filter(event=other_event).delete()
+        self.student.follower.remove(self.society)
+        self.assertEqual(self._feed(), [])
+        self.assertEqual(
+            FeedEntry.get_drift(), ({(self.student.id, other_event.id)}, set())
+        )
+
+    def test_clearing_the_followed_societies_of_a_student_removes_their_events(self):
+        self.society.add_follower(self.student)
+        self.student.follower.clear()
+        self.assertEqual(self._feed(), [])
+
+    def test_clearing_the_followers_of_a_society_removes_its_events(self):
+        self.society.add_follower(self.student)
+        self.society.follower.clear()
+        self.assertEqual(self._feed(), [])
+
+    def test_clearing_the_events_of_a_society_removes_them_from_feeds(self):
+        self.society.add_follower(self.student)
+        self.society.society.clear()
+        self.assertEqual(self._feed(), [])
+
+    def test_entries_copy_the_times_and_status_of_their_event(self):
+        self.society.add_follower(self.student)
+        entry = FeedEntry.objects.get(student=self.student, event=self.event)
+        self.assertEqual(entry.start_time, self.event.start_time)
+        self.assertEqual(entry.end_time, self.event.end_time)
+        self.assertEqual(entry.status, self.event.status)
+
+    def test_saving_an_event_updates_the_copies_in_its_entries(self):
+        self.society.add_follower(self.student)
+        self.event.start_time += timezone.timedelta(days=1)
+        self.event.end_time += timezone.timedelta(days=1)
+        self.event.cancel_event()
+        self.event.save()
+        entry = FeedEntry.objects.get(student=self.student, event=self.event)
+        self.assertEqual(entry.start_time, self.event.start_time)
+        self.assertEqual(entry.end_time, self.event.end_time)
+        self.assertEqual(entry.status, Event.Status.CANCELLED)
+
+    def test_feed_is_read_from_its_index(self):
+        plan = FeedEntry.objects.filter(
+            student=self.student,
+            start_time__gt=timezone.now()
+        ).order_by('start_time', 'event_id').explain()
+        self.assertIn('tsp_feedent_student_168c7f_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_saving_an_event_adds_it_once(self):
+        self.society.add_follower(self.student)
+        self.student.save_event(self.event)
+        self.assertEqual(self._feed(), [self.event])
+
+    def test_unsaving_an_event_keeps_it_when_its_society_is_followed(self):
+        self.student.save_event(self.event)
+        self.society.add_follower(self.student)
+        self.student.unsave_event(self.event)
+        self.assertEqual(self._feed(), [self.event])
+
+    def test_unsaving_an_event_removes_it(self):
+        self.student.save_event(self.event)
+        self.student.unsave_event(self.event)
+        self.assertEqual(self._feed(), [])
+
+    def test_co_hosting_society_fans_event_out_to_its_followers(self):
+        self.other_society.add_follower(self.student)
+        self.assertEqual(self._feed(), [])
+        self.event.society.add(self.other_society)
+        self.assertEqual(self._feed(), [self.event])
+
+    def test_removing_a_society_from_an_event_removes_it_from_feeds(self):
+        self.society.add_follower(self.student)
+        self.event.society.remove(self.society)
+        self.assertEqual(self._feed(), [])
+
+    def test_refresh_repairs_drift(self):
+        self.society.add_follower(self.student)
+        FeedEntry.objects.all().delete()
+        other_event = Event.objects.get(pk=self.event.pk)
+        other_event.pk = None
+        other_event.save()
+        FeedEntry.add_entries([(self.student.id, other_event.id)])
+        missing, stale = FeedEntry.get_drift()
+        self.assertEqual(missing, {(self.student.id, self.event.id)})
+        self.assertEqual(stale, {(self.student.id, other_event.id)})
+        self.assertEqual(FeedEntry.refresh(), (1, 1))
+        self.assertEqual(self._feed(), [self.event])
+        self.assertEqual(FeedEntry.get_drift(), (set(), set()))
@@ -0,0 +1,80 @@
+"""Unit tests of the IdempotencyKey model"""
+from datetime import timedelta
+from unittest.mock import patch
+from django.http import HttpResponseRedirect, QueryDict
+from django.test import TestCase
+from django.utils import timezone
+from tsp.models import IdempotencyKey, User
+
+class IdempotencyKeyModelTestCase(TestCase):
+    """Unit tests of the IdempotencyKey model"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(pk=1)
+        self.other_user = User.objects.exclude(pk=1).first()
+        self.fingerprint = IdempotencyKey.get_fingerprint(
+            '/checkout/', QueryDict('line_1=Strand&postcode=WC2R+2LS')
+        )
+
+    def test_fingerprint_ignores_field_order_and_tokens(self):
+        fingerprint = IdempotencyKey.get_fingerprint(
+            '/checkout/',
+            QueryDict('postcode=WC2R+2LS&csrfmiddlewaretoken=abc&line_1=Strand&idempotency_key=k')
+        )
+        self.assertEqual(fingerprint, self.fingerprint)
+        self.assertEqual(len(fingerprint), 64)
+
+    def test_fingerprint_depends_on_data_and_path(self):
+        data = QueryDict('line_1=Strand&postcode=WC2R+2LS')
+        self.assertNotEqual(
+            IdempotencyKey.get_fingerprint('/cart_detail/', data), self.fingerprint
+        )
+        self.assertNotEqual(
+            IdempotencyKey.get_fingerprint('/checkout/', QueryDict('line_1=Strand')),
+            self.fingerprint
+        )
+
+    def test_begin_records_a_new_key(self):
+        record, created = IdempotencyKey.begin(self.user, 'key', self.fingerprint)
+        self.assertTrue(created)
+        self.assertFalse(record.is_complete)
+        self.assertEqual(record.fingerprint, self.fingerprint)
+
+    def test_begin_returns_the_recorded_key(self):
+        first, _ = IdempotencyKey.begin(self.user, 'key', self.fingerprint)
+        with self.assertNumQueries(1):
+            record, created = IdempotencyKey.begin(self.user, 'key', 'other')
+        self.assertFalse(created)
+        self.assertEqual(record, first)
+
+    def test_keys_are_scoped_to_the_user(self):
+        IdempotencyKey.begin(self.user, 'key', self.fingerprint)
+        _, created = IdempotencyKey.begin(self.other_user, 'key', self.fingerprint)
+        self.assertTrue(created)
+
+    def test_begin_records_an_expired_key_again(self):
+        first, _ = IdempotencyKey.begin(self.user, 'key', self.fingerprint)
+        first.complete(HttpResponseRedirect('/order_detail/1/'))
+        IdempotencyKey.objects.filter(pk=first.pk).update(
+            created_at=timezone.now() - timedelta(hours=25)
+        )
+        with patch('tsp.models.settings.IDEMPOTENCY_KEY_HOURS', 24):
+            record, created = IdempotencyKey.begin(self.user, 'key', self.fingerprint)
+        self.assertTrue(created)
+        self.assertFalse(record.is_complete)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_complete_stores_the_redirect(self):
+        record, _ = IdempotencyKey.begin(self.user, 'key', self.fingerprint)
+        record.complete(HttpResponseRedirect('/order_detail/1/'))
+        record.refresh_from_db()
+        self.assertTrue(record.is_complete)
+        self.assertEqual(record.response_status, 302)
+        self.assertEqual(record.response_location, '/order_detail/1/')
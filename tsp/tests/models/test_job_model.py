@@ -0,0 +1,101 @@
+"""Unit tests of the Job model"""
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from tsp.models import Job, Order
+
+class JobModelTestCase(TestCase):
+    """Unit tests of the Job model"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        # The default order enqueues the record_payment and issue_tickets jobs.
+        self.order = Order.objects.get(pk=29)
+        self.job = Job.objects.get(order=self.order, task='issue_tickets')
+
+    def test_order_jobs_are_enqueued(self):
+        tasks = set(Job.objects.filter(order=self.order).values_list('task', flat=True))
+        self.assertEqual(tasks, {'record_payment', 'issue_tickets'})
+        self.assertEqual(self.job.status, Job.Status.PENDING)
+        self.assertEqual(self.job.attempts, 0)
+
+    def test_enqueue_is_idempotent_per_order(self):
+        job = Job.enqueue('issue_tickets', self.order)
+        self.assertEqual(job, self.job)
+        self.assertEqual(Job.objects.filter(order=self.order).count(), 2)
+
+    def test_enqueue_stores_payload(self):
+        job = Job.enqueue('send_order_confirmation', self.order, email='johndoe@kcl.ac.uk')
+        self.assertEqual(job.payload, {'email': 'johndoe@kcl.ac.uk'})
+
+    def test_claim_next(self):
+        job = Job.claim_next()
+        self.assertEqual(job.task, 'record_payment')
+        self.assertEqual(job.status, Job.Status.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(Job.claim_next(), self.job)
+        self.assertIsNone(Job.claim_next())
+
+    def test_claim_next_skips_jobs_that_are_not_due(self):
+        Job.objects.update(run_at=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(Job.claim_next())
+
+    def test_claim_next_reclaims_abandoned_jobs(self):
+        Job.objects.exclude(pk=self.job.pk).delete()
+        Job.claim_next()
+        Job.objects.update(run_at=timezone.now() - timedelta(seconds=1))
+        job = Job.claim_next()
+        self.assertEqual(job, self.job)
+        self.assertEqual(job.attempts, 2)
+
+    def test_claim_next_fails_abandoned_jobs_out_of_attempts(self):
+        Job.objects.exclude(pk=self.job.pk).delete()
+        Job.objects.update(max_attempts=1)
+        Job.claim_next()
+        Job.objects.update(run_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(Job.claim_next())
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.Status.FAILED)
+        self.assertEqual(self.job.attempts, 1)
+        self.assertIsNotNone(self.job.finished_at)
+
+    def test_mark_succeeded(self):
+        job = Job.claim_next()
+        Job.mark_succeeded(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_mark_failed_schedules_retry_with_backoff(self):
+        job = Job.claim_next()
+        Job.mark_failed(job, 'Error')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.PENDING)
+        self.assertEqual(job.last_error, 'Error')
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=25))
+        self.assertEqual(Job.get_backoff(1), timedelta(seconds=30))
+        self.assertEqual(Job.get_backoff(3), timedelta(seconds=120))
+
+    def test_mark_failed_fails_job_after_max_attempts(self):
+        job = Job.claim_next()
+        job.max_attempts = 1
+        Job.mark_failed(job, 'Error')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_get_order_status(self):
+        self.assertEqual(Job.get_order_status(self.order), Job.Status.PENDING)
+        Job.objects.update(status=Job.Status.SUCCEEDED)
+        self.assertEqual(Job.get_order_status(self.order), Job.Status.SUCCEEDED)
+        self.job.status = Job.Status.FAILED
+        self.job.save()
+        self.assertEqual(Job.get_order_status(self.order), Job.Status.FAILED)
@@ -0,0 +1,96 @@
+"""Unit tests of the OrderLine model"""
+from decimal import Decimal
+from importlib import import_module
+from types import SimpleNamespace
+from django.apps import apps
+from django.test import TestCase
+from tsp.jobs import issue_tickets
+from tsp.pricing import PricedEventCartItem
+from tsp.models import Event, HistoricalCart, Order, OrderLine, Society, Ticket
+
+class OrderLineModelTestCase(TestCase):
+    """Unit tests of the OrderLine model"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        self.order = Order.objects.get(pk=29)
+        self.event = Event.objects.get(pk=15)
+        self.society = Society.objects.get(pk=5)
+        self.historical_cart = HistoricalCart.objects.get(order=self.order)
+
+    def test_lines_are_written_when_the_order_is_placed(self):
+        ticket_line, membership_line = self.order.lines.all()
+        self.assertEqual(ticket_line.type, OrderLine.Type.EARLY_BIRD)
+        self.assertEqual(ticket_line.event, self.event)
+        self.assertEqual(ticket_line.name, self.event.name)
+        self.assertEqual(ticket_line.location, self.event.location)
+        self.assertEqual(ticket_line.start_time, self.event.start_time)
+        self.assertEqual(ticket_line.unit_price, self.event.early_bird_price)
+        self.assertEqual(ticket_line.quantity, 2)
+        self.assertEqual(membership_line.type, OrderLine.Type.MEMBERSHIP)
+        self.assertEqual(membership_line.society, self.society)
+        self.assertEqual(membership_line.name, self.society.name)
+        self.assertEqual(membership_line.university_name, self.society.university.name)
+        self.assertEqual(membership_line.unit_price, self.society.member_fee)
+        self.assertFalse(membership_line.is_ticket)
+
+    def test_totals_match_the_historical_cart(self):
+        total_price, total_saved = OrderLine.get_totals(self.order.lines.all())
+        self.assertEqual(total_price, self.historical_cart.total_price)
+        self.assertEqual(total_saved, self.historical_cart.total_saved)
+
+    def test_discount_is_applied_to_the_standard_tickets(self):
+        item = self.historical_cart.event_cart_item.get()
+        item.standard_quantity = 1
+        pricing = SimpleNamespace(
+            lines=[PricedEventCartItem(item, Decimal('1.50'))],
+            memberships=[]
+        )
+        early_bird_line, standard_line = OrderLine.build_lines(self.order, pricing)
+        self.assertEqual(early_bird_line.discount, 0)
+        self.assertEqual(standard_line.type, OrderLine.Type.STANDARD)
+        self.assertEqual(standard_line.unit_price, self.event.standard_price)
+        self.assertEqual(standard_line.discount, Decimal('1.50'))
+        self.assertEqual(standard_line.subtotal, self.event.standard_price)
+
+    def test_lines_keep_the_event_as_bought(self):
+        name = self.event.name
+        self.event.name = 'Renamed event'
+        self.event.early_bird_price += 1
+        self.event.save()
+        line = self.order.lines.get(type=OrderLine.Type.EARLY_BIRD)
+        self.assertEqual(line.name, name)
+        self.assertEqual(line.unit_price + 1, self.event.early_bird_price)
+
+    def test_tickets_are_issued_from_the_lines(self):
+        tickets = issue_tickets(self.order)
+        line = self.order.lines.get(type=OrderLine.Type.EARLY_BIRD)
+        self.assertEqual(len(tickets), 2)
+        for ticket in Ticket.objects.filter(order=self.order):
+            self.assertEqual(ticket.order_line, line)
+            self.assertEqual(ticket.event, self.event)
+            self.assertEqual(ticket.type, 'early_bird')
+
+    def test_lines_of_existing_orders_are_populated(self):
+        issue_tickets(self.order)
+        expected = list(self.order.lines.values(
+            'type', 'event', 'society', 'name', 'unit_price', 'quantity', 'discount'
+        ))
+        Ticket.objects.update(order_line=None)
+        OrderLine.objects.all().delete()
+        migration = import_module('tsp.migrations.0011_order_lines')
+        migration.populate_order_lines(apps, None)
+        self.assertEqual(
+            list(self.order.lines.values(
+                'type', 'event', 'society', 'name', 'unit_price', 'quantity', 'discount'
+            )),
+            expected
+        )
+        self.assertFalse(Ticket.objects.filter(order_line__isnull=True).exists())
@@ -0,0 +1,166 @@
+"""Unit tests of the OutboundEmail model"""
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import TestCase
+from django.utils import timezone
+from ticket_selling_platform import settings
+from tsp.models import Event, OutboundEmail
+
+class OutboundEmailModelTestCase(TestCase):
+    """Unit tests of the OutboundEmail model"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json'
+    ]
+
+    def setUp(self):
+        self.event = Event.objects.first()
+        OutboundEmail.enqueue([
+            self._build_email(f'student{i}@kcl.ac.uk') for i in range(3)
+        ])
+
+    def _build_email(self, recipient, template='society/email/create_event_email.html'):
+        return OutboundEmail(
+            recipient=recipient,
+            subject='Subject',
+            body='Message',
+            template=template,
+            event=self.event
+        )
+
+    def test_enqueue(self):
+        self.assertEqual(OutboundEmail.objects.count(), 3)
+        self.assertEqual(
+            OutboundEmail.objects.filter(status=OutboundEmail.Status.PENDING).count(), 
+            3
+        )
+
+    def test_enqueue_skips_emails_that_are_waiting(self):
+        OutboundEmail.enqueue([
+            self._build_email('student0@kcl.ac.uk'),
+            self._build_email('student0@kcl.ac.uk', 'society/email/cancel_event_email_saver.html'),
+            self._build_email('student3@kcl.ac.uk')
+        ])
+        self.assertEqual(OutboundEmail.objects.count(), 5)
+
+    def test_enqueue_updates_emails_that_are_waiting(self):
+        email = self._build_email('student0@kcl.ac.uk')
+        email.subject = 'New subject'
+        email.body = 'New message'
+        OutboundEmail.enqueue([email])
+        self.assertEqual(OutboundEmail.objects.count(), 3)
+        waiting_email = OutboundEmail.objects.get(recipient='student0@kcl.ac.uk')
+        self.assertEqual(waiting_email.subject, 'New subject')
+        self.assertEqual(waiting_email.body, 'New message')
+        self.assertEqual(
+            OutboundEmail.objects.get(recipient='student1@kcl.ac.uk').body,
+            'Message'
+        )
+
+    def test_enqueue_while_email_is_being_sent(self):
+        sending_email = OutboundEmail.claim_batch(3)[0]
+        email = self._build_email(sending_email.recipient)
+        email.body = 'New message'
+        OutboundEmail.enqueue([email])
+        self.assertEqual(OutboundEmail.objects.count(), 4)
+        # The email being sent is left as it is
+        sending_email.refresh_from_db()
+        self.assertEqual(sending_email.status, OutboundEmail.Status.SENDING)
+        self.assertEqual(sending_email.body, 'Message')
+        # The new email waits for it
+        new_email = OutboundEmail.objects.get(
+            recipient=sending_email.recipient,
+            status=OutboundEmail.Status.PENDING
+        )
+        self.assertEqual(new_email.body, 'New message')
+        self.assertEqual(new_email.send_after, sending_email.send_after)
+        self.assertEqual(OutboundEmail.claim_batch(3), [])
+        OutboundEmail.mark_sent([sending_email])
+        OutboundEmail.objects.filter(pk=new_email.pk).update(send_after=timezone.now())
+        self.assertEqual(OutboundEmail.claim_batch(3), [new_email])
+
+    def test_enqueue_twice_while_email_is_being_sent(self):
+        sending_email = OutboundEmail.claim_batch(3)[0]
+        for body in ('New message', 'Newer message'):
+            email = self._build_email(sending_email.recipient)
+            email.body = body
+            OutboundEmail.enqueue([email])
+        new_email = OutboundEmail.objects.get(
+            recipient=sending_email.recipient,
+            status=OutboundEmail.Status.PENDING
+        )
+        self.assertEqual(new_email.body, 'Newer message')
+        self.assertEqual(OutboundEmail.objects.count(), 4)
+
+    def test_failed_email_queued_again_is_not_retried(self):
+        sending_email = OutboundEmail.claim_batch(3)[0]
+        OutboundEmail.enqueue([self._build_email(sending_email.recipient)])
+        OutboundEmail.mark_failed(sending_email, 'Error')
+        sending_email.refresh_from_db()
+        self.assertEqual(sending_email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(
+            OutboundEmail.objects.filter(
+                recipient=sending_email.recipient,
+                status=OutboundEmail.Status.PENDING
+            ).count(),
+            1
+        )
+
+    def test_enqueue_again_after_email_is_sent(self):
+        OutboundEmail.mark_sent(OutboundEmail.claim_batch(3))
+        OutboundEmail.enqueue([self._build_email('student0@kcl.ac.uk')])
+        self.assertEqual(OutboundEmail.objects.count(), 4)
+
+    def test_claim_batch(self):
+        emails = OutboundEmail.claim_batch(2)
+        self.assertEqual(len(emails), 2)
+        self.assertEqual(emails[0].status, OutboundEmail.Status.SENDING)
+        self.assertEqual(emails[0].attempts, 1)
+        self.assertEqual(len(OutboundEmail.claim_batch(2)), 1)
+        self.assertEqual(OutboundEmail.claim_batch(2), [])
+
+    def test_claim_batch_reclaims_abandoned_emails(self):
+        OutboundEmail.claim_batch(3)
+        OutboundEmail.objects.update(send_after=timezone.now() - timedelta(seconds=1))
+        emails = OutboundEmail.claim_batch(3)
+        self.assertEqual(len(emails), 3)
+        self.assertEqual(emails[0].attempts, 2)
+
+    def test_mark_sent(self):
+        OutboundEmail.mark_sent(OutboundEmail.claim_batch(1))
+        email = OutboundEmail.objects.get(status=OutboundEmail.Status.SENT)
+        self.assertIsNotNone(email.sent_at)
+
+    def test_get_send_allowance(self):
+        with patch.object(settings, 'EMAIL_SEND_RATE_PER_MINUTE', 2):
+            self.assertEqual(OutboundEmail.get_send_allowance(), 2)
+            OutboundEmail.mark_sent(OutboundEmail.claim_batch(3))
+            self.assertEqual(OutboundEmail.get_send_allowance(), 0)
+            OutboundEmail.objects.update(sent_at=timezone.now() - timedelta(minutes=2))
+            self.assertEqual(OutboundEmail.get_send_allowance(), 2)
+
+    def test_mark_failed_schedules_retry_with_backoff(self):
+        email = OutboundEmail.claim_batch(1)[0]
+        OutboundEmail.objects.exclude(pk=email.pk).delete()
+        OutboundEmail.mark_failed(email, 'Error')
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(email.last_error, 'Error')
+        backoff = email.send_after - timezone.now()
+        self.assertAlmostEqual(backoff.total_seconds(), settings.EMAIL_RETRY_BACKOFF_SECONDS, delta=5)
+
+        OutboundEmail.objects.filter(pk=email.pk).update(send_after=timezone.now())
+        email = OutboundEmail.claim_batch(1)[0]
+        OutboundEmail.mark_failed(email, 'Error')
+        email.refresh_from_db()
+        backoff = email.send_after - timezone.now()
+        self.assertAlmostEqual(backoff.total_seconds(), 2 * settings.EMAIL_RETRY_BACKOFF_SECONDS, delta=5)
+
+    def test_mark_failed_after_max_attempts(self):
+        email = OutboundEmail.claim_batch(1)[0]
+        email.attempts = settings.EMAIL_MAX_ATTEMPTS
+        OutboundEmail.mark_failed(email, 'Error')
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
@@ -0,0 +1,87 @@
+"""Unit tests of the PayoutEntry model"""
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase
+from django.utils import timezone
+from tsp.models import Order, OrderLine, PayoutEntry, Settlement, Society
+
+class PayoutEntryModelTestCase(TestCase):
+    """Unit tests of the PayoutEntry model"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        self.order = Order.objects.get(pk=29)
+        self.society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        self.other_society = Society.objects.get(email='robotics@qmw.ac.uk')
+        self.payouts = {self.society: Decimal('10.00'), self.other_society: Decimal('20.00')}
+        self.order.lines.all().delete()
+        self._add_lines(self.order, self.payouts)
+
+    def _add_lines(self, order, payouts):
+        OrderLine.objects.bulk_create([
+            OrderLine(
+                order=order,
+                type=OrderLine.Type.MEMBERSHIP,
+                society=society,
+                name=society.name,
+                unit_price=amount
+            )
+            for society, amount in payouts.items()
+        ])
+
+    def test_record_payouts(self):
+        self.assertEqual(PayoutEntry.record(self.order), self.payouts)
+        entries = PayoutEntry.objects.filter(order=self.order)
+        self.assertEqual({entry.society: entry.amount for entry in entries}, self.payouts)
+
+    def test_record_payouts_once(self):
+        PayoutEntry.record(self.order)
+        PayoutEntry.record(self.order)
+        self.assertEqual(PayoutEntry.objects.filter(order=self.order).count(), 2)
+
+    def test_payouts_keep_the_prices_as_bought(self):
+        self.society.member_fee = Decimal('99.00')
+        self.society.save()
+        PayoutEntry.record(self.order)
+        entry = PayoutEntry.objects.get(order=self.order, society=self.society)
+        self.assertEqual(entry.amount, Decimal('10.00'))
+
+    def test_free_payouts_are_not_recorded(self):
+        self.order.lines.update(unit_price=0)
+        PayoutEntry.record(self.order)
+        self.assertFalse(PayoutEntry.objects.exists())
+
+    def test_get_unsettled_totals(self):
+        now = timezone.now()
+        PayoutEntry.record(self.order)
+        other_order = Order.objects.create(student=self.order.student)
+        self._add_lines(other_order, {self.society: Decimal('5.00')})
+        PayoutEntry.record(other_order)
+        # Entries created after the end of the window are left out
+        late_order = Order.objects.create(student=self.order.student)
+        PayoutEntry.objects.create(
+            order=late_order,
+            society=self.society,
+            amount=Decimal('7.00'),
+            created_at=now + timedelta(hours=1)
+        )
+        # Settled entries are left out
+        settlement = Settlement.objects.create(
+            society=self.other_society, window_end=now
+        )
+        PayoutEntry.objects.filter(society=self.other_society).update(
+            settlement=settlement
+        )
+        self.assertEqual(
+            PayoutEntry.get_unsettled_totals(now + timedelta(minutes=1)),
+            {self.society.id: Decimal('15.00')}
+        )
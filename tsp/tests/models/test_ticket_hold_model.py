@@ -0,0 +1,112 @@
+"""Unit tests of the TicketHold model"""
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from tsp.models import Event, Cart, EventCartItem, TicketHold, TicketsSoldOut
+
+class TicketHoldModelTestCase(TestCase):
+    """Unit tests of the TicketHold model"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json'
+    ]
+
+    def setUp(self):
+        # The default event has 50 early bird and 100 standard tickets and the 
+        # default cart contains 2 early bird tickets without a hold.
+        self.event = Event.objects.get(pk=15)
+        self.cart = Cart.objects.get(student=1)
+        self.event_cart_item = EventCartItem.objects.get(pk=25)
+        self.other_event_cart_item = EventCartItem.objects.create(event=self.event)
+
+    def test_hold_tickets(self):
+        self.assertTrue(TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 3))
+        hold = TicketHold.objects.get(event_cart_item=self.event_cart_item)
+        self.assertEqual(hold.quantity, 3)
+        self.assertEqual(hold.type, 'early_bird')
+        self.assertGreater(hold.expires_at, timezone.now())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 3)
+        self.assertEqual(Event.get_event_ticket_inventory(self.event, 'early_bird'), 47)
+
+    def test_hold_more_tickets_extends_the_hold(self):
+        TicketHold.hold_tickets(self.event_cart_item, 'standard', 1)
+        TicketHold.objects.update(expires_at=timezone.now() + timedelta(minutes=1))
+        TicketHold.hold_tickets(self.event_cart_item, 'standard', 2)
+        hold = TicketHold.objects.get(event_cart_item=self.event_cart_item)
+        self.assertEqual(hold.quantity, 3)
+        self.assertGreater(hold.expires_at, timezone.now() + timedelta(minutes=10))
+
+    def test_hold_tickets_fails_when_sold_out(self):
+        self.assertTrue(TicketHold.hold_tickets(self.other_event_cart_item, 'early_bird', 49))
+        self.assertFalse(TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 2))
+        self.assertFalse(TicketHold.objects.filter(event_cart_item=self.event_cart_item).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 49)
+
+    def test_hold_tickets_releases_expired_holds_when_sold_out(self):
+        TicketHold.hold_tickets(self.other_event_cart_item, 'early_bird', 50)
+        TicketHold.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertTrue(TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 2))
+        self.assertFalse(TicketHold.objects.filter(event_cart_item=self.other_event_cart_item).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 2)
+
+    def test_release_tickets(self):
+        TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 3)
+        TicketHold.release_tickets(self.event_cart_item, 'early_bird', 1)
+        self.assertEqual(TicketHold.objects.get(event_cart_item=self.event_cart_item).quantity, 2)
+        TicketHold.release_tickets(self.event_cart_item, 'early_bird', 5)
+        self.assertFalse(TicketHold.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 0)
+
+    def test_release_expired(self):
+        TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 3)
+        TicketHold.hold_tickets(self.other_event_cart_item, 'standard', 4)
+        TicketHold.objects.filter(type='standard').update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(TicketHold.release_expired(self.event), 1)
+        self.assertEqual(TicketHold.release_expired(self.event), 0)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 3)
+        self.assertEqual(self.event.standard_held, 0)
+
+    def test_deleting_event_cart_item_releases_its_holds(self):
+        TicketHold.hold_tickets(self.other_event_cart_item, 'standard', 4)
+        self.other_event_cart_item.delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.standard_held, 0)
+        self.assertFalse(TicketHold.objects.exists())
+
+    def test_claim_tickets_converts_holds_into_sold_tickets(self):
+        TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 2)
+        TicketHold.claim_tickets(self.event_cart_item)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 0)
+        self.assertEqual(self.event.early_bird_sold, 2)
+        self.assertFalse(TicketHold.objects.exists())
+
+    def test_claim_tickets_takes_tickets_without_a_hold_from_inventory(self):
+        TicketHold.claim_tickets(self.event_cart_item)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 0)
+        self.assertEqual(self.event.early_bird_sold, 2)
+
+    def test_claim_tickets_fails_when_tickets_are_held_by_others(self):
+        TicketHold.hold_tickets(self.other_event_cart_item, 'early_bird', 49)
+        with self.assertRaises(TicketsSoldOut):
+            TicketHold.claim_tickets(self.event_cart_item)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_held, 49)
+        self.assertEqual(self.event.early_bird_sold, 0)
+
+    def test_get_quantity_held(self):
+        TicketHold.hold_tickets(self.event_cart_item, 'early_bird', 3)
+        TicketHold.hold_tickets(self.other_event_cart_item, 'early_bird', 4)
+        self.assertEqual(TicketHold.get_quantity_held(self.cart, self.event, 'early_bird'), 3)
+        self.assertEqual(TicketHold.get_quantity_held(self.cart, self.event, 'standard'), 0)
@@ -2,6 +2,7 @@
 from django.test import TestCase
 from decimal import Decimal
 from tsp.models import Payment, Order, Student, HistoricalCart, Ticket, Event
+from tsp.jobs import run_pending_jobs
 
 class PaymentModelTestCase(TestCase):
     """Unit tests of the Ticket model"""
@@ -15,6 +16,8 @@ class PaymentModelTestCase(TestCase):
     ]
 
     def setUp(self):
+        # Run the jobs that process the default order.
+        run_pending_jobs()
         self.student = Student.objects.get(email='johndoe@kcl.ac.uk')
         self.order = Order.objects.get(pk=29)
         self.payment = Payment.objects.get(order=self.order)
@@ -0,0 +1,57 @@
+"""Test runner that points the Stripe API at a local fake Stripe server"""
+import os
+import shutil
+import tempfile
+import unittest
+import stripe
+from django.conf import settings
+from django.core.cache import cache
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from tsp.fake_stripe import FakeStripeServer
+
+class CacheClearingTestResult:
+    """
+    Test result mixin that clears the cache before each test, as the cache
+    outlives the rolled back transactions of the tests.
+    """
+
+    def startTest(self, test):
+        cache.clear()
+        super().startTest(test)
+
+class FakeStripeTestRunner(DiscoverRunner):
+    """
+    Test runner that starts a fake Stripe server for the whole test run, so
+    that the tests make no network calls. The cache is cleared before each
+    test. Uploaded files are written to a temporary media directory, removed
+    at the end of the run, rather than to the static files of the project.
+    """
+
+    def get_resultclass(self):
+        resultclass = super().get_resultclass() or unittest.TextTestResult
+        return type(
+            'CacheClearingTestResult',
+            (CacheClearingTestResult, resultclass),
+            {}
+        )
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.fake_stripe = FakeStripeServer().start()
+        self.api_base = stripe.api_base
+        stripe.api_base = self.fake_stripe.url
+        self.media_root = tempfile.mkdtemp(prefix='tsp_media_')
+        shutil.copy(
+            os.path.join(settings.MEDIA_ROOT, 'default_event_photo.jpg'),
+            self.media_root
+        )
+        self.test_settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        stripe.api_base = self.api_base
+        self.fake_stripe.stop()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,90 @@
+"""Unit tests of the cached tickets left for events"""
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase
+from tsp import caching
+from tsp.availability import get_tickets_left
+from tsp.jobs import issue_tickets
+from tsp.models import Event, Order
+
+class AvailabilityTestCase(TestCase):
+    """Unit tests of the cached tickets left for events"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/other_events.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.get(pk=15)
+
+    def _get_expected(self, event):
+        return {
+            'early_bird': max(Event.get_event_ticket_inventory(event, 'early_bird'), 0),
+            'standard': max(Event.get_event_ticket_inventory(event, 'standard'), 0),
+        }
+
+    def test_get_tickets_left_of_many_events_in_one_query(self):
+        events = list(Event.objects.all())
+        with self.assertNumQueries(1):
+            tickets_left = get_tickets_left([event.id for event in events])
+        self.assertEqual(
+            tickets_left,
+            {event.id: self._get_expected(event) for event in events}
+        )
+
+    def test_cached_tickets_left_cost_no_query(self):
+        get_tickets_left([self.event.id])
+        with self.assertNumQueries(0):
+            tickets_left = get_tickets_left([self.event.id])
+        self.assertEqual(tickets_left, {self.event.id: self._get_expected(self.event)})
+
+    def test_unknown_events_are_left_out(self):
+        self.assertEqual(get_tickets_left([999999]), {})
+
+    def test_unknown_events_write_nothing_to_the_cache(self):
+        get_tickets_left([999998, 999999])
+        self.assertEqual(
+            caching.get_versions(
+                [caching.availability_namespace(999998), caching.availability_namespace(999999)],
+                create=False
+            ),
+            [None, None]
+        )
+
+    def test_events_given_a_version_concurrently_are_not_cached(self):
+        namespace = caching.availability_namespace(self.event.id)
+        add_versions = caching.add_versions
+
+        def bump_then_add_versions(namespaces):
+            caching.bump_namespaces(namespace)
+            return add_versions(namespaces)
+
+        with patch('tsp.caching.add_versions', side_effect=bump_then_add_versions):
+            get_tickets_left([self.event.id])
+        with self.assertNumQueries(1):
+            get_tickets_left([self.event.id])
+
+    def test_issuing_tickets_refreshes_the_tickets_left(self):
+        get_tickets_left([self.event.id])
+        Event.objects.filter(pk=self.event.pk).update(standard_sold=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            issue_tickets(Order.objects.get(pk=29))
+        self.event.refresh_from_db()
+        with self.assertNumQueries(1):
+            tickets_left = get_tickets_left([self.event.id])
+        self.assertEqual(tickets_left[self.event.id], self._get_expected(self.event))
+
+    def test_lookups_are_counted_in_the_stats(self):
+        caching.stats.reset()
+        get_tickets_left([self.event.id])
+        get_tickets_left([self.event.id])
+        stats = caching.stats.snapshot()['availability']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
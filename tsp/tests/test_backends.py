@@ -0,0 +1,54 @@
+"""Unit tests of the role authentication backend"""
+from django.test import TestCase
+from django.urls import reverse
+from tsp.backends import RoleModelBackend
+from tsp.models import Society, Student, StudentUnion, User
+
+class RoleModelBackendTestCase(TestCase):
+    """Unit tests of the role authentication backend"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json'
+    ]
+
+    def setUp(self):
+        self.backend = RoleModelBackend()
+
+    def test_get_user_loads_student_with_university_in_one_query(self):
+        student = Student.objects.select_related('university').get(
+            email='johndoe@kcl.ac.uk'
+        )
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(student.pk)
+            self.assertIsInstance(user, Student)
+            self.assertEqual(user.first_name, student.first_name)
+            self.assertEqual(user.university.name, student.university.name)
+
+    def test_get_user_loads_society(self):
+        society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        user = self.backend.get_user(society.pk)
+        self.assertIsInstance(user, Society)
+        self.assertEqual(user.name, society.name)
+
+    def test_get_user_loads_student_union(self):
+        student_union = StudentUnion.objects.get(email='kclsu@kcl.ac.uk')
+        user = self.backend.get_user(student_union.pk)
+        self.assertIsInstance(user, StudentUnion)
+
+    def test_get_user_loads_user_without_role_object(self):
+        admin = User.objects.create_user(
+            email='admin@kcl.ac.uk', 
+            password='Password123',
+            is_superuser=True
+        )
+        user = self.backend.get_user(admin.pk)
+        self.assertIs(type(user), User)
+
+    def test_get_user_returns_none_for_unknown_user(self):
+        self.assertIsNone(self.backend.get_user(0))
+
+    def test_request_user_is_role_object(self):
+        self.client.login(email='johndoe@kcl.ac.uk', password='Password123')
+        response = self.client.get(reverse('all_events'))
+        self.assertIsInstance(response.wsgi_request.user, Student)
@@ -0,0 +1,58 @@
+"""Unit tests of the broadcast message renderer"""
+from django.test import RequestFactory, TestCase
+from django.utils.html import conditional_escape
+from tsp.broadcast import BroadcastMessage, PLACEHOLDER_PATTERN, _RecipientPlaceholder
+from tsp.models import Event, Student
+from tsp.views.helpers import send_event_message
+
+class BroadcastMessageTestCase(TestCase):
+    """Unit tests of the broadcast message renderer"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.event = Event.objects.get(pk=15)
+        self.request = RequestFactory().get('/')
+        self.recipients = list(Student.objects.all())
+
+    def test_messages_match_per_recipient_rendering(self):
+        for template in [
+            'society/email/create_event_email.html',
+            'society/email/modify_event_email_buyer.html',
+            'society/email/cancel_event_email_saver.html'
+        ]:
+            message = BroadcastMessage.render(template, {
+                'domain': 'testserver',
+                'event': self.event,
+                'protocol': 'http'
+            })
+            for recipient in self.recipients:
+                self.assertEqual(
+                    message.personalise(recipient),
+                    send_event_message(self.request, recipient, self.event, template)
+                )
+
+    def test_parts_hold_recipient_attributes(self):
+        message = BroadcastMessage.render('society/email/create_event_email.html', {
+            'domain': 'testserver',
+            'event': self.event,
+            'protocol': 'http'
+        })
+        self.assertEqual(message.parts[1], 'full_name')
+        self.assertIn(self.event.name, message.parts[2])
+
+    def test_escaped_attributes_are_escaped_for_every_recipient(self):
+        placeholder = _RecipientPlaceholder()
+        parts = PLACEHOLDER_PATTERN.split(
+            f'Hi {conditional_escape(placeholder.first_name)}, {placeholder.last_name}!'
+        )
+        self.assertEqual(parts[1], 'first_name|escape')
+        message = BroadcastMessage(parts)
+        student = Student(first_name='<b>John</b>', last_name='<i>Doe</i>')
+        self.assertEqual(message.personalise(student), 'Hi &lt;b&gt;John&lt;/b&gt;, <i>Doe</i>!')
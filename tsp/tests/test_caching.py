@@ -0,0 +1,88 @@
+"""Unit tests of the versioned namespaces of cached data"""
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from tsp import caching
+
+class CachingTestCase(SimpleTestCase):
+    """Unit tests of the versioned namespaces of cached data"""
+
+    def setUp(self):
+        cache.clear()
+        caching.stats.reset()
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return f'value {self.calls}'
+
+    def _get_or_set(self, namespaces=('events:university:1',), parts=('a',)):
+        return caching.get_or_set('test', list(namespaces), list(parts), self._compute, 60)
+
+    def test_versions_of_a_namespace_are_kept(self):
+        versions = caching.get_versions(['first', 'second'])
+        self.assertEqual(caching.get_versions(['first', 'second']), versions)
+
+    def test_bump_changes_the_version_of_a_namespace_only(self):
+        first, second = caching.get_versions(['first', 'second'])
+        caching.bump_namespaces('first')
+        new_first, new_second = caching.get_versions(['first', 'second'])
+        self.assertGreater(new_first, first)
+        self.assertEqual(new_second, second)
+
+    def test_bump_changes_the_versions_of_many_namespaces(self):
+        first, second = caching.get_versions(['first', 'second'])
+        caching.bump_namespaces('first', 'second')
+        new_first, new_second = caching.get_versions(['first', 'second'])
+        self.assertGreater(new_first, first)
+        self.assertGreater(new_second, second)
+
+    def test_get_versions_without_creating_them(self):
+        self.assertEqual(caching.get_versions(['first'], create=False), [None])
+        version = caching.get_versions(['first'])[0]
+        self.assertEqual(caching.get_versions(['first'], create=False), [version])
+
+    def test_add_versions_leaves_out_namespaces_with_a_version(self):
+        version = caching.get_versions(['first'])[0]
+        added = caching.add_versions(['first', 'second'])
+        self.assertEqual(list(added), ['second'])
+        self.assertEqual(caching.get_versions(['first', 'second']), [version, added['second']])
+
+    def test_bump_a_namespace_without_version(self):
+        caching.bump_namespaces('first')
+        version = caching.get_versions(['first'])
+        self.assertEqual(caching.get_versions(['first']), version)
+
+    def test_get_or_set_computes_the_value_once(self):
+        self.assertEqual(self._get_or_set(), 'value 1')
+        self.assertEqual(self._get_or_set(), 'value 1')
+        self.assertEqual(self.calls, 1)
+
+    def test_get_or_set_keys_on_the_parts(self):
+        self.assertEqual(self._get_or_set(parts=['a']), 'value 1')
+        self.assertEqual(self._get_or_set(parts=['b']), 'value 2')
+
+    def test_bump_makes_the_values_of_a_namespace_stale(self):
+        self._get_or_set()
+        caching.bump_namespaces(caching.events_namespace(1))
+        self.assertEqual(self._get_or_set(), 'value 2')
+
+    def test_bump_keeps_the_values_of_other_namespaces(self):
+        self._get_or_set()
+        caching.bump_namespaces(caching.events_namespace(2))
+        self.assertEqual(self._get_or_set(), 'value 1')
+
+    def test_stats_count_hits_and_misses(self):
+        self._get_or_set()
+        self._get_or_set()
+        self._get_or_set()
+        stats = caching.stats.snapshot()['test']
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hit_ratio'], 2 / 3)
+        self.assertGreaterEqual(stats['hit_ms'], 0)
+        self.assertGreaterEqual(stats['miss_ms'], 0)
+
+    def test_reset_forgets_the_stats(self):
+        self._get_or_set()
+        caching.stats.reset()
+        self.assertEqual(caching.stats.snapshot(), {})
@@ -0,0 +1,170 @@
+"""Unit tests of the invalidation of cached data when models change"""
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tsp import caching, invalidation
+from tsp.models import EventCartItem, Event, Society, Student, Ticket, User
+
+class InvalidationTestCase(TestCase):
+    """Unit tests of the invalidation of cached data when models change"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        invalidation.log.clear()
+        self.student = Student.objects.get(email='johndoe@kcl.ac.uk')
+        self.society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        self.event = Event.objects.get(pk=15)
+        self.university_id = self.student.university_id
+
+    def _follow_society(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.society.follower.add(self.student)
+        invalidation.log.clear()
+
+    def _get_invalidated(self, change):
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        return set().union(*(entry['namespaces'] for entry in invalidation.log.recent()))
+
+    def test_invalidations_are_bumped_once_the_transaction_commits(self):
+        namespace = caching.events_namespace(self.university_id)
+        version = caching.get_versions([namespace])[0]
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.event.save()
+            self.assertEqual(caching.get_versions([namespace])[0], version)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertGreater(caching.get_versions([namespace])[0], version)
+
+    def test_invalidations_of_a_transaction_are_coalesced(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.event.save()
+            self.event.save()
+            Ticket.objects.create(event=self.event, type=Ticket.Type.STANDARD)
+        self.assertEqual(len(callbacks), 1)
+        entries = invalidation.log.recent()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['namespaces'], sorted([
+            caching.availability_namespace(self.event.pk),
+            caching.events_namespace(self.university_id),
+        ]))
+        self.assertEqual(entries[0]['reasons'][0], 'Event 15 saved')
+
+    def test_invalidations_of_a_rolled_back_transaction_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                self.event.save()
+                transaction.set_rollback(True)
+            Ticket.objects.create(event=self.event, type=Ticket.Type.STANDARD)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            invalidation.log.recent()[0]['namespaces'],
+            [caching.availability_namespace(self.event.pk)]
+        )
+
+    def test_saving_an_event_invalidates_its_lists_and_availability(self):
+        self._follow_society()
+        namespaces = self._get_invalidated(self.event.save)
+        self.assertEqual(namespaces, {
+            caching.events_namespace(self.university_id),
+            caching.availability_namespace(self.event.pk),
+        })
+
+    def test_deleting_an_event_invalidates_its_lists(self):
+        namespaces = self._get_invalidated(self.event.delete)
+        self.assertIn(caching.events_namespace(self.university_id), namespaces)
+
+    def test_clearing_the_societies_of_an_event_invalidates_their_lists(self):
+        namespaces = self._get_invalidated(self.event.society.clear)
+        self.assertEqual(namespaces, {caching.events_namespace(self.university_id)})
+
+    def test_adding_events_to_a_society_invalidates_its_lists(self):
+        other_society = Society.objects.get(email='robotics@qmw.ac.uk')
+        namespaces = self._get_invalidated(lambda: other_society.society.add(self.event))
+        self.assertEqual(namespaces, {caching.events_namespace(other_society.university_id)})
+
+    def test_saving_a_society_invalidates_its_lists(self):
+        namespaces = self._get_invalidated(self.society.save)
+        self.assertEqual(namespaces, {
+            caching.societies_namespace(self.university_id),
+            caching.events_namespace(self.university_id),
+        })
+
+    def test_logging_in_as_a_society_invalidates_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.login(email=self.society.email, password='Password123')
+        self.assertEqual(callbacks, [])
+
+    def test_following_a_society_invalidates_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.student.follower.add(self.society)
+        self.assertEqual(callbacks, [])
+
+    def test_saving_a_ticket_invalidates_the_availability_of_its_event(self):
+        namespaces = self._get_invalidated(
+            lambda: Ticket.objects.create(event=self.event, type=Ticket.Type.STANDARD)
+        )
+        self.assertEqual(namespaces, {caching.availability_namespace(self.event.pk)})
+
+    def test_saving_an_event_cart_item_invalidates_its_availability(self):
+        item = EventCartItem.objects.get(pk=25)
+        namespaces = self._get_invalidated(item.save)
+        self.assertEqual(namespaces, {caching.availability_namespace(item.event_id)})
+
+    def test_deleting_an_event_cart_item_invalidates_its_availability(self):
+        item = EventCartItem.objects.get(pk=25)
+        namespaces = self._get_invalidated(item.delete)
+        self.assertEqual(namespaces, {caching.availability_namespace(item.event_id)})
+
+class InvalidationsViewTestCase(TestCase):
+    """Unit tests of the debugging view of the latest invalidations"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json'
+    ]
+
+    def setUp(self):
+        invalidation.log.clear()
+        self.url = reverse('debug_invalidations')
+        self.superuser = User.objects.create_user(
+            email='admin@kcl.ac.uk',
+            password='Password123',
+            is_superuser=True
+        )
+
+    def test_url(self):
+        self.assertEqual(self.url, '/debug/invalidations/')
+
+    def test_get_lists_the_latest_invalidations(self):
+        invalidation.log.record(['event:15'], ['Event 15 saved'])
+        self.client.login(email=self.superuser.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        entries = response.json()['invalidations']
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['namespaces'], ['event:15'])
+        self.assertEqual(entries[0]['reasons'], ['Event 15 saved'])
+        self.assertIn('cache_stats', response.json())
+
+    def test_get_redirects_other_users(self):
+        self.client.login(email='johndoe@kcl.ac.uk', password='Password123')
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('landing'), status_code=302, target_status_code=200)
+
+    @override_settings(DEBUG=True)
+    def test_get_is_open_to_every_user_in_debug(self):
+        self.client.login(email='johndoe@kcl.ac.uk', password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,57 @@
+"""Unit tests of the bulk mail dispatcher"""
+from unittest.mock import MagicMock
+from django.core import mail
+from django.test import TestCase
+from tsp.mail import build_email, send_bulk_mail
+
+class BulkMailTestCase(TestCase):
+    """Unit tests of the bulk mail dispatcher"""
+
+    def setUp(self):
+        self.emails = [
+            build_email(f'student{i}@kcl.ac.uk', 'Subject', f'Message {i}')
+            for i in range(5)
+        ]
+
+    def test_build_email(self):
+        email = build_email('johndoe@kcl.ac.uk', 'Subject', 'Message')
+        self.assertEqual(email.to, ['johndoe@kcl.ac.uk'])
+        self.assertEqual(email.subject, 'Subject')
+        self.assertEqual(email.body, 'Message')
+
+    def test_send_bulk_mail(self):
+        result = send_bulk_mail(self.emails, chunk_size=2)
+        self.assertTrue(result.all_sent)
+        self.assertEqual(result.sent_count, 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[3].to, ['student3@kcl.ac.uk'])
+        self.assertEqual(mail.outbox[3].body, 'Message 3')
+
+    def test_connection_is_opened_once_per_chunk(self):
+        connection = MagicMock()
+        send_bulk_mail(self.emails, chunk_size=2, connection=connection)
+        self.assertEqual(connection.open.call_count, 3)
+        self.assertEqual(connection.close.call_count, 3)
+        self.assertEqual(connection.send_messages.call_count, 5)
+
+    def test_failed_recipients_are_reported(self):
+        connection = MagicMock()
+        def send_messages(emails):
+            if emails[0].to == ['student1@kcl.ac.uk']:
+                raise Exception('Recipient refused')
+            return 1
+        connection.send_messages.side_effect = send_messages
+        result = send_bulk_mail(self.emails, connection=connection)
+        self.assertFalse(result.all_sent)
+        self.assertEqual(result.sent_count, 4)
+        self.assertEqual(result.failed, {'student1@kcl.ac.uk': 'Recipient refused'})
+
+    def test_chunk_fails_when_connection_cannot_be_opened(self):
+        connection = MagicMock()
+        connection.open.side_effect = [Exception('Connection refused'), True, True]
+        result = send_bulk_mail(self.emails, chunk_size=2, connection=connection)
+        self.assertEqual(result.sent_count, 3)
+        self.assertEqual(
+            set(result.failed), 
+            {'student0@kcl.ac.uk', 'student1@kcl.ac.uk'}
+        )
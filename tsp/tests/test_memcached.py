@@ -0,0 +1,114 @@
+"""Unit tests of the memcached cache backend against the fake memcached server"""
+import time
+from datetime import date
+from django.test import SimpleTestCase
+from tsp.fake_memcached import FakeMemcachedServer
+from tsp.memcached import MemcachedCache
+
+class MemcachedCacheTestCase(SimpleTestCase):
+    """Unit tests of the memcached cache backend"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fake_memcached = FakeMemcachedServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake_memcached.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.fake_memcached.reset()
+        self.cache = MemcachedCache(
+            self.fake_memcached.location,
+            {'OPTIONS': {'pool_size': 2}}
+        )
+
+    def test_set_and_get_a_value(self):
+        self.cache.set('key', {'name': 'Tech Talk', 'date': date(2025, 1, 1)})
+        self.assertEqual(
+            self.cache.get('key'),
+            {'name': 'Tech Talk', 'date': date(2025, 1, 1)}
+        )
+
+    def test_get_a_missing_value_returns_the_default(self):
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+
+    def test_get_many_values_in_one_command(self):
+        self.cache.set('first', 1)
+        self.cache.set('second', 'two')
+        values = self.cache.get_many(['first', 'second', 'missing'])
+        self.assertEqual(values, {'first': 1, 'second': 'two'})
+        self.assertEqual(self.fake_memcached.count_commands('get'), 1)
+
+    def test_set_many_values_over_one_connection(self):
+        self.cache.set_many({'first': 1, 'second': 'two'}, timeout=None)
+        self.assertEqual(
+            self.cache.get_many(['first', 'second']),
+            {'first': 1, 'second': 'two'}
+        )
+        self.assertEqual(self.fake_memcached.count_commands('set'), 2)
+        self.assertEqual(self.cache._pool.qsize(), 1)
+
+    def test_add_does_not_replace_a_value(self):
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.assertEqual(self.cache.get('key'), 'first')
+
+    def test_incr_and_decr_on_the_server(self):
+        self.cache.set('counter', 10)
+        self.assertEqual(self.cache.incr('counter'), 11)
+        self.assertEqual(self.cache.incr('counter', 5), 16)
+        self.assertEqual(self.cache.decr('counter', 6), 10)
+        self.assertEqual(self.cache.get('counter'), 10)
+        self.assertEqual(self.fake_memcached.count_commands('get'), 1)
+
+    def test_incr_of_a_missing_value_raises_an_error(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_delete_a_value(self):
+        self.cache.set('key', 'value')
+        self.assertTrue(self.cache.delete('key'))
+        self.assertFalse(self.cache.delete('key'))
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_value_expires_after_its_timeout(self):
+        self.cache.set('key', 'value', timeout=1)
+        self.assertEqual(self.cache.get('key'), 'value')
+        time.sleep(1.1)
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_value_with_no_timeout_never_expires(self):
+        self.cache.set('key', 'value', timeout=None)
+        key = self.cache.make_key('key')
+        self.assertIsNone(self.fake_memcached.values[key][2])
+
+    def test_value_with_a_zero_timeout_is_not_kept(self):
+        self.cache.set('key', 'value', timeout=0)
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_touch_changes_the_timeout(self):
+        self.cache.set('key', 'value', timeout=1)
+        self.assertTrue(self.cache.touch('key', timeout=None))
+        time.sleep(1.1)
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertFalse(self.cache.touch('missing'))
+
+    def test_clear_removes_every_value(self):
+        self.cache.set_many({'first': 1, 'second': 2})
+        self.cache.clear()
+        self.assertEqual(self.cache.get_many(['first', 'second']), {})
+
+    def test_connections_are_reused(self):
+        for index in range(5):
+            self.cache.set(f'key{index}', index)
+        self.assertEqual(self.cache._pool.qsize(), 1)
+
+    def test_backend_timeout_is_a_timestamp_after_30_days(self):
+        timeout = 31 * 24 * 60 * 60
+        self.assertGreater(self.cache.get_backend_timeout(timeout), time.time())
+        self.assertEqual(self.cache.get_backend_timeout(60), 60)
+        self.assertEqual(self.cache.get_backend_timeout(None), 0)
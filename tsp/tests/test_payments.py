@@ -0,0 +1,243 @@
+"""Unit tests of the Stripe gateway against the fake Stripe server"""
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+import stripe
+from django.core.cache import cache
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from ticket_selling_platform import settings
+from tsp import payments
+from tsp.fake_stripe import FakeStripeServer
+from tsp.jobs import run_pending_jobs
+from tsp.models import Event, Order, Payment, PayoutEntry, Society, User
+
+class FakeStripeTestCase(TestCase):
+    """Test case running against its own fake Stripe server"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fake_stripe = FakeStripeServer().start()
+        cls.api_base = stripe.api_base
+        stripe.api_base = cls.fake_stripe.url
+
+    @classmethod
+    def tearDownClass(cls):
+        stripe.api_base = cls.api_base
+        cls.fake_stripe.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.fake_stripe.reset()
+        payments.circuit_breaker.reset()
+        cache.clear()
+        # Retry without waiting
+        backoff_patcher = patch.object(settings, 'STRIPE_RETRY_BACKOFF_SECONDS', 0)
+        backoff_patcher.start()
+        self.addCleanup(backoff_patcher.stop)
+
+class PaymentGatewayTestCase(FakeStripeTestCase):
+    """Unit tests of the Stripe gateway"""
+
+    def _create_customer(self):
+        return payments.create_customer('John Doe', 'johndoe@kcl.ac.uk', 'pm_card_visa')
+
+    def test_stripe_uses_the_pooled_client(self):
+        self.assertIs(stripe.default_http_client, payments.http_client)
+        self.assertEqual(stripe.max_network_retries, 0)
+
+    def test_create_customer_attaches_the_payment_method_in_one_call(self):
+        customer = self._create_customer()
+        self.assertEqual(self.fake_stripe.requests, [('POST', '/v1/customers')])
+        self.assertEqual(
+            customer.invoice_settings.default_payment_method.id, 'pm_card_visa'
+        )
+        self.assertEqual(
+            self.fake_stripe.objects['pm_card_visa']['customer'], customer.id
+        )
+
+    def test_payment_method_of_a_new_customer_is_cached(self):
+        customer = self._create_customer()
+        payment_method = payments.get_default_payment_method(customer.id)
+        self.assertEqual(
+            payment_method,
+            {'id': 'pm_card_visa', 'brand': 'visa', 'last4': '4242'}
+        )
+        self.assertEqual(self.fake_stripe.count_requests(), 1)
+
+    def test_payment_method_is_retrieved_in_one_call(self):
+        customer = self._create_customer()
+        cache.clear()
+        payment_method = payments.get_default_payment_method(customer.id)
+        self.assertEqual(payment_method['last4'], '4242')
+        self.assertEqual(self.fake_stripe.count_requests('GET'), 1)
+        payments.get_default_payment_method(customer.id)
+        self.assertEqual(self.fake_stripe.count_requests('GET'), 1)
+
+    def test_rate_limited_call_is_retried(self):
+        self.fake_stripe.fail_next(429)
+        customer = self._create_customer()
+        self.assertEqual(self.fake_stripe.count_requests('POST', '/v1/customers'), 2)
+        self.assertTrue(customer.id.startswith('cus_'))
+        self.assertEqual(len(self.fake_stripe.objects), 2)
+
+    @patch.object(settings, 'STRIPE_RETRY_BACKOFF_SECONDS', 1)
+    def test_retries_back_off_with_jitter(self):
+        self.fake_stripe.fail_next(429, settings.STRIPE_MAX_RETRIES)
+        with patch('tsp.payments.time.sleep') as sleep:
+            self._create_customer()
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), settings.STRIPE_MAX_RETRIES)
+        for attempt, delay in enumerate(delays):
+            self.assertLessEqual(0, delay)
+            self.assertLessEqual(delay, 2 ** attempt)
+
+    def test_call_fails_after_its_retries(self):
+        self.fake_stripe.fail_next(429, settings.STRIPE_MAX_RETRIES + 1)
+        with self.assertRaises(stripe.error.RateLimitError):
+            self._create_customer()
+        self.assertEqual(
+            self.fake_stripe.count_requests(), settings.STRIPE_MAX_RETRIES + 1
+        )
+
+    def test_retried_call_is_not_repeated(self):
+        customer = payments.call(stripe.Customer.create, idempotency_key='checkout-1')
+        retried = payments.call(stripe.Customer.create, idempotency_key='checkout-1')
+        self.assertEqual(retried.id, customer.id)
+        self.assertEqual(len(self.fake_stripe.objects), 1)
+
+    @patch.object(settings, 'STRIPE_MAX_RETRIES', 0)
+    def test_call_times_out(self):
+        self.fake_stripe.latency = 0.5
+        try:
+            with self.assertRaises(stripe.error.APIConnectionError):
+                payments.call(stripe.Customer.retrieve, 'cus_test', timeout=0.05)
+        finally:
+            self.fake_stripe.latency = 0
+        self.assertIsNone(payments.http_client._thread_local.timeout)
+        # Wait for the server to answer the abandoned request
+        deadline = time.monotonic() + 5
+        while not self.fake_stripe.requests and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def test_circuit_opens_after_consecutive_outages(self):
+        threshold = settings.STRIPE_CIRCUIT_FAILURE_THRESHOLD
+        self.fake_stripe.fail_next(500, threshold)
+        for _ in range(threshold):
+            with self.assertRaises(stripe.error.APIError):
+                self._create_customer()
+        with self.assertRaises(payments.PaymentGatewayUnavailable):
+            self._create_customer()
+        self.assertEqual(self.fake_stripe.count_requests(), threshold)
+
+    def test_circuit_closes_after_a_successful_call(self):
+        threshold = settings.STRIPE_CIRCUIT_FAILURE_THRESHOLD
+        self.fake_stripe.fail_next(500, threshold)
+        for _ in range(threshold):
+            with self.assertRaises(stripe.error.APIError):
+                self._create_customer()
+        with patch.object(payments.circuit_breaker, 'reset_seconds', 0):
+            self._create_customer()
+        self.assertFalse(payments.circuit_breaker.is_open)
+        self.assertEqual(payments.circuit_breaker.failures, 0)
+
+    def test_card_errors_do_not_open_the_circuit(self):
+        for _ in range(settings.STRIPE_CIRCUIT_FAILURE_THRESHOLD):
+            with self.assertRaises(stripe.error.InvalidRequestError):
+                payments.call(stripe.Customer.retrieve, 'cus_missing')
+        self.assertFalse(payments.circuit_breaker.is_open)
+
+    def test_create_and_update_account(self):
+        account = payments.create_account(type='custom', country='GB')
+        payments.update_account(
+            account.id,
+            tos_acceptance={'date': 1700000000, 'ip': '127.0.0.1'}
+        )
+        account = stripe.Account.retrieve(account.id)
+        self.assertEqual(account.country, 'GB')
+        self.assertEqual(account.tos_acceptance.ip, '127.0.0.1')
+
+    def test_charge_order_charges_once(self):
+        customer = self._create_customer()
+        order = SimpleNamespace(id=1, customer_id=customer.id)
+        payments.charge_order(order, Decimal('12.50'))
+        payments.charge_order(order, Decimal('12.50'))
+        intents = [
+            obj for obj in self.fake_stripe.objects.values()
+            if obj['object'] == 'payment_intent'
+        ]
+        self.assertEqual(len(intents), 1)
+        self.assertEqual(intents[0]['amount'], 1250)
+        self.assertEqual(intents[0]['status'], 'succeeded')
+
+    def test_free_order_is_not_charged(self):
+        payments.charge_order(SimpleNamespace(id=1, customer_id='cus_test'), 0)
+        self.assertEqual(self.fake_stripe.count_requests(), 0)
+
+class CheckoutStripeCallsTestCase(FakeStripeTestCase):
+    """Tests of the Stripe calls made by a checkout and its jobs"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json'
+    ]
+
+    def _checkout(self):
+        user = User.objects.get(pk=1)
+        self.client.login(email=user.email, password='Password123')
+        return self.client.post(reverse('checkout'), {
+            'payment_method_id': 'pm_card_visa',
+            'full_name': 'John Doe',
+            'email': user.email,
+            'line_1': 'Strand',
+            'city_town': 'London',
+            'postcode': 'WC2R 2LS',
+            'country': 'United Kingdom',
+            'amount': '',
+        })
+
+    def test_checkout_makes_one_stripe_call(self):
+        response = self._checkout()
+        order = Order.objects.latest('pk')
+        self.assertRedirects(response, reverse('order_detail', args=[order.pk]))
+        self.assertTrue(order.customer_id.startswith('cus_'))
+        self.assertEqual(self.fake_stripe.requests, [('POST', '/v1/customers')])
+
+        with patch('tsp.payments.charge_order'):
+            run_pending_jobs()
+        payment = Payment.objects.get(order=order)
+        self.assertEqual(payment.brand, 'visa')
+        self.assertEqual(payment.last4, '4242')
+        self.assertEqual(payment.transaction_id, 'pm_card_visa')
+        self.assertEqual(self.fake_stripe.count_requests(), 1)
+
+    def test_price_changes_after_checkout_are_not_charged(self):
+        self._checkout()
+        order = Order.objects.latest('pk')
+        # The host edits its prices before the payment jobs run
+        event = Event.objects.get(pk=15)
+        event.early_bird_price += 10
+        event.standard_price += 10
+        event.save()
+        society = Society.objects.get(pk=5)
+        society.member_fee += 10
+        society.save()
+        run_pending_jobs()
+        payment = Payment.objects.get(order=order)
+        intent, = [
+            obj for obj in self.fake_stripe.objects.values()
+            if obj['object'] == 'payment_intent'
+        ]
+        self.assertEqual(intent['amount'], int(payment.amount * 100))
+        self.assertEqual(intent['status'], 'succeeded')
+        self.assertEqual(
+            PayoutEntry.objects.filter(order=order).aggregate(Sum('amount'))['amount__sum'],
+            payment.amount
+        )
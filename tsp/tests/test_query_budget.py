@@ -0,0 +1,75 @@
+"""Unit tests of the query budget instrumentation"""
+import json
+import os
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tsp.models import Society
+from tsp.query_budget import QueryRecorder, fingerprint, load_query_budgets
+
+class QueryBudgetTestCase(TestCase):
+    """Unit tests of the query budget instrumentation"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json'
+    ]
+
+    def setUp(self):
+        budgets_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({'all_societies': 1}, budgets_file)
+        budgets_file.close()
+        self.budgets_path = budgets_file.name
+
+    def tearDown(self):
+        os.remove(self.budgets_path)
+
+    def test_fingerprint_ignores_parameters_and_literals(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM tsp_event WHERE id = %s AND name = \'a\''),
+            fingerprint('SELECT  *  FROM tsp_event WHERE id = 12 AND name = \'b\'')
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM tsp_event WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM tsp_event WHERE id IN (...)'
+        )
+
+    def test_fingerprint_keeps_table_names(self):
+        self.assertNotEqual(
+            fingerprint('SELECT * FROM tsp_event'),
+            fingerprint('SELECT * FROM tsp_order')
+        )
+
+    def test_recorder_counts_queries_and_finds_duplicates(self):
+        with QueryRecorder() as recorder:
+            for society in Society.objects.all():
+                society.university.name
+        self.assertEqual(recorder.count, Society.objects.count() + 1)
+        self.assertGreater(recorder.duration_ms, 0)
+        self.assertEqual(list(recorder.duplicates.values()), [Society.objects.count()])
+        self.assertIn(f'{Society.objects.count()}x SELECT', recorder.summary())
+
+    def test_recorder_stops_recording_after_the_block(self):
+        with QueryRecorder() as recorder:
+            Society.objects.count()
+        Society.objects.count()
+        self.assertEqual(recorder.count, 1)
+
+    def test_load_query_budgets(self):
+        self.assertEqual(load_query_budgets(self.budgets_path), {'all_societies': 1})
+
+    def test_middleware_logs_views_over_budget_in_development(self):
+        self.client.login(email='johndoe@kcl.ac.uk', password='Password123')
+        with override_settings(DEBUG=True, QUERY_BUDGETS_FILE=self.budgets_path):
+            with self.assertLogs('tsp.query_budget', 'WARNING') as logs:
+                self.client.get(reverse('all_societies'))
+        self.assertIn('all_societies', logs.output[0])
+        self.assertIn('is over its budget of 1 queries', logs.output[0])
+
+    def test_middleware_is_not_used_outside_development(self):
+        self.client.login(email='johndoe@kcl.ac.uk', password='Password123')
+        with override_settings(QUERY_BUDGETS_FILE=self.budgets_path):
+            with self.assertNoLogs('tsp.query_budget', 'WARNING'):
+                self.client.get(reverse('all_societies'))
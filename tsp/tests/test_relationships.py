@@ -0,0 +1,69 @@
+"""Unit tests of the student relationship snapshots"""
+from django.test import TestCase
+from django.urls import reverse
+from tsp.models import Event, Society, Student
+from tsp.relationships import relationship_scope
+
+class StudentRelationshipsTestCase(TestCase):
+    """Unit tests of the student relationship snapshots"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json'
+    ]
+
+    def setUp(self):
+        self.student = Student.objects.get(email='johndoe@kcl.ac.uk')
+        self.society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        self.other_society = Society.objects.get(email='ai_society@kcl.ac.uk')
+        self.event = Event.objects.get(pk=15)
+        self.student.follower.clear()
+        self.student.saved_event.clear()
+        self.society.add_follower(self.student)
+        self.society.add_regular_member(self.student)
+        self.student.save_event(self.event)
+
+    def test_snapshot_holds_relationships(self):
+        relationships = self.student.relationships
+        self.assertTrue(relationships.follows(self.society))
+        self.assertFalse(relationships.follows(self.other_society))
+        self.assertTrue(relationships.is_regular_member(self.society))
+        self.assertTrue(relationships.is_member(self.society))
+        self.assertFalse(relationships.is_member(self.other_society))
+        self.assertTrue(relationships.has_saved(self.event))
+
+    def test_snapshot_is_loaded_once_per_scope(self):
+        with relationship_scope():
+            with self.assertNumQueries(2):
+                for _ in range(3):
+                    self.assertTrue(self.student.relationships.follows(self.society))
+                    self.assertTrue(self.student.event_saved(self.event))
+
+    def test_snapshot_is_loaded_again_outside_of_a_scope(self):
+        with self.assertNumQueries(2):
+            self.student.relationships.follows(self.society)
+            self.student.relationships.follows(self.society)
+
+    def test_snapshot_is_discarded_when_relationships_change(self):
+        with relationship_scope():
+            self.assertTrue(self.student.relationships.follows(self.society))
+            self.society.remove_follower(self.student)
+            self.assertFalse(self.student.relationships.follows(self.society))
+            self.other_society.follower.add(self.student)
+            self.assertTrue(self.student.relationships.follows(self.other_society))
+            self.assertTrue(self.student.event_saved(self.event))
+            self.student.unsave_event(self.event)
+            self.assertFalse(self.student.event_saved(self.event))
+            self.assertFalse(self.student.event_discounted(self.event))
+            self.student.purchase_discounted_event(self.event)
+            self.assertTrue(self.student.event_discounted(self.event))
+
+    def test_society_page_checks_relationships_with_the_snapshot(self):
+        self.client.login(email=self.student.email, password='Password123')
+        response = self.client.get(reverse('society_page', args=[self.society.pk]))
+        self.assertTrue(response.context['is_member'])
+        self.assertTrue(response.context['is_follower'])
+        self.assertFalse(response.context['is_subscriber'])
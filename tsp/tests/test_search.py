@@ -0,0 +1,96 @@
+"""Unit tests of the event search"""
+from unittest.mock import patch
+from django.test import TestCase
+from tsp.models import Event, Society, University
+from tsp.search import rebuild_search_index, search_events
+
+class EventSearchTestCase(TestCase):
+    """Unit tests of the event search"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/other_events.json'
+    ]
+
+    def setUp(self):
+        self.event = Event.objects.get(pk=15)
+        self.other_event = Event.objects.get(pk=16)
+        self.other_university_event = Event.objects.get(pk=27)
+        self.society = Society.objects.get(name='KCL Tech society')
+        self.other_society = Society.objects.get(name='QMU Robotics society')
+        self.university = self.society.university
+
+    def _search(self, query, university=None):
+        return list(search_events(query, university=university))
+
+    def test_search_by_name(self):
+        self.assertEqual(self._search('Default test event')[0], self.event)
+
+    def test_search_by_description_location_and_society(self):
+        self.assertEqual(self._search('another'), [self.other_event, self.other_university_event])
+        self.assertIn(self.event, self._search('location'))
+        self.assertIn(self.event, self._search('kcl tech'))
+
+    def test_search_matches_prefixes_case_insensitively(self):
+        self.assertEqual(self._search('DEFAU'), [self.event, self.other_event, self.other_university_event])
+
+    def test_search_without_words_matches_nothing(self):
+        self.assertEqual(self._search('!!!'), [])
+
+    def test_empty_search_matches_all_events_of_the_university(self):
+        self.assertEqual(
+            set(self._search('', self.university)), 
+            {self.event, self.other_event}
+        )
+        self.assertEqual(search_events('').count(), Event.objects.count())
+
+    def test_search_is_scoped_by_university(self):
+        self.assertEqual(
+            self._search('other', self.university), 
+            [self.other_event]
+        )
+        self.assertEqual(
+            self._search('other', self.other_society.university), 
+            [self.other_university_event]
+        )
+
+    def test_results_are_ranked_by_relevance(self):
+        # The name of the default event matches, the others only match on 
+        # their location
+        self.assertEqual(self._search('default')[0], self.event)
+
+    def test_index_follows_event_changes(self):
+        self.event.name = 'Hackathon'
+        self.event.save()
+        self.assertEqual(self._search('hackathon'), [self.event])
+        self.event.delete()
+        self.assertEqual(self._search('hackathon'), [])
+
+    def test_index_follows_society_changes(self):
+        self.other_society.society.add(self.event)
+        self.assertEqual(self._search('robotics', self.university), [self.event])
+        self.event.society.remove(self.other_society)
+        self.assertEqual(self._search('robotics', self.university), [])
+        self.society.name = 'KCL Coding society'
+        self.society.save()
+        self.assertEqual(set(self._search('coding')), {self.event, self.other_event})
+        self.society.society.clear()
+        self.assertEqual(self._search('coding'), [])
+
+    def test_rebuild_search_index(self):
+        Event.objects.filter(pk=self.event.pk).update(name='Hackathon')
+        self.assertEqual(self._search('hackathon'), [])
+        self.assertEqual(rebuild_search_index(), Event.objects.count())
+        self.assertEqual(self._search('hackathon'), [self.event])
+
+    def test_fallback_without_fts5(self):
+        Event.objects.filter(pk=self.event.pk).update(name='Hackathon')
+        with patch('tsp.search.uses_fts5', return_value=False):
+            self.assertEqual(self._search('hack'), [self.event])
+            self.assertEqual(self._search('other', self.university), [self.other_event])
+            self.assertEqual(self._search('test event')[0], self.other_event)
+            self.assertIn(self.event, self._search('kcl tech'))
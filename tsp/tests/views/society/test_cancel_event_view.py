@@ -1,11 +1,14 @@
 """Unit tests of the cancel event view"""
 from django.test import TestCase
-from tsp.models import Society, Event, Student
+from tsp.models import Society, Event, OutboundEmail, Student
+from tsp.jobs import run_pending_jobs
+from tsp.mail import send_pending_outbound_emails
 from tsp.tests.helpers import reverse_with_next
 from django.urls import reverse
 from django.core import mail
 from datetime import timedelta
 from django.utils import timezone
+from unittest.mock import patch
 
 class CancelEventViewTestCase(TestCase):
     """Unit tests of the cancel event view"""
@@ -39,12 +42,33 @@ class CancelEventViewTestCase(TestCase):
         response_url = reverse('events_list')
         self.assertTemplateUsed(response, 'society/events_list.html')
         self.assertRedirects(response, response_url, status_code=302, target_status_code=200)
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending_jobs()
+        send_pending_outbound_emails()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, f"We're sorry, the event {self.event.name} is cancelled!")
         self.assertEqual(mail.outbox[0].to, ['johndoe@kcl.ac.uk'])
         messages_list = list(response.context['messages'])
         self.assertEqual(len(messages_list), 1)
 
+    def test_failed_cancel_email_is_retried(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.post(self.url, {'event_id': self.event.id}, follow=True)
+        messages_list = list(response.context['messages'])
+        self.assertEqual(str(messages_list[0]), 'Cancellation emails will be sent shortly!')
+        run_pending_jobs()
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=Exception('Recipient refused')):
+            send_pending_outbound_emails()
+        outbound_email = OutboundEmail.objects.get(event=self.event)
+        self.assertEqual(outbound_email.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(outbound_email.last_error, 'Recipient refused')
+        self.assertEqual(len(mail.outbox), 0)
+        OutboundEmail.objects.filter(pk=outbound_email.pk).update(send_after=timezone.now())
+        send_pending_outbound_emails()
+        outbound_email.refresh_from_db()
+        self.assertEqual(outbound_email.status, OutboundEmail.Status.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
     def test_get_cancel_event_redirects_when_not_logged_in(self):
         redirect_url = reverse_with_next('login', self.url)
         response = self.client.get(self.url)
@@ -4,6 +4,7 @@ from tsp.tests.helpers import reverse_with_next
 from django.urls import reverse
 from tsp.forms.society.contact_members_form import ContactCommitteeMembersForm
 from tsp.models import Society, Student
+from tsp.mail import send_pending_outbound_emails
 from django.core import mail
 
 class ContactCommitteeMembersTestCase(TestCase): 
@@ -67,6 +68,8 @@ class ContactCommitteeMembersTestCase(TestCase):
         self.society.committee_member.add(student)
         response = self.client.post(self.url, self.form_input, follow=True)
         self.assertTemplateUsed(response, 'society/contact_committee_members.html')
+        self.assertEqual(len(mail.outbox), 0)
+        send_pending_outbound_emails()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, 'Test Email')
         self.assertEqual(mail.outbox[0].body, 'This is a test email.')
@@ -1,12 +1,14 @@
 """Unit tests of the create event view"""
 import os
-from ticket_selling_platform import settings
+from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.utils import timezone
 from tsp.tests.helpers import reverse_with_next
 from django.urls import reverse
 from tsp.models import Society, Event, Student
+from tsp.jobs import run_pending_jobs
+from tsp.mail import send_pending_outbound_emails
 from tsp.forms.society.create_event_form import CreateEventForm
 from django.core import mail
 
@@ -183,6 +185,9 @@ class CreateEventViewTestCase(TestCase):
         form = CreateEventForm(data=self.form_input)
         self.assertTrue(form.is_valid())
         self.client.post(self.url, self.form_input, follow=True)
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending_jobs()
+        send_pending_outbound_emails()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, "KCL Tech society has created a new event!")
         self.assertEqual(mail.outbox[0].to, ["johndoe@kcl.ac.uk"])
\ No newline at end of file
@@ -1,12 +1,14 @@
 """Unit tests of the modify event view"""
 import os
-from ticket_selling_platform import settings
+from django.conf import settings
 from django.test import TestCase
 from django.utils import timezone
 from tsp.tests.helpers import reverse_with_next
 from django.urls import reverse
 from django.core import mail
 from tsp.models import Society, Event, Student
+from tsp.jobs import run_pending_jobs
+from tsp.mail import send_pending_outbound_emails
 from tsp.forms.society.modify_event_form import ModifyEventForm
 
 class ModifyEventViewTestCase(TestCase):
@@ -117,10 +119,24 @@ class ModifyEventViewTestCase(TestCase):
         form = ModifyEventForm(data=self.form_input)
         self.assertTrue(form.is_valid())
         self.client.post(self.url, self.form_input, follow=True)
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending_jobs()
+        send_pending_outbound_emails()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, 'Changes to ' + self.event.name )
         self.assertEqual(mail.outbox[0].to, ['johndoe@kcl.ac.uk'])
         
+    def test_event_notification_shows_details_prior_to_the_update(self):
+        self.client.login(email=self.user.email, password='Password123')
+        student = Student.objects.get(email='johndoe@kcl.ac.uk')
+        student.saved_event.add(self.event)
+        self.client.post(self.url, self.form_input, follow=True)
+        run_pending_jobs()
+        send_pending_outbound_emails()
+        self.assertIn(f'Dear {student.full_name},', mail.outbox[0].body)
+        self.assertIn(f'Name: {self.event.name}', mail.outbox[0].body)
+        self.assertNotIn(self.form_input['name'], mail.outbox[0].body)
+
     def test_event_modify_with_invalid_start_time_in_the_past(self):
         self.client.login(username=self.user.email, password='Password123')
         before_count = Event.objects.count()
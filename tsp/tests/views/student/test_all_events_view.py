@@ -87,7 +87,13 @@ class AllEventsViewTestCase(TestCase):
 
     def test_get_all_events_displays_earliest_upcoming_events_that_are_searched(self):
         self.client.login(email=self.user.email, password='Password123')
-        self._tester('EARLIEST', 'UPCOMING', 'default', [self.event1])
+        self._tester('EARLIEST', 'UPCOMING', 'other', [self.event2])
+
+    def test_get_all_events_searches_event_details_and_societies(self):
+        self.client.login(email=self.user.email, password='Password123')
+        # Both upcoming events are at the Default test location
+        self._tester('EARLIEST', 'UPCOMING', 'default', self.upcoming_events)
+        self._tester('EARLIEST', 'UPCOMING', 'kcl tech', self.upcoming_events)
 
     def test_get_all_events_displays_earliest_past_events_when_selected(self):
         self.client.login(email=self.user.email, password='Password123')
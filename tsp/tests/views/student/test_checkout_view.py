@@ -7,8 +7,11 @@ from unittest.mock import patch, MagicMock
 from tsp.json_utils.json_encoder import DecimalEncoder
 from django.test import TestCase, RequestFactory
 from django.contrib.messages import get_messages
+from django.http import QueryDict
 from django.urls import reverse
-from tsp.models import User, Student, Event, Cart, Society, EventCartItem, Order, Payment, Ticket, HistoricalCart
+from django.utils.http import urlencode
+from tsp.models import User, Student, Event, Cart, Society, EventCartItem, Order, Payment, Ticket, HistoricalCart, TicketHold, Job, IdempotencyKey
+from tsp.jobs import run_pending_jobs
 from tsp.forms.student.checkout_form import CheckoutForm
 from tsp.views.student.checkout_view import CheckoutView
 from decimal import Decimal
@@ -113,6 +116,70 @@ class CheckoutViewTestCase(TestCase):
         self.assertEqual(response.url, reverse('order_detail', args=[order.pk]))
         self.assertEqual(response.status_code, 302)
 
+    def test_get_all_items_free_issues_tickets_for_confirmation_email(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.event.early_bird_price = Decimal('0.00')
+        self.event.save()
+        self.society.member_fee = Decimal('0.00')
+        self.society.save()
+        self.event_cart_item.early_bird_quantity = 20
+        self.event_cart_item.save()
+        self.client.get(self.url)
+        order = Order.objects.latest('pk')
+        run_pending_jobs()
+        tickets = Ticket.objects.filter(order=order)
+        self.assertEqual(tickets.count(), 20)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, 20)
+        # Test the confirmation email lists the ids of the issued tickets.
+        self.assertEqual(len(mail.outbox), 1)
+        html_message = mail.outbox[0].alternatives[0][0]
+        for ticket in tickets:
+            self.assertIn(f'Ticket number # {ticket.id}', html_message)
+
+    def test_get_all_items_free_when_tickets_sold_out(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.event.early_bird_price = Decimal('0.00')
+        self.event.save()
+        self.society.member_fee = Decimal('0.00')
+        self.society.save()
+        # Another student holds all the early bird tickets.
+        other_event_cart_item = EventCartItem.objects.create(event=self.event)
+        TicketHold.hold_tickets(other_event_cart_item, 'early_bird', 50)
+        order_count_before = Order.objects.count()
+        response = self.client.get(self.url, follow=True)
+        self.assertEqual(Order.objects.count(), order_count_before)
+        self.assertRedirects(response, reverse('cart_detail'))
+        self.assertContains(
+            response, 
+            'Sorry, the early bird tickets of Default test event are sold out.'
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, 0)
+        self.assertEqual(self.event.early_bird_held, 50)
+
+    def test_get_all_items_free_trims_cart_to_tickets_left(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.event.early_bird_price = Decimal('0.00')
+        self.event.early_bird_sold = self.event.early_booking_capacity - 1
+        self.event.save()
+        self.society.member_fee = Decimal('0.00')
+        self.society.save()
+        order_count_before = Order.objects.count()
+        response = self.client.get(self.url, follow=True)
+        self.assertEqual(Order.objects.count(), order_count_before)
+        self.assertRedirects(response, reverse('cart_detail'))
+        self.assertContains(
+            response,
+            'Sorry, only 1 early bird tickets of Default test event were left. '
+            'Your cart has been updated'
+        )
+        self.event_cart_item.refresh_from_db()
+        self.assertEqual(self.event_cart_item.early_bird_quantity, 1)
+        # The trimmed cart can be checked out
+        self.client.get(self.url)
+        self.assertEqual(Order.objects.count(), order_count_before + 1)
+
     def test_get_paid_items(self):
         self.client.login(email=self.user.email, password='Password123')
         self.assertNotEqual(self.cart.total_price, Decimal('0.00'))
@@ -159,6 +226,14 @@ class CheckoutViewTestCase(TestCase):
         response = self.client.post(self.url, data=data)
         order = Order.objects.latest('pk')
         
+        # Test the payment, tickets and email are left to background jobs.
+        self.assertEqual(Job.get_order_status(order), Job.Status.PENDING)
+        self.assertEqual(Payment.objects.count(), payment_before)
+        self.assertEqual(Ticket.objects.count(), ticket_before)
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending_jobs()
+        self.assertEqual(Job.get_order_status(order), Job.Status.SUCCEEDED)
+        
         # Test the order is completed successfully.
         self._check_successful_order_created(order_count_before, order)
         self._check_successful_historical_cart_created(
@@ -230,6 +305,9 @@ class CheckoutViewTestCase(TestCase):
         self.assertEqual(second_ticket.event, self.event)
         self.assertEqual(first_ticket.type, 'early_bird')
         self.assertEqual(second_ticket.type, 'early_bird')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, 2)
+        self.assertEqual(self.event.standard_sold, 0)
     
     def _check_successful_cart_item_updated(self):
         """
@@ -345,4 +423,91 @@ class CheckoutViewTestCase(TestCase):
             'Generic error: Something went wrong. '\
             'You were not charged. Please try again.'
         )
-    
\ No newline at end of file
+    
+    def test_checkout_form_has_an_idempotency_key(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        key = response.context['form'].initial['idempotency_key']
+        self.assertEqual(len(key), 32)
+        self.assertContains(response, f'name="idempotency_key" value="{key}"')
+        second_key = self.client.get(self.url).context['form'].initial['idempotency_key']
+        self.assertNotEqual(second_key, key)
+
+    @patch('stripe.Customer.create', return_value=mocked_stripe_customer)
+    @patch('stripe.PaymentMethod.attach', return_value=mocked_stripe_payment_method)
+    @patch('stripe.Customer.modify', return_value=mocked_stripe_customer)
+    def test_resubmitted_checkout_redirects_to_the_first_order(
+        self, 
+        customer_modify_mock,
+        payment_method_attach_mock, 
+        customer_create_mock
+    ):
+        self.client.login(email=self.user.email, password='Password123')
+        data = {**self.form_input, 'idempotency_key': 'double-click'}
+        order_count_before = Order.objects.count()
+        response = self.client.post(self.url, data=data)
+        order = Order.objects.latest('pk')
+        self.assertRedirects(response, reverse('order_detail', args=[order.pk]))
+
+        with self.assertNumQueries(4):
+            replay = self.client.post(self.url, data=data)
+        self.assertRedirects(replay, reverse('order_detail', args=[order.pk]))
+        self.assertEqual(Order.objects.count(), order_count_before + 1)
+        self.assertEqual(customer_create_mock.call_count, 1)
+        run_pending_jobs()
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    @patch('stripe.Customer.create', return_value=mocked_stripe_customer)
+    @patch('stripe.PaymentMethod.attach', return_value=mocked_stripe_payment_method)
+    @patch('stripe.Customer.modify', return_value=mocked_stripe_customer)
+    def test_resubmitted_checkout_with_the_idempotency_key_header(
+        self, 
+        customer_modify_mock,
+        payment_method_attach_mock, 
+        customer_create_mock
+    ):
+        self.client.login(email=self.user.email, password='Password123')
+        headers = {'HTTP_IDEMPOTENCY_KEY': 'ajax-retry'}
+        response = self.client.post(self.url, data=self.form_input, **headers)
+        replay = self.client.post(self.url, data=self.form_input, **headers)
+        self.assertEqual(replay['Location'], response['Location'])
+        self.assertEqual(customer_create_mock.call_count, 1)
+
+    @patch('stripe.Customer.create', return_value=mocked_stripe_customer)
+    @patch('stripe.PaymentMethod.attach', return_value=mocked_stripe_payment_method)
+    @patch('stripe.Customer.modify', return_value=mocked_stripe_customer)
+    def test_idempotency_key_reused_with_different_data_is_refused(
+        self, 
+        customer_modify_mock,
+        payment_method_attach_mock, 
+        customer_create_mock
+    ):
+        self.client.login(email=self.user.email, password='Password123')
+        data = {**self.form_input, 'idempotency_key': 'reused'}
+        self.client.post(self.url, data=data)
+        response = self.client.post(self.url, data={**data, 'postcode': 'SE1 9RT'})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(customer_create_mock.call_count, 1)
+
+    @patch('tsp.views.helpers.settings.IDEMPOTENCY_WAIT_SECONDS', 0)
+    def test_idempotency_key_of_a_running_checkout_is_refused(self):
+        self.client.login(email=self.user.email, password='Password123')
+        fingerprint = IdempotencyKey.get_fingerprint(self.url, QueryDict(urlencode(self.form_input)))
+        IdempotencyKey.begin(self.user, 'running', fingerprint)
+        with patch('stripe.Customer.create') as customer_create_mock:
+            response = self.client.post(
+                self.url, data={**self.form_input, 'idempotency_key': 'running'}
+            )
+        self.assertEqual(response.status_code, 409)
+        customer_create_mock.assert_not_called()
+
+    @patch('stripe.Customer.create')
+    def test_failed_checkout_releases_its_idempotency_key(self, customer_create_mock):
+        self.client.login(email=self.user.email, password='Password123')
+        customer_create_mock.side_effect = stripe.error.StripeError()
+        data = {**self.form_input, 'idempotency_key': 'declined'}
+        response = self.client.post(self.url, data=data)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(IdempotencyKey.objects.filter(key='declined').exists())
+        self.assertEqual(response.context['form']['idempotency_key'].value(), 'declined')
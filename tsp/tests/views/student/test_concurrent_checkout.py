@@ -0,0 +1,170 @@
+"""Concurrency tests of the checkout of the last tickets of an event"""
+import threading
+from datetime import timedelta
+from django.db import connection
+from django.db.transaction import TransactionManagementError
+from django.test import Client, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from tsp.jobs import run_pending_jobs
+from tsp.models import (
+    Cart, Event, EventCartItem, Order, Society, Student, StudentUnion, Ticket,
+    University
+)
+
+STUDENT_COUNT = 6
+TICKET_COUNT = 2
+
+class ConcurrentCheckoutTestCase(TransactionTestCase):
+    """Concurrency tests of the checkout of the last tickets of an event"""
+
+    def setUp(self):
+        university = University.objects.create(name="King's College London", abbreviation='KCL')
+        student_union = StudentUnion.objects.create(
+            email='kclsu@kcl.ac.uk', name='KCLSU', university=university
+        )
+        society = Society.objects.create(
+            email='society@kcl.ac.uk', name='Society',
+            student_union=student_union, university=university
+        )
+        start_time = timezone.now() + timedelta(days=30)
+        self.event = Event.objects.create(
+            host=society,
+            name='Last tickets',
+            location='Bush House',
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=2),
+            early_booking_capacity=TICKET_COUNT,
+            standard_booking_capacity=0,
+            early_bird_price=0,
+            standard_price=0
+        )
+        self.event.society.add(society)
+        self.clients = []
+        for i in range(STUDENT_COUNT):
+            student = Student.objects.create(
+                email=f'student{i}@kcl.ac.uk', first_name='Student',
+                last_name=str(i), university=university
+            )
+            cart = Cart.objects.create(student=student)
+            # The tickets are in the cart but not held, as after the hold expired
+            cart.event_cart_item.add(
+                EventCartItem.objects.create(event=self.event, early_bird_quantity=1)
+            )
+            client = Client()
+            client.force_login(student)
+            self.clients.append(client)
+
+    def _check_out_at_once(self, data=None):
+        barrier = threading.Barrier(len(self.clients))
+        responses, errors = [], []
+
+        def check_out(client):
+            try:
+                barrier.wait()
+                if data is None:
+                    responses.append(client.get(reverse('checkout')))
+                else:
+                    responses.append(client.post(reverse('checkout'), data))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=check_out, args=(client,))
+            for client in self.clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses, errors
+
+    def test_concurrent_checkouts_never_oversell(self):
+        responses, errors = self._check_out_at_once()
+        self.assertEqual(errors, [])
+        ordered = [
+            response for response in responses
+            if '/order_detail/' in response.url
+        ]
+        refused = [
+            response for response in responses
+            if response.url == reverse('cart_detail')
+        ]
+        self.assertEqual(len(ordered), TICKET_COUNT)
+        self.assertEqual(len(refused), STUDENT_COUNT - TICKET_COUNT)
+        run_pending_jobs()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, TICKET_COUNT)
+        self.assertEqual(self.event.early_bird_held, 0)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), TICKET_COUNT)
+        self.assertEqual(Order.objects.count(), TICKET_COUNT)
+
+    def test_carts_of_several_events_in_any_order_never_fail(self):
+        second_event = Event.objects.get(pk=self.event.pk)
+        second_event.pk = None
+        second_event.save()
+        # Half of the carts hold the second event first
+        for i, cart in enumerate(Cart.objects.order_by('pk')):
+            event_cart_item = EventCartItem.objects.create(
+                event=second_event, early_bird_quantity=1
+            )
+            if i % 2:
+                first_item = cart.event_cart_item.get()
+                cart.event_cart_item.clear()
+                cart.event_cart_item.add(event_cart_item, first_item)
+            else:
+                cart.event_cart_item.add(event_cart_item)
+        responses, errors = self._check_out_at_once()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(responses), STUDENT_COUNT)
+        run_pending_jobs()
+        for event in (self.event, second_event):
+            event.refresh_from_db()
+            self.assertEqual(event.early_bird_sold, TICKET_COUNT)
+            self.assertEqual(Ticket.objects.filter(event=event).count(), TICKET_COUNT)
+
+    def test_refused_carts_are_trimmed(self):
+        self._check_out_at_once()
+        # The refused students have nothing left in their carts
+        self.assertEqual(
+            EventCartItem.objects.filter(basecart__cart__isnull=False).count(), 0
+        )
+
+    def test_concurrent_paid_checkouts_never_oversell(self):
+        Event.objects.filter(pk=self.event.pk).update(early_bird_price=5)
+        responses, errors = self._check_out_at_once({
+            'payment_method_id': 'pm_card_visa',
+            'full_name': 'Student',
+            'email': 'student@kcl.ac.uk',
+            'line_1': 'Strand',
+            'city_town': 'London',
+            'postcode': 'WC2R 2LS',
+            'country': 'United Kingdom',
+            'amount': '',
+        })
+        self.assertEqual(errors, [])
+        # No checkout fails on the database lock
+        self.assertEqual(
+            sorted(response.status_code for response in responses),
+            [302] * STUDENT_COUNT
+        )
+        self.assertEqual(Order.objects.count(), TICKET_COUNT)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.early_bird_sold, TICKET_COUNT)
+
+    def test_order_transaction_begins_with_the_lock(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.clients[0].get(reverse('checkout'))
+        self.assertIn('/order_detail/', response.url)
+        statements = [query['sql'] for query in queries.captured_queries]
+        begin = statements.index('BEGIN')
+        self.assertTrue(statements[begin + 1].startswith('UPDATE "tsp_event"'))
+        # The checkout runs in one transaction only
+        self.assertEqual(statements.count('BEGIN'), 1)
+
+    def test_events_are_not_locked_outside_a_transaction(self):
+        with self.assertRaises(TransactionManagementError):
+            Event.lock_events(Event.objects.all())
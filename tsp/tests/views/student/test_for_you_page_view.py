@@ -1,7 +1,8 @@
 """Unit tests of the for you page view"""
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from tsp.tests.helpers import reverse_with_next
 from django.urls import reverse
+from django.utils import timezone
 from tsp.models import Society, Event, Student
 
 class ForYouPageViewTestCase(TestCase):
@@ -74,4 +75,27 @@ class ForYouPageViewTestCase(TestCase):
         response = self.client.get(self.url, {'followed_list': "King's College London"})
         event_page_url = reverse('event_page', kwargs={'pk':self.event.pk})
         self.assertContains(response, event_page_url)
-        
\ No newline at end of file
+        
+
+    @override_settings(LIST_PAGE_SIZE=1)
+    def test_pages_of_the_feed_follow_each_other(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.society.add_follower(self.user)
+        later_event = Event.objects.get(pk=15)
+        later_event.pk = None
+        later_event.start_time += timezone.timedelta(days=1)
+        later_event.save()
+        later_event.society.add(self.society)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['object_list'], [self.event])
+        response = self.client.get(f"{self.url}?{response.context['next_page_query']}")
+        self.assertEqual(response.context['object_list'], [later_event])
+        self.assertFalse(response.context['page_obj'].has_next)
+
+    def test_view_hides_cancelled_events(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.society.add_follower(self.user)
+        self.event.cancel_event()
+        self.event.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['object_list'], [])
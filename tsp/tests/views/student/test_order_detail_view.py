@@ -2,8 +2,9 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.test import RequestFactory
-from tsp.models import User, Society, Event, Student, Cart, Order, EventCartItem, Payment
+from tsp.models import User, Society, Event, Student, Cart, Order, EventCartItem, OrderLine, Payment
 from tsp.views.student.order_detail_view import OrderDetailView
+from tsp.jobs import run_pending_jobs
 
 class OrderDetailViewTestCase(TestCase):
     """Unit tests of the order detail view"""
@@ -19,6 +20,8 @@ class OrderDetailViewTestCase(TestCase):
     ]
 
     def setUp(self):
+        # Run the jobs that process the default order.
+        run_pending_jobs()
         self.user = User.objects.get(pk=1)
         self.student = self.user.student
         self.cart = Cart.objects.get(student=self.user)
@@ -79,15 +82,25 @@ class OrderDetailViewTestCase(TestCase):
         expected_total_price = self.order.historicalcart.total_price
         actual_total_saved = response.context_data['total_saved']
         expected_total_saved = self.order.historicalcart.total_saved
-        actual_event_cart_items = response.context_data['event_cart_items']
-        expected_event_cart_items = self.order.historicalcart.event_cart_item.all()
-        actual_memberships = response.context_data['memberships']
-        expected_memberships = self.order.historicalcart.membership.all()
+        actual_lines = response.context_data['lines']
+        expected_lines = OrderLine.objects.filter(order=self.order)
         actual_payment = response.context_data['payment']
         expected_payment = Payment.objects.get(order=self.order)
         self.assertEqual(actual_total_price, expected_total_price)
         self.assertEqual(actual_total_saved, expected_total_saved)
-        self.assertEqual(list(actual_event_cart_items), list(expected_event_cart_items))
-        self.assertEqual(list(actual_memberships), list(expected_memberships))
+        self.assertEqual(list(actual_lines), list(expected_lines))
         self.assertEqual(actual_payment, expected_payment)
+
+    def test_order_is_shown_as_bought_after_the_event_is_edited(self):
+        self.client.login(email=self.user.email, password='Password123')
+        name, price = self.event.name, self.event.early_bird_price
+        self.event.name = 'Renamed event'
+        self.event.early_bird_price += 5
+        self.event.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, name)
+        self.assertNotContains(response, 'Renamed event')
+        self.assertEqual(response.context_data['total_price'], self.order.historicalcart.total_price)
+        self.assertEqual(response.context_data['lines'][0].unit_price, price)
+
         
\ No newline at end of file
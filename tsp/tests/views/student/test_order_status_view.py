@@ -0,0 +1,48 @@
+"""Unit tests of the order status view"""
+from django.test import TestCase
+from django.urls import reverse
+from tsp.jobs import run_pending_jobs
+from tsp.models import Job, Order, Student, User
+
+class OrderStatusViewTestCase(TestCase):
+    """Unit tests of the order status view"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(pk=1)
+        self.order = Order.objects.get(pk=29)
+        self.url = reverse('order_status', kwargs={'pk': self.order.id})
+        self.other_user = Student.objects.get(email='evasmith@qmw.ac.uk')
+
+    def test_url(self):
+        self.assertEqual(self.url, f'/order_detail/{self.order.id}/status/')
+
+    def test_get_status_of_order_being_processed(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': Job.Status.PENDING})
+        response = self.client.get(reverse('order_detail', kwargs={'pk': self.order.id}))
+        self.assertContains(response, 'We are processing your order.')
+
+    def test_get_status_of_processed_order(self):
+        run_pending_jobs()
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.json(), {'status': Job.Status.SUCCEEDED})
+        response = self.client.get(reverse('order_detail', kwargs={'pk': self.order.id}))
+        self.assertNotContains(response, 'We are processing your order.')
+
+    def test_get_status_returns_404_when_access_other_user_order(self):
+        self.client.login(email=self.other_user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
@@ -1,14 +1,14 @@
 """Unit tests of the payout view"""
-import stripe
+from decimal import Decimal
 from unittest.mock import patch, MagicMock
 from django.test import TestCase, RequestFactory
-from django.urls import reverse
-from tsp.models import User, Student, Event, Cart, Society, EventCartItem, Order
+from tsp.models import User, Event, Society, Order, OrderLine, PayoutEntry
 from tsp.views.student.payout_view import PayoutView
+from tsp.jobs import run_pending_jobs
 
-class PayoutViewTestCase(TestCase): 
+class PayoutViewTestCase(TestCase):
     """Unit tests of the payout view"""
-    
+
     fixtures = [
         'tsp/tests/fixtures/default_user.json',
         'tsp/tests/fixtures/other_users.json',
@@ -19,136 +19,94 @@ class PayoutViewTestCase(TestCase):
         'tsp/tests/fixtures/default_cart.json',
         'tsp/tests/fixtures/default_order.json'
     ]
-    
+
     def setUp(self):
+        # Run the jobs that process the default order.
+        with patch('tsp.payments.charge_order'):
+            run_pending_jobs()
+        PayoutEntry.objects.all().delete()
         self.user = User.objects.get(pk=1)
-        self.student = self.user.student
-        self.cart = Cart.objects.get(student=self.student)
+        self.order = Order.objects.get(pk=29)
         self.event = Event.objects.get(pk=15)
-        self.event_cart_item = EventCartItem.objects.get(pk=25)
-        self.society = Society.objects.get(email='tech_society@kcl.ac.uk') 
+        self.society = Society.objects.get(email='tech_society@kcl.ac.uk')
         self.other_event = Event.objects.get(pk=27)
         self.other_society = Society.objects.get(email='robotics@qmw.ac.uk')
-        self.other_event_cart_item = EventCartItem.objects.create(
-            event = self.other_event,
-            early_bird_quantity=10,
-            standard_quantity=0
+        OrderLine.objects.create(
+            order=self.order,
+            type=OrderLine.Type.EARLY_BIRD,
+            event=self.other_event,
+            name=self.other_event.name,
+            unit_price=Decimal('3.00'),
+            quantity=10
         )
-        self.other_user = Student.objects.get(email='janedoe@kcl.ac.uk')
         self.view = PayoutView()
         self.factory = RequestFactory()
-        self.form_input = {
-            'payment_method_id': 'pm_test',
-            'full_name': self.student.full_name,
-            'email': self.student.email,
-            'line_1': 'Strand',
-            'line_2': "King's College London",
-            'city_town': 'London',
-            'postcode': 'WC2R 2LS',
-            'country': 'United Kingdom',
-            'amount': ''
-        }   
-        
-    def test_get_order_items(self):
-        self.client.login(email=self.other_user.email, password='Password123')
-        cart = Cart.objects.create(student = self.other_user)
-        cart.event_cart_item.add(self.event_cart_item)
-        cart.membership.add(self.society)
-        items = self.view._get_order_items(cart)
-        # Check the cart contains 2 items, one event cart item and one society 
-        # membership.assert
-        self.assertEqual(len(items), 2)
-        self.assertIn(self.event_cart_item, items)
-        self.assertIn(self.society, items)
-        
-    def test_get_order_by_seller(self):
-        order_items = [
-            self.event_cart_item, 
-            self.other_event_cart_item, 
-            self.society, 
-            self.other_society
-        ]
-        items = self.view._get_order_items_by_seller(order_items)
-        self.assertIn(self.society, items)
-        self.assertIn(self.other_society, items)
-        self.assertIn(self.event_cart_item,  items[self.society])
-        self.assertIn(self.other_event_cart_item, items[self.other_society])
 
-    def test_calculate_payouts(self):
-        self.cart.membership.add(self.other_society)
-        self.cart.event_cart_item.add(self.other_event_cart_item)
-        seller_items = {
-            self.society: [self.event_cart_item, self.society],
-            self.other_society: [self.other_event_cart_item, self.other_society]
-        }
-        payouts = self.view._get_payouts(seller_items, self.cart)
-        self.assertIn(self.society, payouts)
-        self.assertIn(self.other_society, payouts)
-        # Calculate the total amount of ticket price and membership fee.
-        expected_payout_society_first = (
-            self.society.member_fee + 
-            (self.event_cart_item.early_bird_quantity * self.event.early_bird_price) + 
-            (self.event_cart_item.standard_quantity * self.event.standard_price)
-        )
-        expected_payout_society_second = (
-            self.other_society.member_fee + 
-            (self.other_event_cart_item.early_bird_quantity * self.other_event.early_bird_price) + 
-            (self.other_event_cart_item.standard_quantity * self.other_event.standard_price)
-        )
-        # Deduct discount if applicable 
-        discount_data = self.cart.discount_data
-        discount_applied_first = discount_data.get(self.event_cart_item.id, 0)
-        discount_applied_second = discount_data.get(self.other_event_cart_item.id, 0)
-        expected_payout_society_first -= discount_applied_first
-        expected_payout_society_second -= discount_applied_second
-        self.assertEqual(payouts[self.society], expected_payout_society_first)
-        self.assertEqual(payouts[self.other_society], expected_payout_society_second)
-    
-    @patch('stripe.Customer.create', return_value=MagicMock(id='fakecus_test123'))
-    @patch('stripe.PaymentMethod.attach', return_value=MagicMock(id='pm_test123'))
-    @patch('stripe.Customer.modify', return_value=MagicMock(id='fakecus_test123'))
+    def _get_expected_payouts(self):
+        payouts = {self.society: Decimal('0.00'), self.other_society: Decimal('0.00')}
+        for line in self.order.lines.all():
+            seller = self.other_society if line.event == self.other_event else self.society
+            payouts[seller] += line.subtotal - line.discount
+        return payouts
+
     @patch('stripe.Customer.retrieve')
-    @patch('stripe.PaymentMethod.retrieve')
     @patch('stripe.PaymentIntent.create')
-    def test_initiate_payout(
-        self, 
-        payment_intent_create_mock, 
-        payment_method_retrieve_mock, 
-        customer_retrieve_mock, 
-        customer_modify_mock, 
-        mock_payment_method_attach, 
-        mock_customer_create
-    ):
-        self.client.login(email=self.user.email, password='Password123')
+    def test_post(self, payment_intent_create_mock, customer_retrieve_mock):
         # Set up the mock return values
         customer_retrieve_mock.return_value = MagicMock(
-            invoice_settings=MagicMock(default_payment_method='pm_test123')
+            invoice_settings=MagicMock(
+                default_payment_method=MagicMock(id='pm_test123')
+            )
         )
-        payment_method_retrieve_mock.return_value = MagicMock()
         payment_intent_create_mock.return_value = MagicMock(confirm=MagicMock())
-        # Checkout and get the latest order.
-        data = self.form_input
-        response = self.client.post(reverse('checkout'), data=data)
-        order = Order.objects.get(pk=29)
-        payouts = {
-            self.society: 10,
-            self.other_society: 20
-        }
-        self.view._initiate_payout(order, payouts)
-        # Check if the Stripe API calls are being made with the correct parameters
-        customer_retrieve_mock.assert_called_with(order.customer_id)
-        payment_method_retrieve_mock.assert_called_with('pm_test123')
-        for seller, payout_amount in payouts.items():
-            payment_intent_create_mock.assert_any_call(
-                amount=int(payout_amount * 100),
-                currency='gbp',
-                payment_method='pm_test123',
-                customer=order.customer_id,
-                payment_method_types=['card'],
-                transfer_data={
-                    'destination': seller.stripe_account_id
-                },
-            )
-            payment_intent_create_mock.return_value.confirm.assert_called()
-        # Test the correct amount of payment intents have been created.
-        self.assertEqual(len(payouts), len(payment_intent_create_mock.call_args_list))
+        expected_payouts = self._get_expected_payouts()
+        request = self.factory.post('/')
+        response = self.view.post(request, self.order.id)
+        self.assertEqual(response.status_code, 204)
+        # The customer and its payment method are retrieved in one call
+        customer_retrieve_mock.assert_called_once_with(
+            self.order.customer_id,
+            expand=['invoice_settings.default_payment_method']
+        )
+        # Test the customer is charged once for the whole order, at the
+        # prices of the lines
+        payment_intent_create_mock.assert_called_once_with(
+            amount=int(sum(expected_payouts.values()) * 100),
+            currency='gbp',
+            payment_method='pm_test123',
+            customer=self.order.customer_id,
+            payment_method_types=['card'],
+            transfer_group=f'order-{self.order.id}',
+            idempotency_key=f'order-{self.order.id}-charge',
+        )
+        payment_intent_create_mock.return_value.confirm.assert_called()
+        # Test the payouts are recorded in the ledger, once
+        self.view.post(request, self.order.id)
+        entries = PayoutEntry.objects.filter(order=self.order)
+        self.assertEqual(
+            {entry.society: entry.amount for entry in entries},
+            expected_payouts
+        )
+        self.assertIsNone(entries[0].settlement)
+
+    def test_payouts_are_grouped_by_seller(self):
+        payouts = OrderLine.get_payouts(self.order)
+        self.assertEqual(payouts, self._get_expected_payouts())
+
+    def test_event_without_host_is_paid_to_its_society(self):
+        Event.objects.filter(pk=self.other_event.pk).update(host=None)
+        payouts = OrderLine.get_payouts(self.order)
+        self.assertEqual(payouts, self._get_expected_payouts())
+
+    def test_event_without_seller_is_not_paid_out(self):
+        Event.objects.filter(pk=self.other_event.pk).update(host=None)
+        self.other_event.society.clear()
+        payouts = OrderLine.get_payouts(self.order)
+        self.assertNotIn(None, payouts)
+        self.assertNotIn(self.other_society, payouts)
+        self.assertEqual(payouts[self.society], self._get_expected_payouts()[self.society])
+
+    def test_deleted_event_is_not_paid_out(self):
+        self.order.lines.filter(event=self.other_event).update(event=None)
+        payouts = OrderLine.get_payouts(self.order)
+        self.assertEqual(list(payouts), [self.society])
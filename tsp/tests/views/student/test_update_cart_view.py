@@ -1,10 +1,11 @@
 """Unit tests of the add to cart view"""
 import json
+from django.db.models import F
 from django.http import HttpRequest
 from django.test import TestCase, RequestFactory
 from django.urls import reverse
 from tsp.tests.helpers import reverse_with_next
-from tsp.models import User, Student, Event, Cart, Society, EventCartItem
+from tsp.models import User, Student, Event, Cart, Society, EventCartItem, TicketHold
 from tsp.forms.student.update_cart_form import UpdateCartForm
 from tsp.views.student.update_cart_view import UpdateCartView
 
@@ -67,26 +68,6 @@ class AddToCartViewTestCase(TestCase):
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
         self.assertTemplateUsed(response, 'landing.html')
         
-    def test_ajax_request_max_availability(self):
-        self.client.login(email=self.user.email, password='Password123')
-        # Create the data dictionary for the request
-        request_data = {
-            'event_cart_item_id': self.event_cart_item.id,
-            'action': 'get_max_availability'
-        }
-        # Send an AJAX request
-        response = self.client.get(
-            self.url,
-            request_data,
-            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
-        )
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response['Content-Type'], 'application/json')
-        # Test the JsonResponse content is correct
-        response_data = json.loads(response.content)
-        self.assertIn('early_bird_availability', response_data)
-        self.assertIn('standard_availability', response_data)
-
     def test_increase_number_of_tickets(self):
         self.client.login(email=self.user.email, password='Password123')
         request_data = {
@@ -125,6 +106,65 @@ class AddToCartViewTestCase(TestCase):
         expected_early_bird_quantity = early_bird_quantity_before - 1
         self.assertEqual(actual_early_bird_quantity, expected_early_bird_quantity)
     
+    def test_tickets_added_are_capped_at_tickets_left(self):
+        self.client.login(email=self.user.email, password='Password123')
+        tickets_left = Event.get_event_ticket_inventory(self.event, 'early_bird')
+        early_bird_quantity_before = self.event_cart_item.early_bird_quantity
+        # Test more tickets than are left are not added to the cart.
+        response = self.client.post(self.url, {
+            'event_cart_item_id': self.event_cart_item.id,
+            'early_bird_to_add': tickets_left + 1
+        })
+        response_data = json.loads(response.content)
+        self.assertFalse(response_data['success'])
+        self.assertEqual(
+            response_data['errors']['__all__'],
+            [UpdateCartForm.sold_out_message]
+        )
+        self.event_cart_item.refresh_from_db()
+        self.assertEqual(self.event_cart_item.early_bird_quantity, early_bird_quantity_before)
+        # Test all the tickets left can be added to the cart.
+        response = self.client.post(self.url, {
+            'event_cart_item_id': self.event_cart_item.id,
+            'early_bird_to_add': tickets_left
+        })
+        self.assertTrue(json.loads(response.content)['success'])
+        self.event_cart_item.refresh_from_db()
+        self.assertEqual(
+            self.event_cart_item.early_bird_quantity,
+            early_bird_quantity_before + tickets_left
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(Event.get_event_ticket_inventory(self.event, 'early_bird'), 0)
+
+    def test_tickets_of_a_sold_out_event_are_not_added(self):
+        self.client.login(email=self.user.email, password='Password123')
+        Event.objects.filter(pk=self.event.pk).update(
+            early_bird_sold=F('early_booking_capacity'),
+            standard_sold=F('standard_booking_capacity')
+        )
+        response = self.client.post(self.url, {
+            'event_cart_item_id': self.event_cart_item.id,
+            'early_bird_to_add': 1,
+            'standard_to_add': 1
+        })
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        self.assertFalse(response_data['success'])
+        self.assertIn(UpdateCartForm.sold_out_message, response_data['errors']['__all__'])
+        updated_event_cart_item = EventCartItem.objects.get(id=self.event_cart_item.id)
+        self.assertEqual(
+            updated_event_cart_item.early_bird_quantity,
+            self.event_cart_item.early_bird_quantity
+        )
+        self.assertEqual(
+            updated_event_cart_item.standard_quantity,
+            self.event_cart_item.standard_quantity
+        )
+        self.assertFalse(
+            TicketHold.objects.filter(event_cart_item=self.event_cart_item).exists()
+        )
+
     def test_event_cart_item_removed_when_number_of_tickets_is_zero(self):
         self.client.login(email=self.user.email, password='Password123')
         event_cart_items = self.cart.event_cart_item.all()
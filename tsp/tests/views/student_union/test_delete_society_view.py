@@ -2,14 +2,15 @@
 from django.test import TestCase
 from django.urls import reverse
 from tsp.tests.helpers import reverse_with_next
-from tsp.models import Society, StudentUnion
+from tsp.models import Event, FeedEntry, Society, StudentUnion
 
 class DeleteSocietyViewTestCase(TestCase):
     """Unit tests of the delete society view"""
 
     fixtures = [
         'tsp/tests/fixtures/default_user.json',
-        'tsp/tests/fixtures/default_university.json'
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/default_event.json'
     ]
 
     def setUp(self):
@@ -31,6 +32,19 @@ class DeleteSocietyViewTestCase(TestCase):
         messages_list = list(response.context['messages'])
         self.assertEqual(len(messages_list), 1)
     
+    def test_delete_society_cancels_its_events(self):
+        self.client.login(email=self.user.email, password='Password123')
+        event = Event.objects.get(host=self.Society)
+        FeedEntry.add_entries([(1, event.id)])
+        self.client.post(self.url, {'society_id': self.Society.id})
+        event.refresh_from_db()
+        self.assertEqual(event.status, Event.Status.CANCELLED)
+        self.assertIsNone(event.host)
+        self.assertEqual(
+            FeedEntry.objects.get(event=event).status,
+            Event.Status.CANCELLED
+        )
+
     def test_unsuccessful_delete_society_with_non_existing_society_id(self):
         self.client.login(email=self.user.email, password='Password123')
         before_count = Society.objects.count()
@@ -0,0 +1,85 @@
+"""Unit tests of the availability view"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tsp.models import Event
+
+class AvailabilityViewTestCase(TestCase):
+    """Unit tests of the availability view"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/other_events.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('availability')
+        self.events = list(Event.objects.order_by('id'))
+
+    def test_url(self):
+        self.assertEqual(self.url, '/availability/')
+
+    def test_get_tickets_left_of_many_events(self):
+        response = self.client.get(self.url, {'event': [event.id for event in self.events]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()['events']
+        self.assertEqual(set(data), {str(event.id) for event in self.events})
+        event = self.events[0]
+        self.assertEqual(data[str(event.id)], {
+            'early_bird': max(Event.get_event_ticket_inventory(event, 'early_bird'), 0),
+            'standard': max(Event.get_event_ticket_inventory(event, 'standard'), 0),
+        })
+
+    def test_cached_tickets_left_cost_no_query(self):
+        event_ids = [event.id for event in self.events]
+        self.client.get(self.url, {'event': event_ids})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'event': event_ids})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(AVAILABILITY_CACHE_SECONDS=7)
+    def test_response_can_be_cached_publicly(self):
+        response = self.client.get(self.url, {'event': self.events[0].id})
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=7', response['Cache-Control'])
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_matching_etag_gets_not_modified(self):
+        response = self.client.get(self.url, {'event': self.events[0].id})
+        etag = response['ETag']
+        response = self.client.get(
+            self.url,
+            {'event': self.events[0].id},
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_does_not_depend_on_the_order_of_the_events(self):
+        first = self.client.get(self.url, {'event': [self.events[0].id, self.events[1].id]})
+        second = self.client.get(self.url, {'event': [self.events[1].id, self.events[0].id]})
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_unknown_events_are_left_out(self):
+        response = self.client.get(self.url, {'event': [self.events[0].id, 999999]})
+        self.assertEqual(list(response.json()['events']), [str(self.events[0].id)])
+
+    def test_get_without_events_is_refused(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_with_an_invalid_event_is_refused(self):
+        response = self.client.get(self.url, {'event': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(AVAILABILITY_MAX_EVENTS=1)
+    def test_get_with_too_many_events_is_refused(self):
+        response = self.client.get(self.url, {'event': [self.events[0].id, self.events[1].id]})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,94 @@
+"""Unit tests of the keyset pagination of the list views"""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from tsp.models import Order, Society, Student
+
+@override_settings(LIST_PAGE_SIZE=1)
+class KeysetPaginationTestCase(TestCase):
+    """Unit tests of the keyset pagination of the list views"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    def setUp(self):
+        self.user = Student.objects.get(email='johndoe@kcl.ac.uk')
+        self.societies = list(
+            Society.objects.filter(university=self.user.university).order_by('name', 'id')
+        )
+        self.client.login(email=self.user.email, password='Password123')
+
+    def test_first_page_holds_page_size_objects(self):
+        response = self.client.get(reverse('all_societies'))
+        self.assertEqual(list(response.context['object_list']), self.societies[:1])
+        self.assertTrue(response.context['page_obj'].has_next)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertContains(response, 'data-load-more-target="#list-items"')
+
+    def test_pages_follow_each_other_without_gaps_or_repeats(self):
+        url = reverse('all_societies')
+        societies = []
+        query = ''
+        while True:
+            response = self.client.get(f'{url}?{query}')
+            societies.extend(response.context['object_list'])
+            if not response.context['page_obj'].has_next:
+                break
+            query = response.context['next_page_query']
+        self.assertEqual(societies, self.societies)
+        self.assertNotContains(response, 'data-load-more')
+
+    def test_next_page_keeps_filters(self):
+        response = self.client.get(reverse('all_societies'), {'search': 'soc'})
+        self.assertIn('search=soc', response.context['next_page_query'])
+        self.assertIn('cursor=', response.context['next_page_query'])
+
+    def test_next_page_numbering_continues_from_previous_page(self):
+        second_page = self.client.get(reverse('all_societies')).context['next_page_query']
+        response = self.client.get(f"{reverse('all_societies')}?{second_page}")
+        self.assertEqual(response.context['page_obj'].start_index, 2)
+
+    def test_ajax_request_renders_only_the_next_page(self):
+        first_page = self.client.get(reverse('all_societies'))
+        response = self.client.get(
+            f"{reverse('all_societies')}?{first_page.context['next_page_query']}",
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertTemplateUsed(response, 'partials/keyset_page.html')
+        self.assertTemplateUsed(response, 'partials/lists/societies.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertContains(response, '<template data-items>')
+        self.assertContains(response, self.societies[1].name)
+        self.assertNotContains(response, self.societies[0].name)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('all_societies'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_descending_ordering_breaks_ties_by_id(self):
+        order = Order.objects.get(pk=29)
+        create_at = timezone.now()
+        for _ in range(3):
+            order.pk = None
+            order.create_at = create_at
+            order.save()
+        expected = list(
+            Order.objects.filter(student=self.user).order_by('-create_at', 'id')
+        )
+        url = reverse('list_order_history')
+        orders = []
+        query = ''
+        while True:
+            response = self.client.get(f'{url}?{query}')
+            orders.extend(response.context['object_list'])
+            if not response.context['page_obj'].has_next:
+                break
+            query = response.context['next_page_query']
+        self.assertEqual(orders, expected)
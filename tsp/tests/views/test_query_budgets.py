@@ -0,0 +1,402 @@
+"""Query budget tests of every view against a large dataset"""
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from ticket_selling_platform.urls import urlpatterns
+from tsp.jobs import run_pending_jobs
+from tsp.models import (
+    Cart, Event, EventCartItem, FeedEntry, Order, Society, Student,
+    StudentUnion, User
+)
+from tsp.query_budget import QueryRecorder, load_query_budgets
+from tsp.search import rebuild_search_index
+from tsp.views.tokens import account_activation_token
+
+SOCIETY_COUNT = 20
+STUDENT_COUNT = 30
+EVENT_COUNT = 60
+ORDER_COUNT = 10
+ORDER_ITEM_COUNT = 10
+CART_ITEM_COUNT = 15
+MEMBERSHIP_COUNT = 5
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Query budget tests of every view against a large dataset. The views are
+    requested again after the dataset has doubled: a view that runs a query
+    per object it shows makes more queries the second time and fails.
+    """
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json',
+        'tsp/tests/fixtures/default_cart.json',
+        'tsp/tests/fixtures/default_order.json'
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.get(email='johndoe@kcl.ac.uk')
+        cls.society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        cls.student_union = StudentUnion.objects.get(email='kclsu@kcl.ac.uk')
+        cls.superuser = User.objects.create(
+            email='budget_admin@kcl.ac.uk',
+            password=cls.student.password,
+            is_superuser=True
+        )
+        # Every student of the dataset buys tickets of the default event
+        Event.objects.filter(pk=15).update(
+            early_booking_capacity=1000,
+            standard_booking_capacity=1000
+        )
+        cls.event = Event.objects.get(pk=15)
+        cls.societies = [cls.society]
+        cls.students = [cls.student]
+        cls.events = [cls.event]
+        run_pending_jobs()
+        cls._add_dataset(cls, 1)
+
+    @classmethod
+    def _add_dataset(cls, dataset, batch):
+        """
+        Add a batch of societies, students, events, relationships and orders
+        to the dataset, and refill the cart of the student. The attributes
+        of the dataset, the test case class or a test, are set to the grown
+        lists.
+        """
+
+        dataset.societies = dataset.societies + cls._create_societies(dataset, batch)
+        students = cls._create_students(dataset, batch)
+        dataset.students = dataset.students + students
+        events = cls._create_events(dataset, batch)
+        dataset.events = dataset.events + events
+        cls._create_relationships(dataset, students, events)
+        cls._create_orders(dataset, students, batch)
+        cls._fill_cart(
+            dataset.student.cart,
+            dataset.events[1:CART_ITEM_COUNT * batch + 1]
+        )
+        dataset.student.cart.membership.add(
+            *dataset.societies[1:MEMBERSHIP_COUNT * batch + 1]
+        )
+        dataset.order = Order.objects.filter(student=dataset.student).latest('id')
+
+    @classmethod
+    def _create_societies(cls, dataset, batch):
+        return [
+            Society.objects.create(
+                email=f'budget_society{batch}_{i}@kcl.ac.uk',
+                password=dataset.student.password,
+                name=f'Budget society {batch}-{i}',
+                student_union=dataset.student_union,
+                university=dataset.student.university,
+                member_discount=i % 20,
+                member_fee=i % 10
+            )
+            for i in range(SOCIETY_COUNT)
+        ]
+
+    @classmethod
+    def _create_students(cls, dataset, batch):
+        students = [
+            Student.objects.create(
+                email=f'budget_student{batch}_{i}@kcl.ac.uk',
+                password=dataset.student.password,
+                first_name=f'Student{i}',
+                last_name=f'Budget{batch}',
+                university=dataset.student.university
+            )
+            for i in range(STUDENT_COUNT)
+        ]
+        for student in students:
+            Cart.objects.create(student=student)
+        return students
+
+    @classmethod
+    def _create_events(cls, dataset, batch):
+        start_time = timezone.now() + timedelta(days=30)
+        societies = dataset.societies
+        events = Event.objects.bulk_create([
+            Event(
+                host=societies[i % len(societies)],
+                name=f'Budget event {batch}-{i}',
+                description='An event of the query budget tests.',
+                location='Bush House',
+                start_time=start_time + timedelta(hours=i),
+                end_time=start_time + timedelta(hours=i + 2),
+                early_booking_capacity=100,
+                standard_booking_capacity=200,
+                early_bird_price=3,
+                standard_price=5
+            )
+            for i in range(EVENT_COUNT)
+        ])
+        # Every event is co-organised by the tech society
+        Event.society.through.objects.bulk_create(
+            [
+                Event.society.through(event_id=event.id, society_id=event.host_id)
+                for event in events
+            ] + [
+                Event.society.through(event_id=event.id, society_id=dataset.society.id)
+                for event in events
+            ],
+            ignore_conflicts=True
+        )
+        return events
+
+    @classmethod
+    def _create_relationships(cls, dataset, students, events):
+        society_relations = [
+            (Society.follower.through, dataset.societies),
+            (Society.subscriber.through, dataset.societies),
+            (Society.regular_member.through, dataset.societies[:MEMBERSHIP_COUNT]),
+        ]
+        for through, societies in society_relations:
+            through.objects.bulk_create([
+                through(society_id=society.id, student_id=student.id)
+                for society in societies
+                for student in dataset.students
+            ], ignore_conflicts=True)
+        Society.committee_member.through.objects.bulk_create([
+            Society.committee_member.through(
+                society_id=dataset.society.id,
+                student_id=student.id
+            )
+            for student in students[:MEMBERSHIP_COUNT]
+        ], ignore_conflicts=True)
+        Student.saved_event.through.objects.bulk_create([
+            Student.saved_event.through(student_id=dataset.student.id, event_id=event.id)
+            for event in events
+        ], ignore_conflicts=True)
+        FeedEntry.refresh()
+        rebuild_search_index()
+
+    @classmethod
+    def _create_orders(cls, dataset, students, batch):
+        events = dataset.events[1:]
+        for i in range(ORDER_COUNT):
+            cls._fill_cart(
+                dataset.student.cart,
+                events[i * ORDER_ITEM_COUNT % len(events):][:ORDER_ITEM_COUNT]
+            )
+            cls._create_order(dataset.student)
+        for student in students:
+            cls._fill_cart(student.cart, [dataset.event])
+            cls._create_order(student)
+        # The latest order of the student, shown by the order views, grows
+        # with the dataset
+        cls._fill_cart(dataset.student.cart, events[:ORDER_ITEM_COUNT * batch])
+        dataset.student.cart.membership.add(
+            *dataset.societies[1:MEMBERSHIP_COUNT * batch + 1]
+        )
+        cls._create_order(dataset.student)
+        run_pending_jobs()
+
+    @classmethod
+    def _fill_cart(cls, cart, events):
+        event_cart_items = EventCartItem.objects.bulk_create([
+            EventCartItem(event=event, early_bird_quantity=1, standard_quantity=1)
+            for event in events
+        ])
+        cart.event_cart_item.add(*event_cart_items)
+
+    @classmethod
+    def _create_order(cls, student):
+        Order.objects.create(
+            student=student,
+            line_1='Strand',
+            city_town='London',
+            postcode='WC2R 2LS',
+            country='United Kingdom'
+        )
+
+    def setUp(self):
+        self.budgets = load_query_budgets()
+        self.requests = self._get_requests()
+
+    def _get_requests(self):
+        """
+        Get the request made to each view, by URL name, as the email of the
+        logged in user or None, the method, the path, the data and the
+        expected response: a status code, or the URL of a redirect.
+        """
+
+        student = self.student.email
+        society = self.society.email
+        student_union = self.student_union.email
+        superuser = self.superuser.email
+        uidb64 = urlsafe_base64_encode(force_bytes(self.student.pk))
+        token = account_activation_token.make_token(self.student)
+        event_cart_item = self.student.cart.event_cart_item.first()
+        committee_member = self.students[1]
+        event_page = reverse('event_page', args=[self.event.id])
+        society_page = reverse('society_page', args=[self.society.id])
+        return {
+            'landing': (None, 'get', reverse('landing'), {}, 200),
+            'sign_up': (None, 'get', reverse('sign_up'), {}, 200),
+            'login': (None, 'get', reverse('login'), {}, 200),
+            'log_out': (student, 'get', reverse('log_out'), {}, reverse('landing')),
+            'forgot_password': (None, 'get', reverse('forgot_password'), {}, 200),
+            'forgot_password_next': (
+                None, 'get', reverse('forgot_password_next', args=[uidb64]), {}, 200
+            ),
+            'change_password': (student, 'get', reverse('change_password'), {}, 200),
+            'activate': (
+                None, 'get', reverse('activate', args=[uidb64, token]), {},
+                reverse('login')
+            ),
+            'debug_invalidations': (
+                superuser, 'get', reverse('debug_invalidations'), {}, 200
+            ),
+
+            'create_society': (student_union, 'get', reverse('create_society'), {}, 200),
+            'view_societies': (student_union, 'get', reverse('view_societies'), {}, 200),
+            # The society hosts events of every batch of the dataset
+            'delete_society': (
+                student_union, 'post', reverse('delete_society'),
+                {'society_id': self.societies[1].id}, reverse('view_societies')
+            ),
+            'society_profile': (
+                student_union, 'get', reverse('society_profile', args=[self.society.id]),
+                {}, 200
+            ),
+
+            'create_event': (society, 'get', reverse('create_event'), {}, 200),
+            'events_list': (society, 'get', reverse('events_list'), {}, 200),
+            'event_detail': (
+                society, 'get', reverse('event_detail', args=[self.event.id]), {}, 200
+            ),
+            'modify_event': (
+                society, 'get', reverse('modify_event', args=[self.event.id]), {}, 200
+            ),
+            'cancel_event': (
+                society, 'post', reverse('cancel_event'), {'event_id': self.event.id},
+                reverse('events_list')
+            ),
+            'list_committee_member': (
+                society, 'get', reverse('list_committee_member'), {}, 200
+            ),
+            'add_committee_member': (
+                society, 'get', reverse('add_committee_member'), {}, 200
+            ),
+            'remove_committee_member': (
+                society, 'post', reverse('remove_committee_member'),
+                {'member_pk': committee_member.id}, reverse('list_committee_member')
+            ),
+            'list_regular_member': (society, 'get', reverse('list_regular_member'), {}, 200),
+            'member_discount': (society, 'get', reverse('member_discount'), {}, 200),
+            'member_fee': (society, 'get', reverse('member_fee'), {}, 200),
+            'contact_committee': (society, 'get', reverse('contact_committee'), {}, 200),
+            'edit_profile_page': (society, 'get', reverse('edit_profile_page'), {}, 200),
+            'bank_details': (society, 'get', reverse('bank_details'), {}, 200),
+            'event_tickets': (
+                society, 'get', reverse('event_tickets', args=[self.event.id]), {}, 200
+            ),
+            'list_follower': (society, 'get', reverse('list_follower'), {}, 200),
+            'list_subscriber': (society, 'get', reverse('list_subscriber'), {}, 200),
+            'clear_regular_members': (
+                society, 'post', reverse('clear_regular_members'), {},
+                reverse('list_regular_member')
+            ),
+
+            'all_events': (student, 'get', reverse('all_events'), {}, 200),
+            'all_societies': (student, 'get', reverse('all_societies'), {}, 200),
+            'society_page': (student, 'get', society_page, {}, 200),
+            'follow_society': (
+                student, 'post', reverse('follow_society'), {'society_pk': self.society.id},
+                society_page
+            ),
+            'subscribe_society': (
+                student, 'post', reverse('subscribe_society'),
+                {'society_pk': self.society.id}, society_page
+            ),
+            'for_you_page': (student, 'get', reverse('for_you_page'), {}, 200),
+            'save_event': (
+                student, 'post', reverse('save_event'), {'event_pk': self.event.id},
+                event_page
+            ),
+            'event_page': (student, 'get', event_page, {}, 200),
+            'add_to_cart': (
+                student, 'post', reverse('add_to_cart'),
+                {'event_pk': self.event.id, 'early_bird_to_add': 1, 'standard_to_add': ''},
+                event_page
+            ),
+            'buy_membership': (
+                student, 'post', reverse('buy_membership'),
+                {'society_pk': self.societies[-1].id}, reverse('cart_detail')
+            ),
+            'cart_detail': (student, 'get', reverse('cart_detail'), {}, 200),
+            'update_cart': (
+                student, 'post', reverse('update_cart'),
+                {'event_cart_item_id': event_cart_item.id, 'early_bird_to_add': 1}, 200
+            ),
+            'availability': (
+                None, 'get', reverse('availability'),
+                {'event': [event.id for event in self.events[:CART_ITEM_COUNT]]}, 200
+            ),
+            'checkout': (student, 'get', reverse('checkout'), {}, 200),
+            'order_detail': (
+                student, 'get', reverse('order_detail', args=[self.order.id]), {}, 200
+            ),
+            'tickets': (student, 'get', reverse('tickets', args=[self.order.id]), {}, 200),
+            'order_status': (
+                student, 'get', reverse('order_status', args=[self.order.id]), {}, 200
+            ),
+            'list_order_history': (student, 'get', reverse('list_order_history'), {}, 200),
+        }
+
+    def _record_request(self, url_name):
+        email, method, path, data, expected = self.requests[url_name]
+        self.client.logout()
+        # The views are measured with nothing cached
+        cache.clear()
+        with transaction.atomic():
+            if email is not None:
+                self.client.force_login(User.objects.get(email=email))
+            with QueryRecorder() as recorder:
+                response = getattr(self.client, method)(path, data)
+            transaction.set_rollback(True)
+        if isinstance(expected, int):
+            self.assertEqual(response.status_code, expected, url_name)
+        else:
+            self.assertRedirects(response, expected, fetch_redirect_response=False)
+        return recorder
+
+    def _record_all_requests(self):
+        return {
+            url_name: self._record_request(url_name)
+            for url_name in sorted(self.requests)
+        }
+
+    def test_every_route_has_a_budget_and_a_request(self):
+        url_names = {pattern.name for pattern in urlpatterns if pattern.name}
+        self.assertEqual(set(self.budgets), url_names)
+        self.assertEqual(set(self.requests), url_names)
+
+    def test_views_stay_within_their_query_budget(self):
+        recorders = self._record_all_requests()
+        self._add_dataset(self, 2)
+        self.requests = self._get_requests()
+        grown_recorders = self._record_all_requests()
+        for url_name in sorted(self.requests):
+            with self.subTest(url_name=url_name):
+                recorder = grown_recorders[url_name]
+                self.assertLessEqual(
+                    recorder.count,
+                    self.budgets[url_name],
+                    f'{url_name} is over its query budget\n{recorder.summary()}'
+                )
+                self.assertEqual(
+                    recorder.count,
+                    recorders[url_name].count,
+                    f'{url_name} makes more queries on a larger dataset\n'
+                    f'{recorders[url_name].summary()}\n{recorder.summary()}'
+                )
@@ -0,0 +1,113 @@
+"""Unit tests of the caching of the lists of events and societies"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tsp import caching
+from tsp.models import Event, Society
+
+@override_settings(VIEW_CACHE_SECONDS=300)
+class ViewCachingTestCase(TestCase):
+    """Unit tests of the caching of the lists of events and societies"""
+
+    fixtures = [
+        'tsp/tests/fixtures/default_user.json',
+        'tsp/tests/fixtures/other_users.json',
+        'tsp/tests/fixtures/default_university.json',
+        'tsp/tests/fixtures/other_universities.json',
+        'tsp/tests/fixtures/default_event.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        caching.stats.reset()
+        self.event = Event.objects.get(pk=15)
+        self.events_url = reverse('all_events')
+        self.societies_url = reverse('all_societies')
+
+    def _log_in(self, email='johndoe@kcl.ac.uk'):
+        self.client.login(email=email, password='Password123')
+
+    def _get_names(self, url, data=None):
+        response = self.client.get(url, data or {})
+        self.assertEqual(response.status_code, 200)
+        return [item.name for item in response.context['object_list']]
+
+    def test_cached_list_is_served_with_only_the_queries_of_the_session(self):
+        self._log_in()
+        self.client.get(self.events_url)
+        # The session and the logged-in user are loaded
+        with self.assertNumQueries(2):
+            response = self.client.get(self.events_url)
+        self.assertContains(response, self.event.name)
+        self.assertContains(response, 'johndoe@kcl.ac.uk')
+        stats = caching.stats.snapshot()['all_events']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_cached_list_is_shared_by_the_students_of_a_university(self):
+        self._log_in()
+        self.client.get(self.societies_url)
+        self.client.logout()
+        self._log_in('janedoe@kcl.ac.uk')
+        response = self.client.get(self.societies_url)
+        self.assertContains(response, 'janedoe@kcl.ac.uk')
+        self.assertEqual(caching.stats.snapshot()['all_societies']['hits'], 1)
+
+    def test_cached_list_is_not_shared_across_universities(self):
+        self._log_in()
+        kcl_names = self._get_names(self.societies_url)
+        self.client.logout()
+        self._log_in('evasmith@qmw.ac.uk')
+        qmw_names = self._get_names(self.societies_url)
+        self.assertNotEqual(kcl_names, qmw_names)
+        self.assertCountEqual(
+            qmw_names,
+            Society.objects.filter(university_id=17).values_list('name', flat=True)
+        )
+
+    def test_cached_list_depends_on_the_query_parameters(self):
+        self._log_in()
+        self.assertIn(self.event.name, self._get_names(self.events_url))
+        self.assertEqual(self._get_names(self.events_url, {'search': 'zzz'}), [])
+        self.assertIn(self.event.name, self._get_names(self.events_url, {'search': ''}))
+        self.assertEqual(caching.stats.snapshot()['all_events']['misses'], 2)
+
+    def test_saving_an_event_makes_the_event_list_stale(self):
+        self._log_in()
+        self._get_names(self.events_url)
+        self.event.name = 'Renamed event'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.save()
+        self.assertIn('Renamed event', self._get_names(self.events_url))
+
+    def test_removing_the_societies_of_an_event_makes_the_event_list_stale(self):
+        self._log_in()
+        self._get_names(self.events_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.society.clear()
+        self.assertNotIn(self.event.name, self._get_names(self.events_url))
+
+    def test_deleting_an_event_makes_the_event_list_stale(self):
+        self._log_in()
+        self._get_names(self.events_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+        self.assertNotIn(self.event.name, self._get_names(self.events_url))
+
+    def test_saving_a_society_makes_the_society_lists_stale(self):
+        self._log_in()
+        self._get_names(self.societies_url)
+        society = Society.objects.get(email='tech_society@kcl.ac.uk')
+        society.name = 'Renamed society'
+        with self.captureOnCommitCallbacks(execute=True):
+            society.save()
+        self.assertIn('Renamed society', self._get_names(self.societies_url))
+        self.client.logout()
+        self._log_in('kclsu@kcl.ac.uk')
+        self.assertIn('Renamed society', self._get_names(reverse('view_societies')))
+
+    @override_settings(VIEW_CACHE_SECONDS=0)
+    def test_lists_are_not_cached_when_the_setting_is_0(self):
+        self._log_in()
+        self._get_names(self.events_url)
+        self._get_names(self.events_url)
+        self.assertNotIn('all_events', caching.stats.snapshot())
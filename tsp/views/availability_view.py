@@ -0,0 +1,59 @@
+import hashlib
+from django.conf import settings
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.generic import View
+from tsp.availability import get_tickets_left
+
+class AvailabilityView(View):
+    """
+    View that reports the tickets left for many events in one request, 
+    polled by the quantity widgets of the cart. The tickets left are the 
+    same for every user, so the response is public and can be cached by 
+    browsers and proxies for AVAILABILITY_CACHE_SECONDS, and revalidated 
+    with its ETag.
+    """
+
+    def get(self, request):
+        """
+        Handle GET requests to the view.
+
+        Parameters
+        ----------
+        request : HttpRequest
+            The HTTP request object, with the id of every event in an event 
+            query parameter.
+
+        Returns
+        -------
+        JsonResponse or HttpResponseNotModified or HttpResponseBadRequest
+            A JSON response with the number of early bird and standard 
+            tickets left by id of event, a 304 response if the ETag of the 
+            request matches, or a 400 response if the events are missing, 
+            invalid or too many.
+        """
+
+        try:
+            event_ids = sorted({int(event_id) for event_id in request.GET.getlist('event')})
+        except ValueError:
+            return HttpResponseBadRequest('Invalid event id.')
+        if not event_ids or len(event_ids) > settings.AVAILABILITY_MAX_EVENTS:
+            return HttpResponseBadRequest(
+                f'Between 1 and {settings.AVAILABILITY_MAX_EVENTS} events are required.'
+            )
+        tickets_left = get_tickets_left(event_ids)
+        data = {
+            'events': {
+                str(event_id): tickets_left[event_id]
+                for event_id in event_ids
+                if event_id in tickets_left
+            }
+        }
+        response = JsonResponse(data)
+        response['ETag'] = f'"{hashlib.sha256(response.content).hexdigest()[:32]}"'
+        patch_cache_control(
+            response, 
+            public=True, 
+            max_age=settings.AVAILABILITY_CACHE_SECONDS
+        )
+        return get_conditional_response(request, etag=response['ETag'], response=response)
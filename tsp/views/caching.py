@@ -0,0 +1,77 @@
+from django.conf import settings
+from tsp import caching
+
+class CachedViewMixin:
+    """
+    Serve the GET requests of a list view from the cache.
+
+    The context of the page is cached once the view has built it, keyed on
+    the view, the university and role of the user and the query parameters,
+    sorted and without the empty ones, so that students of the same
+    university share the cached lists. The page is still rendered for every
+    request, with the user and CSRF token of the request, but without
+    touching the database. The cached contexts are kept in the namespaces
+    of get_cache_namespaces, which are bumped when their data changes, and
+    for the VIEW_CACHE_SECONDS setting at most. Caching is off when the
+    setting is 0.
+
+    Attributes
+    ----------
+    cache_name : str
+        The name the cached contexts and their statistics are kept under.
+    """
+
+    cache_name = None
+
+    def get_cache_namespaces(self):
+        """
+        Get the namespaces of the cached contexts of the view.
+
+        Returns
+        -------
+        list of str
+            The namespaces.
+        """
+
+        return []
+
+    def get_cache_key_parts(self):
+        """
+        Get the values the context of the view depends on.
+
+        Returns
+        -------
+        list
+            The university and role of the user and the query parameters.
+        """
+
+        user = self.request.user
+        params = sorted(
+            (name, value)
+            for name, values in self.request.GET.lists()
+            for value in values
+            if value != ''
+        )
+        return [user.university_id, user.role, params]
+
+    def get(self, request, *args, **kwargs):
+        timeout = settings.VIEW_CACHE_SECONDS
+        if not timeout:
+            return super().get(request, *args, **kwargs)
+        context = caching.get_or_set(
+            self.cache_name or type(self).__name__,
+            self.get_cache_namespaces(),
+            self.get_cache_key_parts(),
+            self._get_cacheable_context,
+            timeout
+        )
+        self.object_list = context['object_list']
+        return self.render_to_response({**context, 'view': self})
+
+    def _get_cacheable_context(self):
+        """Build the context of the page, without the view."""
+
+        self.object_list = self.get_queryset()
+        context = self.get_context_data()
+        context.pop('view', None)
+        return context
@@ -1,9 +1,11 @@
 from django.shortcuts import redirect
 from django.conf import settings
 from django.contrib.auth.mixins import AccessMixin
-from django.http import HttpRequest, HttpResponseRedirect, HttpResponse
-from tsp.models import User
+from django.http import HttpRequest, HttpResponseRedirect, HttpResponse, HttpResponseBadRequest
+from tsp.models import IdempotencyKey, Job, User
+from tsp.broadcast import BroadcastMessage
 from typing import Union 
+import time
 
 from django.template.loader import render_to_string
 from django.contrib.sites.shortcuts import get_current_site
@@ -55,6 +57,79 @@ class StudentUnionAccessMixin(BaseAccessMixin):
     def check_access(self, request: HttpRequest) -> bool:
         return request.user.role == User.Role.STUDENT_UNION
 
+class DebugAccessMixin(BaseAccessMixin):
+    """
+    Provides access control for debugging views in order to restrict them 
+    to superusers, or to every logged in user when DEBUG is on.
+    """
+
+    def check_access(self, request: HttpRequest) -> bool:
+        return settings.DEBUG or request.user.is_superuser
+
+class IdempotentPostMixin:
+    """
+    Makes the POST requests of a view idempotent. A request sent with an 
+    idempotency key, in the idempotency_key form field or the 
+    Idempotency-Key header for AJAX requests, is recorded before it runs. A 
+    retry with the same key gets the redirect of the first request without 
+    running the view again, a retry with different data is refused, and a 
+    retry while the first request is still running waits for it for up to 
+    IDEMPOTENCY_WAIT_SECONDS. The key is released if the request does not 
+    redirect, so that a request that failed can be sent again.
+    """
+
+    idempotency_header = 'Idempotency-Key'
+    idempotency_field = 'idempotency_key'
+    idempotency_poll_seconds = 0.1
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        key = (
+            request.headers.get(self.idempotency_header) 
+            or request.POST.get(self.idempotency_field)
+        )
+        if not key:
+            return super().post(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return HttpResponseBadRequest('The idempotency key is too long.')
+
+        fingerprint = IdempotencyKey.get_fingerprint(request.path, request.POST)
+        record, created = IdempotencyKey.begin(request.user, key, fingerprint)
+        if not created:
+            return self._replay(record, fingerprint)
+        try:
+            response = super().post(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code in (301, 302, 303, 307, 308):
+            record.complete(response)
+        else:
+            record.delete()
+        return response
+
+    def _replay(self, record: IdempotencyKey, fingerprint: str) -> HttpResponse:
+        """Get the response of the request first sent with the key."""
+
+        if record.fingerprint != fingerprint:
+            return HttpResponse(
+                'The idempotency key was used for a different request.', 
+                status=422
+            )
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while not record.is_complete and time.monotonic() < deadline:
+            time.sleep(self.idempotency_poll_seconds)
+            record = IdempotencyKey.objects.filter(pk=record.pk).first()
+            if record is None:
+                break
+        if record is None or not record.is_complete:
+            return HttpResponse(
+                'The request with this idempotency key has not completed.', 
+                status=409
+            )
+        response = HttpResponseRedirect(record.response_location)
+        response.status_code = record.response_status
+        return response
+
 def login_prohibited(view_function): 
     """
     Decorator that prevents authenticated users from accessing a view. 
@@ -119,4 +194,27 @@ def send_event_message(request, recipient, event, web_format):
         'event': event, 
         'protocol': 'https' if request.is_secure() else 'http'
     }) 
-    return message
\ No newline at end of file
+    return message
+
+def enqueue_event_broadcast(request, event, audience, web_format, mail_subject): 
+    """
+    Render an event notification once for all recipients of the audience, 
+    and enqueue a job that personalises it for every recipient and writes 
+    it to the email outbox, so that the request does not depend on the 
+    number of recipients. The event details are rendered as they are when 
+    the broadcast is enqueued.
+    """
+
+    message = BroadcastMessage.render(web_format, {
+        'domain': get_current_site(request).domain, 
+        'event': event, 
+        'protocol': 'https' if request.is_secure() else 'http'
+    })
+    Job.enqueue(
+        'broadcast_event_email',
+        event_id=event.id,
+        audience=audience,
+        template=web_format,
+        subject=mail_subject,
+        parts=message.parts
+    )
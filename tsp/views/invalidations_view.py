@@ -0,0 +1,33 @@
+from django.http import JsonResponse
+from django.views.generic import View
+from tsp import caching, invalidation
+from tsp.views.helpers import DebugAccessMixin
+
+class InvalidationsView(DebugAccessMixin, View):
+    """
+    Debugging view that lists the latest invalidations of cached data made 
+    by the process serving the request, with the hit and miss statistics of 
+    the cached data.
+    """
+
+    def get(self, request):
+        """
+        Handle GET requests to the view.
+
+        Parameters
+        ----------
+        request : HttpRequest
+            The HTTP request object.
+
+        Returns
+        -------
+        JsonResponse
+            A JSON response with the time, namespaces and reasons of the 
+            latest batches of invalidations, latest first, and the cache 
+            statistics by name of cached data.
+        """
+
+        return JsonResponse({
+            'invalidations': invalidation.log.recent(),
+            'cache_stats': caching.stats.snapshot(),
+        })
@@ -0,0 +1,267 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+class KeysetPage:
+    """
+    A page of a list paginated by keyset.
+
+    Attributes
+    ----------
+    object_list : list
+        The objects of the page.
+    has_next : bool
+        Whether there are objects after the page.
+    next_cursor : str or None
+        The cursor of the next page, None if there is no next page.
+    start_index : int
+        The 1-based position of the first object of the page in the list.
+    """
+
+    def __init__(self, object_list, has_next, next_cursor, start_index):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+        self.start_index = start_index
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+class KeysetPaginationMixin:
+    """
+    Paginate a ListView by keyset instead of by offset.
+
+    The objects are ordered by a stable ordering that ends with a unique
+    field, and each page starts right after the last object of the previous
+    page, found through the cursor in the query string. Fetching a page costs
+    the same however far into the list it is, unlike an offset that has to
+    skip all the rows before it.
+
+    The page is rendered with the template in items_template_name, which the
+    template of the view includes. Requests made with XMLHttpRequest by the
+    "load more" link are answered with only the objects of the next page and
+    the link to the page after it.
+
+    Attributes
+    ----------
+    keyset_ordering : tuple of str
+        The fields the objects are ordered by, the last one being unique. A
+        field prefixed with '-' is in descending order.
+    items_template_name : str
+        The template that renders the objects of a page.
+    items_container_id : str
+        The id of the element of the page the objects are rendered in.
+    """
+
+    keyset_ordering = ('id',)
+    items_template_name = None
+    items_container_id = 'list-items'
+    fragment_template_name = 'partials/keyset_page.html'
+    cursor_kwarg = 'cursor'
+
+    def get_paginate_by(self, queryset):
+        """
+        Get the number of objects per page.
+
+        Returns
+        -------
+        int
+            The LIST_PAGE_SIZE setting.
+        """
+
+        return settings.LIST_PAGE_SIZE
+
+    def get_keyset_ordering(self):
+        """
+        Get the fields the objects are ordered by.
+
+        Returns
+        -------
+        tuple of str
+            The fields the objects are ordered by, the last one being unique.
+        """
+
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Get the page of objects after the cursor of the request.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            The objects of the list.
+        page_size : int
+            The number of objects per page.
+
+        Returns
+        -------
+        tuple
+            No paginator, the page, the objects of the page and whether the
+            list has more than one page.
+
+        Raises
+        ------
+        Http404
+            If the cursor is invalid.
+        """
+
+        ordering = self.get_keyset_ordering()
+        queryset = queryset.order_by(*ordering)
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        position = 0
+        if cursor:
+            values, position = self._decode_cursor(queryset.model, ordering, cursor)
+            queryset = queryset.filter(self._get_keyset_filter(ordering, values))
+        object_list = list(queryset[:page_size + 1])
+        has_next = len(object_list) > page_size
+        object_list = object_list[:page_size]
+        next_cursor = None
+        if has_next:
+            next_cursor = self._encode_cursor(
+                [getattr(object_list[-1], field.lstrip('-')) for field in ordering],
+                position + page_size
+            )
+        page = KeysetPage(object_list, has_next, next_cursor, position + 1)
+        return (None, page, object_list, has_next or bool(cursor))
+
+    def get_template_names(self):
+        """
+        Get the template of the full list, or of the next page only for the
+        requests of the "load more" link.
+
+        Returns
+        -------
+        list of str
+            The names of the templates.
+        """
+
+        if self.request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def get_context_data(self, **kwargs):
+        """
+        Get the data to be used in the template.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the following key(s) in addition to
+            those of ListView:
+            - 'items_template_name': The template of the objects of a page.
+            - 'items_container_id': The id of the element of the objects.
+            - 'next_page_query': The query string of the next page.
+        """
+
+        context = super().get_context_data(**kwargs)
+        context['items_template_name'] = self.items_template_name
+        context['items_container_id'] = self.items_container_id
+        page = context['page_obj']
+        if page.has_next:
+            query = self.request.GET.copy()
+            query[self.cursor_kwarg] = page.next_cursor
+            context['next_page_query'] = query.urlencode()
+        return context
+
+    def _get_keyset_filter(self, ordering, values):
+        """
+        Build the filter of the objects after the given ordering values,
+        comparing the fields in turn as a tuple.
+
+        Parameters
+        ----------
+        ordering : tuple of str
+            The fields the objects are ordered by.
+        values : list
+            The values of the fields of the last object of the previous page.
+
+        Returns
+        -------
+        Q
+            The filter of the objects after the values.
+        """
+
+        clauses = []
+        equal = {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': value}))
+            equal[name] = value
+        return reduce(or_, clauses)
+
+    def _encode_cursor(self, values, position):
+        """
+        Encode the ordering values of the last object of a page and the
+        number of objects up to it into a cursor.
+
+        Parameters
+        ----------
+        values : list
+            The values of the ordering fields of the last object.
+        position : int
+            The number of objects up to and including the last object.
+
+        Returns
+        -------
+        str
+            The cursor.
+        """
+
+        values = [
+            value.isoformat() if isinstance(value, (date, datetime))
+            else str(value) if isinstance(value, Decimal)
+            else value
+            for value in values
+        ]
+        data = json.dumps({'v': values, 'p': position}).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def _decode_cursor(self, model, ordering, cursor):
+        """
+        Decode a cursor into the ordering values of the last object of the
+        previous page and its position.
+
+        Parameters
+        ----------
+        model : Model
+            The model of the objects.
+        ordering : tuple of str
+            The fields the objects are ordered by.
+        cursor : str
+            The cursor.
+
+        Returns
+        -------
+        tuple
+            The values of the ordering fields and the position.
+
+        Raises
+        ------
+        Http404
+            If the cursor is invalid.
+        """
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            values = data['v']
+            position = int(data['p'])
+            if len(values) != len(ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(ordering, values)
+            ]
+        except Exception:
+            raise Http404('Invalid cursor.')
+        return values, position
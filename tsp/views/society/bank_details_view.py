@@ -1,4 +1,3 @@
-import stripe
 import time
 from django.views.generic.edit import UpdateView
 from django.contrib import messages
@@ -7,8 +6,7 @@ from tsp.models import Society
 from ticket_selling_platform import settings
 from tsp.forms.society.bank_details_form import BankDetailsForm
 from tsp.views.helpers import SocietyAccessMixin
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from tsp import payments
 
 class BankDetailsView(SocietyAccessMixin, UpdateView):
     """View that manages the bank details for a society account."""
@@ -20,7 +18,7 @@ class BankDetailsView(SocietyAccessMixin, UpdateView):
     def get_object(self, queryset=None):
         """Get the society object for the view."""
         
-        self.society = self.request.user.society
+        self.society = self.request.user
         return self.society
 
     def form_valid(self, form):
@@ -61,7 +59,7 @@ class BankDetailsView(SocietyAccessMixin, UpdateView):
             The Stripe account created.
         """
 
-        account = stripe.Account.create(
+        account = payments.create_account(
             type='custom',
             country='GB',
             email=self.society.email,
@@ -113,11 +111,13 @@ class BankDetailsView(SocietyAccessMixin, UpdateView):
             The society's Stripe account.
         """
         
-        account.tos_acceptance = {
-            'date': int(time.time()),
-            'ip': self.request.META.get('REMOTE_ADDR', None),
-        }
-        account.save()
+        payments.update_account(
+            account.id,
+            tos_acceptance={
+                'date': int(time.time()),
+                'ip': self.request.META.get('REMOTE_ADDR', None),
+            }
+        )
 
     def form_invalid(self, form):
         """
@@ -1,7 +1,7 @@
 from django.shortcuts import redirect, render, get_object_or_404
 from django.urls import reverse_lazy
 from tsp.models import Event
-from tsp.views.helpers import SocietyAccessMixin, send_email, send_event_message
+from tsp.views.helpers import SocietyAccessMixin, enqueue_event_broadcast
 from django.views import View
 from django.template.loader import render_to_string
 from django.contrib.sites.shortcuts import get_current_site
@@ -37,7 +37,9 @@ class CancelEventView(SocietyAccessMixin, View):
         Generate the cancellation email for all of the students who bought 
         the ticket or saved the event.
         If a student both saved the event and bought ticket(s), he/she is 
-        recognized as a buyer.
+        recognized as a buyer. The emails are written to the email outbox by 
+        a background job, and sent from there by the send_outbound_emails 
+        worker.
 
         Parameters
         ----------
@@ -47,39 +49,19 @@ class CancelEventView(SocietyAccessMixin, View):
             The cancelled event.
         """
 
-        email_to_buyer = 'society/email/cancel_event_email_buyer.html'
-        email_to_saver = 'society/email/cancel_event_email_saver.html'
-        
-        try:
-            for buyer in event.event_buyers:
-                self._send_cancel_email(request, event, buyer, email_to_buyer)
-            for saver in event.event_filtered_savers:
-                self._send_cancel_email(request, event, saver, email_to_saver)
-            messages.success(request, 'Cancellation emails sent successfully!')
-        except Exception as e:
-            messages.error(request, 'Failed to send the cancellation emails.')
-
-    def _send_cancel_email(self, request, event, user, email_template):
-        """
-        Send a cancellation email to a user for a cancelled event.
-        
-        Parameters
-        ----------
-        request : HttpRequest
-            The current HTTP request.
-        event : Event
-            The cancelled event.
-        user : User
-            The user who bought the ticket or saved the event.
-        email_template : str
-            The path to the email template to use for the email.
-        
-        Returns
-        -------
-        bool
-            True if the email was successfully sent, False otherwise.
-        """
-    
         mail_subject = 'We\'re sorry, the event ' + event.name + ' is cancelled!'
-        message = send_event_message(request, user, event, email_template)  
-        send_email(request, [user.email] , mail_subject, message)
\ No newline at end of file
+        enqueue_event_broadcast(
+            request, 
+            event, 
+            'buyers', 
+            'society/email/cancel_event_email_buyer.html', 
+            mail_subject
+        )
+        enqueue_event_broadcast(
+            request, 
+            event, 
+            'savers', 
+            'society/email/cancel_event_email_saver.html', 
+            mail_subject
+        )
+        messages.success(request, 'Cancellation emails will be sent shortly!')
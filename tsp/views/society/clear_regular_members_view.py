@@ -18,7 +18,7 @@ class ClearRegularMembersView(SocietyAccessMixin, View):
             all regular members.
         """
         
-        society = request.user.society
+        society = request.user
         society.regular_member.clear()
         messages.success(request, "All regular members have been removed.")
         return redirect('list_regular_member')
\ No newline at end of file
@@ -25,7 +25,7 @@ class AddCommitteeMemberView(SocietyAccessMixin, FormView):
         """
     
         kwargs = super().get_form_kwargs()
-        kwargs['society'] = self.request.user.society
+        kwargs['society'] = self.request.user
         return kwargs
 
     def form_valid(self, form):
@@ -47,7 +47,7 @@ class AddCommitteeMemberView(SocietyAccessMixin, FormView):
         """
 
         student = form.cleaned_data['student']
-        society = Society.objects.get(pk=self.request.user.pk)
+        society = self.request.user
         society.add_committee_member(student)
         messages.success(self.request, "New committee member added!")
         return super().form_valid(form)
@@ -20,6 +20,6 @@ class ListCommitteeMembersView(SocietyAccessMixin, ListView):
             that is filtered based on the society account logged in. 
         """
         
-        society = self.request.user.society
+        society = self.request.user
         committee_members = society.committee_members.order_by('first_name')
         return committee_members     
\ No newline at end of file
@@ -21,7 +21,7 @@ class RemoveCommitteeMemberView(SocietyAccessMixin, View):
             A redirect response to the committee member list page.
         """
         
-        society = request.user.society
+        society = request.user
         member_pk = request.POST['member_pk']
         member = Student.objects.get(pk=member_pk) 
         society.remove_committee_member(member) 
@@ -1,10 +1,9 @@
 from django.shortcuts import render
 from django.views import View
-from tsp.views.helpers import send_email
 from django.contrib import messages
 from tsp.views.helpers import SocietyAccessMixin
 from tsp.forms.society.contact_members_form import ContactCommitteeMembersForm  
-from tsp.models import Society
+from tsp.models import OutboundEmail
 
 class ContactCommitteeMembersView(SocietyAccessMixin, View):
     """View for users to contact committee members."""
@@ -42,13 +41,17 @@ class ContactCommitteeMembersView(SocietyAccessMixin, View):
         if form.is_valid(): 
             mail_subject = form.get_header() 
             mail_message = form.get_message()  
-            society = Society.objects.get(pk=request.user.pk)
+            society = request.user
             committee_members = society.committee_members
-            emails = []
-            for member in committee_members: 
-                emails.append(member.email)
-            send_email(request, emails, mail_subject, mail_message)
-            messages.success(request, 'Email sent successfully!')
+            OutboundEmail.enqueue([
+                OutboundEmail(
+                    recipient=member.email, 
+                    subject=mail_subject, 
+                    body=mail_message
+                )
+                for member in committee_members
+            ])
+            messages.success(request, 'Email will be sent shortly!')
         return self.render()
 
     def render(self):
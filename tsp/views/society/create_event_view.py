@@ -1,4 +1,4 @@
-from tsp.views.helpers import SocietyAccessMixin, send_email, send_event_message
+from tsp.views.helpers import SocietyAccessMixin, enqueue_event_broadcast
 from django import forms
 from django.contrib import messages
 from django.urls import reverse_lazy
@@ -48,12 +48,12 @@ class CreateEventView(SocietyAccessMixin, CreateView):
                 event.society.add(partner.id)
 
         # Set the host and add it to event if the society has set bank details.
-        host = self.request.user.society
+        host = self.request.user
         if host and not host.has_bank_details:
             event.delete()
             messages.error(self.request, "Host does not have bank details.")
             return self.form_invalid(form)
-        event.host = self.request.user.society
+        event.host = self.request.user
         event.society.add(event.host.id) 
 
         # Set the event photo and save the event
@@ -87,7 +87,9 @@ class CreateEventView(SocietyAccessMixin, CreateView):
     
     def _send_event_notification(self, event):
         """
-        Send an event notification to subscribed users.
+        Send an event notification to subscribed users. The notifications 
+        are written to the email outbox by a background job, and sent from 
+        there by the send_outbound_emails worker.
 
         Parameters
         ----------
@@ -95,10 +97,10 @@ class CreateEventView(SocietyAccessMixin, CreateView):
             The event that has been created
         """
 
-        subscribers = event.host.subscriber.all()
-        for society in event.society.all():
-            subscribers |= society.subscriber.all()
-
-        for subscriber in subscribers.distinct():
-            message = send_event_message(self.request, subscriber, event, 'society/email/create_event_email.html')  
-            send_email(self.request, [subscriber.email], f'{event.host.name} has created a new event!', message)
\ No newline at end of file
+        enqueue_event_broadcast(
+            self.request,
+            event,
+            'subscribers',
+            'society/email/create_event_email.html',
+            f'{event.host.name} has created a new event!'
+        )
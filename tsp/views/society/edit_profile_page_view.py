@@ -19,4 +19,4 @@ class EditProfilePageView(SocietyAccessMixin, DetailView):
             The current society user.
         """
         
-        return self.request.user.society
\ No newline at end of file
+        return self.request.user
\ No newline at end of file
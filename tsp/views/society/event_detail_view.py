@@ -28,7 +28,7 @@ class EventDetailView(SocietyAccessMixin, DetailView):
         """
         
         event = get_object_or_404(Event, pk=self.kwargs.get('pk'))
-        society = self.request.user.society
+        society = self.request.user
         if not event.is_organiser(society):
             raise Http404
         return event
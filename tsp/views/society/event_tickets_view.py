@@ -2,12 +2,14 @@ from django.views.generic import ListView
 from tsp.views.helpers import SocietyAccessMixin
 from tsp.models import Ticket, Event
 from django.shortcuts import get_object_or_404, redirect
+from tsp.views.pagination import KeysetPaginationMixin
 
-class EventTicketsView(SocietyAccessMixin, ListView):
+class EventTicketsView(SocietyAccessMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of tickets for an event."""
 
     model = Ticket
     template_name = 'society/event_tickets.html'
+    items_template_name = 'partials/lists/tickets.html'
 
     def get_queryset(self):
         """
@@ -20,7 +22,7 @@ class EventTicketsView(SocietyAccessMixin, ListView):
         """ 
 
         event = self.get_object()
-        return Ticket.get_tickets_by_event(event)
+        return Ticket.get_tickets_by_event(event).select_related('order__student')
 
     def get_object(self):   
         """
@@ -40,5 +42,5 @@ class EventTicketsView(SocietyAccessMixin, ListView):
         return get_object_or_404(
             Event, 
             pk=self.kwargs.get('pk'),
-            society=self.request.user.society
+            society=self.request.user
         )
\ No newline at end of file
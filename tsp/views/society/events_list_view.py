@@ -1,6 +1,7 @@
 from django.views.generic import ListView
-from tsp.models import Event, Society
+from tsp.models import Event
 from tsp.views.helpers import SocietyAccessMixin
+from tsp.search import search_events
 
 class EventListView(SocietyAccessMixin, ListView):
     """View that displays a list events for a society account."""
@@ -26,8 +27,7 @@ class EventListView(SocietyAccessMixin, ListView):
             Upcoming events are displayed if event type is not selected.
         """
         
-        user = self.request.user
-        society = Society.objects.get(pk=user.pk)
+        society = self.request.user
         event_type = self.request.GET.get('event_type', self.selected_option)
         self.selected_option = event_type
         
@@ -40,10 +40,7 @@ class EventListView(SocietyAccessMixin, ListView):
         
         search_query = self.request.GET.get('search', '')
         if search_query:
-            queryset = queryset.filter(
-                society__in=[society], 
-                name__icontains=search_query
-            )
+            queryset = search_events(search_query, queryset=queryset)
         return queryset
     
     def get_context_data(self, **kwargs):
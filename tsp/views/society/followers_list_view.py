@@ -1,13 +1,16 @@
 from tsp.views.helpers import SocietyAccessMixin
 from django.views.generic import ListView
 from tsp.models import Society
+from tsp.views.pagination import KeysetPaginationMixin
 
-class FollowersListView(SocietyAccessMixin, ListView):
+class FollowersListView(SocietyAccessMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of followers for a society account."""   
 
     model = Society 
     template_name = 'society/followers_list.html'
     context_object_name = "users"
+    items_template_name = 'partials/lists/students.html'
+    keyset_ordering = ('first_name', 'id')
 
     def get_queryset(self):
         """
@@ -20,7 +23,7 @@ class FollowersListView(SocietyAccessMixin, ListView):
             that is filtered based on the society account logged in. 
         """
         
-        society = self.request.user.society
-        followers = society.followers.order_by('first_name')
+        society = self.request.user
+        followers = society.followers.all()
         return followers
    
\ No newline at end of file
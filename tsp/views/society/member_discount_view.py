@@ -23,7 +23,7 @@ class MemberDiscountView(SocietyAccessMixin, UpdateView):
             The current society user.
         """
         
-        return self.request.user.society
+        return self.request.user
 
     def form_valid(self, form):
         """
@@ -22,7 +22,7 @@ class MemberFeeView(SocietyAccessMixin, UpdateView):
             The current society user.
         """
         
-        return self.request.user.society
+        return self.request.user
 
     def form_valid(self, form):
         """
@@ -1,7 +1,7 @@
 from django.contrib import messages
 from django.http import Http404
 from django.urls import reverse_lazy
-from tsp.views.helpers import SocietyAccessMixin, send_email, send_event_message
+from tsp.views.helpers import SocietyAccessMixin, enqueue_event_broadcast
 from django.views.generic import UpdateView
 from django.shortcuts import render, redirect, reverse
 from tsp.models import Event
@@ -37,7 +37,7 @@ class ModifyEventView(SocietyAccessMixin, UpdateView):
         """
 
         event = Event.objects.get(pk=self.kwargs['pk'])
-        society = request.user.society
+        society = request.user
         if not event.is_active or not event.is_organiser(society):
             raise Http404()
         form = self.form_class()
@@ -78,50 +78,31 @@ class ModifyEventView(SocietyAccessMixin, UpdateView):
         Generate the email for all of the students who bought the ticket or 
         saved the event.
         If a student both saved the event and bought ticket(s), he/she is 
-        recognized as a buyer.
+        recognized as a buyer. The emails are written to the email outbox by 
+        a background job, and sent from there by the send_outbound_emails 
+        worker.
 
-        Parameters
-        ----------
-        request : HttpRequest
-            The current HTTP request.
-        event : Event
-            The cancelled event.
-        """
-
-        email_to_buyer = 'society/email/modify_event_email_buyer.html'
-        email_to_saver = 'society/email/modify_event_email_saver.html'
-        
-        try:
-            for buyer in event.event_buyers:
-                self._send_email(request, event, buyer, email_to_buyer)
-            for saver in event.event_filtered_savers:
-                self._send_email(request, event, saver, email_to_saver)
-            messages.success(request, 'Modification emails sent successfully!')
-        except Exception as e:
-            print(e)
-            messages.error(request, 'Failed to send the modification emails.')
-
-    def _send_email(self, request, event, user, email_template):
-        """
-        Send the email to a user for a modified event.
-        
         Parameters
         ----------
         request : HttpRequest
             The current HTTP request.
         event : Event
             The modified event.
-        user : User
-            The user who bought the ticket or saved the event.
-        email_template : str
-            The path to the email template to use for the email.
-        
-        Returns
-        -------
-        bool
-            True if the email was successfully sent, False otherwise.
         """
-        
+
         mail_subject = 'Changes to ' + event.name 
-        message = send_event_message(request, user, event, email_template)  
-        send_email(request, [user.email] , mail_subject, message)
\ No newline at end of file
+        enqueue_event_broadcast(
+            request, 
+            event, 
+            'buyers', 
+            'society/email/modify_event_email_buyer.html', 
+            mail_subject
+        )
+        enqueue_event_broadcast(
+            request, 
+            event, 
+            'savers', 
+            'society/email/modify_event_email_saver.html', 
+            mail_subject
+        )
+        messages.success(request, 'Modification emails will be sent shortly!')
@@ -1,13 +1,16 @@
 from tsp.views.helpers import SocietyAccessMixin
 from django.views.generic import ListView
 from tsp.models import Society
+from tsp.views.pagination import KeysetPaginationMixin
 
-class ListRegularMembers(SocietyAccessMixin, ListView):
+class ListRegularMembers(SocietyAccessMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of regular members for a society account.""" 
     
     model = Society 
     template_name = 'society/regular_members_list.html'
     context_object_name = "users"
+    items_template_name = 'partials/lists/members.html'
+    keyset_ordering = ('first_name', 'id')
     
     def get_queryset(self):
         """
@@ -20,6 +23,6 @@ class ListRegularMembers(SocietyAccessMixin, ListView):
             is filtered based on the society account logged in. 
         """
 
-        society = self.request.user.society
-        regular_members = society.regular_members.order_by('first_name')
+        society = self.request.user
+        regular_members = society.regular_members.all()
         return regular_members
\ No newline at end of file
@@ -1,13 +1,16 @@
 from tsp.views.helpers import SocietyAccessMixin
 from django.views.generic import ListView
 from tsp.models import Society
+from tsp.views.pagination import KeysetPaginationMixin
 
-class SubscriberListView(SocietyAccessMixin, ListView):
+class SubscriberListView(SocietyAccessMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of subscribers for a society account."""   
 
     model = Society 
     template_name = 'society/subscribers_list.html'
     context_object_name = "users"
+    items_template_name = 'partials/lists/students.html'
+    keyset_ordering = ('first_name', 'id')
 
     def get_queryset(self):
         """
@@ -20,7 +23,7 @@ class SubscriberListView(SocietyAccessMixin, ListView):
             that is filtered based on the society account logged in. 
         """
         
-        society = self.request.user.society
-        subscribers = society.subscribers.order_by('first_name')
+        society = self.request.user
+        subscribers = society.subscribers.all()
         return subscribers
    
\ No newline at end of file
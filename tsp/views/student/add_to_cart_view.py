@@ -31,8 +31,8 @@ class AddToCartView(StudentAccessMixin, View):
         Notes
         -----
         Get or create the cart for the current user. 
-        If the form is valid, create and add the cart item into the user's cart. 
-        Otherwise generate an error message and return user to the event details 
+        If the form is valid, create and add the cart item into the user's cart 
+        and hold its tickets. Otherwise generate an error message and return user to the event details 
         page.
         """
         
@@ -40,7 +40,10 @@ class AddToCartView(StudentAccessMixin, View):
         form = AddToCartForm(request.POST, user=request.user, event=event)
         if form.is_valid():
             self.cart = form.save()
-            if (form.cleaned_data['early_bird_to_add'] or 
+            if form.non_field_errors():
+                # The tickets sold out before they could be held
+                messages.error(request, form.non_field_errors()[0])
+            elif (form.cleaned_data['early_bird_to_add'] or 
                 form.cleaned_data['standard_to_add'] or 
                 form.cleaned_data['membership']):
                 messages.success(request, self.success_message)
@@ -1,18 +1,36 @@
 from django.views.generic import ListView
 from django.utils import timezone
 from tsp.models import Event
+from tsp.search import search_events
+from tsp import caching
+from tsp.views.caching import CachedViewMixin
 from tsp.views.helpers import StudentAccessMixin
+from tsp.views.pagination import KeysetPaginationMixin
 
-class AllEventsView(StudentAccessMixin, ListView):
+class AllEventsView(StudentAccessMixin, CachedViewMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of all events."""
 
     model = Event
+    cache_name = 'all_events'
     template_name = 'student/all_events.html'
+    items_template_name = 'partials/lists/events.html'
     selected_date_option = "EARLIEST"
     selected_status_option = "UPCOMING"
     date_options = [("EARLIEST", "Earliest"), ("LATEST", "Latest")]
     status_options = [("UPCOMING", "Upcoming"), ("PAST", "Past"), ("CANCELLED", "Cancelled")]
     
+    def get_cache_namespaces(self):
+        """
+        Get the namespaces of the cached contexts of the view.
+
+        Returns
+        -------
+        list of str
+            The namespace of the events of the university of the user.
+        """
+
+        return [caching.events_namespace(self.request.user.university_id)]
+
     def get_queryset(self):
         """
         Get the queryset of events.
@@ -28,10 +46,13 @@ class AllEventsView(StudentAccessMixin, ListView):
         self.selected_date_option = date_filter
         status_filter = self.request.GET.get('status_filter', self.selected_status_option)
         self.selected_status_option = status_filter
-        context = Event.objects.filter(name__icontains=search_query, society__university=self.request.user.university)
+        context = search_events(
+            search_query, 
+            university=self.request.user.university, 
+            ranked=False
+        )
         context = self._filter_by_status(status_filter, context)
-        context = self._filter_by_datetime(date_filter, context)
-        return context.distinct()
+        return context
     
     def _filter_by_status(self, status_filter, context):
         """
@@ -58,37 +79,20 @@ class AllEventsView(StudentAccessMixin, ListView):
             context = context.filter(end_time__gte=now, status='CANCELLED')
         return context
     
-    def _filter_by_datetime(self, date_filter, context):
+    def get_keyset_ordering(self):
         """
-        Filter the queryset of events by the earliest or latest start date 
-        and time.
-
-        Parameters
-        ----------
-        date_filter : str
-            The selected date and time filter: either 'EARLIEST' or 'LATEST'.
-        context : QuerySet
-            The queryset of events to filter.
+        Get the fields the events are ordered by, from the earliest or latest 
+        start date and time selected by the user.
 
         Returns
         -------
-        QuerySet
-            The filtered queryset of events.
+        tuple of str
+            The fields the events are ordered by.
         """
-        
-        if date_filter == 'EARLIEST':
-            context = context.order_by(
-                'start_time__date', 
-                'start_time__hour', 
-                'start_time__minute'
-            )
-        elif date_filter == 'LATEST':
-            context = context.order_by(
-                '-start_time__date', 
-                '-start_time__hour', 
-                '-start_time__minute'
-            )
-        return context
+
+        if self.selected_date_option == 'LATEST':
+            return ('-start_time', '-id')
+        return ('start_time', 'id')
 
     def get_context_data(self, **kwargs):
         """
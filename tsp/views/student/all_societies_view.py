@@ -1,13 +1,31 @@
 from django.views.generic import ListView
 from django.db.models import Q
 from tsp.models import Society, University
+from tsp import caching
+from tsp.views.caching import CachedViewMixin
 from tsp.views.helpers import StudentAccessMixin
+from tsp.views.pagination import KeysetPaginationMixin
 
-class AllSocietiesView(StudentAccessMixin, ListView):
+class AllSocietiesView(StudentAccessMixin, CachedViewMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of all societies."""
 
     model = Society
+    cache_name = 'all_societies'
     template_name = 'student/all_societies.html'
+    items_template_name = 'partials/lists/societies.html'
+    keyset_ordering = ('name', 'id')
+
+    def get_cache_namespaces(self):
+        """
+        Get the namespaces of the cached contexts of the view.
+
+        Returns
+        -------
+        list of str
+            The namespace of the societies of the university of the user.
+        """
+
+        return [caching.societies_namespace(self.request.user.university_id)]
 
     def get_queryset(self):
         """
@@ -17,14 +35,14 @@ class AllSocietiesView(StudentAccessMixin, ListView):
         -------
         queryset
             All societies belonging to the same university as the user, 
-            filtered by the search query and ordered by name.
+            filtered by the search query.
         """
         
         search_query = self.request.GET.get('search', "")
         return Society.objects.filter(
             name__icontains=search_query,
             university=self.request.user.university,
-        ).order_by('name')
+        ).select_related('university')
 
     def get_context_data(self, **kwargs):
         """
@@ -25,7 +25,7 @@ class BuyMembershipView(StudentAccessMixin, View):
             A redirect response to the cart detail page.
         """
         
-        student = request.user.student
+        student = request.user
         cart = get_object_or_404(Cart, student=student)
         society_pk = request.POST['society_pk']
         membership = get_object_or_404(Society, pk=society_pk)
@@ -13,7 +13,7 @@ class CartDetailView(StudentAccessMixin, DetailView):
     def get_object(self, queryset=None):
         """Return the cart instance associated with the current user."""
         
-        cart,_ = Cart.objects.get_or_create(student=self.request.user.student)
+        cart,_ = Cart.objects.get_or_create(student=self.request.user)
         return cart
     
     def get_context_data(self, **kwargs):
@@ -29,22 +29,19 @@ class CartDetailView(StudentAccessMixin, DetailView):
             - 'total_saved': The total amount saved through discounts.
             - 'total_price': The total price of all items in the cart with discounts applied.
             - 'count': The total number of items in the cart.
+            - 'discount_data': The discount applied to each event cart item.
         """ 
         
         context = super().get_context_data(**kwargs)
-        cart = self.object
-        memberships = cart.membership.all()
-        event_cart_items = cart.event_cart_item.all()
-        total_saved =cart.total_saved
-        total_price = cart.total_price
-        count = cart.count
+        pricing = self.object.get_pricing()
  
         context.update({
-            'event_cart_items': event_cart_items,
-            'memberships': memberships,
-            'total_saved': total_saved,
-            'total_price': total_price,
-            'count': count,
+            'event_cart_items': pricing.event_cart_items,
+            'memberships': pricing.memberships,
+            'total_saved': pricing.total_saved,
+            'total_price': pricing.total_price,
+            'count': pricing.count,
+            'discount_data': pricing.discount_data,
         })
 
         return context
\ No newline at end of file
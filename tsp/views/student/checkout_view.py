@@ -1,25 +1,25 @@
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.views.generic import FormView
-from tsp.views.helpers import StudentAccessMixin
+from tsp.views.helpers import IdempotentPostMixin, StudentAccessMixin
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.db import transaction
-from tsp.models import Order, Payment, Ticket, HistoricalCart
+from tsp.models import CartTrimmed, Event, Order, Job, Student, TicketsSoldOut
 import stripe
 import os
+import uuid
 from tsp.forms.student.checkout_form import CheckoutForm
-from django.core.mail import send_mail
+from tsp import payments
 from ticket_selling_platform import settings
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CheckoutView(StudentAccessMixin, FormView):
+class CheckoutView(StudentAccessMixin, IdempotentPostMixin, FormView):
     """
     View for handling the checkout process, including creating a new 
     order, processing payment with Stripe, clearing the shopping 
-    cart and updating inventory.
+    cart and updating inventory. The checkout form carries an idempotency 
+    key, so that submitting it again redirects to the order already placed.
     """
     
     template_name = 'student/checkout.html'
@@ -41,8 +41,8 @@ class CheckoutView(StudentAccessMixin, FormView):
             The HTTP response object returned by the superclass.
         """
         
-        if hasattr(request.user, 'student'):
-            self.student = request.user.student
+        if isinstance(request.user, Student):
+            self.student = request.user
             self.cart = self.student.cart
 
         return super().dispatch(request, *args, **kwargs)
@@ -68,7 +68,8 @@ class CheckoutView(StudentAccessMixin, FormView):
     
     def get_form(self, form_class=None):
         """
-        Get an instance of the form to be used in this view.
+        Get an instance of the form to be used in this view. A new form 
+        gets a new idempotency key.
 
         Returns
         -------
@@ -79,6 +80,8 @@ class CheckoutView(StudentAccessMixin, FormView):
         form = super().get_form(form_class)
         form.initial['amount'] = self.cart.total_price
         form.initial['email'] = self.student.email
+        if not form.is_bound:
+            form.initial['idempotency_key'] = uuid.uuid4().hex
         return form
     
     def get(self, request, *args, **kwargs):
@@ -99,16 +102,20 @@ class CheckoutView(StudentAccessMixin, FormView):
             The HTTP response object that represents the view.
         """
 
-        if self.cart.all_items_free:
-            order = self._create_order(None)
-            self._send_order_confirmation(order, None)
+        if self.cart.get_pricing().all_items_free:
+            try:
+                order = self._create_order(None)
+            except TicketsSoldOut as e:
+                messages.error(request, str(e))
+                return redirect('cart_detail')
             return redirect('order_detail', pk=order.pk)
         return super().get(request, *args, **kwargs)
 
-    @transaction.atomic
     def form_valid(self, form):    
         """
-        Handle valid form submissions.
+        Handle valid form submissions. The customer is created in Stripe 
+        before the order transaction starts, so that the transaction does not 
+        wait on Stripe and begins with the lock of the events.
         
         Parameters
         ----------
@@ -126,24 +133,11 @@ class CheckoutView(StudentAccessMixin, FormView):
         amount = int(form.initial['amount'] * 100)
         payment_method_id = form.cleaned_data['payment_method_id']
         try:
-            # Create a customer object
-            customer = stripe.Customer.create(
-                name=form.cleaned_data['full_name'],
-                email=form.cleaned_data['email'],
-            )
-         
-            # Attach the payment method to the customer
-            stripe.PaymentMethod.attach(
-                payment_method_id,
-                customer=customer.id,
-            )
-
-            # Set the payment method as default payment method for the customer
-            stripe.Customer.modify(
-                customer.id,
-                invoice_settings={
-                    'default_payment_method': payment_method_id,
-                },
+            # Create a customer with the payment method as its default
+            customer = payments.create_customer(
+                form.cleaned_data['full_name'],
+                form.cleaned_data['email'],
+                payment_method_id
             )
         
             # Create a new order
@@ -153,28 +147,49 @@ class CheckoutView(StudentAccessMixin, FormView):
             self._handle_stripe_error(e)
             return self.form_invalid(form) 
 
+        except CartTrimmed as e:
+            messages.error(self.request, str(e))
+            return redirect('cart_detail')
+
+        except TicketsSoldOut as e:
+            messages.error(self.request, str(e))
+            return self.form_invalid(form)
+
         except Exception as e:
             self._handle_generic_error()
             return self.form_invalid(form)
              
-        self._send_order_confirmation(order, form)
         return redirect('order_detail', pk=order.pk)
             
     def _create_order(self, form, customer_id=None):
         """
-        Create a new order with the submitted form data.
+        Create a new order with the submitted form data and enqueue its 
+        confirmation email. The order is created in its own transaction, so 
+        that a failed order completion rolls back the order only. The 
+        transaction first locks the events of the cart, then checks that 
+        their tickets are still left, so that concurrent checkouts of the 
+        last tickets cannot both succeed. This must not be called in another 
+        transaction: on SQLite the lock only makes concurrent checkouts wait 
+        for each other if it is the first statement of the outermost 
+        transaction.
         
         Parameters
         ----------
         form : CheckoutForm
             The form instance containing the submitted data.
-        charge_id : str
-            The charge ID for the Stripe payment if applicable.
+        customer_id : str, optional
+            The id of the Stripe customer paying for the order.
          
         Returns
         -------
         Order
             The newly created order instance.
+
+        Raises
+        ------
+        CartTrimmed
+            If the cart holds more tickets than are left. The cart is trimmed 
+            to the tickets left and no order is created.
         """
         
         if form is not None:
@@ -186,15 +201,25 @@ class CheckoutView(StudentAccessMixin, FormView):
         else:
             line_1, line_2, city_town, postcode, country = '', '', '', '', ''
             
-        order = Order.objects.create(
-            student=self.student,
-            line_1=line_1,
-            line_2=line_2,
-            city_town=city_town,
-            postcode=postcode,
-            country=country,
-            customer_id=customer_id,
-        )
+        with transaction.atomic():
+            # Lock the events first, see Event.lock_events
+            events = Event.lock_events(
+                Event.objects.filter(eventcartitem__basecart=self.cart)
+            )
+            trimmed = self.cart.trim_to_availability(events)
+            if not trimmed:
+                order = Order.objects.create(
+                    student=self.student,
+                    line_1=line_1,
+                    line_2=line_2,
+                    city_town=city_town,
+                    postcode=postcode,
+                    country=country,
+                    customer_id=customer_id,
+                )
+                self._send_order_confirmation(order, form)
+        if trimmed:
+            raise CartTrimmed(trimmed)
         return order
         
     def _handle_stripe_error(self, e):
@@ -264,7 +289,8 @@ class CheckoutView(StudentAccessMixin, FormView):
     
     def _send_order_confirmation(self, order, form):
         """
-        Send an email confirmation for the given order.
+        Enqueue the email confirmation for the given order. The email is 
+        rendered and sent by a background job once the tickets are issued.
 
         Parameters
         ----------
@@ -274,39 +300,8 @@ class CheckoutView(StudentAccessMixin, FormView):
             The form containing checkout information.
         """
         
-        subject = f"We have received your order #{order.id}"
-        from_email = settings.EMAIL_HOST_USER
-        
         if form:
             to_email = form.cleaned_data['email']
         else:
             to_email = self.student.email
-        
-        try:
-            payment = Payment.objects.get(order=order)
-        except Payment.DoesNotExist:
-            payment = None
-    
-        context = ({
-            'order': order,
-            'tickets': Ticket.objects.filter(order=order),
-            'payment': payment,
-            'cart': HistoricalCart.objects.get(order=order)
-        })
-        html_message = render_to_string(
-            'student/email/order_confirmation.html', 
-            context
-        )
-
-        # Create the email and attach the HTML message.  
-        msg = EmailMultiAlternatives(
-            subject,
-            '',
-            from_email,
-            [to_email],
-        )
-        msg.attach_alternative(html_message, "text/html")
-
-        # send the email
-        msg.send()
-
+        Job.enqueue('send_order_confirmation', order, email=to_email)
@@ -27,7 +27,7 @@ class StudentEventPageView(StudentAccessMixin, DetailView):
             The current user's student object.
         """
         
-        return self.request.user.student
+        return self.request.user
     
     def get_object(self):
         """
@@ -26,8 +26,8 @@ class FollowSocietyView(StudentAccessMixin, View):
         
         society_pk = request.POST.get('society_pk')
         society = get_object_or_404(Society, pk=society_pk)
-        student = request.user.student
-        if student in society.followers:
+        student = request.user
+        if student.relationships.follows(society):
             society.remove_follower(student)
         else:
             society.add_follower(student)
@@ -1,15 +1,19 @@
 from django.views.generic import ListView
 from django.db.models import Q
 from django.utils import timezone
-from tsp.models import Society, Event, Student
+from tsp.models import Society, Event, FeedEntry
 from tsp.views.helpers import StudentAccessMixin
+from tsp.views.pagination import KeysetPaginationMixin
+from tsp.search import search_events
 from itertools import chain
 
-class ForYouPageView(StudentAccessMixin, ListView):
+class ForYouPageView(StudentAccessMixin, KeysetPaginationMixin, ListView):
     """View that displays all the events associated with a followed society."""
 
     model = Event
     template_name = 'student/for_you_page.html'
+    items_template_name = 'partials/lists/events.html'
+    keyset_ordering = ('start_time', 'id')
     selected_society = 'ALL'
         
     def get_queryset(self):
@@ -29,19 +33,58 @@ class ForYouPageView(StudentAccessMixin, ListView):
         if society_filter != 'ALL':
             self.selected_society = Society.objects.get(name=society_filter)
             context = Event.objects.filter(society=self.selected_society)
+        elif not self.request.GET.get('search'):
+            # The feed holds each event of the followed societies and the 
+            # saved events once, with their times and status, so that a page 
+            # is read from its index without joining the events first
+            return FeedEntry.objects.filter(
+                student=self.request.user.id,
+                end_time__gte=timezone.now(),
+                status=Event.Status.ACTIVE
+            ).select_related('event')
         else:
-            student = Student.objects.get(id=self.request.user.id)
-            followed_societies = Society.objects.filter(follower=student)
-            followed_society_events = Event.objects.filter(society__in=followed_societies)
-            saved_events = student.saved_event.all()
-            context = followed_society_events | saved_events
+            context = Event.objects.filter(feed_entries__student=self.request.user.id)
         context = self._filter_events(context)
         return context
 
+    def get_keyset_ordering(self):
+        """
+        Get the fields the objects are ordered by.
+
+        Returns
+        -------
+        tuple of str
+            The start time and id of the events, from the feed entries when 
+            the feed is read.
+        """
+
+        if self.object_list.model is FeedEntry:
+            return ('start_time', 'event_id')
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Get the page of events after the cursor of the request, the events 
+        of the feed entries when the feed is read.
+
+        Returns
+        -------
+        tuple
+            No paginator, the page, the events of the page and whether the 
+            list has more than one page.
+        """
+
+        paginator, page, object_list, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        if queryset.model is FeedEntry:
+            object_list = [entry.event for entry in object_list]
+            page.object_list = object_list
+        return paginator, page, object_list, is_paginated
+
     def _filter_events(self, events):
         """
         Filter a queryset of events based on user selection.
-        The queryset is then ordered by start time in ascending order.
 
         Parameters
         ----------
@@ -55,11 +98,11 @@ class ForYouPageView(StudentAccessMixin, ListView):
         """
     
         search_query = self.request.GET.get('search', "")
+        events = search_events(search_query, queryset=events, ranked=False)
         events = events.filter(
-            Q(name__contains=search_query),
             Q(end_time__gte=timezone.now()), 
             Q(status='ACTIVE')
-        ).distinct().order_by('start_time__date', 'start_time__hour', 'start_time__minute')
+        )
         return events
 
     def get_context_data(self, **kwargs):
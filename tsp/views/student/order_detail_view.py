@@ -1,7 +1,7 @@
 from django.views.generic import DetailView
 from tsp.views.helpers import StudentAccessMixin
 from django.shortcuts import get_object_or_404
-from tsp.models import Order, HistoricalCart, Payment
+from tsp.models import Order, OrderLine, Payment, Job
 
 class OrderDetailView(StudentAccessMixin, DetailView):
     """View for a student to view an order."""
@@ -20,14 +20,16 @@ class OrderDetailView(StudentAccessMixin, DetailView):
             A dictionary containing the following key(s):
             - 'total_price': The total price of the order.
             - 'total_saved': The total saved from the order.
-            - 'event_cart_items': The events in the order.
-            - 'memberships': The memberships in the order.
+            - 'lines': The items of the order as they were bought.
             - 'payment': The payment object.
+            - 'processing_status': The status of the background jobs of the 
+              order.
         """
         
         context = super().get_context_data(**kwargs)
-        order = self.get_object()
-        historical_cart = HistoricalCart.objects.get(order=order)
+        order = self.object
+        lines = list(order.lines.all())
+        total_price, total_saved = OrderLine.get_totals(lines)
 
         try:
             payment = Payment.objects.get(order=order)
@@ -36,12 +38,11 @@ class OrderDetailView(StudentAccessMixin, DetailView):
             payment = None 
         
         context.update({
-            'total_price': historical_cart.total_price,
-            'total_saved': historical_cart.total_saved,
-            'discount_data': historical_cart.discount_data_dict,
-            'event_cart_items': historical_cart.event_cart_item.all(),
-            'memberships': historical_cart.membership.all(),
+            'total_price': total_price,
+            'total_saved': total_saved,
+            'lines': lines,
             'payment' : payment,
+            'processing_status': Job.get_order_status(order),
         })
         return context
 
@@ -61,5 +62,5 @@ class OrderDetailView(StudentAccessMixin, DetailView):
         return get_object_or_404(   
             Order, 
             pk=self.kwargs.get('pk'), 
-            student=self.request.user.student
+            student=self.request.user
         )
\ No newline at end of file
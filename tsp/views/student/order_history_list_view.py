@@ -1,13 +1,16 @@
 from tsp.views.helpers import StudentAccessMixin
 from django.views.generic import ListView
 from tsp.models import Order
+from tsp.views.pagination import KeysetPaginationMixin
 
-class ListOrderHistoryView(StudentAccessMixin, ListView):
+class ListOrderHistoryView(StudentAccessMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of orders for a student account."""   
 
     model = Order 
     template_name = 'student/order_history_list.html'
     context_object_name = "order"
+    items_template_name = 'partials/lists/orders.html'
+    keyset_ordering = ('-create_at', 'id')
 
     def get_queryset(self):
         """
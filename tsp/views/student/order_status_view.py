@@ -0,0 +1,33 @@
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.generic import View
+from tsp.views.helpers import StudentAccessMixin
+from tsp.models import Order, Job
+
+class OrderStatusView(StudentAccessMixin, View):
+    """
+    View that reports the processing status of an order of the current 
+    student, polled by the order detail page while the background jobs of 
+    the order are running.
+    """
+
+    def get(self, request, pk):
+        """
+        Handle GET requests to the view.
+
+        Parameters
+        ----------
+        request : HttpRequest
+            The HTTP request object.
+        pk : int
+            The primary key of the order.
+
+        Returns
+        -------
+        JsonResponse
+            A JSON response with the status of the order, either 'PENDING', 
+            'SUCCEEDED' or 'FAILED'.
+        """
+
+        order = get_object_or_404(Order, pk=pk, student=request.user)
+        return JsonResponse({'status': Job.get_order_status(order)})
@@ -27,7 +27,7 @@ class SaveEventView(StudentAccessMixin, View):
         
         event_pk = request.POST['event_pk']
         event = get_object_or_404(Event, pk=event_pk)
-        student = request.user.student
+        student = request.user
         if student.event_saved(event):
             student.unsave_event(event)
         else:
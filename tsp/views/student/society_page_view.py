@@ -29,7 +29,7 @@ class SocietyPageView(StudentAccessMixin, DetailView):
         """
         
         society_pk = self.kwargs.get('pk')
-        student = self.request.user.student
+        student = self.request.user
         
         return get_object_or_404(   
             Society, 
@@ -53,9 +53,9 @@ class SocietyPageView(StudentAccessMixin, DetailView):
         """
 
         context = super().get_context_data(**kwargs)
-        student = self.request.user.student
-        society = self.get_object()
+        student = self.request.user
+        society = self.object
         context['is_member'] = society.is_student_member(student)
-        context['is_follower'] = student in society.followers
-        context['is_subscriber'] = student in society.subscribers
+        context['is_follower'] = student.relationships.follows(society)
+        context['is_subscriber'] = student.relationships.is_subscribed(society)
         return context
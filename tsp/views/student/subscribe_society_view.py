@@ -26,8 +26,8 @@ class SubscribeSocietyView(StudentAccessMixin, View):
         
         society_pk = request.POST.get('society_pk')
         society = get_object_or_404(Society, pk=society_pk)
-        student = request.user.student
-        if student in society.subscribers:
+        student = request.user
+        if student.relationships.is_subscribed(society):
             society.remove_subscriber(student)
         else:
             society.add_subscriber(student)
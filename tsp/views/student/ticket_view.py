@@ -21,8 +21,9 @@ class TicketView(StudentAccessMixin, DetailView):
         """
         
         context = super().get_context_data(**kwargs)
-        order = self.get_object()
-        context['tickets'] = Ticket.objects.filter(order=order)
+        context['tickets'] = Ticket.objects.filter(
+            order=self.object
+        ).select_related('order_line')
         return context
 
     def get_queryset(self):
@@ -37,4 +38,4 @@ class TicketView(StudentAccessMixin, DetailView):
         """
         
         queryset = super().get_queryset()
-        return queryset.filter(student=self.request.user.student)
\ No newline at end of file
+        return queryset.filter(student=self.request.user)
\ No newline at end of file
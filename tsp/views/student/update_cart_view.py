@@ -1,7 +1,7 @@
 from django.views.generic import View
 from django.urls import reverse_lazy 
 from tsp.models import Cart, EventCartItem, Society
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import redirect
 from tsp.forms.student.update_cart_form import UpdateCartForm
 from tsp.views.helpers import StudentAccessMixin
 from django.http import JsonResponse
@@ -35,7 +35,8 @@ class UpdateCartView(StudentAccessMixin, FormMixin, View):
     
     def get(self, request, *args, **kwargs):
         """
-        Handles GET requests to the view.
+        Handles GET requests to the view. The quantity widgets of the cart 
+        get the tickets left from the availability view.
 
         Parameters
         ----------
@@ -44,28 +45,9 @@ class UpdateCartView(StudentAccessMixin, FormMixin, View):
 
         Returns
         -------
-        HttpResponse or JsonResponse
-            The HTTP response or JSON response.
+        HttpResponseRedirect
+            A redirect to the cart.
         """
-        
-        cart = self.get_object()
-        event_cart_item_id = request.GET.get('event_cart_item_id')
-        if event_cart_item_id:
-            event_cart_item = get_object_or_404(EventCartItem, pk=event_cart_item_id)
-            form = self.form_class(event=event_cart_item.event) 
-            form.cart=cart
-
-        # Return a JSON response with the available ticket quantities when 
-        # the request is an AJAX request and the action is to get the maximum 
-        # ticket availability
-        if (request.headers.get('x-requested-with') == 'XMLHttpRequest' 
-            and request.GET.get('action') == 'get_max_availability'):
-            early_bird_availability = form._get_available_ticket_quantities('early_bird')
-            standard_availability = form._get_available_ticket_quantities('standard')
-            return JsonResponse({
-                'early_bird_availability': early_bird_availability,
-                'standard_availability': standard_availability,
-            })
 
         return redirect('cart_detail')
     
@@ -91,9 +73,9 @@ class UpdateCartView(StudentAccessMixin, FormMixin, View):
         form.event_cart_item=event_cart_item
         if form.is_valid():         
             form.save()
-            return JsonResponse({'success': True})
-        else:
+        if form.errors:
             return JsonResponse({'success': False, 'errors': form.errors})
+        return JsonResponse({'success': True})
         
     def _get_event_cart_item(self, cart, request):
         """
@@ -1,16 +1,34 @@
 from django.views.generic import ListView
+from tsp import caching
+from tsp.views.caching import CachedViewMixin
 from tsp.views.helpers import StudentUnionAccessMixin
+from tsp.views.pagination import KeysetPaginationMixin
 from tsp.models import Society, University
 from tsp.forms.student_union.all_societies_form import AllSocietiesForm
 
-class SocietiesView(StudentUnionAccessMixin, ListView):
+class SocietiesView(StudentUnionAccessMixin, CachedViewMixin, KeysetPaginationMixin, ListView):
     """View that displays a list of all societies."""
 
     model = Society
+    cache_name = 'societies'
     form_class = AllSocietiesForm
     template_name = 'student_union/societies_list.html'
+    items_template_name = 'partials/lists/societies_table.html'
+    keyset_ordering = ('name', 'id')
     selected_option = "King's College London"
 
+    def get_cache_namespaces(self):
+        """
+        Get the namespaces of the cached contexts of the view.
+
+        Returns
+        -------
+        list of str
+            The namespace of the societies of the university of the user.
+        """
+
+        return [caching.societies_namespace(self.request.user.university_id)]
+
     def get_queryset(self):
         """
         Get the queryset of all societies in the same university as the student union.
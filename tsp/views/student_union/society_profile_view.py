@@ -27,7 +27,7 @@ class SocietyProfileView(StudentUnionAccessMixin, DetailView):
         """
         
         society_pk = self.kwargs.get('pk')
-        student_union = self.request.user.studentunion
+        student_union = self.request.user
         
         return get_object_or_404(   
             Society, 